@@ -4,7 +4,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
 from src.utilitarios_centrais.logger import logger
-from src.rotas import rt_fluig_chamados, rt_fluig_servicos, rt_fluig_datasets, rt_fluig_processos
+from src.rotas import rt_fluig_chamados, rt_fluig_servicos, rt_fluig_datasets, rt_fluig_processos, rt_fluig_diagnostico, rt_metricas
 from src.rotas.webapp import rt_login, rt_chamado
 from src.web.web_auth_manager import (
     iniciar_login_automatico, 
@@ -18,7 +18,19 @@ from src.historico_monitor.background_service import (
     iniciar_monitoramento_historico,
     parar_monitoramento_historico,
 )
+from src.fluig.fluig_pool import fechar_clientes_fluig, fechar_clientes_fluig_async
+from src.fluig.fluig_diretorio import (
+    iniciar_sincronizacao_diretorio,
+    parar_sincronizacao_diretorio,
+)
+from src.fluig.fluig_catalogo import (
+    iniciar_sincronizacao_catalogo,
+    parar_sincronizacao_catalogo,
+)
+from src.site.filas_materializadas import iniciar_atualizacao_filas, parar_atualizacao_filas
+from src.site.filas_push import parar_publicacao_filas
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.metricas import MiddlewareMetricasHTTP
 
 import uvicorn
 
@@ -30,6 +42,15 @@ async def lifespan(app: FastAPI):
     logger.info("Iniciando renovação automática de cookies do Fluig (intervalo: 20 minutos)...")
     iniciar_login_automatico()
     
+    # Diretório local de colaboradores (carrega do disco e sincroniza em background)
+    iniciar_sincronizacao_diretorio()
+    
+    # Catálogo de serviços (snapshot local sincronizado em background)
+    iniciar_sincronizacao_catalogo()
+    
+    # Filas do webapp pré-carregadas em background (grupo e usuários ativos)
+    iniciar_atualizacao_filas()
+    
     # Verifica se o monitoramento de emails está habilitado
     gmail_enabled = getattr(ConfigEnvSetings, 'GMAIL_MONITOR_ENABLED', 'true').lower()
     if gmail_enabled in ('true', '1', 'yes'):
@@ -83,6 +104,22 @@ async def lifespan(app: FastAPI):
     
     logger.info("Parando renovação automática de cookies...")
     parar_login_automatico()
+    
+    logger.info("Parando sincronização do diretório de colaboradores...")
+    parar_sincronizacao_diretorio()
+    
+    logger.info("Parando sincronização do catálogo de serviços...")
+    parar_sincronizacao_catalogo()
+    
+    # Encerra os pollers das filas em tempo real (SSE)
+    parar_publicacao_filas()
+    
+    # Para a pré-carga das filas e salva os usuários ativos
+    parar_atualizacao_filas()
+    
+    # Fecha conexões HTTP compartilhadas com o Fluig
+    await fechar_clientes_fluig_async()
+    fechar_clientes_fluig()
 
 
 app = FastAPI(
@@ -92,13 +129,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 app.add_middleware(SessionMiddleware, secret_key="CV7uYNpRr2tciYu2s4IEWaikuIAw")
+app.add_middleware(MiddlewareMetricasHTTP)
 app.mount("/static", StaticFiles(directory="src/site/static"), name="static")
 
 
 app.include_router(rt_fluig_chamados.rt_fluig_chamados, prefix="/api/v1")
 app.include_router(rt_fluig_servicos.rt_fluig_servicos, prefix="/api/v1")
 app.include_router(rt_fluig_datasets.rt_fluig_datasets, prefix="/api/v1")
+app.include_router(rt_fluig_diagnostico.rt_fluig_diagnostico, prefix="/api/v1")
 app.include_router(rt_fluig_processos.rt_fluig_processos)
+app.include_router(rt_metricas.rt_metricas)
 app.include_router(rt_login.router)
 app.include_router(rt_chamado.router)
 
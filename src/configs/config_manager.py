@@ -9,6 +9,7 @@ import os
 from pathlib import Path
 from typing import Optional, Dict
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.rastreamento import com_span
 
 # Caminho do arquivo de configuração
 CONFIG_FILE = Path(__file__).parent / "personalizar_chamado.ini"
@@ -189,6 +190,7 @@ class ConfigManager:
             print(f"Erro ao salvar configuração: {str(e)}")
             return False
     
+    @com_span("config.carregar_configuracao")
     def carregar_configuracao(self, email: Optional[str] = None) -> Dict[str, str]:
         """
         Carrega as configurações salvas
@@ -500,6 +502,7 @@ class ConfigManagerGerais:
             print(f"Erro ao salvar configuração geral: {str(e)}")
             return False
     
+    @com_span("config.carregar_configuracao_gerais")
     def carregar_configuracao(self) -> Dict[str, str]:
         """
         Carrega as configurações gerais do sistema
@@ -3,6 +3,7 @@ Gerenciador de configurações no Google Drive
 Sincroniza arquivos de configuração entre o sistema local e o Google Drive
 """
 import io
+import threading
 from pathlib import Path
 from typing import Optional, Dict, List
 from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
@@ -11,6 +12,8 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import medir_drive
+from src.utilitarios_centrais.rastreamento import com_span
 
 
 class DriveConfigManager:
@@ -18,11 +21,26 @@ class DriveConfigManager:
     
     def __init__(self):
         """Inicializa o gerenciador de configurações do Drive"""
-        self.service = None
+        # O cliente HTTP do googleapiclient (httplib2) não é thread-safe:
+        # cada thread usa seu próprio serviço, criado a partir das mesmas credenciais
+        self._credentials = None
+        self._local = threading.local()
+        # Cache dos IDs de subpastas (nome, pai) -> id, evita uma consulta ao Drive por leitura/escrita
+        self._pastas: Dict[tuple, str] = {}
+        self._pastas_lock = threading.Lock()
         self.base_folder_id = None
         self._inicializar_servico()
         self._obter_pasta_configs()
     
+    @property
+    def service(self):
+        """Serviço do Google Drive da thread atual (None se as credenciais não foram criadas)"""
+        servico = getattr(self._local, 'service', None)
+        if servico is None and self._credentials is not None:
+            servico = build('drive', 'v3', credentials=self._credentials, cache_discovery=False)
+            self._local.service = servico
+        return servico
+    
     def _inicializar_servico(self):
         """Inicializa o serviço do Google Drive"""
         try:
@@ -51,14 +69,16 @@ class DriveConfigManager:
             if hasattr(ConfigEnvSetings, 'GMAIL_DELEGATE_USER') and ConfigEnvSetings.GMAIL_DELEGATE_USER:
                 credentials = credentials.with_subject(ConfigEnvSetings.GMAIL_DELEGATE_USER)
             
-            self.service = build('drive', 'v3', credentials=credentials)
+            self._local.service = build('drive', 'v3', credentials=credentials, cache_discovery=False)
+            self._credentials = credentials
             logger.debug("[DriveConfigManager] Serviço do Google Drive criado com sucesso")
             
         except Exception as e:
             logger.error(f"[DriveConfigManager] Erro ao criar serviço do Google Drive: {str(e)}")
             import traceback
             logger.debug(f"[DriveConfigManager] Traceback: {traceback.format_exc()}")
-            self.service = None
+            self._credentials = None
+            self._local.service = None
     
     def _obter_pasta_configs(self):
         """Obtém o ID da pasta de configurações no Drive"""
@@ -97,6 +117,23 @@ class DriveConfigManager:
             logger.error("[DriveConfigManager] Serviço do Drive não inicializado")
             return None
         
+        chave_pasta = (nome_pasta, parent_id)
+        folder_id = self._pastas.get(chave_pasta)
+        if folder_id:
+            return folder_id
+        
+        # Serializa busca/criação para que threads concorrentes não criem a mesma pasta duas vezes
+        with self._pastas_lock:
+            folder_id = self._pastas.get(chave_pasta)
+            if folder_id:
+                return folder_id
+            folder_id = self._buscar_ou_criar_pasta(nome_pasta, parent_id)
+            if folder_id:
+                self._pastas[chave_pasta] = folder_id
+            return folder_id
+    
+    def _buscar_ou_criar_pasta(self, nome_pasta: str, parent_id: Optional[str] = None) -> Optional[str]:
+        """Busca a pasta no Drive e cria se não existir (ver _criar_pasta_se_nao_existir)"""
         try:
             # Busca pasta existente
             query = f"name='{nome_pasta}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
@@ -105,11 +142,12 @@ class DriveConfigManager:
             else:
                 query += " and 'root' in parents"
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name)",
-                pageSize=1
-            ).execute()
+            with medir_drive('buscar'):
+                results = self.service.files().list(
+                    q=query,
+                    fields="files(id, name)",
+                    pageSize=1
+                ).execute()
             
             files = results.get('files', [])
             if files:
@@ -125,10 +163,11 @@ class DriveConfigManager:
             if parent_id:
                 file_metadata['parents'] = [parent_id]
             
-            folder = self.service.files().create(
-                body=file_metadata,
-                fields='id'
-            ).execute()
+            with medir_drive('criar_pasta'):
+                folder = self.service.files().create(
+                    body=file_metadata,
+                    fields='id'
+                ).execute()
             
             folder_id = folder.get('id')
             logger.info(f"[DriveConfigManager] Pasta '{nome_pasta}' criada (ID: {folder_id})")
@@ -162,11 +201,12 @@ class DriveConfigManager:
             if folder_id:
                 query += f" and '{folder_id}' in parents"
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, modifiedTime)",
-                pageSize=1
-            ).execute()
+            with medir_drive('buscar'):
+                results = self.service.files().list(
+                    q=query,
+                    fields="files(id, name, modifiedTime)",
+                    pageSize=1
+                ).execute()
             
             # Valida se results é um dicionário
             if not isinstance(results, dict):
@@ -249,29 +289,32 @@ class DriveConfigManager:
                 # Se precisar mover o arquivo para outra pasta, usa addParents/removeParents
                 if pasta_destino_id:
                     # Obtém os pais atuais do arquivo
-                    arquivo_atual = self.service.files().get(
-                        fileId=arquivo_id,
-                        fields='parents'
-                    ).execute()
+                    with medir_drive('metadados'):
+                        arquivo_atual = self.service.files().get(
+                            fileId=arquivo_id,
+                            fields='parents'
+                        ).execute()
                     pais_atuais = arquivo_atual.get('parents', [])
                     
                     # Se o arquivo não está na pasta correta, move ele
                     if pasta_destino_id not in pais_atuais:
                         # Remove dos pais antigos e adiciona ao novo
-                        self.service.files().update(
-                            fileId=arquivo_id,
-                            addParents=pasta_destino_id,
-                            removeParents=','.join(pais_atuais) if pais_atuais else None,
-                            fields='id'
-                        ).execute()
+                        with medir_drive('metadados'):
+                            self.service.files().update(
+                                fileId=arquivo_id,
+                                addParents=pasta_destino_id,
+                                removeParents=','.join(pais_atuais) if pais_atuais else None,
+                                fields='id'
+                            ).execute()
                 
                 # Atualiza o conteúdo do arquivo
-                file = self.service.files().update(
-                    fileId=arquivo_id,
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
+                with medir_drive('upload'):
+                    file = self.service.files().update(
+                        fileId=arquivo_id,
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    ).execute()
                 logger.info(f"[DriveConfigManager] Arquivo '{nome_arquivo}' atualizado no Drive (ID: {arquivo_id})")
             else:
                 # Cria novo arquivo
@@ -281,11 +324,12 @@ class DriveConfigManager:
                 if pasta_destino_id:
                     file_metadata['parents'] = [pasta_destino_id]
                 
-                file = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
+                with medir_drive('upload'):
+                    file = self.service.files().create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    ).execute()
                 arquivo_id = file.get('id')
                 logger.info(f"[DriveConfigManager] Arquivo '{nome_arquivo}' enviado para o Drive (ID: {arquivo_id})")
             
@@ -342,8 +386,9 @@ class DriveConfigManager:
             downloader = MediaIoBaseDownload(conteudo, request)
             
             done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            with medir_drive('download'):
+                while not done:
+                    status, done = downloader.next_chunk()
             
             # Salva arquivo localmente
             caminho_local.parent.mkdir(parents=True, exist_ok=True)
@@ -362,6 +407,7 @@ class DriveConfigManager:
             logger.debug(f"[DriveConfigManager] Traceback: {traceback.format_exc()}")
             return False
     
+    @com_span("drive.listar_configs")
     def listar_configs(self, subpasta: Optional[str] = None) -> List[Dict[str, str]]:
         """
         Lista todos os arquivos de configuração no Drive
@@ -385,11 +431,12 @@ class DriveConfigManager:
                 if not pasta_id:
                     return []
             
-            results = self.service.files().list(
-                q=f"'{pasta_id}' in parents and trashed=false",
-                fields="files(id, name, modifiedTime, size)",
-                pageSize=100
-            ).execute()
+            with medir_drive('listar'):
+                results = self.service.files().list(
+                    q=f"'{pasta_id}' in parents and trashed=false",
+                    fields="files(id, name, modifiedTime, size)",
+                    pageSize=100
+                ).execute()
             
             arquivos = []
             for file in results.get('files', []):
@@ -406,6 +453,7 @@ class DriveConfigManager:
             logger.error(f"[DriveConfigManager] Erro ao listar arquivos: {str(e)}")
             return []
     
+    @com_span("drive.ler_config_do_drive")
     def ler_config_do_drive(self, nome_arquivo: str, subpasta: Optional[str] = None) -> Optional[str]:
         """
         Lê conteúdo de um arquivo de configuração diretamente do Drive
@@ -442,8 +490,9 @@ class DriveConfigManager:
             downloader = MediaIoBaseDownload(conteudo, request)
             
             done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            with medir_drive('download'):
+                while not done:
+                    status, done = downloader.next_chunk()
             
             # Retorna conteúdo como string
             return conteudo.getvalue().decode('utf-8')
@@ -452,6 +501,7 @@ class DriveConfigManager:
             logger.error(f"[DriveConfigManager] Erro ao ler arquivo '{nome_arquivo}' do Drive: {str(e)}")
             return None
     
+    @com_span("drive.salvar_config_no_drive")
     def salvar_config_no_drive(self, conteudo: str, nome_arquivo: str, subpasta: Optional[str] = None) -> bool:
         """
         Salva conteúdo de configuração diretamente no Drive
@@ -499,29 +549,32 @@ class DriveConfigManager:
                 # Se precisar mover o arquivo para outra pasta, usa addParents/removeParents
                 if pasta_destino_id:
                     # Obtém os pais atuais do arquivo
-                    arquivo_atual = self.service.files().get(
-                        fileId=arquivo_id,
-                        fields='parents'
-                    ).execute()
+                    with medir_drive('metadados'):
+                        arquivo_atual = self.service.files().get(
+                            fileId=arquivo_id,
+                            fields='parents'
+                        ).execute()
                     pais_atuais = arquivo_atual.get('parents', [])
                     
                     # Se o arquivo não está na pasta correta, move ele
                     if pasta_destino_id not in pais_atuais:
                         # Remove dos pais antigos e adiciona ao novo
-                        self.service.files().update(
-                            fileId=arquivo_id,
-                            addParents=pasta_destino_id,
-                            removeParents=','.join(pais_atuais) if pais_atuais else None,
-                            fields='id'
-                        ).execute()
+                        with medir_drive('metadados'):
+                            self.service.files().update(
+                                fileId=arquivo_id,
+                                addParents=pasta_destino_id,
+                                removeParents=','.join(pais_atuais) if pais_atuais else None,
+                                fields='id'
+                            ).execute()
                 
                 # Atualiza o conteúdo do arquivo
-                file = self.service.files().update(
-                    fileId=arquivo_id,
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
+                with medir_drive('upload'):
+                    file = self.service.files().update(
+                        fileId=arquivo_id,
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    ).execute()
                 logger.info(f"[DriveConfigManager] Arquivo '{nome_arquivo}' atualizado no Drive (ID: {arquivo_id})")
             else:
                 # Cria novo arquivo
@@ -531,11 +584,12 @@ class DriveConfigManager:
                 if pasta_destino_id:
                     file_metadata['parents'] = [pasta_destino_id]
                 
-                file = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
+                with medir_drive('upload'):
+                    file = self.service.files().create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    ).execute()
                 arquivo_id = file.get('id')
                 logger.info(f"[DriveConfigManager] Arquivo '{nome_arquivo}' criado no Drive (ID: {arquivo_id})")
             
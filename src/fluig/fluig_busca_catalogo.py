@@ -0,0 +1,187 @@
+"""
+Índice de busca (typeahead) do catálogo de serviços
+
+Busca por servico, item_servico e grupo_servico sem acento/caixa, tolerante a
+palavras incompletas e erros de digitação:
+- índice invertido token -> serviços, com o vocabulário ordenado para achar
+  prefixos por bisect (o usuário ainda está digitando a palavra);
+- índice de trigramas token -> vocabulário para termos com erro de digitação
+  (similaridade de Jaccard entre os trigramas do termo e de cada token).
+
+Ranking: serviços que atendem mais termos primeiro; depois a soma dos pesos
+(campo: servico > item_servico > grupo_servico; qualidade: exato > prefixo >
+aproximado) e um bônus quando o nome começa com / contém a consulta inteira.
+
+O índice é imutável e montado junto com o IndiceCatalogo. Na recarga, a
+análise de cada serviço (normalização e tokens) e os trigramas de cada token
+são reaproveitados do índice anterior, então só os serviços novos ou
+alterados são processados de novo.
+"""
+import heapq
+import re
+from bisect import bisect_left
+from typing import Any, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from src.fluig.fluig_diretorio import normalizar_termo
+
+# Campos pesquisados e peso de cada um no ranking
+CAMPOS_BUSCA: Tuple[Tuple[str, float], ...] = (
+    ('servico', 3.0),
+    ('item_servico', 2.0),
+    ('grupo_servico', 1.0),
+)
+
+# Máximo de resultados por busca
+LIMITE_MAXIMO_RESULTADOS = 50
+
+# Similaridade mínima de trigramas para aceitar um token como erro de digitação
+SIMILARIDADE_MINIMA = 0.35
+# Termos menores que isso só casam por prefixo (trigramas de 1-2 letras não discriminam)
+TAMANHO_MINIMO_APROXIMADO = 3
+
+_QUALIDADE_EXATO = 1.0
+_QUALIDADE_PREFIXO = 0.8
+_QUALIDADE_APROXIMADO = 0.6
+
+_SEPARADORES = re.compile(r'[^0-9a-z]+')
+
+
+def _tokens(texto_normalizado: str) -> Tuple[str, ...]:
+    return tuple(t for t in _SEPARADORES.split(texto_normalizado) if t)
+
+
+def _trigramas(token: str) -> FrozenSet[str]:
+    """Trigramas do token com bordas (como o pg_trgm: dois espaços antes, um depois)"""
+    texto = f"  {token} "
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+class _ServicoAnalisado(NamedTuple):
+    nome: str
+    tokens_por_campo: Tuple[Tuple[str, ...], ...]
+
+
+def _analisar(chave: Tuple[str, ...]) -> _ServicoAnalisado:
+    normalizados = [normalizar_termo(valor) for valor in chave]
+    return _ServicoAnalisado(normalizados[0], tuple(_tokens(n) for n in normalizados))
+
+
+class IndiceBuscaServicos:
+    """
+    Índice imutável de busca sobre uma lista de serviços
+
+    Attributes:
+        total_tokens: Tamanho do vocabulário
+        reaproveitados: Serviços cuja análise veio do índice anterior
+    """
+
+    def __init__(self, servicos: Sequence[Mapping[str, Any]], anterior: Optional["IndiceBuscaServicos"] = None):
+        analises_anteriores = anterior._analises if anterior is not None else {}
+        trigramas_anteriores = anterior._trigramas_token if anterior is not None else {}
+
+        self._servicos = tuple(servicos)
+        self._analises: Dict[Tuple[str, ...], _ServicoAnalisado] = {}
+        self._nomes: List[str] = []
+        self.reaproveitados = 0
+
+        postings: Dict[str, Dict[int, float]] = {}
+        for posicao, servico in enumerate(self._servicos):
+            chave = tuple(str(servico.get(campo) or '') for campo, _ in CAMPOS_BUSCA)
+            analise = self._analises.get(chave) or analises_anteriores.get(chave)
+            if analise is None:
+                analise = _analisar(chave)
+            else:
+                self.reaproveitados += 1
+            self._analises[chave] = analise
+            self._nomes.append(analise.nome)
+            for (_, peso), tokens in zip(CAMPOS_BUSCA, analise.tokens_por_campo):
+                for token in tokens:
+                    pesos = postings.setdefault(token, {})
+                    if pesos.get(posicao, 0.0) < peso:
+                        pesos[posicao] = peso
+
+        self._vocabulario: List[str] = sorted(postings)
+        self._postings: Dict[str, Tuple[Tuple[int, float], ...]] = {
+            token: tuple(pesos.items()) for token, pesos in postings.items()
+        }
+
+        self._trigramas_token: Dict[str, FrozenSet[str]] = {}
+        por_trigrama: Dict[str, List[str]] = {}
+        for token in self._vocabulario:
+            trigramas = trigramas_anteriores.get(token) or _trigramas(token)
+            self._trigramas_token[token] = trigramas
+            for trigrama in trigramas:
+                por_trigrama.setdefault(trigrama, []).append(token)
+        self._por_trigrama: Dict[str, Tuple[str, ...]] = {t: tuple(v) for t, v in por_trigrama.items()}
+
+        self.total_tokens = len(self._vocabulario)
+
+    def _pesos_termo(self, termo: str) -> Dict[int, float]:
+        """Melhor peso de cada serviço para um termo (exato, prefixo ou aproximado)"""
+        melhores: Dict[int, float] = {}
+
+        def somar(token: str, qualidade: float):
+            for posicao, peso in self._postings[token]:
+                valor = peso * qualidade
+                if melhores.get(posicao, 0.0) < valor:
+                    melhores[posicao] = valor
+
+        inicio = bisect_left(self._vocabulario, termo)
+        for indice in range(inicio, len(self._vocabulario)):
+            token = self._vocabulario[indice]
+            if not token.startswith(termo):
+                break
+            somar(token, _QUALIDADE_EXATO if token == termo else _QUALIDADE_PREFIXO)
+
+        if len(termo) >= TAMANHO_MINIMO_APROXIMADO:
+            trigramas = _trigramas(termo)
+            comuns: Dict[str, int] = {}
+            for trigrama in trigramas:
+                for token in self._por_trigrama.get(trigrama, ()):
+                    comuns[token] = comuns.get(token, 0) + 1
+            for token, quantidade in comuns.items():
+                if token.startswith(termo):
+                    continue
+                similaridade = quantidade / (len(trigramas) + len(self._trigramas_token[token]) - quantidade)
+                if similaridade >= SIMILARIDADE_MINIMA:
+                    somar(token, _QUALIDADE_APROXIMADO * similaridade)
+
+        return melhores
+
+    def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[Mapping[str, Any], float]]:
+        """
+        Retorna os serviços mais relevantes para a consulta
+
+        Args:
+            consulta: Texto digitado (parcial, com ou sem acento)
+            limite: Quantidade máxima de resultados (até LIMITE_MAXIMO_RESULTADOS)
+
+        Returns:
+            Lista de (serviço, pontuação), do mais relevante para o menos
+        """
+        limite = min(limite, LIMITE_MAXIMO_RESULTADOS)
+        consulta_normalizada = normalizar_termo(consulta)
+        termos = list(dict.fromkeys(_tokens(consulta_normalizada)))
+        if not termos or limite <= 0:
+            return []
+
+        pontos: Dict[int, float] = {}
+        acertos: Dict[int, int] = {}
+        for termo in termos:
+            for posicao, peso in self._pesos_termo(termo).items():
+                pontos[posicao] = pontos.get(posicao, 0.0) + peso
+                acertos[posicao] = acertos.get(posicao, 0) + 1
+
+        for posicao in pontos:
+            nome = self._nomes[posicao]
+            if nome.startswith(consulta_normalizada):
+                pontos[posicao] += 2.0
+            elif consulta_normalizada in nome:
+                pontos[posicao] += 1.0
+
+        melhores = heapq.nsmallest(
+            limite,
+            pontos,
+            key=lambda p: (-acertos[p], -pontos[p], len(self._nomes[p]), self._nomes[p])
+        )
+        return [(self._servicos[p], round(pontos[p], 3)) for p in melhores]
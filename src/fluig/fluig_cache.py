@@ -0,0 +1,1004 @@
+"""
+Cache em memória (TTL + LRU) para consultas ao Fluig
+
+CacheTTL é limitado em quantidade de entradas, seguro entre threads e
+coalesce misses concorrentes da mesma chave (single-flight): enquanto a
+primeira chamada busca no Fluig, as demais aguardam o mesmo resultado, tanto
+em threads (FluigCore) quanto em corrotinas (AsyncFluigCore).
+
+O cache de datasets (get_cache_datasets) fica na frente de Dataset_config,
+com chave (ambiente, datasetId, campo, valor) e TTL curto para "não encontrado".
+
+ExecucoesEmVoo é o single-flight sem armazenamento, usado sob RequestTipoGET
+para que GETs idênticos simultâneos compartilhem uma única requisição.
+
+CacheRevalidacao (stale-while-revalidate) fica na frente das listagens de
+fila do webapp: limitado em entradas e bytes, responde com a entrada vencida
+enquanto uma única atualização por chave roda em background.
+
+CacheDetalhesChamados guarda os detalhes de cada chamado (processInstanceId)
+junto com a versão da task (movementSequence, estado, status e responsável)
+vista na listagem /api/v2/tasks: a entrada só é usada enquanto a versão da
+listagem atual for a mesma, então uma atualização de fila só busca os
+detalhes dos chamados que se moveram.
+"""
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, NamedTuple, Optional, Tuple
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_atualizacao_cache, registrar_consulta_cache
+
+
+def _copiar(valor: Any) -> Any:
+    """Copia estruturas mutáveis para que o chamador não altere o que está no cache"""
+    if isinstance(valor, (dict, list)):
+        return copy.deepcopy(valor)
+    return valor
+
+
+# Resultado entregue a quem aguardava quando o líder é cancelado
+_LIDER_CANCELADO = object()
+
+
+class CacheTTL:
+    """
+    Cache limitado com expiração por TTL, descarte LRU e cache negativo
+
+    Cargas simultâneas da mesma chave são feitas uma vez (obter_ou_carregar).
+    Se quem carrega for cancelado (cliente desconectou), o cancelamento não é
+    repassado: um dos que aguardavam assume e carrega de novo.
+
+    Attributes:
+        nome: Nome do cache (usado nos logs e estatísticas)
+        max_entradas: Máximo de entradas mantidas (as menos usadas são descartadas)
+        ttl_segundos: Validade das entradas positivas
+        ttl_negativo_segundos: Validade das entradas negativas ("não encontrado")
+    """
+
+    def __init__(self, nome: str, max_entradas: int, ttl_segundos: float, ttl_negativo_segundos: float):
+        self.nome = nome
+        self.max_entradas = max(1, int(max_entradas))
+        self.ttl_segundos = float(ttl_segundos)
+        self.ttl_negativo_segundos = float(ttl_negativo_segundos)
+
+        self._lock = threading.Lock()
+        # chave -> (expira_em, valor, negativo)
+        self._dados: "OrderedDict[Hashable, Tuple[float, Any, bool]]" = OrderedDict()
+        self._em_voo: Dict[Hashable, Future] = {}
+
+        self.hits = 0
+        self.hits_negativos = 0
+        self.misses = 0
+        self.coalescidos = 0
+        self.expirados = 0
+        self.descartados = 0
+        self.lideres_cancelados = 0
+
+    def _buscar_valido(self, chave: Hashable) -> Tuple[bool, Any]:
+        """Busca a chave no cache (chamar com o lock adquirido)"""
+        entrada = self._dados.get(chave)
+        if entrada is None:
+            return False, None
+
+        expira_em, valor, negativo = entrada
+        if time.monotonic() >= expira_em:
+            del self._dados[chave]
+            self.expirados += 1
+            return False, None
+
+        self._dados.move_to_end(chave)
+        self.hits += 1
+        if negativo:
+            self.hits_negativos += 1
+        return True, valor
+
+    def obter(self, chave: Hashable) -> Tuple[bool, Any]:
+        """
+        Obtém um valor do cache
+
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            encontrado, valor = self._buscar_valido(chave)
+        return encontrado, _copiar(valor) if encontrado else None
+
+    def salvar(self, chave: Hashable, valor: Any, negativo: bool = False):
+        """Salva um valor com o TTL correspondente (positivo ou negativo)"""
+        ttl = self.ttl_negativo_segundos if negativo else self.ttl_segundos
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + ttl, _copiar(valor), negativo)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+                self.descartados += 1
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> int:
+        """
+        Remove uma chave (ou todas, se chave for None)
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            if chave is None:
+                removidas = len(self._dados)
+                self._dados.clear()
+                return removidas
+            return 1 if self._dados.pop(chave, None) is not None else 0
+
+    def _reservar(self, chave: Hashable) -> Tuple[str, Any]:
+        """
+        Decide o que fazer com a chave: ('hit', valor), ('aguardar', future) ou ('carregar', future)
+        """
+        with self._lock:
+            encontrado, valor = self._buscar_valido(chave)
+            if encontrado:
+                return 'hit', _copiar(valor)
+
+            futuro = self._em_voo.get(chave)
+            if futuro is not None:
+                self.coalescidos += 1
+                return 'aguardar', futuro
+
+            self.misses += 1
+            futuro = Future()
+            # Em execução: quem aguarda e é cancelado não consegue cancelar o resultado compartilhado
+            futuro.set_running_or_notify_cancel()
+            self._em_voo[chave] = futuro
+            return 'carregar', futuro
+
+    def _concluir(
+        self,
+        chave: Hashable,
+        futuro: Future,
+        valor: Any,
+        erro: Optional[BaseException],
+        armazenar: Optional[Callable[[Any], bool]],
+        negativo: Optional[Callable[[Any], bool]]
+    ):
+        """Armazena o resultado do carregamento e libera quem estava aguardando"""
+        if erro is None and (armazenar is None or armazenar(valor)):
+            self.salvar(chave, valor, negativo=bool(negativo and negativo(valor)))
+        with self._lock:
+            self._em_voo.pop(chave, None)
+        if erro is not None:
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(valor)
+
+    def obter_ou_carregar(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Any],
+        armazenar: Optional[Callable[[Any], bool]] = None,
+        negativo: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Retorna o valor do cache ou executa o carregador (uma única vez por chave em voo)
+
+        Args:
+            chave: Chave do cache
+            carregador: Função que busca o valor na origem
+            armazenar: Decide se o resultado deve ser armazenado (padrão: sempre)
+            negativo: Decide se o resultado é "não encontrado" (usa TTL negativo)
+
+        Returns:
+            Valor do cache ou da origem
+        """
+        acao, dado = self._reservar(chave)
+        if acao == 'hit':
+            return dado
+        if acao == 'aguardar':
+            return _copiar(dado.result())
+
+        try:
+            valor = carregador()
+        except BaseException as e:
+            self._concluir(chave, dado, None, e, armazenar, negativo)
+            raise
+        self._concluir(chave, dado, valor, None, armazenar, negativo)
+        return valor
+
+    async def obter_ou_carregar_async(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]] = None,
+        negativo: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Versão assíncrona de obter_ou_carregar (carregador é uma corrotina)"""
+        while True:
+            acao, dado = self._reservar(chave)
+            if acao == 'hit':
+                return dado
+            if acao == 'aguardar':
+                valor = await asyncio.wrap_future(dado)
+                if valor is _LIDER_CANCELADO:
+                    # Líder cancelado: quem reservar primeiro carrega de novo
+                    continue
+                return _copiar(valor)
+
+            try:
+                valor = await carregador()
+            except asyncio.CancelledError:
+                with self._lock:
+                    self.lideres_cancelados += 1
+                self._concluir(chave, dado, _LIDER_CANCELADO, None, lambda _: False, None)
+                raise
+            except BaseException as e:
+                self._concluir(chave, dado, None, e, armazenar, negativo)
+                raise
+            self._concluir(chave, dado, valor, None, armazenar, negativo)
+            return valor
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+        with self._lock:
+            consultas = self.hits + self.misses + self.coalescidos
+            return {
+                'nome': self.nome,
+                'tamanho': len(self._dados),
+                'max_entradas': self.max_entradas,
+                'ttl_segundos': self.ttl_segundos,
+                'ttl_negativo_segundos': self.ttl_negativo_segundos,
+                'hits': self.hits,
+                'hits_negativos': self.hits_negativos,
+                'misses': self.misses,
+                'coalescidos': self.coalescidos,
+                'expirados': self.expirados,
+                'descartados': self.descartados,
+                'lideres_cancelados': self.lideres_cancelados,
+                'em_voo': len(self._em_voo),
+                'taxa_acerto': round((self.hits + self.coalescidos) / consultas, 4) if consultas else 0.0,
+            }
+
+
+class ExecucoesEmVoo:
+    """
+    Single-flight sem armazenamento: chamadas simultâneas com a mesma chave
+    compartilham uma única execução e o mesmo resultado (ou exceção)
+
+    Assim que a execução termina a chave é liberada; a próxima chamada
+    executa de novo (não há cache).
+
+    A execução roda no contexto de quem chegou primeiro (líder): prioridade
+    no limitador, prazo_fluig e span de rastreamento são os dele, e quem
+    aguarda recebe o resultado (ou o PrazoExcedidoError) obtido sob esse
+    contexto. Se o líder for cancelado (cliente desconectou), o cancelamento
+    não é repassado: um dos que aguardavam assume e executa de novo.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._em_voo: Dict[Hashable, Future] = {}
+        self.execucoes = 0
+        self.coalescidas = 0
+        self.lideres_cancelados = 0
+
+    def _reservar(self, chave: Hashable) -> Tuple[bool, Future]:
+        """Retorna (executar, future): executar=False indica que já existe execução em andamento"""
+        with self._lock:
+            futuro = self._em_voo.get(chave)
+            if futuro is not None:
+                self.coalescidas += 1
+                return False, futuro
+            self.execucoes += 1
+            futuro = Future()
+            # Em execução: quem aguarda e é cancelado não consegue cancelar o resultado compartilhado
+            futuro.set_running_or_notify_cancel()
+            self._em_voo[chave] = futuro
+            return True, futuro
+
+    def _concluir(self, chave: Hashable, futuro: Future, valor: Any, erro: Optional[BaseException]):
+        """Libera a chave e entrega o resultado a quem estava aguardando"""
+        with self._lock:
+            self._em_voo.pop(chave, None)
+        if erro is not None:
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(valor)
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        """
+        Executa a função ou aguarda a execução idêntica já em andamento
+
+        Args:
+            chave: Identifica chamadas equivalentes
+            funcao: Função a executar
+
+        Returns:
+            Resultado da função (compartilhado entre as chamadas coalescidas)
+        """
+        executar, futuro = self._reservar(chave)
+        if not executar:
+            return futuro.result()
+
+        try:
+            valor = funcao()
+        except BaseException as e:
+            self._concluir(chave, futuro, None, e)
+            raise
+        self._concluir(chave, futuro, valor, None)
+        return valor
+
+    async def executar_async(self, chave: Hashable, funcao: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de executar (funcao é uma corrotina)"""
+        while True:
+            executar, futuro = self._reservar(chave)
+            if not executar:
+                valor = await asyncio.wrap_future(futuro)
+                if valor is _LIDER_CANCELADO:
+                    # Líder cancelado: quem reservar primeiro executa de novo
+                    continue
+                return valor
+
+            try:
+                valor = await funcao()
+            except asyncio.CancelledError:
+                with self._lock:
+                    self.lideres_cancelados += 1
+                self._concluir(chave, futuro, _LIDER_CANCELADO, None)
+                raise
+            except BaseException as e:
+                self._concluir(chave, futuro, None, e)
+                raise
+            self._concluir(chave, futuro, valor, None)
+            return valor
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna execuções reais, chamadas coalescidas e execuções em andamento"""
+        with self._lock:
+            total = self.execucoes + self.coalescidas
+            return {
+                'nome': self.nome,
+                'execucoes': self.execucoes,
+                'coalescidas': self.coalescidas,
+                'lideres_cancelados': self.lideres_cancelados,
+                'em_voo': len(self._em_voo),
+                'taxa_coalescencia': round(self.coalescidas / total, 4) if total else 0.0,
+            }
+
+
+class CacheRevalidacao:
+    """
+    Cache assíncrono limitado (entradas e bytes) com stale-while-revalidate
+
+    - Entrada com menos de ttl_segundos: devolvida direto (hit).
+    - Entre ttl_segundos e max_obsoleto_segundos: devolvida vencida (obsoleto)
+      e uma atualização da chave é disparada em background, se ainda não houver.
+    - Sem entrada ou vencida há mais que max_obsoleto_segundos: quem chega
+      primeiro carrega (miss) e os demais aguardam a mesma carga (coalescido).
+
+    Há no máximo uma carga em andamento por chave. Falha na atualização em
+    background mantém a entrada vencida; falha numa carga sem entrada é
+    propagada a quem aguardava. Os valores devem ser imutáveis (ex.: FilaSerializada, com a
+    resposta JSON já serializada); o tamanho de cada entrada vem de `tamanho`.
+
+    Attributes:
+        nome: Nome do cache (logs, estatísticas e métricas)
+        max_entradas: Máximo de entradas (as menos usadas são descartadas)
+        max_bytes: Máximo de bytes somando todas as entradas
+        ttl_segundos: Idade até a qual a entrada é servida sem atualizar
+        max_obsoleto_segundos: Idade máxima em que a entrada ainda é servida vencida
+        armazenavel: Decide se um valor pode ser guardado (ex.: fila sem detalhes faltando); padrão: sempre
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        max_entradas: int,
+        max_bytes: int,
+        ttl_segundos: float,
+        max_obsoleto_segundos: float,
+        tamanho: Callable[[Any], int] = len,
+        armazenavel: Optional[Callable[[Any], bool]] = None
+    ):
+        self.nome = nome
+        self.max_entradas = max(1, int(max_entradas))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl_segundos = float(ttl_segundos)
+        self.max_obsoleto_segundos = max(self.ttl_segundos, float(max_obsoleto_segundos))
+        self._tamanho = tamanho
+        self._armazenavel = armazenavel
+
+        self._lock = threading.Lock()
+        # chave -> (atualizado_em, valor, tamanho)
+        self._dados: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._em_voo: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.obsoletos = 0
+        self.misses = 0
+        self.coalescidos = 0
+        self.atualizacoes = 0
+        self.erros_atualizacao = 0
+        self.descartados = 0
+        self.grandes_demais = 0
+        self.recusados = 0
+
+    def _remover(self, chave: Hashable):
+        """Remove a entrada (chamar com o lock adquirido)"""
+        entrada = self._dados.pop(chave, None)
+        if entrada is not None:
+            self._bytes -= entrada[2]
+
+    def contem(self, chave: Hashable) -> bool:
+        """Indica se há entrada servível (até max_obsoleto_segundos) para a chave, sem carregar"""
+        with self._lock:
+            entrada = self._dados.get(chave)
+            return entrada is not None and time.monotonic() - entrada[0] <= self.max_obsoleto_segundos
+
+    def idade(self, chave: Hashable) -> Optional[float]:
+        """Segundos desde que a entrada foi salva (None se não houver entrada)"""
+        with self._lock:
+            entrada = self._dados.get(chave)
+            return time.monotonic() - entrada[0] if entrada is not None else None
+
+    def salvar(self, chave: Hashable, valor: Any):
+        """Salva um valor carregado fora do cache"""
+        if self._armazenavel is not None and not self._armazenavel(valor):
+            with self._lock:
+                self.recusados += 1
+            return
+        tamanho = self._tamanho(valor)
+        with self._lock:
+            self._remover(chave)
+            if tamanho > self.max_bytes:
+                self.grandes_demais += 1
+                logger.warning(f"[CacheRevalidacao] {self.nome}: entrada de {tamanho} bytes maior que o limite ({self.max_bytes}) - não armazenada")
+                return
+            self._dados[chave] = (time.monotonic(), valor, tamanho)
+            self._bytes += tamanho
+            while len(self._dados) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, _, tamanho_removido) = self._dados.popitem(last=False)
+                self._bytes -= tamanho_removido
+                self.descartados += 1
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> int:
+        """
+        Remove uma chave (ou todas, se chave for None)
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            if chave is None:
+                removidas = len(self._dados)
+                self._dados.clear()
+                self._bytes = 0
+                return removidas
+            existia = chave in self._dados
+            self._remover(chave)
+            return 1 if existia else 0
+
+    async def _carregar(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]]
+    ) -> Any:
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            valor = await carregador()
+            if armazenar is None or armazenar(valor):
+                self.salvar(chave, valor)
+            sucesso = True
+            return valor
+        finally:
+            with self._lock:
+                self._em_voo.pop(chave, None)
+                self.atualizacoes += 1
+                if not sucesso:
+                    self.erros_atualizacao += 1
+            registrar_atualizacao_cache(self.nome, time.perf_counter() - inicio, sucesso)
+
+    def _tarefa_carga(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]]
+    ) -> Tuple[asyncio.Task, bool]:
+        """Retorna a carga em andamento da chave ou cria uma (chamar com o lock adquirido)"""
+        loop = asyncio.get_running_loop()
+        tarefa = self._em_voo.get(chave)
+        if tarefa is not None and not tarefa.done() and tarefa.get_loop() is loop:
+            return tarefa, False
+        tarefa = loop.create_task(self._carregar(chave, carregador, armazenar))
+        self._em_voo[chave] = tarefa
+        return tarefa, True
+
+    def _registrar_falha_em_background(self, tarefa: asyncio.Task):
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.warning(f"[CacheRevalidacao] {self.nome}: falha ao atualizar em background - mantendo entrada vencida: {tarefa.exception()}")
+
+    def consultar(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, str, Optional[asyncio.Task]]:
+        """
+        Parte síncrona de obter_ou_carregar: contabiliza a consulta e dispara a carga se preciso
+
+        Para quem acompanha a carga enquanto ela roda (ex.: streaming da fila, em que o
+        carregador de quem dispara a carga transmite os chamados conforme chegam).
+
+        Returns:
+            Tupla (valor, resultado, carga): em 'hit'/'obsoleto' valor é a entrada e carga é None;
+            em 'miss'/'coalescido' valor é None e carga é a tarefa compartilhada (aguardar com
+            asyncio.shield, para o cancelamento de uma requisição não cancelar a carga)
+        """
+        with self._lock:
+            entrada = self._dados.get(chave)
+            idade = time.monotonic() - entrada[0] if entrada is not None else None
+            if idade is not None and idade > self.max_obsoleto_segundos:
+                self._remover(chave)
+                entrada = None
+
+            if entrada is not None:
+                self._dados.move_to_end(chave)
+                if idade < self.ttl_segundos:
+                    self.hits += 1
+                    resultado = 'hit'
+                else:
+                    self.obsoletos += 1
+                    resultado = 'obsoleto'
+                    tarefa, nova = self._tarefa_carga(chave, carregador, armazenar)
+                    if nova:
+                        tarefa.add_done_callback(self._registrar_falha_em_background)
+            else:
+                tarefa, nova = self._tarefa_carga(chave, carregador, armazenar)
+                if nova:
+                    self.misses += 1
+                    resultado = 'miss'
+                else:
+                    self.coalescidos += 1
+                    resultado = 'coalescido'
+
+        registrar_consulta_cache(self.nome, resultado)
+        if entrada is not None:
+            return entrada[1], resultado, None
+        return None, resultado, tarefa
+
+    async def obter_ou_carregar(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, str]:
+        """
+        Retorna o valor do cache (atualizando em background se vencido) ou carrega
+
+        Args:
+            chave: Chave do cache
+            carregador: Corrotina que busca o valor na origem
+            armazenar: Decide se o resultado deve ser armazenado (padrão: sempre)
+
+        Returns:
+            Tupla (valor, resultado) com resultado 'hit', 'obsoleto', 'miss' ou 'coalescido'
+        """
+        valor, resultado, carga = self.consultar(chave, carregador, armazenar)
+        if carga is None:
+            return valor, resultado
+        # shield: o cancelamento de uma requisição não cancela a carga compartilhada
+        return await asyncio.shield(carga), resultado
+
+    async def atualizar(
+        self,
+        chave: Hashable,
+        carregador: Callable[[], Awaitable[Any]],
+        armazenar: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Carrega o valor na origem e salva, aproveitando uma carga já em andamento da chave
+
+        Usado por quem mantém a entrada atualizada fora das consultas (pollers, pré-carga).
+
+        Returns:
+            Valor carregado (exceções da carga são propagadas)
+        """
+        with self._lock:
+            tarefa, _ = self._tarefa_carga(chave, carregador, armazenar)
+        return await asyncio.shield(tarefa)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+        with self._lock:
+            consultas = self.hits + self.obsoletos + self.misses + self.coalescidos
+            return {
+                'nome': self.nome,
+                'tamanho': len(self._dados),
+                'bytes': self._bytes,
+                'max_entradas': self.max_entradas,
+                'max_bytes': self.max_bytes,
+                'ttl_segundos': self.ttl_segundos,
+                'max_obsoleto_segundos': self.max_obsoleto_segundos,
+                'hits': self.hits,
+                'obsoletos': self.obsoletos,
+                'misses': self.misses,
+                'coalescidos': self.coalescidos,
+                'atualizacoes': self.atualizacoes,
+                'erros_atualizacao': self.erros_atualizacao,
+                'descartados': self.descartados,
+                'grandes_demais': self.grandes_demais,
+                'recusados': self.recusados,
+                'em_voo': len(self._em_voo),
+                'taxa_acerto': round((self.hits + self.obsoletos) / consultas, 4) if consultas else 0.0,
+            }
+
+
+def versao_task(item: Mapping[str, Any]) -> Tuple:
+    """
+    Versão de um chamado segundo a listagem de tasks
+
+    movementSequence muda a cada movimentação; estado, status e responsável
+    cobrem reatribuições e listagens sem movementSequence.
+    """
+    estado = item.get('state') or {}
+    responsavel = item.get('assignee') or {}
+    return (
+        item.get('movementSequence'),
+        estado.get('sequence') if isinstance(estado, dict) else estado,
+        item.get('status'),
+        responsavel.get('code') if isinstance(responsavel, dict) else responsavel,
+    )
+
+
+class CacheDetalhesChamados:
+    """
+    Cache de detalhes de chamados validado pela versão da task (ver versao_task)
+
+    A chave é (ambiente, processInstanceId). Uma entrada só é devolvida se a
+    versão informada for igual à salva; versão diferente conta como 'alterado'
+    e o detalhe é buscado de novo. ttl_segundos limita a idade da entrada mesmo
+    sem mudança de versão (ex.: formulário salvo sem movimentar). Cargas
+    simultâneas do mesmo chamado/versão são coalescidas.
+
+    Os detalhes são compartilhados sem cópia: quem lê não deve alterá-los.
+
+    Attributes:
+        nome: Nome do cache (logs, estatísticas e métricas)
+        max_entradas: Máximo de chamados mantidos (os menos usados são descartados)
+        ttl_segundos: Idade máxima de uma entrada
+    """
+
+    def __init__(self, nome: str, max_entradas: int, ttl_segundos: float):
+        self.nome = nome
+        self.max_entradas = max(1, int(max_entradas))
+        self.ttl_segundos = float(ttl_segundos)
+
+        self._lock = threading.Lock()
+        # (ambiente, processInstanceId) -> (salvo_em, versao, detalhes)
+        self._dados: "OrderedDict[Tuple[str, int], Tuple[float, Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._cargas = ExecucoesEmVoo(nome)
+
+        self.hits = 0
+        self.misses = 0
+        self.alterados = 0
+        self.expirados = 0
+        self.descartados = 0
+        self.invalidados = 0
+
+    @staticmethod
+    def _chave(ambiente: str, process_instance_id: Any) -> Tuple[str, int]:
+        return (ambiente.upper(), int(process_instance_id))
+
+    def _consultar(self, chave: Tuple[str, int], versao: Tuple) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Retorna (detalhes, resultado) com resultado 'hit', 'miss', 'alterado' ou 'expirado'"""
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None, 'miss'
+            salvo_em, versao_salva, detalhes = entrada
+            if versao_salva != versao:
+                del self._dados[chave]
+                self.alterados += 1
+                return None, 'alterado'
+            if time.monotonic() - salvo_em >= self.ttl_segundos:
+                del self._dados[chave]
+                self.expirados += 1
+                return None, 'expirado'
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return detalhes, 'hit'
+
+    def obter(self, ambiente: str, process_instance_id: Any, versao: Tuple) -> Optional[Dict[str, Any]]:
+        """Retorna os detalhes salvos para a versão informada (ou None)"""
+        detalhes, _ = self._consultar(self._chave(ambiente, process_instance_id), versao)
+        return detalhes
+
+    def salvar(self, ambiente: str, process_instance_id: Any, versao: Tuple, detalhes: Dict[str, Any]):
+        """Salva os detalhes do chamado na versão informada"""
+        if self.ttl_segundos <= 0:
+            return
+        chave = self._chave(ambiente, process_instance_id)
+        with self._lock:
+            self._dados[chave] = (time.monotonic(), versao, detalhes)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+                self.descartados += 1
+
+    def invalidar(self, ambiente: Optional[str] = None, process_instance_id: Any = None) -> int:
+        """
+        Remove um chamado (ou todos, se ambiente/process_instance_id forem None)
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            if ambiente is None or process_instance_id is None:
+                removidas = len(self._dados)
+                self._dados.clear()
+            else:
+                removidas = 1 if self._dados.pop(self._chave(ambiente, process_instance_id), None) is not None else 0
+            self.invalidados += removidas
+            return removidas
+
+    async def obter_ou_carregar_async(
+        self,
+        ambiente: str,
+        process_instance_id: Any,
+        versao: Tuple,
+        carregador: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Retorna os detalhes da versão informada, buscando na origem se necessário
+
+        Args:
+            ambiente: Ambiente do Fluig (PRD ou QLD)
+            process_instance_id: Número do chamado
+            versao: Versão atual da task (versao_task)
+            carregador: Corrotina que busca os detalhes no Fluig (None em caso de falha, não armazenado)
+
+        Returns:
+            Tupla (detalhes, resultado) com resultado 'hit', 'miss', 'alterado' ou 'expirado'
+        """
+        chave = self._chave(ambiente, process_instance_id)
+        detalhes, resultado = self._consultar(chave, versao)
+        registrar_consulta_cache(self.nome, resultado)
+        if detalhes is not None:
+            return detalhes, resultado
+
+        async def carregar():
+            inicio = time.perf_counter()
+            valor = await carregador()
+            registrar_atualizacao_cache(self.nome, time.perf_counter() - inicio, valor is not None)
+            if valor is not None:
+                self.salvar(ambiente, process_instance_id, versao, valor)
+            return valor
+
+        return await self._cargas.executar_async((chave, versao), carregar), resultado
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+        cargas = self._cargas.estatisticas()
+        with self._lock:
+            consultas = self.hits + self.misses + self.alterados + self.expirados
+            return {
+                'nome': self.nome,
+                'tamanho': len(self._dados),
+                'max_entradas': self.max_entradas,
+                'ttl_segundos': self.ttl_segundos,
+                'hits': self.hits,
+                'misses': self.misses,
+                'alterados': self.alterados,
+                'expirados': self.expirados,
+                'descartados': self.descartados,
+                'invalidados': self.invalidados,
+                'cargas': cargas['execucoes'],
+                'coalescidos': cargas['coalescidas'],
+                'em_voo': cargas['em_voo'],
+                'taxa_acerto': round(self.hits / consultas, 4) if consultas else 0.0,
+            }
+
+
+# ==================== CACHE DE DATASETS ====================
+_cache_datasets: Optional[CacheTTL] = None
+_cache_datasets_lock = threading.Lock()
+
+
+def get_cache_datasets() -> Optional[CacheTTL]:
+    """
+    Retorna a instância global do cache de datasets
+
+    Returns:
+        CacheTTL ou None se DATASET_CACHE_ENABLED estiver desabilitado
+    """
+    global _cache_datasets
+    if str(getattr(ConfigEnvSetings, 'DATASET_CACHE_ENABLED', 'true')).lower() != 'true':
+        return None
+    if _cache_datasets is None:
+        with _cache_datasets_lock:
+            if _cache_datasets is None:
+                _cache_datasets = CacheTTL(
+                    nome="datasets",
+                    max_entradas=int(getattr(ConfigEnvSetings, 'DATASET_CACHE_MAX_ENTRADAS', 2000)),
+                    ttl_segundos=float(getattr(ConfigEnvSetings, 'DATASET_CACHE_TTL_SEGUNDOS', 900)),
+                    ttl_negativo_segundos=float(getattr(ConfigEnvSetings, 'DATASET_CACHE_TTL_NEGATIVO_SEGUNDOS', 60)),
+                )
+                logger.info(
+                    f"[fluig_cache] Cache de datasets criado - Máx: {_cache_datasets.max_entradas}, "
+                    f"TTL: {_cache_datasets.ttl_segundos}s, TTL negativo: {_cache_datasets.ttl_negativo_segundos}s"
+                )
+    return _cache_datasets
+
+
+def chave_cache_dataset(ambiente: str, parametro: Dict[str, str]) -> Tuple[str, str, str, str]:
+    """
+    Monta a chave (ambiente, datasetId, campo, valor) a partir dos parâmetros de Dataset_config
+
+    O valor é normalizado (sem espaços nas pontas, minúsculo) para que variações
+    de caixa do mesmo email/nome compartilhem a entrada.
+    """
+    campo, _, valor = parametro['filterFields'].partition(',')
+    return (ambiente.upper(), parametro['datasetId'], campo, valor.strip().casefold())
+
+
+def dataset_sem_resultados(dados: Any) -> bool:
+    """Indica se a resposta do dataset não trouxe registros ("não encontrado")"""
+    if not isinstance(dados, dict):
+        return False
+    content = dados.get('content')
+    if isinstance(content, dict):
+        content = content.get('values')
+    return not content
+
+
+def _resposta_armazenavel(dados: Any) -> bool:
+    """Só armazena respostas processadas (dict); erros HTTP voltam como Response e não entram no cache"""
+    return isinstance(dados, dict)
+
+
+def buscar_dataset_com_cache(ambiente: str, parametro: Dict[str, str], carregador: Callable[[], Any]) -> Any:
+    """
+    Executa a busca de dataset passando pelo cache (se habilitado)
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        parametro: Parâmetros montados por montar_busca_dataset
+        carregador: Função que faz a requisição ao Fluig
+
+    Returns:
+        Resultado de tratar_resposta_dataset (do cache ou do Fluig)
+    """
+    cache = get_cache_datasets()
+    if cache is None:
+        return carregador()
+    return cache.obter_ou_carregar(
+        chave_cache_dataset(ambiente, parametro),
+        carregador,
+        armazenar=_resposta_armazenavel,
+        negativo=dataset_sem_resultados,
+    )
+
+
+async def buscar_dataset_com_cache_async(ambiente: str, parametro: Dict[str, str], carregador: Callable[[], Awaitable[Any]]) -> Any:
+    """Versão assíncrona de buscar_dataset_com_cache"""
+    cache = get_cache_datasets()
+    if cache is None:
+        return await carregador()
+    return await cache.obter_ou_carregar_async(
+        chave_cache_dataset(ambiente, parametro),
+        carregador,
+        armazenar=_resposta_armazenavel,
+        negativo=dataset_sem_resultados,
+    )
+
+
+# ==================== CACHE DAS FILAS DE CHAMADOS ====================
+_cache_filas_chamados: Optional[CacheRevalidacao] = None
+_cache_filas_chamados_lock = threading.Lock()
+
+
+class FilaSerializada(NamedTuple):
+    """
+    Valor do cache das filas: resposta JSON já serializada e se ela está completa
+
+    completa é False quando a busca de detalhes de algum chamado falhou ou estourou
+    o prazo; essa fila é devolvida a quem pediu, mas não vai para o cache.
+    """
+    corpo: bytes
+    completa: bool
+
+
+def _tamanho_fila(fila: FilaSerializada) -> int:
+    return len(fila.corpo)
+
+
+def _fila_completa(fila: FilaSerializada) -> bool:
+    return fila.completa
+
+
+def get_cache_filas_chamados() -> CacheRevalidacao:
+    """Retorna o cache global das listagens de fila do webapp (FILA_CACHE_*)"""
+    global _cache_filas_chamados
+    if _cache_filas_chamados is None:
+        with _cache_filas_chamados_lock:
+            if _cache_filas_chamados is None:
+                _cache_filas_chamados = CacheRevalidacao(
+                    nome="filas_chamados",
+                    max_entradas=int(getattr(ConfigEnvSetings, 'FILA_CACHE_MAX_ENTRADAS', 200)),
+                    max_bytes=int(getattr(ConfigEnvSetings, 'FILA_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+                    ttl_segundos=float(getattr(ConfigEnvSetings, 'FILA_CACHE_TTL_SEGUNDOS', 300)),
+                    max_obsoleto_segundos=float(getattr(ConfigEnvSetings, 'FILA_CACHE_MAX_OBSOLETO_SEGUNDOS', 1800)),
+                    tamanho=_tamanho_fila,
+                    armazenavel=_fila_completa,
+                )
+    return _cache_filas_chamados
+
+
+# ==================== CACHE DE DETALHES DE CHAMADOS ====================
+_cache_detalhes_chamados: Optional[CacheDetalhesChamados] = None
+_cache_detalhes_chamados_lock = threading.Lock()
+
+
+def get_cache_detalhes_chamados() -> Optional[CacheDetalhesChamados]:
+    """
+    Retorna o cache global de detalhes de chamados (webapp e monitores)
+
+    Returns:
+        CacheDetalhesChamados ou None se CHAMADO_DETALHES_CACHE_ENABLED estiver desabilitado
+    """
+    global _cache_detalhes_chamados
+    if str(getattr(ConfigEnvSetings, 'CHAMADO_DETALHES_CACHE_ENABLED', 'true')).lower() != 'true':
+        return None
+    if _cache_detalhes_chamados is None:
+        with _cache_detalhes_chamados_lock:
+            if _cache_detalhes_chamados is None:
+                _cache_detalhes_chamados = CacheDetalhesChamados(
+                    nome="detalhes_chamados",
+                    max_entradas=int(getattr(ConfigEnvSetings, 'CHAMADO_DETALHES_CACHE_MAX_ENTRADAS', 5000)),
+                    ttl_segundos=float(getattr(ConfigEnvSetings, 'CHAMADO_DETALHES_CACHE_TTL_SEGUNDOS', 3600)),
+                )
+                logger.info(
+                    f"[fluig_cache] Cache de detalhes de chamados criado - Máx: {_cache_detalhes_chamados.max_entradas}, "
+                    f"TTL: {_cache_detalhes_chamados.ttl_segundos}s"
+                )
+    return _cache_detalhes_chamados
+
+
+# ==================== COALESCÊNCIA DE GETs ====================
+_coalescedores_get: Dict[str, ExecucoesEmVoo] = {
+    'sync': ExecucoesEmVoo("get_sync"),
+    'async': ExecucoesEmVoo("get_async"),
+}
+
+
+def get_coalescedor_get(assincrono: bool = False) -> Optional[ExecucoesEmVoo]:
+    """
+    Retorna o coalescedor de GETs ao Fluig (RequestsFluig ou RequestsFluigAsync)
+
+    Sync e async ficam separados porque compartilham objetos de resposta
+    de bibliotecas diferentes (requests x httpx).
+
+    Returns:
+        ExecucoesEmVoo ou None se FLUIG_GET_COALESCING_ENABLED estiver desabilitado
+    """
+    if str(getattr(ConfigEnvSetings, 'FLUIG_GET_COALESCING_ENABLED', 'true')).lower() != 'true':
+        return None
+    return _coalescedores_get['async' if assincrono else 'sync']
+
+
+def chave_requisicao_get(ambiente: str, url: str, parametros: Optional[Dict[str, Any]]) -> Tuple:
+    """Monta a chave de um GET (ambiente + URL + parâmetros em ordem estável)"""
+    itens = tuple(sorted((str(k), str(v)) for k, v in (parametros or {}).items()))
+    return (ambiente.upper(), url, itens)
+
+
+def obter_estatisticas_coalescencia() -> Dict[str, Any]:
+    """Retorna as estatísticas dos coalescedores de GET (sync e async)"""
+    return {tipo: coalescedor.estatisticas() for tipo, coalescedor in _coalescedores_get.items()}
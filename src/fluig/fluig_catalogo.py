@@ -0,0 +1,700 @@
+"""
+Catálogo de serviços em memória, sincronizado a partir do dataset ITSM_Catalogo_Servico
+
+Fonte do catálogo, em ordem de preferência:
+- src/json/catalogo_servicos_{ambiente}.json: snapshot compacto e versionado
+  com os detalhes de todos os serviços, gravado pelo SincronizadorCatalogo
+  (thread em background);
+- src/json/servicos_{ambiente}.json: lista salva por POST /fluig/{ambiente}/servicos
+  (só a primeira página do dataset), usada até a primeira sincronização.
+
+O arquivo é carregado uma vez em um IndiceCatalogo imutável, indexado por
+documentid e por nome normalizado (sem acento/caixa), e compartilhado pelas
+rotas. A cada consulta só é feito um stat do arquivo: se mudou, um novo
+índice é montado e a referência é trocada, então leituras concorrentes nunca
+veem um catálogo pela metade. A sincronização monta o índice da nova revisão
+na própria thread, logo após gravar o snapshot; as rotas async usam
+indice_async, que só lê a referência pronta (uma recarga, se ainda for
+necessária, roda fora do event loop). O corpo da resposta de /listar_servicos é
+serializado na carga, então a rota só devolve os bytes prontos, e o índice
+de busca (typeahead, fluig_busca_catalogo) é montado junto, reaproveitando
+a análise dos serviços que não mudaram.
+
+A sincronização percorre o dataset em páginas (só o documentid) e busca os
+detalhes em lotes: uma requisição a /api/public/ecm/dataset/datasets/ por
+lote, com uma constraint SHOULD de documentid por serviço. Cada nova revisão
+do snapshot registra o que mudou (incluídos, removidos e campos alterados)
+em src/json/catalogo_servicos_{ambiente}_alteracoes.jsonl.
+
+obter_detalhes_servico é o resolvedor único dos detalhes de um serviço (rota
+POST /fluig/{ambiente}/servicos/detalhes e webapp): snapshot e, para serviços
+que ainda não estão nele, cache em memória com TTL e single-flight (CacheTTL)
+na frente do Fluig.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.fluig.fluig_busca_catalogo import IndiceBuscaServicos
+from src.fluig.fluig_cache import CacheTTL, dataset_sem_resultados
+from src.fluig.fluig_diretorio import normalizar_termo
+from src.fluig.fluig_limitador import com_prioridade_fluig, PRIORIDADE_BACKGROUND
+from src.fluig.fluig_requests import RequestsFluig
+from src.fluig.fluig_resiliencia import circuito_aberto, FAMILIA_DATASET
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_ciclo_loop
+from src.web.web_servicos_fluig import obter_detalhes_servico_fluig
+
+DIRETORIO_JSON = Path(__file__).resolve().parent.parent / "json"
+DATASET_CATALOGO = "ITSM_Catalogo_Servico"
+VERSAO_SNAPSHOT = 1
+
+# Constraint SHOULD do Fluig: o registro atende se bater com qualquer uma delas
+_CONSTRAINT_SHOULD = 2
+
+
+def _assinatura_arquivo(caminho: Path) -> Optional[Tuple[int, int]]:
+    """Retorna (mtime_ns, tamanho) do arquivo ou None se não existe"""
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _resumo_servico(servico: Mapping[str, Any]) -> Dict[str, str]:
+    """Campos do serviço devolvidos por /listar_servicos"""
+    return {
+        'servico': servico.get('servico', ''),
+        'documentid': str(servico.get('documentid', '')),
+        'grupo_servico': servico.get('grupo_servico', ''),
+        'item_servico': servico.get('item_servico', ''),
+        'numero_documento': str(servico.get('documentid', ''))
+    }
+
+
+def _registros_dataset(dados: Any) -> List[Dict[str, Any]]:
+    """Extrai os registros de uma resposta de dataset (content como lista ou {'values': [...]})"""
+    content = dados.get('content') if isinstance(dados, dict) else None
+    if isinstance(content, dict):
+        content = content.get('values')
+    return [r for r in (content or []) if isinstance(r, dict)]
+
+
+class IndiceCatalogo:
+    """
+    Índice imutável do catálogo de serviços
+
+    Attributes:
+        assinatura: (arquivo, mtime_ns, tamanho) do arquivo carregado
+        completo: True se veio do snapshot (registros com todos os campos de detalhe)
+        revisao: Revisão do snapshot (None para a lista simples)
+        sincronizado_em: Data da sincronização que gerou o snapshot
+        por_documentid: documentid -> serviço
+        por_nome: nome normalizado -> serviço (primeira ocorrência, como a busca linear)
+        corpo_lista: Resposta JSON de /listar_servicos já serializada
+        busca: Índice de busca por servico, item_servico e grupo_servico
+    """
+
+    def __init__(
+        self,
+        servicos: Tuple[Mapping[str, Any], ...],
+        assinatura: Tuple[str, int, int],
+        completo: bool = False,
+        revisao: Optional[int] = None,
+        sincronizado_em: Optional[str] = None,
+        anterior: Optional["IndiceCatalogo"] = None
+    ):
+        self.assinatura = assinatura
+        self.servicos = servicos
+        self.completo = completo
+        self.revisao = revisao
+        self.sincronizado_em = sincronizado_em
+        por_documentid: Dict[str, Mapping[str, Any]] = {}
+        por_nome: Dict[str, Mapping[str, Any]] = {}
+        for servico in servicos:
+            por_documentid.setdefault(str(servico.get('documentid', '')), servico)
+            nome = normalizar_termo(servico.get('servico', ''))
+            if nome:
+                por_nome.setdefault(nome, servico)
+        self.por_documentid = MappingProxyType(por_documentid)
+        self.por_nome = MappingProxyType(por_nome)
+        # Mesmo formato do JSONResponse (ensure_ascii=False, separadores compactos)
+        self.corpo_lista = json.dumps(
+            {"sucesso": True, "servicos": [_resumo_servico(s) for s in servicos]},
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        self.busca = IndiceBuscaServicos(servicos, anterior.busca if anterior is not None else None)
+
+    def buscar_por_nome(self, nome: str) -> Optional[Mapping[str, Any]]:
+        """Busca um serviço pelo nome (sem acento/caixa/espaços extras)"""
+        return self.por_nome.get(normalizar_termo(nome))
+
+    def buscar_por_documentid(self, documentid: str) -> Optional[Mapping[str, Any]]:
+        """Busca um serviço pelo documentid"""
+        return self.por_documentid.get(str(documentid).strip())
+
+    def buscar(self, consulta: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Busca aproximada (typeahead) por nome, item e grupo do serviço
+
+        Args:
+            consulta: Texto digitado (parcial, sem acento, com erros de digitação)
+            limite: Quantidade máxima de resultados
+
+        Returns:
+            Serviços no formato de /listar_servicos com a pontuação, do mais relevante para o menos
+        """
+        return [
+            {**_resumo_servico(servico), 'pontuacao': pontuacao}
+            for servico, pontuacao in self.busca.buscar(consulta, limite)
+        ]
+
+
+class CatalogoServicos:
+    """
+    Catálogo de serviços de um ambiente, recarregado quando o arquivo muda
+
+    Attributes:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        arquivo_snapshot: Snapshot gravado pela sincronização (catalogo_servicos_{ambiente}.json)
+        arquivo: Lista simples (servicos_{ambiente}.json), usada enquanto não há snapshot
+    """
+
+    def __init__(self, ambiente: str, arquivo: Optional[Path] = None, arquivo_snapshot: Optional[Path] = None):
+        self.ambiente = ambiente.upper()
+        self.arquivo = arquivo or (DIRETORIO_JSON / f"servicos_{self.ambiente.lower()}.json")
+        self.arquivo_snapshot = arquivo_snapshot or (DIRETORIO_JSON / f"catalogo_servicos_{self.ambiente.lower()}.json")
+        self._indice: Optional[IndiceCatalogo] = None
+        self._lock = threading.Lock()
+        self.recargas = 0
+
+    def _assinatura_atual(self) -> Optional[Tuple[str, int, int]]:
+        """Assinatura do arquivo de origem (snapshot, se existir, senão a lista simples)"""
+        for caminho in (self.arquivo_snapshot, self.arquivo):
+            assinatura = _assinatura_arquivo(caminho)
+            if assinatura is not None:
+                return (str(caminho), *assinatura)
+        return None
+
+    def _carregar(self, assinatura: Tuple[str, int, int]) -> IndiceCatalogo:
+        caminho = Path(assinatura[0])
+        with open(caminho, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if caminho == self.arquivo_snapshot:
+            if not isinstance(data, dict) or data.get('versao') != VERSAO_SNAPSHOT or not isinstance(data.get('servicos'), list):
+                raise ValueError(f"Snapshot do catálogo inválido ou de versão incompatível: {caminho}")
+            servicos = tuple(MappingProxyType(dict(s)) for s in data['servicos'] if isinstance(s, dict))
+            return IndiceCatalogo(servicos, assinatura, True, data.get('revisao'), data.get('sincronizado_em'), self._indice)
+
+        content = data.get('content') if isinstance(data, dict) else None
+        if not isinstance(content, list):
+            raise ValueError(f"Formato inválido do arquivo de serviços: {caminho}")
+        servicos = tuple(MappingProxyType(dict(s)) for s in content if isinstance(s, dict))
+        return IndiceCatalogo(servicos, assinatura, anterior=self._indice)
+
+    def indice(self) -> Optional[IndiceCatalogo]:
+        """
+        Retorna o índice atual, recarregando se o arquivo mudou
+
+        Returns:
+            IndiceCatalogo ou None se nenhum dos arquivos existe
+
+        Raises:
+            ValueError: Se o arquivo não tem o formato esperado
+        """
+        assinatura = self._assinatura_atual()
+        if assinatura is None:
+            return None
+        indice = self._indice
+        if indice is not None and indice.assinatura == assinatura:
+            return indice
+
+        with self._lock:
+            # Outra thread pode ter recarregado enquanto esperava o lock
+            assinatura = self._assinatura_atual()
+            if assinatura is None:
+                return None
+            if self._indice is not None and self._indice.assinatura == assinatura:
+                return self._indice
+            self._indice = self._carregar(assinatura)
+            self.recargas += 1
+            logger.info(
+                f"[fluig_catalogo] Catálogo {self.ambiente} carregado de {Path(assinatura[0]).name}: "
+                f"{len(self._indice.servicos)} serviço(s)"
+            )
+            return self._indice
+
+    async def indice_async(self) -> Optional[IndiceCatalogo]:
+        """
+        Versão de indice para rotas async: a recarga (json.load e montagem dos índices) roda em outra thread
+
+        Returns:
+            IndiceCatalogo ou None se nenhum dos arquivos existe
+
+        Raises:
+            ValueError: Se o arquivo não tem o formato esperado
+        """
+        indice = self._indice
+        if indice is not None and indice.assinatura == self._assinatura_atual():
+            return indice
+        return await asyncio.to_thread(self.indice)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna a origem e o tamanho do catálogo e a quantidade de recargas"""
+        indice = self._indice
+        return {
+            'ambiente': self.ambiente,
+            'origem': Path(indice.assinatura[0]).name if indice else None,
+            'completo': indice.completo if indice else False,
+            'revisao': indice.revisao if indice else None,
+            'sincronizado_em': indice.sincronizado_em if indice else None,
+            'servicos': len(indice.servicos) if indice else 0,
+            'nomes_indexados': len(indice.por_nome) if indice else 0,
+            'tokens_busca': indice.busca.total_tokens if indice else 0,
+            'recargas': self.recargas,
+        }
+
+
+# ==================== SINCRONIZAÇÃO ====================
+
+def _diferencas(antigos: Mapping[str, Mapping[str, Any]], novos: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Compara dois catálogos (documentid -> serviço) e lista incluídos, removidos e alterados"""
+    incluidos = [{'documentid': i, 'servico': s.get('servico', '')} for i, s in novos.items() if i not in antigos]
+    removidos = [{'documentid': i, 'servico': s.get('servico', '')} for i, s in antigos.items() if i not in novos]
+    alterados = []
+    for documentid, novo in novos.items():
+        antigo = antigos.get(documentid)
+        if antigo is None or dict(antigo) == novo:
+            continue
+        campos = sorted(c for c in set(antigo) | set(novo) if antigo.get(c) != novo.get(c))
+        alterados.append({'documentid': documentid, 'servico': novo.get('servico', ''), 'campos': campos})
+    return {'incluidos': incluidos, 'removidos': removidos, 'alterados': alterados}
+
+
+class SincronizadorCatalogo:
+    """
+    Sincroniza o catálogo de serviços de um ambiente com o dataset ITSM_Catalogo_Servico
+
+    Attributes:
+        catalogo: CatalogoServicos do ambiente (lê o snapshot gravado aqui)
+        tamanho_pagina: documentids por página na listagem
+        tamanho_lote: documentids por requisição de detalhes
+        intervalo_minutos: Intervalo entre sincronizações
+        arquivo_alteracoes: Log das alterações de cada revisão (JSONL)
+    """
+
+    def __init__(
+        self,
+        catalogo: CatalogoServicos,
+        tamanho_pagina: int = 500,
+        tamanho_lote: int = 50,
+        intervalo_minutos: float = 360.0
+    ):
+        self.catalogo = catalogo
+        self.ambiente = catalogo.ambiente
+        self.tamanho_pagina = max(1, int(tamanho_pagina))
+        self.tamanho_lote = max(1, int(tamanho_lote))
+        self.intervalo_minutos = float(intervalo_minutos)
+        self.arquivo_alteracoes = catalogo.arquivo_snapshot.with_name(
+            f"{catalogo.arquivo_snapshot.stem}_alteracoes.jsonl"
+        )
+
+        self._lock_sincronizacao = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.sincronizacoes = 0
+        self.ultima_sincronizacao: Optional[Dict[str, Any]] = None
+
+    def _listar_documentids(self, requests_fluig: RequestsFluig) -> Optional[List[str]]:
+        """
+        Percorre o dataset em páginas (limit/offset) trazendo só o documentid
+
+        Returns:
+            documentids na ordem do dataset ou None se alguma página falhar
+        """
+        url = requests_fluig.url + "/api/public/ecm/dataset/search"
+        documentids: Dict[str, None] = {}
+        offset = 0
+
+        while not self._parar.is_set():
+            parametros = {
+                'datasetId': DATASET_CATALOGO,
+                'resultFields': 'documentid',
+                'limit': self.tamanho_pagina,
+                'offset': offset,
+            }
+            resposta = requests_fluig.RequestTipoGET(url, parametros, logar_conteudo=False)
+            if resposta.status_code != 200:
+                logger.error(f"[SincronizadorCatalogo] Erro ao listar serviços (offset {offset}) - Status: {resposta.status_code}")
+                return None
+
+            pagina = [
+                str(r['documentid']) for r in _registros_dataset(resposta.json())
+                if r.get('documentid') not in (None, '')
+            ]
+            novos = sum(1 for d in pagina if d not in documentids)
+            documentids.update(dict.fromkeys(pagina))
+
+            # Última página (ou servidor que ignora offset e repete a mesma página)
+            if len(pagina) < self.tamanho_pagina or novos == 0:
+                break
+            offset += self.tamanho_pagina
+
+        return list(documentids)
+
+    def _baixar_detalhes(self, requests_fluig: RequestsFluig, documentids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Busca os detalhes em lotes: uma requisição por lote, uma constraint SHOULD por documentid
+
+        Returns:
+            documentid -> registro completo ou None se algum lote falhar
+        """
+        url = requests_fluig.url + "/api/public/ecm/dataset/datasets/"
+        detalhes: Dict[str, Dict[str, Any]] = {}
+
+        for inicio in range(0, len(documentids), self.tamanho_lote):
+            if self._parar.is_set():
+                return None
+            lote = documentids[inicio:inicio + self.tamanho_lote]
+            payload = {
+                "name": DATASET_CATALOGO,
+                "fields": None,
+                "constraints": [
+                    {
+                        "_field": "documentid",
+                        "_initialValue": int(d) if d.isdigit() else d,
+                        "_finalValue": int(d) if d.isdigit() else d,
+                        "_type": _CONSTRAINT_SHOULD
+                    }
+                    for d in lote
+                ],
+                "order": None
+            }
+            resposta = requests_fluig.RequestTipoPOST(url, payload, logar_conteudo=False)
+            if resposta.status_code != 200:
+                logger.error(f"[SincronizadorCatalogo] Erro ao buscar detalhes (lote {inicio // self.tamanho_lote + 1}) - Status: {resposta.status_code}")
+                return None
+
+            for registro in _registros_dataset(resposta.json()):
+                if registro.get('documentid') not in (None, ''):
+                    detalhes[str(registro['documentid'])] = registro
+
+        return detalhes
+
+    def _gravar_snapshot(self, servicos: List[Dict[str, Any]], revisao: int, sincronizado_em: str):
+        """Grava o snapshot compacto (escrita atômica via arquivo temporário)"""
+        conteudo = {
+            'versao': VERSAO_SNAPSHOT,
+            'ambiente': self.ambiente,
+            'dataset': DATASET_CATALOGO,
+            'revisao': revisao,
+            'sincronizado_em': sincronizado_em,
+            'total': len(servicos),
+            'servicos': servicos,
+        }
+        arquivo = self.catalogo.arquivo_snapshot
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        temporario = arquivo.with_name(f".{arquivo.name}.{os.getpid()}.tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporario, arquivo)
+
+    def _registrar_alteracoes(self, revisao: int, sincronizado_em: str, diferencas: Dict[str, Any]):
+        """Acrescenta a revisão ao log de alterações (uma linha JSON por revisão)"""
+        try:
+            with open(self.arquivo_alteracoes, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'revisao': revisao, 'sincronizado_em': sincronizado_em, **diferencas}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.error(f"[SincronizadorCatalogo] Erro ao gravar {self.arquivo_alteracoes.name}: {str(e)}")
+
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
+    def sincronizar(self) -> Dict[str, Any]:
+        """
+        Baixa o catálogo completo e grava uma nova revisão do snapshot se algo mudou
+
+        Returns:
+            Resumo (total, incluidos, alterados, removidos, revisao, requisicoes_detalhes) e duração
+        """
+        with self._lock_sincronizacao:
+            inicio = time.monotonic()
+            resumo: Dict[str, Any] = {'ambiente': self.ambiente}
+            try:
+                requests_fluig = RequestsFluig(self.ambiente)
+                documentids = self._listar_documentids(requests_fluig)
+                novos = self._baixar_detalhes(requests_fluig, documentids) if documentids is not None else None
+            except Exception as e:
+                logger.error(f"[SincronizadorCatalogo] Erro ao sincronizar ({self.ambiente}): {str(e)}")
+                novos = None
+
+            if novos is None:
+                # Mantém o snapshot atual; a próxima sincronização tenta de novo
+                resumo['erro'] = True
+            else:
+                try:
+                    atual = self.catalogo.indice()
+                except ValueError as e:
+                    logger.warning(f"[SincronizadorCatalogo] {str(e)} - gravando novo snapshot")
+                    atual = None
+                completo = atual is not None and atual.completo
+                antigos = atual.por_documentid if completo else {}
+                diferencas = _diferencas(antigos, novos)
+                revisao = (atual.revisao or 0) if completo else 0
+
+                if not completo or any(diferencas.values()):
+                    revisao += 1
+                    sincronizado_em = datetime.now().isoformat(timespec='seconds')
+                    servicos = sorted(novos.values(), key=lambda s: (normalizar_termo(s.get('servico', '')), str(s['documentid'])))
+                    self._gravar_snapshot(servicos, revisao, sincronizado_em)
+                    self._registrar_alteracoes(revisao, sincronizado_em, diferencas)
+                    # Monta o índice da nova revisão aqui, fora das rotas
+                    self.catalogo.indice()
+                    # Detalhes buscados avulsos no Fluig passam a vir do snapshot
+                    get_cache_detalhes_servico().invalidar()
+
+                resumo.update({
+                    'total': len(novos),
+                    'incluidos': len(diferencas['incluidos']),
+                    'alterados': len(diferencas['alterados']),
+                    'removidos': len(diferencas['removidos']),
+                    'revisao': revisao,
+                    'requisicoes_detalhes': -(-len(documentids) // self.tamanho_lote),
+                })
+                logger.info(
+                    f"[SincronizadorCatalogo] Catálogo sincronizado ({self.ambiente}) - Revisão: {revisao}, Total: {len(novos)}, "
+                    f"Incluídos: {resumo['incluidos']}, Alterados: {resumo['alterados']}, Removidos: {resumo['removidos']}"
+                )
+
+            self.sincronizacoes += 1
+            resumo['duracao_segundos'] = round(time.monotonic() - inicio, 3)
+            resumo['finalizado_em'] = datetime.now().isoformat(timespec='seconds')
+            registrar_ciclo_loop(f"catalogo_{self.ambiente.lower()}", resumo['duracao_segundos'], sucesso=not resumo.get('erro'))
+            self.ultima_sincronizacao = resumo
+            return resumo
+
+    def _precisa_sincronizar(self) -> bool:
+        """Indica se não há snapshot ou se ele é mais antigo que o intervalo"""
+        try:
+            indice = self.catalogo.indice()
+        except ValueError:
+            return True
+        if indice is None or not indice.completo or not indice.sincronizado_em:
+            return True
+        try:
+            idade = (datetime.now() - datetime.fromisoformat(indice.sincronizado_em)).total_seconds()
+        except ValueError:
+            return True
+        return idade >= self.intervalo_minutos * 60
+
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
+    def _loop_sincronizacao(self):
+        """Thread que sincroniza o catálogo periodicamente"""
+        logger.info(f"[SincronizadorCatalogo] Thread de sincronização iniciada ({self.ambiente}, intervalo: {self.intervalo_minutos} minuto(s))")
+
+        if not self._precisa_sincronizar():
+            logger.info(f"[SincronizadorCatalogo] Snapshot do catálogo ainda válido ({self.ambiente}) - próxima sincronização em {self.intervalo_minutos} minuto(s)")
+            self._parar.wait(timeout=self.intervalo_minutos * 60)
+
+        while not self._parar.is_set():
+            try:
+                # Fluig indisponível (circuito aberto): mantém o snapshot atual e tenta no próximo ciclo
+                if circuito_aberto(self.ambiente, [FAMILIA_DATASET]):
+                    logger.warning(f"[SincronizadorCatalogo] Circuito de datasets aberto ({self.ambiente}) - sincronização adiada")
+                    self._parar.wait(timeout=60)
+                    continue
+                self.sincronizar()
+                self._parar.wait(timeout=self.intervalo_minutos * 60)
+            except Exception as e:
+                logger.error(f"[SincronizadorCatalogo] Erro no loop de sincronização: {str(e)}")
+                self._parar.wait(timeout=60)  # Em caso de erro, aguarda 1 minuto
+
+        logger.info(f"[SincronizadorCatalogo] Thread de sincronização encerrada ({self.ambiente})")
+
+    def iniciar(self):
+        """Inicia a sincronização periódica em background"""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning(f"[SincronizadorCatalogo] Sincronização já em execução ({self.ambiente})")
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop_sincronizacao,
+            name=f"SincronizadorCatalogo_{self.ambiente}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        """Para a sincronização periódica"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna o estado do catálogo e o resumo da última sincronização"""
+        return {
+            **self.catalogo.estatisticas(),
+            'sincronizacoes': self.sincronizacoes,
+            'sincronizando': self._lock_sincronizacao.locked(),
+            'ultima_sincronizacao': self.ultima_sincronizacao,
+        }
+
+
+# ==================== INSTÂNCIAS GLOBAIS ====================
+_catalogos: Dict[str, CatalogoServicos] = {}
+_catalogos_lock = threading.Lock()
+_sincronizadores: Dict[str, SincronizadorCatalogo] = {}
+
+
+def get_catalogo_servicos(ambiente: str = "PRD") -> CatalogoServicos:
+    """
+    Retorna o catálogo de serviços do ambiente (criado na primeira chamada)
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+
+    Returns:
+        CatalogoServicos
+    """
+    ambiente = ambiente.upper()
+    catalogo = _catalogos.get(ambiente)
+    if catalogo is None:
+        with _catalogos_lock:
+            catalogo = _catalogos.setdefault(ambiente, CatalogoServicos(ambiente))
+    return catalogo
+
+
+def get_sincronizador_catalogo(ambiente: str) -> Optional[SincronizadorCatalogo]:
+    """
+    Retorna o sincronizador do catálogo do ambiente (apenas se a sincronização foi iniciada)
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+
+    Returns:
+        SincronizadorCatalogo ou None
+    """
+    return _sincronizadores.get(ambiente.upper())
+
+
+def iniciar_sincronizacao_catalogo():
+    """Inicia a sincronização do catálogo de serviços dos ambientes configurados (CATALOGO_SYNC_*)"""
+    enabled = str(getattr(ConfigEnvSetings, 'CATALOGO_SYNC_ENABLED', 'true')).lower()
+    if enabled not in ('true', '1', 'yes'):
+        logger.info("[fluig_catalogo] Sincronização do catálogo de serviços desabilitada")
+        return
+
+    ambientes = str(getattr(ConfigEnvSetings, 'CATALOGO_SYNC_AMBIENTES', 'PRD') or '')
+    for ambiente in [a.strip().upper() for a in ambientes.split(',') if a.strip()]:
+        if ambiente not in ('PRD', 'QLD'):
+            logger.warning(f"[fluig_catalogo] Ambiente inválido em CATALOGO_SYNC_AMBIENTES: {ambiente}")
+            continue
+        sincronizador = _sincronizadores.get(ambiente)
+        if sincronizador is None:
+            sincronizador = SincronizadorCatalogo(
+                get_catalogo_servicos(ambiente),
+                tamanho_pagina=int(getattr(ConfigEnvSetings, 'CATALOGO_SYNC_TAMANHO_PAGINA', 500)),
+                tamanho_lote=int(getattr(ConfigEnvSetings, 'CATALOGO_SYNC_TAMANHO_LOTE', 50)),
+                intervalo_minutos=float(getattr(ConfigEnvSetings, 'CATALOGO_SYNC_INTERVALO_MINUTOS', 360)),
+            )
+            _sincronizadores[ambiente] = sincronizador
+        sincronizador.iniciar()
+
+
+def parar_sincronizacao_catalogo():
+    """Para a sincronização do catálogo de todos os ambientes"""
+    for sincronizador in list(_sincronizadores.values()):
+        sincronizador.parar()
+
+
+# ==================== DETALHES DE SERVIÇO ====================
+_cache_detalhes: Optional[CacheTTL] = None
+_cache_detalhes_lock = threading.Lock()
+
+
+def get_cache_detalhes_servico() -> CacheTTL:
+    """Retorna o cache global dos detalhes buscados avulsos no Fluig (SERVICO_DETALHES_*)"""
+    global _cache_detalhes
+    if _cache_detalhes is None:
+        with _cache_detalhes_lock:
+            if _cache_detalhes is None:
+                _cache_detalhes = CacheTTL(
+                    nome="detalhes_servico",
+                    max_entradas=int(getattr(ConfigEnvSetings, 'SERVICO_DETALHES_MAX_ENTRADAS', 500)),
+                    ttl_segundos=float(getattr(ConfigEnvSetings, 'SERVICO_DETALHES_TTL_SEGUNDOS', 3600)),
+                    ttl_negativo_segundos=float(getattr(ConfigEnvSetings, 'SERVICO_DETALHES_TTL_NEGATIVO_SEGUNDOS', 60)),
+                )
+    return _cache_detalhes
+
+
+def _como_resposta_dataset(servico: Mapping[str, Any]) -> Dict[str, Any]:
+    """Monta, a partir do registro do snapshot, a mesma resposta da consulta do dataset por documentid"""
+    registro = dict(servico)
+    return {'content': {'columns': list(registro.keys()), 'values': [registro]}, 'message': None}
+
+
+def _detalhes_sem_resultado(detalhes: Optional[Dict[str, Any]]) -> bool:
+    return not detalhes or dataset_sem_resultados(detalhes)
+
+
+def obter_detalhes_servico(
+    documentid: str,
+    ambiente: str = "PRD",
+    forcar_atualizacao: bool = False
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Resolve os detalhes de um serviço: snapshot do catálogo -> memória -> Fluig
+
+    Serviços que ainda não estão no snapshot são buscados no Fluig; buscas
+    simultâneas do mesmo serviço fazem uma única requisição.
+    Função bloqueante: nas rotas async, chamar com asyncio.to_thread.
+
+    Args:
+        documentid: DocumentID do serviço
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        forcar_atualizacao: Ignora snapshot e memória e busca no Fluig
+
+    Returns:
+        Tupla (detalhes, fonte) com fonte 'catalogo', 'cache' ou 'api'; (None, None) se não encontrado
+    """
+    documentid = str(documentid).strip()
+    ambiente = ambiente.upper()
+    cache = get_cache_detalhes_servico()
+    chave = (ambiente, documentid)
+
+    if forcar_atualizacao:
+        cache.invalidar(chave)
+    else:
+        try:
+            indice = get_catalogo_servicos(ambiente).indice()
+        except ValueError as e:
+            logger.warning(f"[fluig_catalogo] {str(e)}")
+            indice = None
+        if indice is not None and indice.completo:
+            servico = indice.buscar_por_documentid(documentid)
+            if servico is not None:
+                return _como_resposta_dataset(servico), 'catalogo'
+
+        encontrado, detalhes = cache.obter(chave)
+        if encontrado:
+            return (None, None) if _detalhes_sem_resultado(detalhes) else (detalhes, 'cache')
+
+    detalhes = cache.obter_ou_carregar(
+        chave,
+        lambda: obter_detalhes_servico_fluig(document_id=documentid, ambiente=ambiente),
+        negativo=_detalhes_sem_resultado,
+    )
+    if _detalhes_sem_resultado(detalhes):
+        return None, None
+    return detalhes, 'api'
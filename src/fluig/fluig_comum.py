@@ -0,0 +1,740 @@
+"""
+Montagem de requisições e tratamento de respostas do Fluig
+
+Funções compartilhadas por FluigCore (síncrono, requests) e AsyncFluigCore
+(assíncrono, httpx). As respostas de ambos os clientes expõem a mesma
+interface usada aqui (status_code, json(), text, content, headers).
+"""
+import asyncio
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator, AsyncIterator, Awaitable
+from urllib.parse import urlparse, quote
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.modelo_dados.modelos_fluig import DatasetConfig
+from src.utilitarios_centrais.logger import logger
+
+# Endpoint de anexos do workflow (saveAttachments)
+URL_SAVE_ATTACHMENTS = "/ecm/api/rest/ecm/workflowView/saveAttachments"
+
+# Headers exigidos pelo saveAttachments
+HEADERS_ANEXO = {
+    'Content-Type': 'application/json; charset=UTF-8',
+    'X-Requested-With': 'XMLHttpRequest'
+}
+
+
+def base_url_fluig(url_base: str) -> str:
+    """Retorna apenas esquema + host da URL base (endpoints da API v2 ficam na raiz)"""
+    parsed_url = urlparse(url_base)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+
+def assignee_padrao(ambiente: str) -> str:
+    """Retorna o colleague padrão do ambiente para listagem de tasks"""
+    if ambiente.upper() == "QLD":
+        return ConfigEnvSetings.USER_COLLEAGUE_ID_QLD
+    return ConfigEnvSetings.USER_COLLEAGUE_ID
+
+
+def montar_url_processo(process_id: str) -> str:
+    """Monta o caminho de start do processo (processId com URL encode, espaços viram %20)"""
+    process_id_encoded = quote(process_id, safe='')
+    return f"/process-management/api/v2/processes/{process_id_encoded}/start"
+
+
+def montar_busca_dataset(dataset_id: str, user: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Monta a URL relativa e os parâmetros de busca de um dataset
+
+    Determina automaticamente se USER é email, chapa (colleague) ou nome/chapa
+    e escolhe o campo de filtro conforme o dataset configurado.
+
+    Args:
+        dataset_id: ID do dataset conforme DatasetConfig
+        user: Usuário para busca (email ou nome/chapa)
+
+    Returns:
+        Tupla (url_suffix, parametros)
+
+    Raises:
+        ValueError: Se dataset_id não existe ou user não foi fornecido
+    """
+    # Valida dataset_id
+    if not dataset_id:
+        logger.error("[Dataset_config] dataset_id não fornecido")
+        raise ValueError("[Dataset_config] dataset_id não fornecido")
+
+    logger.debug(f"[Dataset_config] Dataset ID: {dataset_id}")
+    if not user:
+        logger.error("[Dataset_config] user não fornecido")
+        raise ValueError("[Dataset_config] user não fornecido")
+
+    logger.debug(f"[Dataset_config] User: {user}")
+
+    logger.info(f"[Dataset_config] Carregando configuração do dataset '{dataset_id}'...")
+    datasets = DatasetConfig()
+
+    if dataset_id not in datasets:
+        datasets_disponiveis = ', '.join(datasets.keys())
+        logger.error(
+            f"[Dataset_config] Dataset '{dataset_id}' não encontrado. "
+            f"Datasets disponíveis: {datasets_disponiveis}"
+        )
+        raise ValueError(
+            f"[Dataset_config] Dataset '{dataset_id}' não encontrado. "
+            f"Datasets disponíveis: {datasets_disponiveis}"
+        )
+
+    config = datasets[dataset_id]
+    logger.info(f"[Dataset_config] Configuração do dataset carregada: {config.get('nome_dataset', dataset_id)}")
+
+    # Determinar tipo de busca e campo a usar
+    user_stripped = user.strip()
+
+    if '@' in user:
+        # Busca por email
+        campo_busca = config['campo_email']
+        tipo_busca = "email"
+        logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (contém '@')")
+    elif dataset_id == 'colleague' and 'campo_currentProject' in config and user_stripped.isdigit():
+        # Busca por CHAPA (número) no dataset colleague - usar currentProject
+        campo_busca = config['campo_currentProject']
+        tipo_busca = "chapa (currentProject)"
+        logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (CHAPA numérica '{user_stripped}' no dataset colleague)")
+    else:
+        # Busca por nome (não é email e não é número)
+        campo_busca = config['campo_nome']
+        tipo_busca = "nome"
+        logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (nome/chapa)")
+
+    logger.debug(f"[Dataset_config] Campo de busca selecionado: {campo_busca}")
+    parametro = {
+        'datasetId': config['datasetId'],
+        'filterFields': f'{campo_busca},{user}'
+    }
+
+    logger.info(
+        f"[Dataset_config] Parâmetros configurados - "
+        f"datasetId: {parametro['datasetId']}, "
+        f"filterFields: {parametro['filterFields']}"
+    )
+    url_suffix = config.get('url', '/api/public/ecm/dataset/search')
+    return url_suffix, parametro
+
+
+def tratar_resposta_dataset(resposta):
+    """
+    Trata a resposta da busca de dataset
+
+    Returns:
+        Dicionário com dados do dataset ou a própria resposta HTTP em caso de erro
+    """
+    if resposta.status_code == 200:
+        try:
+            dados = resposta.json()
+            logger.info(f"[Dataset_config] Requisição bem-sucedida - {len(dados.get('content', []))} resultado(s) encontrado(s)")
+            return dados
+        except Exception as e:
+            logger.error(f"[Dataset_config] Erro ao processar resposta JSON: {str(e)}")
+            return resposta
+    else:
+        logger.error(f"[Dataset_config] Erro na requisição - Status: {resposta.status_code}")
+        return resposta
+
+
+def montar_payload_abertura(
+    tipo_chamado: str,
+    Item: Any,
+    ambiente: str,
+    usuario_atendido: Optional[str] = None,
+    target_assignee: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Monta o payload de abertura de chamado (classificado ou normal)
+
+    ATENÇÃO: os payloads consultam datasets do Fluig de forma síncrona;
+    em código assíncrono chame via asyncio.to_thread.
+
+    Raises:
+        ValueError: Se o tipo for inválido ou o payload não puder ser montado
+    """
+    from src.utilitarios_centrais.payloads import PayloadChamadoClassificado, PayloadChamadoNormal
+
+    if tipo_chamado == "classificado":
+        payload = PayloadChamadoClassificado(Item, ambiente=ambiente, usuario_atendido=usuario_atendido, target_assignee=target_assignee)
+        if not payload:
+            logger.error("[AberturaDeChamado] Falha ao montar payload do chamado classificado")
+            raise ValueError("[AberturaDeChamado] Falha ao montar payload do chamado classificado")
+    elif tipo_chamado == "normal":
+        payload = PayloadChamadoNormal(Item, ambiente=ambiente, usuario_atendido=usuario_atendido)
+        if not payload:
+            logger.error("[AberturaDeChamado] Falha ao montar payload do chamado normal")
+            raise ValueError("[AberturaDeChamado] Falha ao montar payload do chamado normal")
+    else:
+        logger.error(f"[AberturaDeChamado] Tipo de chamado inválido: {tipo_chamado}")
+        raise ValueError(f"[AberturaDeChamado] Tipo de chamado inválido: {tipo_chamado}")
+    return payload
+
+
+def tratar_resposta_processo(resposta, metodo: str, extrair_instance_id: bool = False) -> Dict[str, Any]:
+    """
+    Trata a resposta do start de processo
+
+    Args:
+        resposta: Resposta HTTP
+        metodo: Nome do método chamador (prefixo dos logs)
+        extrair_instance_id: Se True, adiciona process_instance_id ao resultado
+
+    Returns:
+        Dicionário com status_code, sucesso e dados (ou texto) da resposta
+    """
+    resultado = {
+        "status_code": resposta.status_code,
+        "sucesso": resposta.status_code == 200
+    }
+
+    try:
+        resultado["dados"] = resposta.json()
+        logger.info(f"[{metodo}] Resposta processada com sucesso - Status: {resposta.status_code}")
+        if extrair_instance_id and resultado["sucesso"]:
+            # Extrai processInstanceId se disponível
+            if isinstance(resultado["dados"], dict):
+                resultado["process_instance_id"] = resultado["dados"].get("processInstanceId")
+    except Exception as e:
+        logger.warning(f"[{metodo}] Erro ao processar JSON da resposta: {str(e)}")
+        resultado["dados"] = None
+        resultado["texto"] = resposta.text[:500] if resposta.text else ""
+
+    return resultado
+
+
+def tratar_resposta_upload(resposta, nome_arquivo: str) -> Dict[str, Any]:
+    """
+    Trata a resposta do /ecm/upload
+
+    Returns:
+        Dicionário padronizado com sucesso, dados, document_id, nome e tamanho (ou erro)
+    """
+    if resposta.status_code == 200:
+        try:
+            resultado = resposta.json()
+
+            # Verifica se há erro no conteúdo da resposta
+            if 'files' in resultado and len(resultado['files']) > 0:
+                primeiro_arquivo = resultado['files'][0]
+                if 'error' in primeiro_arquivo:
+                    logger.error(f"[upload_arquivo_fluig] Erro no upload: {primeiro_arquivo['error']}")
+                    return {"sucesso": False, "erro": primeiro_arquivo['error']}
+
+                # O endpoint /ecm/upload não retorna document_id diretamente
+                # Retorna formato padronizado para facilitar uso
+                logger.info(f"[upload_arquivo_fluig] Upload realizado com sucesso: {resultado}")
+                return {
+                    "sucesso": True,
+                    "dados": resultado,
+                    "document_id": primeiro_arquivo.get("documentId") or primeiro_arquivo.get("id") or primeiro_arquivo.get("document_id"),
+                    "nome": primeiro_arquivo.get("name", nome_arquivo),
+                    "tamanho": primeiro_arquivo.get("size")
+                }
+            else:
+                logger.error(f"[upload_arquivo_fluig] Resposta inesperada: {resultado}")
+                return {"sucesso": False, "erro": "Resposta inesperada do servidor"}
+        except Exception as e:
+            logger.error(f"[upload_arquivo_fluig] Erro ao processar resposta JSON: {str(e)}")
+            return {"sucesso": False, "erro": f"Erro ao processar resposta: {str(e)}"}
+    else:
+        logger.error(f"[upload_arquivo_fluig] Erro no upload - Status: {resposta.status_code}, Resposta: {resposta.text[:500]}")
+        return {"sucesso": False, "erro": f"Erro HTTP {resposta.status_code}", "status_code": resposta.status_code}
+
+
+def montar_payload_anexo_processo(
+    process_id: str,
+    process_instance_id: int,
+    nome_arquivo: str,
+    document_id: Optional[int] = None,
+    version: int = 57,
+    current_movto: int = 3,
+    task_user_id: Optional[str] = None,
+    colleague_id: Optional[str] = None,
+    attached_user: str = "Infra Automação",
+    attached_activity: str = "Aguardando Classificação",
+    internal_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Monta o payload do saveAttachments para qualquer processo
+
+    Returns:
+        Payload ou None se task_user_id não estiver configurado
+    """
+    # Se document_id não fornecido, usa 0 (para arquivos enviados via upload)
+    if document_id is None or document_id <= 0:
+        document_id = 0
+        logger.info(f"[AnexarArquivoProcesso] Anexando arquivo {nome_arquivo} (sem document_id, usando 0) ao processo {process_id} (chamado {process_instance_id}) usando OAuth 1.0")
+    else:
+        logger.info(f"[AnexarArquivoProcesso] Anexando arquivo {nome_arquivo} (DocumentID: {document_id}) ao processo {process_id} (chamado {process_instance_id}) usando OAuth 1.0")
+
+    # Obtém IDs padrão se não fornecidos
+    if not task_user_id:
+        task_user_id = ConfigEnvSetings.ADMIN_COLLEAGUE_ID
+    if not colleague_id:
+        colleague_id = ConfigEnvSetings.ADMIN_COLLEAGUE_ID
+
+    if not task_user_id or task_user_id == "":
+        logger.error("[AnexarArquivoProcesso] task_user_id não configurado")
+        return None
+
+    # Gera internal_id se não fornecido (timestamp em milissegundos)
+    if internal_id is None:
+        internal_id = int(time.time() * 1000)
+
+    # Monta payload conforme exemplo fornecido
+    payload = {
+        "processId": process_id,
+        "version": version,
+        "managerMode": False,
+        "taskUserId": task_user_id,
+        "processInstanceId": process_instance_id,
+        "isDigitalSigned": False,
+        "selectedState": 5,
+        "attachments": [{
+            "id": 1,
+            "fullPath": "BPM",
+            "droppedZipZone": False,
+            "name": nome_arquivo,
+            "internalId": internal_id,
+            "newAttach": True,
+            "description": nome_arquivo,
+            "documentId": document_id,
+            "attachedUser": attached_user,
+            "attachedActivity": attached_activity,
+            "attachments": [{
+                "attach": False,
+                "principal": True,
+                "fileName": nome_arquivo
+            }],
+            "hasOwnSubMenu": True,
+            "enablePublish": False,
+            "enableEdit": False,
+            "enableEditContent": False,
+            "fromUpload": True,
+            "enableDownload": True,
+            "hasMoreOptions": False,
+            "deleted": False,
+            "iconClass": "fluigicon-file-upload",
+            "iconUrl": False,
+            "colleagueId": colleague_id or task_user_id
+        }],
+        "currentMovto": current_movto
+    }
+
+    # Log do payload completo
+    payload_json = json.dumps(payload, indent=2, ensure_ascii=False)
+    logger.info(f"[AnexarArquivoProcesso] Payload completo:\n{payload_json}")
+    return payload
+
+
+def tratar_resposta_anexo_processo(resposta, process_id: str, process_instance_id: int) -> Dict[str, Any]:
+    """
+    Trata a resposta do saveAttachments (AnexarArquivoProcesso)
+
+    Returns:
+        Dicionário com status_code, sucesso e dados da resposta
+    """
+    resultado = {
+        "status_code": resposta.status_code,
+        "sucesso": resposta.status_code == 200
+    }
+
+    try:
+        resultado["dados"] = resposta.json()
+
+        if resposta.status_code == 200:
+            # Verifica se há erro na resposta
+            if resultado["dados"].get("content") == "ERROR" or resultado["dados"].get("message"):
+                mensagem_erro = resultado["dados"].get("message", {})
+                if isinstance(mensagem_erro, dict):
+                    erro_msg = mensagem_erro.get("message", "Erro desconhecido")
+                else:
+                    erro_msg = str(mensagem_erro)
+                logger.error(f"[AnexarArquivoProcesso] Erro retornado pelo Fluig: {erro_msg}")
+                resultado["sucesso"] = False
+                resultado["erro"] = erro_msg
+            else:
+                # Verifica se anexou com sucesso
+                content = resultado["dados"].get("content", {})
+                if content and content.get("hasNewAttachment"):
+                    logger.info(f"[AnexarArquivoProcesso] Arquivo anexado com sucesso ao processo {process_id} (chamado {process_instance_id})")
+                else:
+                    logger.warning(f"[AnexarArquivoProcesso] Resposta sem confirmação explícita de anexo, mas status 200")
+        else:
+            logger.error(f"[AnexarArquivoProcesso] Erro ao anexar arquivo - Status: {resposta.status_code}")
+            resultado["texto"] = resposta.text[:500] if resposta.text else ""
+    except Exception as e:
+        logger.warning(f"[AnexarArquivoProcesso] Erro ao processar JSON da resposta: {str(e)}")
+        resultado["dados"] = None
+        resultado["texto"] = resposta.text[:500] if resposta.text else ""
+
+    return resultado
+
+
+def montar_payload_anexo_chamado(
+    process_instance_id: int,
+    nome_arquivo: str,
+    admin_colleague_id: str,
+    version: int = 57,
+    current_movto: int = 3
+) -> Dict[str, Any]:
+    """
+    Monta o payload do saveAttachments para "Abertura de Chamados"
+
+    IMPORTANTE: taskUserId e colleagueId devem ser ADMIN_COLLEAGUE_ID;
+    attachedUser é fixo: "Infra Automação"
+    """
+    # Monta payload conforme payload_anexar_arquivo_chamado.json
+    payload = {"processId": "Abertura de Chamados","version": version,"managerMode": False,"taskUserId": admin_colleague_id,"processInstanceId": process_instance_id,"isDigitalSigned": False,"selectedState": 5,"attachments": [{"id": 1,"fullPath": "BPM","droppedZipZone": False,"name": nome_arquivo,"newAttach": True,"description": nome_arquivo,"documentId": 0,"attachedUser": "Infra Automação","attachedActivity": "Aguardando Classificação","attachments": [{"attach": False,"principal": True,"fileName": nome_arquivo}],"hasOwnSubMenu": True,"enablePublish": False,"enableEdit": False,"enableEditContent": False,"fromUpload": True,"enableDownload": True,"hasMoreOptions": False,"iconClass": "fluigicon-file-upload","iconUrl": False,"colleagueId": admin_colleague_id}],"currentMovto": current_movto}
+
+    # Log do payload completo
+    payload_json = json.dumps(payload, indent=2, ensure_ascii=False)
+    logger.info(f"[anexar_arquivo_chamado] Payload completo:{payload_json}")
+    logger.info(f"[anexar_arquivo_chamado] Headers: {HEADERS_ANEXO}")
+    return payload
+
+
+def tratar_resposta_anexo_chamado(resposta, process_instance_id: int) -> bool:
+    """
+    Trata a resposta do saveAttachments (anexar_arquivo_chamado)
+
+    Returns:
+        True se anexou com sucesso, False caso contrário
+    """
+    if resposta.status_code == 200:
+        try:
+            resultado = resposta.json()
+
+            # Verifica se há erro na resposta
+            if resultado.get("content") == "ERROR" or resultado.get("message"):
+                mensagem_erro = resultado.get("message", {})
+                if isinstance(mensagem_erro, dict):
+                    erro_msg = mensagem_erro.get("message", "Erro desconhecido")
+                else:
+                    erro_msg = str(mensagem_erro)
+                logger.error(f"[anexar_arquivo_chamado] Erro retornado pelo Fluig: {erro_msg}")
+                logger.debug(f"[anexar_arquivo_chamado] Resposta completa: {resultado}")
+                return False
+
+            # Verifica se anexou com sucesso
+            content = resultado.get("content", {})
+            if content and content.get("hasNewAttachment"):
+                logger.info(f"[anexar_arquivo_chamado] Arquivo anexado com sucesso ao chamado {process_instance_id}")
+                logger.debug(f"[anexar_arquivo_chamado] Resposta: {resultado}")
+                return True
+            else:
+                logger.warning(f"[anexar_arquivo_chamado] Resposta sem confirmação explícita de anexo, mas status 200")
+                return True  # Assumir sucesso se status 200 e sem erro
+        except Exception as e:
+            logger.error(f"[anexar_arquivo_chamado] Erro ao processar resposta JSON: {str(e)}")
+            return False
+    else:
+        logger.error(f"[anexar_arquivo_chamado] Erro ao anexar arquivo - Status: {resposta.status_code}, Resposta: {resposta.text[:500]}")
+        return False
+
+
+def montar_parametros_tasks(
+    assignee: str,
+    status: str = "NOT_COMPLETED",
+    sla_status: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 1000,
+    order: str = "processInstanceId"
+) -> Dict[str, Any]:
+    """Monta a query string do /process-management/api/v2/tasks"""
+    params = {
+        'assignee': assignee,
+        'status': status,
+        'page': page,
+        'pageSize': page_size,
+        'order': order
+    }
+
+    # Adiciona slaStatus apenas se fornecido
+    if sla_status:
+        params['slaStatus'] = sla_status
+    return params
+
+
+def tratar_resposta_tasks(response) -> Optional[Dict[str, Any]]:
+    """Trata a resposta da listagem de tasks (dados JSON ou None)"""
+    if response.status_code == 200:
+        try:
+            data = response.json()
+            items = data.get('items', [])
+            has_next = data.get('hasNext', False)
+            logger.info(f"[listar_chamados_tasks] {len(items)} chamado(s) encontrado(s), hasNext: {has_next}")
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(f"[listar_chamados_tasks] Erro ao decodificar JSON: {str(e)}")
+            logger.debug(f"[listar_chamados_tasks] Resposta: {response.text[:500]}")
+            return None
+    else:
+        logger.error(f"[listar_chamados_tasks] Erro na requisição - Status: {response.status_code}")
+        logger.debug(f"[listar_chamados_tasks] Resposta: {response.text[:500]}")
+        if response.status_code == 401:
+            logger.error("[listar_chamados_tasks] Erro de autenticação. Verifique as credenciais OAuth 1.0 (CK, CS, TK, TS)")
+        return None
+
+
+def tamanho_pagina_padrao(page_size: Optional[int] = None) -> int:
+    """Tamanho de página para os iteradores paginados (FLUIG_PAGINACAO_TAMANHO_PAGINA se não informado)"""
+    if page_size:
+        return max(1, int(page_size))
+    return max(1, int(getattr(ConfigEnvSetings, 'FLUIG_PAGINACAO_TAMANHO_PAGINA', 500)))
+
+
+def _validar_pagina(dados: Optional[Dict[str, Any]], metodo: str, page: int) -> Dict[str, Any]:
+    """Garante que a página foi obtida; falha no meio da paginação não pode truncar o resultado em silêncio"""
+    if dados is None:
+        raise RuntimeError(f"[{metodo}] Falha ao obter a página {page} do Fluig")
+    return dados
+
+
+def iterar_paginas(
+    buscar_pagina: Callable[[int], Optional[Dict[str, Any]]],
+    metodo: str,
+    prefetch: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre um endpoint paginado da API v2 (page/pageSize) seguindo hasNext
+
+    Args:
+        buscar_pagina: Função que recebe o número da página e retorna os dados (ou None em erro)
+        metodo: Nome usado nos logs
+        prefetch: Se True, busca a próxima página em outra thread (com o contexto do chamador) enquanto ele consome a atual
+
+    Yields:
+        Dados de cada página (items, hasNext)
+
+    Raises:
+        RuntimeError: Se alguma página não puder ser obtida
+    """
+    max_paginas = int(getattr(ConfigEnvSetings, 'FLUIG_PAGINACAO_MAX_PAGINAS', 500))
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"prefetch_{metodo}") if prefetch else None
+    try:
+        page = 1
+        dados = _validar_pagina(buscar_pagina(page), metodo, page)
+        while True:
+            tem_proxima = bool(dados.get('hasNext')) and page < max_paginas
+            # A thread do executor não herda os contextvars (prioridade, prazo, rastro): a busca roda numa cópia do contexto atual
+            proxima = executor.submit(contextvars.copy_context().run, buscar_pagina, page + 1) if executor and tem_proxima else None
+
+            yield dados
+
+            if not tem_proxima:
+                if dados.get('hasNext'):
+                    logger.warning(f"[{metodo}] Limite de {max_paginas} página(s) atingido (FLUIG_PAGINACAO_MAX_PAGINAS)")
+                return
+
+            page += 1
+            dados = _validar_pagina(proxima.result() if proxima else buscar_pagina(page), metodo, page)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iterar_paginas_async(
+    buscar_pagina: Callable[[int], Awaitable[Optional[Dict[str, Any]]]],
+    metodo: str,
+    prefetch: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Versão assíncrona de iterar_paginas (o prefetch é uma task no mesmo event loop)"""
+    max_paginas = int(getattr(ConfigEnvSetings, 'FLUIG_PAGINACAO_MAX_PAGINAS', 500))
+    proxima = None
+    try:
+        page = 1
+        dados = _validar_pagina(await buscar_pagina(page), metodo, page)
+        while True:
+            tem_proxima = bool(dados.get('hasNext')) and page < max_paginas
+            proxima = asyncio.create_task(buscar_pagina(page + 1)) if prefetch and tem_proxima else None
+
+            yield dados
+
+            if not tem_proxima:
+                if dados.get('hasNext'):
+                    logger.warning(f"[{metodo}] Limite de {max_paginas} página(s) atingido (FLUIG_PAGINACAO_MAX_PAGINAS)")
+                return
+
+            page += 1
+            dados = _validar_pagina(await proxima if proxima else await buscar_pagina(page), metodo, page)
+            proxima = None
+    finally:
+        if proxima and not proxima.done():
+            proxima.cancel()
+
+
+def _logar_erro_http_chamado(response, metodo: str, process_instance_id: int):
+    """Loga erros HTTP dos endpoints /requests e /activities da API v2"""
+    logger.error(f"[{metodo}] Erro HTTP {response.status_code}")
+    logger.error(f"[{metodo}] Resposta do servidor: {response.text[:500]}")
+
+    if response.status_code in [401, 403]:
+        logger.warning(f"[{metodo}] Erro de autenticação. Verifique as credenciais OAuth1 (CK, CS, TK, TS)")
+    elif response.status_code == 404:
+        logger.warning(f"[{metodo}] Chamado {process_instance_id} não encontrado")
+    elif response.status_code == 500:
+        logger.warning(f"[{metodo}] Erro interno do servidor. Verifique se o chamado existe")
+
+
+def tratar_resposta_detalhes(response, process_instance_id: int) -> Optional[Dict[str, Any]]:
+    """Trata a resposta de detalhes do chamado, simplificando formFields em dicionário"""
+    if response.status_code == 200:
+        try:
+            data = response.json()
+
+            # Simplifica formFields: transforma array de {field, value} em dicionário simples
+            if "formFields" in data and isinstance(data["formFields"], list):
+                form_fields_dict = {}
+                for item in data["formFields"]:
+                    if isinstance(item, dict) and "field" in item and "value" in item:
+                        form_fields_dict[item["field"]] = item["value"]
+                data["formFields"] = form_fields_dict
+
+            logger.info(f"[obter_detalhes_chamado] Detalhes obtidos com sucesso")
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(f"[obter_detalhes_chamado] Erro ao decodificar JSON: {str(e)}")
+            logger.debug(f"[obter_detalhes_chamado] Resposta: {response.text[:500]}")
+            return None
+    else:
+        _logar_erro_http_chamado(response, "obter_detalhes_chamado", process_instance_id)
+        return None
+
+
+def tratar_resposta_atividades(response, process_instance_id: int) -> Optional[Dict[str, Any]]:
+    """Trata a resposta de atividades do chamado (dados JSON ou None)"""
+    if response.status_code == 200:
+        try:
+            data = response.json()
+
+            items = data.get('items', [])
+            has_next = data.get('hasNext', False)
+
+            logger.info(f"[obter_detalhes_atividade] {len(items)} atividade(s) encontrada(s), hasNext: {has_next}")
+            logger.debug(f"[obter_detalhes_atividade] Resposta completa: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
+
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(f"[obter_detalhes_atividade] Erro ao decodificar JSON: {str(e)}")
+            logger.debug(f"[obter_detalhes_atividade] Resposta: {response.text[:500]}")
+            return None
+    else:
+        _logar_erro_http_chamado(response, "obter_detalhes_atividade", process_instance_id)
+        return None
+
+
+def tratar_resposta_historico(response, process_instance_id: int) -> Optional[Dict[str, Any]]:
+    """Trata a resposta do histórico do chamado (dados JSON ou None)"""
+    if response.status_code == 200:
+        try:
+            data = response.json()
+
+            items = data.get('items', [])
+            has_next = data.get('hasNext', False)
+
+            logger.info(f"[obter_historico_chamado] {len(items)} evento(s) encontrado(s) no histórico, hasNext: {has_next}")
+            logger.debug(f"[obter_historico_chamado] Resposta completa: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
+
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(f"[obter_historico_chamado] Erro ao decodificar JSON: {str(e)}")
+            logger.debug(f"[obter_historico_chamado] Resposta: {response.text[:500]}")
+            return None
+    else:
+        _logar_erro_http_chamado(response, "obter_historico_chamado", process_instance_id)
+        return None
+
+
+def _inteiro_ou_none(valor: Any) -> Optional[int]:
+    """Converte IDs do histórico (int ou string) para int; None se ausente/inválido"""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def marcador_historico(items: List[Dict[str, Any]]) -> Dict[str, Optional[int]]:
+    """
+    Calcula o marcador do último item conhecido de um histórico
+
+    Args:
+        items: Itens do histórico já conhecidos
+
+    Returns:
+        Dicionário com ultimo_movement_sequence, ultimo_observation_id e
+        ultimo_attachment_id (argumentos do modo incremental de obter_historico_chamado)
+    """
+    def maximo(campo: str) -> Optional[int]:
+        valores = [v for v in (_inteiro_ou_none(item.get(campo)) for item in items) if v is not None]
+        return max(valores) if valores else None
+
+    return {
+        'ultimo_movement_sequence': maximo('movementSequence'),
+        'ultimo_observation_id': maximo('observationId'),
+        'ultimo_attachment_id': maximo('attachmentId'),
+    }
+
+
+def filtrar_itens_novos(
+    items: List[Dict[str, Any]],
+    ultimo_movement_sequence: Optional[int] = None,
+    ultimo_observation_id: Optional[int] = None,
+    ultimo_attachment_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Filtra os itens do histórico mais novos que o marcador
+
+    Um item é novo se a movimentação é posterior à última conhecida ou, na
+    mesma movimentação, se o comentário/anexo tem ID maior que o último conhecido.
+    """
+    def maior(valor: Any, referencia: Optional[int]) -> bool:
+        valor = _inteiro_ou_none(valor)
+        return valor is not None and (referencia is None or valor > referencia)
+
+    novos = []
+    for item in items:
+        if ultimo_movement_sequence is not None and maior(item.get('movementSequence'), ultimo_movement_sequence):
+            novos.append(item)
+        elif item.get('type') == 'OBSERVATION' and maior(item.get('observationId'), ultimo_observation_id):
+            novos.append(item)
+        elif item.get('type') == 'ATTACHMENT' and maior(item.get('attachmentId'), ultimo_attachment_id):
+            novos.append(item)
+    return novos
+
+
+def formatar_tamanho(tamanho_bytes: int) -> str:
+    """Converte tamanho em bytes para formato legível"""
+    if tamanho_bytes < 1024:
+        return f"{tamanho_bytes} bytes"
+    elif tamanho_bytes < 1024 * 1024:
+        return f"{tamanho_bytes / 1024:.2f} KB"
+    return f"{tamanho_bytes / (1024 * 1024):.2f} MB"
+
+
+def tratar_resposta_download(response, document_name: str) -> Optional[bytes]:
+    """Trata a resposta do download de anexo (bytes do arquivo ou None)"""
+    if response.status_code == 200:
+        tamanho_formatado = formatar_tamanho(len(response.content))
+        logger.info(f"[baixar_anexo_chamado] Anexo '{document_name}' baixado com sucesso - Tamanho: {tamanho_formatado}")
+        return response.content
+    else:
+        logger.error(f"[baixar_anexo_chamado] Erro ao baixar anexo '{document_name}' - Status: {response.status_code}")
+        # Tenta ler apenas se for texto (não binário)
+        try:
+            content_type = response.headers.get('Content-Type', '')
+            if 'text' in content_type.lower() or 'json' in content_type.lower():
+                logger.error(f"[baixar_anexo_chamado] Resposta: {response.text[:500]}")
+        except Exception:
+            pass
+        return None
@@ -1,13 +1,24 @@
-from typing import Optional, Dict, Any, List
-from urllib.parse import urlparse
+from typing import Optional, Dict, Any, List, Iterator
 import json
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
-from src.modelo_dados.modelos_fluig import DatasetConfig
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.rastreamento import com_span
 from src.fluig.fluig_requests import RequestsFluig
+from src.fluig.fluig_cache import buscar_dataset_com_cache
+from src.fluig.fluig_diretorio import buscar_no_diretorio
+from src.fluig.fluig_comum import (
+    URL_SAVE_ATTACHMENTS, HEADERS_ANEXO,
+    base_url_fluig, assignee_padrao, montar_url_processo,
+    montar_busca_dataset, tratar_resposta_dataset,
+    montar_payload_abertura, tratar_resposta_processo, tratar_resposta_upload,
+    montar_payload_anexo_processo, tratar_resposta_anexo_processo,
+    montar_payload_anexo_chamado, tratar_resposta_anexo_chamado,
+    montar_parametros_tasks, tratar_resposta_tasks, tratar_resposta_detalhes,
+    tratar_resposta_atividades, tratar_resposta_historico, tratar_resposta_download,
+    tamanho_pagina_padrao, iterar_paginas, filtrar_itens_novos,
+)
 from src.web.web_cookies import carregar_cookies, cookies_para_requests
 from src.web.web_auth_manager import garantir_autenticacao, obter_cookies_validos
-import requests
 import io
 
 class FluigCore():
@@ -39,6 +50,7 @@ class FluigCore():
         
         logger.info(f"[FluigCore] Instância criada com sucesso")
 
+    @com_span("fluig.Dataset_config")
     def Dataset_config(self, dataset_id: str, user: str) -> dict:
         """
         Retorna configuração de busca do dataset
@@ -57,84 +69,24 @@ class FluigCore():
             ValueError: Se dataset_id não existe ou user não foi fornecido
         """
         logger.info(f"[Dataset_config] Iniciando configuração de busca - Ambiente: {self.ambiente}, Dataset: {dataset_id}, User: {user}")
+        url_suffix, parametro = montar_busca_dataset(dataset_id, user)
+        url_dataset = self.url_base + url_suffix
+        logger.debug(f"[Dataset_config] URL dataset configurada: {url_dataset}")
         
-        # Valida dataset_id
-        if not dataset_id:
-            logger.error("[Dataset_config] dataset_id não fornecido")
-            raise ValueError("[Dataset_config] dataset_id não fornecido")
-        
-        logger.debug(f"[Dataset_config] Dataset ID: {dataset_id}")
-        if not user:
-            logger.error("[Dataset_config] user não fornecido")
-            raise ValueError("[Dataset_config] user não fornecido")
-        
-        logger.debug(f"[Dataset_config] User: {user}")
-        
-
-        logger.info(f"[Dataset_config] Carregando configuração do dataset '{dataset_id}'...")
-        datasets = DatasetConfig()
-        
-        if dataset_id not in datasets:
-            datasets_disponiveis = ', '.join(datasets.keys())
-            logger.error(
-                f"[Dataset_config] Dataset '{dataset_id}' não encontrado. "
-                f"Datasets disponíveis: {datasets_disponiveis}"
-            )
-            raise ValueError(
-                f"[Dataset_config] Dataset '{dataset_id}' não encontrado. "
-                f"Datasets disponíveis: {datasets_disponiveis}"
-            )
-        
-        config = datasets[dataset_id]
-        logger.info(f"[Dataset_config] Configuração do dataset carregada: {config.get('nome_dataset', dataset_id)}")
-        
-        # Determinar tipo de busca e campo a usar
-        user_stripped = user.strip()
-        
-        if '@' in user:
-            # Busca por email
-            campo_busca = config['campo_email']
-            tipo_busca = "email"
-            logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (contém '@')")
-        elif dataset_id == 'colleague' and 'campo_currentProject' in config and user_stripped.isdigit():
-            # Busca por CHAPA (número) no dataset colleague - usar currentProject
-            campo_busca = config['campo_currentProject']
-            tipo_busca = "chapa (currentProject)"
-            logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (CHAPA numérica '{user_stripped}' no dataset colleague)")
-        else:
-            # Busca por nome (não é email e não é número)
-            campo_busca = config['campo_nome']
-            tipo_busca = "nome"
-            logger.info(f"[Dataset_config] Tipo de busca detectado: {tipo_busca} (nome/chapa)")
+        # Diretório local de colaboradores (sincronizado em background); miss segue para o Fluig
+        dados_diretorio = buscar_no_diretorio(self.ambiente, parametro)
+        if dados_diretorio is not None:
+            return dados_diretorio
         
-        logger.debug(f"[Dataset_config] Campo de busca selecionado: {campo_busca}")
-        parametro = {
-            'datasetId': config['datasetId'],
-            'filterFields': f'{campo_busca},{user}'
-        }
+        def carregar():
+            logger.info(f"[Dataset_config] Fazendo requisição GET para: {url_dataset}")
+            resposta = self.requests.RequestTipoGET(url_dataset, parametro)
+            return tratar_resposta_dataset(resposta)
         
-        logger.info(
-            f"[Dataset_config] Parâmetros configurados - "
-            f"datasetId: {parametro['datasetId']}, "
-            f"filterFields: {parametro['filterFields']}"
-        )
-        url_suffix = config.get('url', '/api/public/ecm/dataset/search')
-        url_dataset = self.url_base + url_suffix
-        logger.debug(f"[Dataset_config] URL dataset configurada: {url_dataset}")
-        logger.info(f"[Dataset_config] Fazendo requisição GET para: {url_dataset}")
-        resposta = self.requests.RequestTipoGET(url_dataset, parametro)
-        if resposta.status_code == 200:
-            try:
-                dados = resposta.json()
-                logger.info(f"[Dataset_config] Requisição bem-sucedida - {len(dados.get('content', []))} resultado(s) encontrado(s)")
-                return dados
-            except Exception as e:
-                logger.error(f"[Dataset_config] Erro ao processar resposta JSON: {str(e)}")
-                return resposta
-        else:
-            logger.error(f"[Dataset_config] Erro na requisição - Status: {resposta.status_code}")
-            return resposta
+        # Consultas repetidas (mesmo ambiente/dataset/campo/valor) são respondidas pelo cache
+        return buscar_dataset_com_cache(self.ambiente, parametro, carregar)
 
+    @com_span("fluig.AberturaDeChamado")
     def AberturaDeChamado(self,tipo_chamado: str, Item: any, usuario_atendido: Optional[str] = None, target_assignee: Optional[str] = None):
         """
             ITEM
@@ -158,40 +110,14 @@ class FluigCore():
         logger.info(f"[AberturaDeChamado] Usando autenticação OAuth 1.0")
         url = self.url_base + "/process-management/api/v2/processes/Abertura%20de%20Chamados/start"
         
-        from src.utilitarios_centrais.payloads import PayloadChamadoClassificado, PayloadChamadoNormal
-        
-        if tipo_chamado == "classificado":
-            payload = PayloadChamadoClassificado(Item, ambiente=self.ambiente, usuario_atendido=usuario_atendido, target_assignee=target_assignee)
-            if not payload:
-                logger.error("[AberturaDeChamado] Falha ao montar payload do chamado classificado")
-                raise ValueError("[AberturaDeChamado] Falha ao montar payload do chamado classificado")
-        elif tipo_chamado == "normal":
-            payload = PayloadChamadoNormal(Item, ambiente=self.ambiente, usuario_atendido=usuario_atendido)
-            if not payload:
-                logger.error("[AberturaDeChamado] Falha ao montar payload do chamado normal")
-                raise ValueError("[AberturaDeChamado] Falha ao montar payload do chamado normal")
-        else:
-            logger.error(f"[AberturaDeChamado] Tipo de chamado inválido: {tipo_chamado}")
-            raise ValueError(f"[AberturaDeChamado] Tipo de chamado inválido: {tipo_chamado}")
+        payload = montar_payload_abertura(tipo_chamado, Item, self.ambiente, usuario_atendido, target_assignee)
         
         logger.info(f"[AberturaDeChamado] Enviando requisição POST para: {url}")
         # Usa RequestTipoPOST que utiliza apenas OAuth 1.0
         resposta = self.requests.RequestTipoPOST(url, payload)
-        resultado = {
-            "status_code": resposta.status_code,
-            "sucesso": resposta.status_code == 200
-        }
-        
-        try:
-            resultado["dados"] = resposta.json()
-            logger.info(f"[AberturaDeChamado] Resposta processada com sucesso - Status: {resposta.status_code}")
-        except Exception as e:
-            logger.warning(f"[AberturaDeChamado] Erro ao processar JSON da resposta: {str(e)}")
-            resultado["dados"] = None
-            resultado["texto"] = resposta.text[:500] if resposta.text else ""
-        
-        return resultado
+        return tratar_resposta_processo(resposta, "AberturaDeChamado")
 
+    @com_span("fluig.IniciarProcesso")
     def IniciarProcesso(self, process_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Inicia um processo genérico no Fluig usando autenticação OAuth 1.0
@@ -209,10 +135,7 @@ class FluigCore():
         logger.info(f"[IniciarProcesso] Iniciando processo - ProcessId: {process_id}, Ambiente: {self.ambiente}")
         logger.info(f"[IniciarProcesso] Usando autenticação OAuth 1.0")
         
-        # URL encode do processId (espaços viram %20)
-        from urllib.parse import quote
-        process_id_encoded = quote(process_id, safe='')
-        url = f"{self.url_base}/process-management/api/v2/processes/{process_id_encoded}/start"
+        url = self.url_base + montar_url_processo(process_id)
         
         logger.info(f"[IniciarProcesso] Enviando requisição POST para: {url}")
         logger.debug(f"[IniciarProcesso] Payload: {json.dumps(payload, indent=2, ensure_ascii=False)}")
@@ -222,26 +145,9 @@ class FluigCore():
         
         # Usa RequestTipoPOST que utiliza apenas OAuth 1.0
         resposta = self.requests.RequestTipoPOST(url, payload, headers_extra=headers_extra)
-        
-        resultado = {
-            "status_code": resposta.status_code,
-            "sucesso": resposta.status_code == 200
-        }
-        
-        try:
-            resultado["dados"] = resposta.json()
-            logger.info(f"[IniciarProcesso] Resposta processada com sucesso - Status: {resposta.status_code}")
-            if resultado["sucesso"]:
-                # Extrai processInstanceId se disponível
-                if isinstance(resultado["dados"], dict):
-                    resultado["process_instance_id"] = resultado["dados"].get("processInstanceId")
-        except Exception as e:
-            logger.warning(f"[IniciarProcesso] Erro ao processar JSON da resposta: {str(e)}")
-            resultado["dados"] = None
-            resultado["texto"] = resposta.text[:500] if resposta.text else ""
-        
-        return resultado
+        return tratar_resposta_processo(resposta, "IniciarProcesso", extrair_instance_id=True)
 
+    @com_span("fluig.upload_arquivo_fluig")
     def upload_arquivo_fluig(self, arquivo_bytes: bytes, nome_arquivo: str, colleague_id: str) -> dict | None:
         """
         Faz upload de um arquivo no Fluig usando o endpoint /ecm/upload
@@ -289,36 +195,7 @@ class FluigCore():
                 timeout=60
             )
             
-            if resposta.status_code == 200:
-                try:
-                    resultado = resposta.json()
-                    
-                    # Verifica se há erro no conteúdo da resposta
-                    if 'files' in resultado and len(resultado['files']) > 0:
-                        primeiro_arquivo = resultado['files'][0]
-                        if 'error' in primeiro_arquivo:
-                            logger.error(f"[upload_arquivo_fluig] Erro no upload: {primeiro_arquivo['error']}")
-                            return {"sucesso": False, "erro": primeiro_arquivo['error']}
-                        
-                        # O endpoint /ecm/upload não retorna document_id diretamente
-                        # Retorna formato padronizado para facilitar uso
-                        logger.info(f"[upload_arquivo_fluig] Upload realizado com sucesso: {resultado}")
-                        return {
-                            "sucesso": True,
-                            "dados": resultado,
-                            "document_id": primeiro_arquivo.get("documentId") or primeiro_arquivo.get("id") or primeiro_arquivo.get("document_id"),
-                            "nome": primeiro_arquivo.get("name", nome_arquivo),
-                            "tamanho": primeiro_arquivo.get("size")
-                        }
-                    else:
-                        logger.error(f"[upload_arquivo_fluig] Resposta inesperada: {resultado}")
-                        return {"sucesso": False, "erro": "Resposta inesperada do servidor"}
-                except Exception as e:
-                    logger.error(f"[upload_arquivo_fluig] Erro ao processar resposta JSON: {str(e)}")
-                    return {"sucesso": False, "erro": f"Erro ao processar resposta: {str(e)}"}
-            else:
-                logger.error(f"[upload_arquivo_fluig] Erro no upload - Status: {resposta.status_code}, Resposta: {resposta.text[:500]}")
-                return {"sucesso": False, "erro": f"Erro HTTP {resposta.status_code}", "status_code": resposta.status_code}
+            return tratar_resposta_upload(resposta, nome_arquivo)
                 
         except Exception as e:
             logger.error(f"[upload_arquivo_fluig] Erro inesperado no upload: {str(e)}")
@@ -326,6 +203,7 @@ class FluigCore():
             logger.debug(f"[upload_arquivo_fluig] Traceback: {traceback.format_exc()}")
             return None
 
+    @com_span("fluig.AnexarArquivoProcesso")
     def AnexarArquivoProcesso(
         self,
         process_id: str,
@@ -365,130 +243,27 @@ class FluigCore():
             Dicionário com status_code, sucesso e dados da resposta
         """
         try:
-            # Se document_id não fornecido, usa 0 (para arquivos enviados via upload)
-            if document_id is None or document_id <= 0:
-                document_id = 0
-                logger.info(f"[AnexarArquivoProcesso] Anexando arquivo {nome_arquivo} (sem document_id, usando 0) ao processo {process_id} (chamado {process_instance_id}) usando OAuth 1.0")
-            else:
-                logger.info(f"[AnexarArquivoProcesso] Anexando arquivo {nome_arquivo} (DocumentID: {document_id}) ao processo {process_id} (chamado {process_instance_id}) usando OAuth 1.0")
-            
-            # Obtém IDs padrão se não fornecidos
-            if not task_user_id:
-                task_user_id = ConfigEnvSetings.ADMIN_COLLEAGUE_ID
-            if not colleague_id:
-                colleague_id = ConfigEnvSetings.ADMIN_COLLEAGUE_ID
-            
-            if not task_user_id or task_user_id == "":
-                logger.error("[AnexarArquivoProcesso] task_user_id não configurado")
+            payload = montar_payload_anexo_processo(
+                process_id=process_id,
+                process_instance_id=process_instance_id,
+                nome_arquivo=nome_arquivo,
+                document_id=document_id,
+                version=version,
+                current_movto=current_movto,
+                task_user_id=task_user_id,
+                colleague_id=colleague_id,
+                attached_user=attached_user,
+                attached_activity=attached_activity,
+                internal_id=internal_id
+            )
+            if payload is None:
                 return {"status_code": 500, "sucesso": False, "erro": "task_user_id não configurado"}
             
-            # Gera internal_id se não fornecido (timestamp em milissegundos)
-            if internal_id is None:
-                import time
-                internal_id = int(time.time() * 1000)
-            
-            # URL do endpoint saveAttachments
-            url_save = self.url_base + "/ecm/api/rest/ecm/workflowView/saveAttachments"
-            
-            # Monta payload conforme exemplo fornecido
-            payload = {
-                "processId": process_id,
-                "version": version,
-                "managerMode": False,
-                "taskUserId": task_user_id,
-                "processInstanceId": process_instance_id,
-                "isDigitalSigned": False,
-                "selectedState": 5,
-                "attachments": [{
-                    "id": 1,
-                    "fullPath": "BPM",
-                    "droppedZipZone": False,
-                    "name": nome_arquivo,
-                    "internalId": internal_id,
-                    "newAttach": True,
-                    "description": nome_arquivo,
-                    "documentId": document_id,
-                    "attachedUser": attached_user,
-                    "attachedActivity": attached_activity,
-                    "attachments": [{
-                        "attach": False,
-                        "principal": True,
-                        "fileName": nome_arquivo
-                    }],
-                    "hasOwnSubMenu": True,
-                    "enablePublish": False,
-                    "enableEdit": False,
-                    "enableEditContent": False,
-                    "fromUpload": True,
-                    "enableDownload": True,
-                    "hasMoreOptions": False,
-                    "deleted": False,
-                    "iconClass": "fluigicon-file-upload",
-                    "iconUrl": False,
-                    "colleagueId": colleague_id or task_user_id
-                }],
-                "currentMovto": current_movto
-            }
-            
-            # Log do payload completo
-            payload_json = json.dumps(payload, indent=2, ensure_ascii=False)
-            logger.info(f"[AnexarArquivoProcesso] Payload completo:\n{payload_json}")
-            
-            # Headers para anexar arquivo
-            headers = {
-                'Content-Type': 'application/json; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
+            url_save = self.url_base + URL_SAVE_ATTACHMENTS
             logger.info(f"[AnexarArquivoProcesso] Enviando requisição para: {url_save}")
             
-            # Faz requisição usando OAuth 1.0
-            from src.auth.auth_fluig import AutenticarFluig
-            auth, _ = AutenticarFluig(self.ambiente)
-            
-            resposta = requests.post(
-                url_save,
-                json=payload,
-                headers=headers,
-                auth=auth,
-                timeout=30
-            )
-            
-            resultado = {
-                "status_code": resposta.status_code,
-                "sucesso": resposta.status_code == 200
-            }
-            
-            try:
-                resultado["dados"] = resposta.json()
-                
-                if resposta.status_code == 200:
-                    # Verifica se há erro na resposta
-                    if resultado["dados"].get("content") == "ERROR" or resultado["dados"].get("message"):
-                        mensagem_erro = resultado["dados"].get("message", {})
-                        if isinstance(mensagem_erro, dict):
-                            erro_msg = mensagem_erro.get("message", "Erro desconhecido")
-                        else:
-                            erro_msg = str(mensagem_erro)
-                        logger.error(f"[AnexarArquivoProcesso] Erro retornado pelo Fluig: {erro_msg}")
-                        resultado["sucesso"] = False
-                        resultado["erro"] = erro_msg
-                    else:
-                        # Verifica se anexou com sucesso
-                        content = resultado["dados"].get("content", {})
-                        if content and content.get("hasNewAttachment"):
-                            logger.info(f"[AnexarArquivoProcesso] Arquivo anexado com sucesso ao processo {process_id} (chamado {process_instance_id})")
-                        else:
-                            logger.warning(f"[AnexarArquivoProcesso] Resposta sem confirmação explícita de anexo, mas status 200")
-                else:
-                    logger.error(f"[AnexarArquivoProcesso] Erro ao anexar arquivo - Status: {resposta.status_code}")
-                    resultado["texto"] = resposta.text[:500] if resposta.text else ""
-            except Exception as e:
-                logger.warning(f"[AnexarArquivoProcesso] Erro ao processar JSON da resposta: {str(e)}")
-                resultado["dados"] = None
-                resultado["texto"] = resposta.text[:500] if resposta.text else ""
-            
-            return resultado
+            resposta = self.requests.RequestTipoPOST(url_save, payload, headers_extra=HEADERS_ANEXO, timeout=30)
+            return tratar_resposta_anexo_processo(resposta, process_id, process_instance_id)
                 
         except Exception as e:
             logger.error(f"[AnexarArquivoProcesso] Erro inesperado ao anexar arquivo: {str(e)}")
@@ -500,6 +275,7 @@ class FluigCore():
                 "erro": str(e)
             }
 
+    @com_span("fluig.anexar_arquivo_chamado")
     def anexar_arquivo_chamado(
         self,
         process_instance_id: int,
@@ -533,72 +309,13 @@ class FluigCore():
                 logger.error("[anexar_arquivo_chamado] ADMIN_COLLEAGUE_ID não configurado")
                 return False
             
-            # URL do endpoint saveAttachments
-            url_save = self.url_base + "/ecm/api/rest/ecm/workflowView/saveAttachments"
-            
-            # Monta payload conforme payload_anexar_arquivo_chamado.json
-            # IMPORTANTE: taskUserId e colleagueId devem ser ADMIN_COLLEAGUE_ID
-            # attachedUser é fixo: "Infra Automação"
-            payload = {"processId": "Abertura de Chamados","version": version,"managerMode": False,"taskUserId": admin_colleague_id,"processInstanceId": process_instance_id,"isDigitalSigned": False,"selectedState": 5,"attachments": [{"id": 1,"fullPath": "BPM","droppedZipZone": False,"name": nome_arquivo,"newAttach": True,"description": nome_arquivo,"documentId": 0,"attachedUser": "Infra Automação","attachedActivity": "Aguardando Classificação","attachments": [{"attach": False,"principal": True,"fileName": nome_arquivo}],"hasOwnSubMenu": True,"enablePublish": False,"enableEdit": False,"enableEditContent": False,"fromUpload": True,"enableDownload": True,"hasMoreOptions": False,"iconClass": "fluigicon-file-upload","iconUrl": False,"colleagueId": admin_colleague_id}],"currentMovto": current_movto}
-            
-            # Log do payload completo
-            import json
-            payload_json = json.dumps(payload, indent=2, ensure_ascii=False)
-            logger.info(f"[anexar_arquivo_chamado] Payload completo:{payload_json}")
-            
-            # Headers para anexar arquivo
-            headers = {
-                'Content-Type': 'application/json; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
-            logger.info(f"[anexar_arquivo_chamado] Headers: {headers}")
-            
-            # Faz requisição usando OAuth 1.0
-            # Nota: O RequestsFluig.RequestTipoPOST usa headers padrão, mas precisamos de headers específicos
-            # então vamos usar OAuth 1.0 diretamente
-            from src.auth.auth_fluig import AutenticarFluig
-            auth, _ = AutenticarFluig(self.ambiente)
+            url_save = self.url_base + URL_SAVE_ATTACHMENTS
+            payload = montar_payload_anexo_chamado(process_instance_id, nome_arquivo, admin_colleague_id, version, current_movto)
             
+            # saveAttachments exige headers próprios (HEADERS_ANEXO), mesclados aos padrão
             logger.info(f"[anexar_arquivo_chamado] Enviando requisição para: {url_save}")
-            resposta = requests.post(
-                url_save,
-                json=payload,
-                headers=headers,
-                auth=auth,
-                timeout=30
-            )
-            
-            if resposta.status_code == 200:
-                try:
-                    resultado = resposta.json()
-                    
-                    # Verifica se há erro na resposta
-                    if resultado.get("content") == "ERROR" or resultado.get("message"):
-                        mensagem_erro = resultado.get("message", {})
-                        if isinstance(mensagem_erro, dict):
-                            erro_msg = mensagem_erro.get("message", "Erro desconhecido")
-                        else:
-                            erro_msg = str(mensagem_erro)
-                        logger.error(f"[anexar_arquivo_chamado] Erro retornado pelo Fluig: {erro_msg}")
-                        logger.debug(f"[anexar_arquivo_chamado] Resposta completa: {resultado}")
-                        return False
-                    
-                    # Verifica se anexou com sucesso
-                    content = resultado.get("content", {})
-                    if content and content.get("hasNewAttachment"):
-                        logger.info(f"[anexar_arquivo_chamado] Arquivo anexado com sucesso ao chamado {process_instance_id}")
-                        logger.debug(f"[anexar_arquivo_chamado] Resposta: {resultado}")
-                        return True
-                    else:
-                        logger.warning(f"[anexar_arquivo_chamado] Resposta sem confirmação explícita de anexo, mas status 200")
-                        return True  # Assumir sucesso se status 200 e sem erro
-                except Exception as e:
-                    logger.error(f"[anexar_arquivo_chamado] Erro ao processar resposta JSON: {str(e)}")
-                    return False
-            else:
-                logger.error(f"[anexar_arquivo_chamado] Erro ao anexar arquivo - Status: {resposta.status_code}, Resposta: {resposta.text[:500]}")
-                return False
+            resposta = self.requests.RequestTipoPOST(url_save, payload, headers_extra=HEADERS_ANEXO, timeout=30)
+            return tratar_resposta_anexo_chamado(resposta, process_instance_id)
                 
         except Exception as e:
             logger.error(f"[anexar_arquivo_chamado] Erro inesperado ao anexar arquivo: {str(e)}")
@@ -636,13 +353,7 @@ class FluigCore():
             Dados JSON com lista de chamados (tasks) ou None
         """
         try:
-            # Obtém assignee se não fornecido
-            if not assignee:
-                if self.ambiente.upper() == "QLD":
-                    assignee = ConfigEnvSetings.USER_COLLEAGUE_ID_QLD
-                else:
-                    assignee = ConfigEnvSetings.USER_COLLEAGUE_ID
-                    
+            assignee = assignee or assignee_padrao(self.ambiente)
             if not assignee:
                 logger.error(f"[listar_chamados_tasks] assignee não configurado para ambiente {self.ambiente}")
                 return None
@@ -650,25 +361,8 @@ class FluigCore():
             logger.info(f"[listar_chamados_tasks] Usando assignee: {assignee} para ambiente {self.ambiente}")
             logger.info(f"[listar_chamados_tasks] Usando autenticação OAuth 1.0 (CK, CS, TK, TS)")
             
-            # Usa URL base já configurada na instância
-            parsed_url = urlparse(self.url_base)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
-            # Monta URL do endpoint v2
-            url = f"{base_url}/process-management/api/v2/tasks"
-            
-            # Parâmetros da query
-            params = {
-                'assignee': assignee,
-                'status': status,
-                'page': page,
-                'pageSize': page_size,
-                'order': order
-            }
-            
-            # Adiciona slaStatus apenas se fornecido
-            if sla_status:
-                params['slaStatus'] = sla_status
+            url = base_url_fluig(self.url_base) + "/process-management/api/v2/tasks"
+            params = montar_parametros_tasks(assignee, status, sla_status, page, page_size, order)
             
             logger.info(f"[listar_chamados_tasks] Fazendo requisição para {self.ambiente}...")
             logger.debug(f"[listar_chamados_tasks] URL: {url}")
@@ -678,24 +372,7 @@ class FluigCore():
             response = self.requests.RequestTipoGET(url, params)
             
             logger.info(f"[listar_chamados_tasks] Status Code: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    items = data.get('items', [])
-                    has_next = data.get('hasNext', False)
-                    logger.info(f"[listar_chamados_tasks] {len(items)} chamado(s) encontrado(s), hasNext: {has_next}")
-                    return data
-                except json.JSONDecodeError as e:
-                    logger.error(f"[listar_chamados_tasks] Erro ao decodificar JSON: {str(e)}")
-                    logger.debug(f"[listar_chamados_tasks] Resposta: {response.text[:500]}")
-                    return None
-            else:
-                logger.error(f"[listar_chamados_tasks] Erro na requisição - Status: {response.status_code}")
-                logger.debug(f"[listar_chamados_tasks] Resposta: {response.text[:500]}")
-                if response.status_code == 401:
-                    logger.error("[listar_chamados_tasks] Erro de autenticação. Verifique as credenciais OAuth 1.0 (CK, CS, TK, TS)")
-                return None
+            return tratar_resposta_tasks(response)
                 
         except Exception as e:
             logger.error(f"[listar_chamados_tasks] Erro ao listar chamados: {str(e)}")
@@ -703,6 +380,45 @@ class FluigCore():
             logger.debug(f"[listar_chamados_tasks] Traceback: {traceback.format_exc()}")
             return None
 
+    def iterar_chamados_tasks(
+        self,
+        assignee: Optional[str] = None,
+        status: str = "NOT_COMPLETED",
+        sla_status: Optional[str] = None,
+        page_size: Optional[int] = None,
+        order: str = "processInstanceId",
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre todos os chamados (tasks) seguindo hasNext, uma página por vez
+        
+        Diferente de listar_chamados_tasks (uma única página), percorre a fila
+        inteira sem manter todas as páginas em memória.
+        
+        Args:
+            assignee: ID do colleague ou grupo (opcional, usa USER_COLLEAGUE_ID se não fornecido)
+            status: Status das tarefas (padrão: 'NOT_COMPLETED')
+            sla_status: Status do SLA (opcional, None para todos)
+            page_size: Registros por página (padrão: FLUIG_PAGINACAO_TAMANHO_PAGINA)
+            order: Campo para ordenação (padrão: 'processInstanceId')
+            prefetch: Se True, busca a próxima página enquanto a atual é consumida
+        
+        Yields:
+            Cada task (item) da listagem
+        
+        Raises:
+            RuntimeError: Se alguma página não puder ser obtida
+        """
+        tamanho = tamanho_pagina_padrao(page_size)
+        paginas = iterar_paginas(
+            lambda page: self.listar_chamados_tasks(assignee, status, sla_status, page, tamanho, order),
+            "iterar_chamados_tasks",
+            prefetch=prefetch
+        )
+        for dados in paginas:
+            yield from dados.get('items', [])
+
+    @com_span("fluig.obter_detalhes_chamado")
     def obter_detalhes_chamado(
         self,
         process_instance_id: int,
@@ -723,12 +439,8 @@ class FluigCore():
             Dados JSON com detalhes do chamado ou None
         """
         try:
-            # Usa URL base já configurada na instância
-            parsed_url = urlparse(self.url_base)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
             # Endpoint oficial da API v2 do Fluig
-            url = f"{base_url}/process-management/api/v2/requests/{process_instance_id}"
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}"
             
             # Parâmetros da query string
             parametros = {
@@ -742,37 +454,7 @@ class FluigCore():
             response = self.requests.RequestTipoGET(url, parametros)
             
             logger.info(f"[obter_detalhes_chamado] Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    
-                    # Simplifica formFields: transforma array de {field, value} em dicionário simples
-                    if "formFields" in data and isinstance(data["formFields"], list):
-                        form_fields_dict = {}
-                        for item in data["formFields"]:
-                            if isinstance(item, dict) and "field" in item and "value" in item:
-                                form_fields_dict[item["field"]] = item["value"]
-                        data["formFields"] = form_fields_dict
-                    
-                    logger.info(f"[obter_detalhes_chamado] Detalhes obtidos com sucesso")
-                    return data
-                except json.JSONDecodeError as e:
-                    logger.error(f"[obter_detalhes_chamado] Erro ao decodificar JSON: {str(e)}")
-                    logger.debug(f"[obter_detalhes_chamado] Resposta: {response.text[:500]}")
-                    return None
-            else:
-                logger.error(f"[obter_detalhes_chamado] Erro HTTP {response.status_code}")
-                logger.error(f"[obter_detalhes_chamado] Resposta do servidor: {response.text[:500]}")
-                
-                if response.status_code in [401, 403]:
-                    logger.warning("[obter_detalhes_chamado] Erro de autenticação. Verifique as credenciais OAuth1 (CK, CS, TK, TS)")
-                elif response.status_code == 404:
-                    logger.warning(f"[obter_detalhes_chamado] Chamado {process_instance_id} não encontrado")
-                elif response.status_code == 500:
-                    logger.warning(f"[obter_detalhes_chamado] Erro interno do servidor. Verifique se o chamado existe")
-                
-                return None
+            return tratar_resposta_detalhes(response, process_instance_id)
                 
         except Exception as e:
             logger.error(f"[obter_detalhes_chamado] Erro inesperado: {str(e)}")
@@ -801,12 +483,8 @@ class FluigCore():
             Retorna None em caso de erro
         """
         try:
-            # Usa URL base já configurada na instância
-            parsed_url = urlparse(self.url_base)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
             # Endpoint oficial da API v2 do Fluig
-            url = f"{base_url}/process-management/api/v2/activities"
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/activities"
             
             # Parâmetros da query string
             parametros = {
@@ -823,34 +501,7 @@ class FluigCore():
             response = self.requests.RequestTipoGET(url, parametros)
             
             logger.info(f"[obter_detalhes_atividade] Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    
-                    items = data.get('items', [])
-                    has_next = data.get('hasNext', False)
-                    
-                    logger.info(f"[obter_detalhes_atividade] {len(items)} atividade(s) encontrada(s), hasNext: {has_next}")
-                    logger.debug(f"[obter_detalhes_atividade] Resposta completa: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
-                    
-                    return data
-                except json.JSONDecodeError as e:
-                    logger.error(f"[obter_detalhes_atividade] Erro ao decodificar JSON: {str(e)}")
-                    logger.debug(f"[obter_detalhes_atividade] Resposta: {response.text[:500]}")
-                    return None
-            else:
-                logger.error(f"[obter_detalhes_atividade] Erro HTTP {response.status_code}")
-                logger.error(f"[obter_detalhes_atividade] Resposta do servidor: {response.text[:500]}")
-                
-                if response.status_code in [401, 403]:
-                    logger.warning("[obter_detalhes_atividade] Erro de autenticação. Verifique as credenciais OAuth1 (CK, CS, TK, TS)")
-                elif response.status_code == 404:
-                    logger.warning(f"[obter_detalhes_atividade] Chamado {process_instance_id} não encontrado")
-                elif response.status_code == 500:
-                    logger.warning(f"[obter_detalhes_atividade] Erro interno do servidor. Verifique se o chamado existe")
-                
-                return None
+            return tratar_resposta_atividades(response, process_instance_id)
                 
         except Exception as e:
             logger.error(f"[obter_detalhes_atividade] Erro inesperado: {str(e)}")
@@ -858,11 +509,15 @@ class FluigCore():
             logger.debug(f"[obter_detalhes_atividade] Traceback: {traceback.format_exc()}")
             return None
 
+    @com_span("fluig.obter_historico_chamado")
     def obter_historico_chamado(
         self,
         process_instance_id: int,
         page: int = 1,
-        page_size: int = 1000
+        page_size: int = 1000,
+        ultimo_movement_sequence: Optional[int] = None,
+        ultimo_observation_id: Optional[int] = None,
+        ultimo_attachment_id: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Obtém o histórico de um chamado usando o endpoint da API v2
@@ -871,24 +526,37 @@ class FluigCore():
         
         IMPORTANTE: Usa exclusivamente autenticação OAuth 1.0 (CK, CS, TK, TS)
         
+        Modo incremental: informando o marcador do último item conhecido
+        (ver marcador_historico), as páginas são lidas da mais recente para a
+        mais antiga e a busca para na primeira página que contém um item já
+        conhecido. Retorna apenas os itens novos, então o custo acompanha o
+        volume de mudanças e não o tamanho do histórico.
+        
         Args:
             process_instance_id: ID da instância do processo (número do chamado)
-            page: Número da página (padrão: 1)
+            page: Número da página (padrão: 1, ignorado no modo incremental)
             page_size: Tamanho da página (padrão: 1000)
+            ultimo_movement_sequence: Última movimentação conhecida (modo incremental)
+            ultimo_observation_id: Último comentário conhecido (modo incremental)
+            ultimo_attachment_id: Último anexo conhecido (modo incremental)
         
         Returns:
             Dicionário com o histórico do chamado contendo:
-            - items: Lista de eventos do histórico (MOVEMENT, OBSERVATION, ATTACHMENT)
-            - hasNext: Indica se há mais páginas
+            - items: Lista de eventos do histórico (MOVEMENT, OBSERVATION, ATTACHMENT),
+              apenas os novos no modo incremental
+            - hasNext: Indica se há mais páginas (sempre False no modo incremental)
+            - paginas_consultadas: Apenas no modo incremental
             Retorna None em caso de erro
         """
+        if any(v is not None for v in (ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id)):
+            return self._obter_historico_incremental(
+                process_instance_id, page_size,
+                ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id
+            )
+        
         try:
-            # Usa URL base já configurada na instância
-            parsed_url = urlparse(self.url_base)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
             # Endpoint oficial da API v2 do Fluig
-            url = f"{base_url}/process-management/api/v2/requests/{process_instance_id}/histories"
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}/histories"
             
             # Parâmetros da query string
             parametros = {
@@ -905,34 +573,7 @@ class FluigCore():
             response = self.requests.RequestTipoGET(url, parametros)
             
             logger.info(f"[obter_historico_chamado] Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    
-                    items = data.get('items', [])
-                    has_next = data.get('hasNext', False)
-                    
-                    logger.info(f"[obter_historico_chamado] {len(items)} evento(s) encontrado(s) no histórico, hasNext: {has_next}")
-                    logger.debug(f"[obter_historico_chamado] Resposta completa: {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}")
-                    
-                    return data
-                except json.JSONDecodeError as e:
-                    logger.error(f"[obter_historico_chamado] Erro ao decodificar JSON: {str(e)}")
-                    logger.debug(f"[obter_historico_chamado] Resposta: {response.text[:500]}")
-                    return None
-            else:
-                logger.error(f"[obter_historico_chamado] Erro HTTP {response.status_code}")
-                logger.error(f"[obter_historico_chamado] Resposta do servidor: {response.text[:500]}")
-                
-                if response.status_code in [401, 403]:
-                    logger.warning("[obter_historico_chamado] Erro de autenticação. Verifique as credenciais OAuth1 (CK, CS, TK, TS)")
-                elif response.status_code == 404:
-                    logger.warning(f"[obter_historico_chamado] Chamado {process_instance_id} não encontrado")
-                elif response.status_code == 500:
-                    logger.warning(f"[obter_historico_chamado] Erro interno do servidor. Verifique se o chamado existe")
-                
-                return None
+            return tratar_resposta_historico(response, process_instance_id)
                 
         except Exception as e:
             logger.error(f"[obter_historico_chamado] Erro inesperado: {str(e)}")
@@ -940,6 +581,69 @@ class FluigCore():
             logger.debug(f"[obter_historico_chamado] Traceback: {traceback.format_exc()}")
             return None
     
+    def _obter_historico_incremental(
+        self,
+        process_instance_id: int,
+        page_size: int,
+        ultimo_movement_sequence: Optional[int],
+        ultimo_observation_id: Optional[int],
+        ultimo_attachment_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Busca apenas os itens do histórico mais novos que o marcador (ver obter_historico_chamado)"""
+        itens_novos = []
+        paginas_consultadas = 0
+        try:
+            paginas = iterar_paginas(
+                lambda page: self.obter_historico_chamado(process_instance_id, page, page_size),
+                "obter_historico_chamado"
+            )
+            for dados in paginas:
+                paginas_consultadas += 1
+                items = dados.get('items', [])
+                novos = filtrar_itens_novos(items, ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id)
+                itens_novos.extend(novos)
+                # Itens vêm do mais recente para o mais antigo: encontrou item conhecido, o restante já é conhecido
+                if len(novos) < len(items):
+                    break
+        except RuntimeError as e:
+            logger.error(f"[obter_historico_chamado] Erro na busca incremental do chamado {process_instance_id}: {str(e)}")
+            return None
+        
+        logger.info(
+            f"[obter_historico_chamado] Busca incremental do chamado {process_instance_id}: "
+            f"{len(itens_novos)} item(ns) novo(s) em {paginas_consultadas} página(s)"
+        )
+        return {'items': itens_novos, 'hasNext': False, 'paginas_consultadas': paginas_consultadas}
+    
+    def iterar_historico_chamado(
+        self,
+        process_instance_id: int,
+        page_size: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre todo o histórico de um chamado seguindo hasNext, uma página por vez
+        
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+            page_size: Registros por página (padrão: FLUIG_PAGINACAO_TAMANHO_PAGINA)
+            prefetch: Se True, busca a próxima página enquanto a atual é consumida
+        
+        Yields:
+            Cada evento do histórico (MOVEMENT, OBSERVATION, ATTACHMENT)
+        
+        Raises:
+            RuntimeError: Se alguma página não puder ser obtida
+        """
+        tamanho = tamanho_pagina_padrao(page_size)
+        paginas = iterar_paginas(
+            lambda page: self.obter_historico_chamado(process_instance_id, page, tamanho),
+            "iterar_historico_chamado",
+            prefetch=prefetch
+        )
+        for dados in paginas:
+            yield from dados.get('items', [])
+    
     def baixar_anexo_chamado(
         self,
         process_instance_id: int,
@@ -960,12 +664,8 @@ class FluigCore():
             Bytes do arquivo baixado ou None em caso de erro
         """
         try:
-            # Usa URL base já configurada na instância
-            parsed_url = urlparse(self.url_base)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            
             # Endpoint oficial da API v2 do Fluig
-            url = f"{base_url}/process-management/api/v2/requests/{process_instance_id}/attachments/download"
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}/attachments/download"
             
             # Parâmetros da query string
             parametros = {
@@ -981,29 +681,7 @@ class FluigCore():
             response = self.requests.RequestTipoGET(url, parametros, logar_conteudo=False)
             
             logger.info(f"[baixar_anexo_chamado] Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                tamanho_bytes = len(response.content)
-                # Converte tamanho para formato legível
-                if tamanho_bytes < 1024:
-                    tamanho_formatado = f"{tamanho_bytes} bytes"
-                elif tamanho_bytes < 1024 * 1024:
-                    tamanho_formatado = f"{tamanho_bytes / 1024:.2f} KB"
-                else:
-                    tamanho_formatado = f"{tamanho_bytes / (1024 * 1024):.2f} MB"
-                
-                logger.info(f"[baixar_anexo_chamado] Anexo '{document_name}' baixado com sucesso - Tamanho: {tamanho_formatado}")
-                return response.content
-            else:
-                logger.error(f"[baixar_anexo_chamado] Erro ao baixar anexo '{document_name}' - Status: {response.status_code}")
-                # Tenta ler apenas se for texto (não binário)
-                try:
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'text' in content_type.lower() or 'json' in content_type.lower():
-                        logger.error(f"[baixar_anexo_chamado] Resposta: {response.text[:500]}")
-                except:
-                    pass
-                return None
+            return tratar_resposta_download(response, document_name)
                 
         except Exception as e:
             logger.error(f"[baixar_anexo_chamado] Exceção ao baixar anexo: {str(e)}")
@@ -0,0 +1,499 @@
+import asyncio
+import json
+from typing import Optional, Dict, Any, AsyncIterator
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+from src.fluig.fluig_requests import RequestsFluigAsync
+from src.fluig.fluig_cache import buscar_dataset_com_cache_async
+from src.fluig.fluig_diretorio import buscar_no_diretorio
+from src.fluig.fluig_comum import (
+    URL_SAVE_ATTACHMENTS, HEADERS_ANEXO,
+    base_url_fluig, assignee_padrao, montar_url_processo,
+    montar_busca_dataset, tratar_resposta_dataset,
+    montar_payload_abertura, tratar_resposta_processo, tratar_resposta_upload,
+    montar_payload_anexo_processo, tratar_resposta_anexo_processo,
+    montar_payload_anexo_chamado, tratar_resposta_anexo_chamado,
+    montar_parametros_tasks, tratar_resposta_tasks, tratar_resposta_detalhes,
+    tratar_resposta_atividades, tratar_resposta_historico, tratar_resposta_download,
+    tamanho_pagina_padrao, iterar_paginas_async, filtrar_itens_novos,
+)
+
+
+class AsyncFluigCore():
+    """
+    Versão assíncrona de FluigCore para uso nas rotas FastAPI
+
+    Mesmos métodos, parâmetros e retornos de FluigCore, porém como corrotinas
+    sobre o httpx.AsyncClient compartilhado do ambiente: as rotas aguardam o
+    Fluig sem ocupar threads do threadpool do servidor.
+
+    Deve ser instanciada dentro do event loop que fará as requisições.
+    """
+
+    def __init__(self, ambiente: str = "PRD"):
+        """
+        Inicializa a classe AsyncFluigCore
+
+        Args:
+            ambiente: Ambiente ('PRD' ou 'QLD')
+        """
+        logger.info(f"[AsyncFluigCore] Inicializando - Ambiente: {ambiente}")
+        self.ambiente = ambiente
+        self.requests = RequestsFluigAsync(ambiente)
+        self.url_base = self.requests.url
+
+    async def Dataset_config(self, dataset_id: str, user: str) -> dict:
+        """
+        Busca usuário no dataset (ver FluigCore.Dataset_config)
+
+        Args:
+            dataset_id: ID do dataset conforme DatasetConfig
+            user: Usuário para busca (email ou nome/chapa)
+
+        Returns:
+            Dicionário com dados do dataset ou resposta HTTP
+
+        Raises:
+            ValueError: Se dataset_id não existe ou user não foi fornecido
+        """
+        logger.info(f"[Dataset_config] Iniciando configuração de busca (async) - Ambiente: {self.ambiente}, Dataset: {dataset_id}, User: {user}")
+        url_suffix, parametro = montar_busca_dataset(dataset_id, user)
+        url_dataset = self.url_base + url_suffix
+
+        dados_diretorio = buscar_no_diretorio(self.ambiente, parametro)
+        if dados_diretorio is not None:
+            return dados_diretorio
+
+        async def carregar():
+            logger.info(f"[Dataset_config] Fazendo requisição GET para: {url_dataset}")
+            resposta = await self.requests.RequestTipoGET(url_dataset, parametro)
+            return tratar_resposta_dataset(resposta)
+
+        return await buscar_dataset_com_cache_async(self.ambiente, parametro, carregar)
+
+    async def AberturaDeChamado(self, tipo_chamado: str, Item: Any, usuario_atendido: Optional[str] = None, target_assignee: Optional[str] = None):
+        """
+        Abre um chamado no Fluig usando autenticação OAuth 1.0 (ver FluigCore.AberturaDeChamado)
+
+        A montagem do payload consulta datasets de forma síncrona e roda em thread.
+
+        Args:
+            tipo_chamado: Tipo de chamado ('classificado' ou 'normal')
+            Item: Dados do chamado
+            usuario_atendido: Nome do usuário atendido (opcional)
+            target_assignee: Responsável de destino (opcional, apenas classificado)
+
+        Returns:
+            Dicionário com status_code, sucesso e dados da resposta
+        """
+        logger.info(f"[AberturaDeChamado] Iniciando abertura de chamado (async) - Tipo: {tipo_chamado}, UsuarioAtendido: {usuario_atendido}")
+        url = self.url_base + "/process-management/api/v2/processes/Abertura%20de%20Chamados/start"
+
+        payload = await asyncio.to_thread(
+            montar_payload_abertura, tipo_chamado, Item, self.ambiente, usuario_atendido, target_assignee
+        )
+
+        logger.info(f"[AberturaDeChamado] Enviando requisição POST para: {url}")
+        resposta = await self.requests.RequestTipoPOST(url, payload)
+        return tratar_resposta_processo(resposta, "AberturaDeChamado")
+
+    async def IniciarProcesso(self, process_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Inicia um processo genérico no Fluig usando autenticação OAuth 1.0
+
+        Args:
+            process_id: ID/Nome do processo no Fluig
+            payload: Payload genérico do processo (dicionário com os campos do formulário)
+
+        Returns:
+            Dicionário com status_code, sucesso, dados e process_instance_id
+        """
+        logger.info(f"[IniciarProcesso] Iniciando processo (async) - ProcessId: {process_id}, Ambiente: {self.ambiente}")
+        url = self.url_base + montar_url_processo(process_id)
+
+        logger.info(f"[IniciarProcesso] Enviando requisição POST para: {url}")
+        logger.debug(f"[IniciarProcesso] Payload: {json.dumps(payload, indent=2, ensure_ascii=False)}")
+
+        resposta = await self.requests.RequestTipoPOST(url, payload, headers_extra={"X-Process-Id": process_id})
+        return tratar_resposta_processo(resposta, "IniciarProcesso", extrair_instance_id=True)
+
+    async def upload_arquivo_fluig(self, arquivo_bytes: bytes, nome_arquivo: str, colleague_id: str) -> dict | None:
+        """
+        Faz upload de um arquivo no Fluig usando o endpoint /ecm/upload
+
+        Args:
+            arquivo_bytes: Conteúdo do arquivo em bytes
+            nome_arquivo: Nome do arquivo
+            colleague_id: ID do colaborador (userId)
+
+        Returns:
+            Dicionário com resposta do upload ou None em caso de erro
+        """
+        try:
+            url_upload = self.url_base + "/ecm/upload"
+            files = {
+                'files': (nome_arquivo, arquivo_bytes, 'application/octet-stream')
+            }
+            data = {
+                'userId': colleague_id
+            }
+
+            logger.info(f"[upload_arquivo_fluig] Enviando arquivo (async) para: {url_upload} - Nome: {nome_arquivo}, Tamanho: {len(arquivo_bytes)} bytes, userId: {colleague_id}")
+            resposta = await self.requests.RequestTipoPOSTMultipart(
+                url=url_upload,
+                files=files,
+                data=data,
+                timeout=60
+            )
+            return tratar_resposta_upload(resposta, nome_arquivo)
+
+        except Exception as e:
+            logger.error(f"[upload_arquivo_fluig] Erro inesperado no upload: {str(e)}")
+            import traceback
+            logger.debug(f"[upload_arquivo_fluig] Traceback: {traceback.format_exc()}")
+            return None
+
+    async def AnexarArquivoProcesso(
+        self,
+        process_id: str,
+        process_instance_id: int,
+        nome_arquivo: str,
+        document_id: Optional[int] = None,
+        version: int = 57,
+        current_movto: int = 3,
+        task_user_id: Optional[str] = None,
+        colleague_id: Optional[str] = None,
+        attached_user: str = "Infra Automação",
+        attached_activity: str = "Aguardando Classificação",
+        internal_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Anexa um arquivo a um processo/chamado usando o endpoint saveAttachments
+        (ver FluigCore.AnexarArquivoProcesso)
+
+        Returns:
+            Dicionário com status_code, sucesso e dados da resposta
+        """
+        try:
+            payload = montar_payload_anexo_processo(
+                process_id=process_id,
+                process_instance_id=process_instance_id,
+                nome_arquivo=nome_arquivo,
+                document_id=document_id,
+                version=version,
+                current_movto=current_movto,
+                task_user_id=task_user_id,
+                colleague_id=colleague_id,
+                attached_user=attached_user,
+                attached_activity=attached_activity,
+                internal_id=internal_id
+            )
+            if payload is None:
+                return {"status_code": 500, "sucesso": False, "erro": "task_user_id não configurado"}
+
+            url_save = self.url_base + URL_SAVE_ATTACHMENTS
+            logger.info(f"[AnexarArquivoProcesso] Enviando requisição (async) para: {url_save}")
+            resposta = await self.requests.RequestTipoPOST(url_save, payload, headers_extra=HEADERS_ANEXO, timeout=30)
+            return tratar_resposta_anexo_processo(resposta, process_id, process_instance_id)
+
+        except Exception as e:
+            logger.error(f"[AnexarArquivoProcesso] Erro inesperado ao anexar arquivo: {str(e)}")
+            import traceback
+            logger.debug(f"[AnexarArquivoProcesso] Traceback: {traceback.format_exc()}")
+            return {
+                "status_code": 500,
+                "sucesso": False,
+                "erro": str(e)
+            }
+
+    async def anexar_arquivo_chamado(
+        self,
+        process_instance_id: int,
+        nome_arquivo: str,
+        version: int = 57,
+        current_movto: int = 3
+    ) -> bool:
+        """
+        Anexa um arquivo a um chamado usando o endpoint saveAttachments
+        (ver FluigCore.anexar_arquivo_chamado)
+
+        Returns:
+            True se anexou com sucesso, False caso contrário
+        """
+        try:
+            logger.info(f"[anexar_arquivo_chamado] Anexando arquivo {nome_arquivo} ao chamado {process_instance_id} (async)")
+
+            admin_colleague_id = ConfigEnvSetings.ADMIN_COLLEAGUE_ID
+            if not admin_colleague_id or admin_colleague_id == "":
+                logger.error("[anexar_arquivo_chamado] ADMIN_COLLEAGUE_ID não configurado")
+                return False
+
+            url_save = self.url_base + URL_SAVE_ATTACHMENTS
+            payload = montar_payload_anexo_chamado(process_instance_id, nome_arquivo, admin_colleague_id, version, current_movto)
+
+            logger.info(f"[anexar_arquivo_chamado] Enviando requisição para: {url_save}")
+            resposta = await self.requests.RequestTipoPOST(url_save, payload, headers_extra=HEADERS_ANEXO, timeout=30)
+            return tratar_resposta_anexo_chamado(resposta, process_instance_id)
+
+        except Exception as e:
+            logger.error(f"[anexar_arquivo_chamado] Erro inesperado ao anexar arquivo: {str(e)}")
+            import traceback
+            logger.debug(f"[anexar_arquivo_chamado] Traceback: {traceback.format_exc()}")
+            return False
+
+    async def listar_chamados_tasks(
+        self,
+        assignee: Optional[str] = None,
+        status: str = "NOT_COMPLETED",
+        sla_status: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 1000,
+        order: str = "processInstanceId"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lista chamados (tasks) usando o endpoint v2 /process-management/api/v2/tasks
+
+        Args:
+            assignee: ID do colleague (opcional, usa USER_COLLEAGUE_ID se não fornecido)
+            status: Status das tarefas (padrão: 'NOT_COMPLETED')
+            sla_status: Status do SLA (opcional, None para todos)
+            page: Número da página (padrão: 1)
+            page_size: Quantidade de registros por página (padrão: 1000)
+            order: Campo para ordenação (padrão: 'processInstanceId')
+
+        Returns:
+            Dados JSON com lista de chamados (tasks) ou None
+        """
+        try:
+            assignee = assignee or assignee_padrao(self.ambiente)
+            if not assignee:
+                logger.error(f"[listar_chamados_tasks] assignee não configurado para ambiente {self.ambiente}")
+                return None
+
+            url = base_url_fluig(self.url_base) + "/process-management/api/v2/tasks"
+            params = montar_parametros_tasks(assignee, status, sla_status, page, page_size, order)
+
+            logger.info(f"[listar_chamados_tasks] Fazendo requisição (async) para {self.ambiente} - assignee: {assignee}")
+            logger.debug(f"[listar_chamados_tasks] Params: {params}")
+            response = await self.requests.RequestTipoGET(url, params)
+            return tratar_resposta_tasks(response)
+
+        except Exception as e:
+            logger.error(f"[listar_chamados_tasks] Erro ao listar chamados: {str(e)}")
+            import traceback
+            logger.debug(f"[listar_chamados_tasks] Traceback: {traceback.format_exc()}")
+            return None
+
+    async def iterar_chamados_tasks(
+        self,
+        assignee: Optional[str] = None,
+        status: str = "NOT_COMPLETED",
+        sla_status: Optional[str] = None,
+        page_size: Optional[int] = None,
+        order: str = "processInstanceId",
+        prefetch: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Itera sobre todos os chamados (tasks) seguindo hasNext (ver FluigCore.iterar_chamados_tasks)
+
+        Yields:
+            Cada task (item) da listagem
+
+        Raises:
+            RuntimeError: Se alguma página não puder ser obtida
+        """
+        tamanho = tamanho_pagina_padrao(page_size)
+        paginas = iterar_paginas_async(
+            lambda page: self.listar_chamados_tasks(assignee, status, sla_status, page, tamanho, order),
+            "iterar_chamados_tasks",
+            prefetch=prefetch
+        )
+        async for dados in paginas:
+            for item in dados.get('items', []):
+                yield item
+
+    async def obter_detalhes_chamado(self, process_instance_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Obtém detalhes de um chamado (formFields simplificados em dicionário)
+
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+
+        Returns:
+            Dados JSON com detalhes do chamado ou None
+        """
+        try:
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}"
+            logger.info(f"[obter_detalhes_chamado] Buscando detalhes do chamado {process_instance_id} (async)...")
+            response = await self.requests.RequestTipoGET(url, {"expand": "formFields"})
+            return tratar_resposta_detalhes(response, process_instance_id)
+
+        except Exception as e:
+            logger.error(f"[obter_detalhes_chamado] Erro inesperado: {str(e)}")
+            return None
+
+    async def obter_detalhes_atividade(
+        self,
+        process_instance_id: int,
+        page: int = 1,
+        page_size: int = 1000
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtém as atividades de um processo/chamado (GET /process-management/api/v2/activities)
+
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+            page: Número da página (padrão: 1)
+            page_size: Tamanho da página (padrão: 1000)
+
+        Returns:
+            Dicionário com items e hasNext ou None em caso de erro
+        """
+        try:
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/activities"
+            parametros = {
+                "processInstanceId": process_instance_id,
+                "page": page,
+                "pageSize": page_size
+            }
+            logger.info(f"[obter_detalhes_atividade] Buscando detalhes das atividades do chamado {process_instance_id} (async)...")
+            response = await self.requests.RequestTipoGET(url, parametros)
+            return tratar_resposta_atividades(response, process_instance_id)
+
+        except Exception as e:
+            logger.error(f"[obter_detalhes_atividade] Erro inesperado: {str(e)}")
+            import traceback
+            logger.debug(f"[obter_detalhes_atividade] Traceback: {traceback.format_exc()}")
+            return None
+
+    async def obter_historico_chamado(
+        self,
+        process_instance_id: int,
+        page: int = 1,
+        page_size: int = 1000,
+        ultimo_movement_sequence: Optional[int] = None,
+        ultimo_observation_id: Optional[int] = None,
+        ultimo_attachment_id: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtém o histórico de um chamado (GET /process-management/api/v2/requests/{id}/histories)
+
+        Com o marcador do último item conhecido, busca apenas os itens novos
+        (ver FluigCore.obter_historico_chamado).
+
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+            page: Número da página (padrão: 1, ignorado no modo incremental)
+            page_size: Tamanho da página (padrão: 1000)
+            ultimo_movement_sequence: Última movimentação conhecida (modo incremental)
+            ultimo_observation_id: Último comentário conhecido (modo incremental)
+            ultimo_attachment_id: Último anexo conhecido (modo incremental)
+
+        Returns:
+            Dicionário com items e hasNext ou None em caso de erro
+        """
+        if any(v is not None for v in (ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id)):
+            return await self._obter_historico_incremental(
+                process_instance_id, page_size,
+                ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id
+            )
+
+        try:
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}/histories"
+            parametros = {
+                "page": page,
+                "pageSize": page_size
+            }
+            logger.info(f"[obter_historico_chamado] Buscando histórico do chamado {process_instance_id} (async)...")
+            response = await self.requests.RequestTipoGET(url, parametros)
+            return tratar_resposta_historico(response, process_instance_id)
+
+        except Exception as e:
+            logger.error(f"[obter_historico_chamado] Erro inesperado: {str(e)}")
+            import traceback
+            logger.debug(f"[obter_historico_chamado] Traceback: {traceback.format_exc()}")
+            return None
+
+    async def _obter_historico_incremental(
+        self,
+        process_instance_id: int,
+        page_size: int,
+        ultimo_movement_sequence: Optional[int],
+        ultimo_observation_id: Optional[int],
+        ultimo_attachment_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Busca apenas os itens do histórico mais novos que o marcador (ver obter_historico_chamado)"""
+        itens_novos = []
+        paginas_consultadas = 0
+        paginas = iterar_paginas_async(
+            lambda page: self.obter_historico_chamado(process_instance_id, page, page_size),
+            "obter_historico_chamado"
+        )
+        try:
+            async for dados in paginas:
+                paginas_consultadas += 1
+                items = dados.get('items', [])
+                novos = filtrar_itens_novos(items, ultimo_movement_sequence, ultimo_observation_id, ultimo_attachment_id)
+                itens_novos.extend(novos)
+                if len(novos) < len(items):
+                    break
+        except RuntimeError as e:
+            logger.error(f"[obter_historico_chamado] Erro na busca incremental do chamado {process_instance_id}: {str(e)}")
+            return None
+        finally:
+            await paginas.aclose()
+
+        logger.info(
+            f"[obter_historico_chamado] Busca incremental do chamado {process_instance_id} (async): "
+            f"{len(itens_novos)} item(ns) novo(s) em {paginas_consultadas} página(s)"
+        )
+        return {'items': itens_novos, 'hasNext': False, 'paginas_consultadas': paginas_consultadas}
+
+    async def iterar_historico_chamado(
+        self,
+        process_instance_id: int,
+        page_size: Optional[int] = None,
+        prefetch: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Itera sobre todo o histórico de um chamado seguindo hasNext (ver FluigCore.iterar_historico_chamado)
+
+        Yields:
+            Cada evento do histórico (MOVEMENT, OBSERVATION, ATTACHMENT)
+
+        Raises:
+            RuntimeError: Se alguma página não puder ser obtida
+        """
+        tamanho = tamanho_pagina_padrao(page_size)
+        paginas = iterar_paginas_async(
+            lambda page: self.obter_historico_chamado(process_instance_id, page, tamanho),
+            "iterar_historico_chamado",
+            prefetch=prefetch
+        )
+        async for dados in paginas:
+            for item in dados.get('items', []):
+                yield item
+
+    async def baixar_anexo_chamado(self, process_instance_id: int, document_name: str) -> Optional[bytes]:
+        """
+        Baixa um anexo de um chamado (GET /process-management/api/v2/requests/{id}/attachments/download)
+
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+            document_name: Nome do documento/anexo a ser baixado
+
+        Returns:
+            Bytes do arquivo baixado ou None em caso de erro
+        """
+        try:
+            url = f"{base_url_fluig(self.url_base)}/process-management/api/v2/requests/{process_instance_id}/attachments/download"
+            logger.info(f"[baixar_anexo_chamado] Baixando anexo '{document_name}' do chamado {process_instance_id} (async)...")
+            response = await self.requests.RequestTipoGET(url, {"documentName": document_name}, logar_conteudo=False)
+            return tratar_resposta_download(response, document_name)
+
+        except Exception as e:
+            logger.error(f"[baixar_anexo_chamado] Exceção ao baixar anexo: {str(e)}")
+            import traceback
+            logger.debug(f"[baixar_anexo_chamado] Traceback: {traceback.format_exc()}")
+            return None
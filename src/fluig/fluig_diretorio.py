@@ -0,0 +1,498 @@
+"""
+Diretório local de colaboradores sincronizado a partir dos datasets do Fluig
+
+A busca de usuário por dataset (colleague/ds_funcionarios) é a chamada mais
+frequente ao Fluig. Este módulo baixa o dataset inteiro em páginas, monta
+índices em memória por email, nome (sem acento/caixa) e chapa e responde
+Dataset_config localmente; só em caso de miss a busca vai ao Fluig.
+
+O índice é persistido em src/json/colaboradores_{ambiente}.json, então um
+restart já começa com o diretório carregado, e é atualizado periodicamente
+por uma thread em background.
+"""
+import json
+import os
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.modelo_dados.modelos_fluig import DatasetConfig
+from src.fluig.fluig_requests import RequestsFluig
+from src.fluig.fluig_limitador import com_prioridade_fluig, PRIORIDADE_BACKGROUND
+from src.fluig.fluig_resiliencia import circuito_aberto, FAMILIA_DATASET
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_ciclo_loop
+
+# Campo que identifica um registro em cada dataset (usado no diff incremental)
+CAMPOS_ID_DATASET = {
+    'colleague': 'colleagueId',
+    'ds_funcionarios': 'Chapa',
+}
+
+VERSAO_ARQUIVO = 1
+
+
+def normalizar_termo(valor: Any) -> str:
+    """
+    Normaliza um termo de busca: sem acentos, minúsculo e com espaços simples
+
+    Args:
+        valor: Email, nome ou chapa
+
+    Returns:
+        Termo normalizado (string vazia se valor for vazio)
+    """
+    if valor is None:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(valor))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+
+def campos_indexados(dataset_id: str) -> List[str]:
+    """Retorna os campos de busca do dataset conforme DatasetConfig (email, nome e currentProject)"""
+    config = DatasetConfig().get(dataset_id, {})
+    campos = []
+    for chave in ('campo_email', 'campo_nome', 'campo_currentProject'):
+        campo = config.get(chave)
+        if campo and campo not in campos:
+            campos.append(campo)
+    return campos
+
+
+def _extrair_registros(dados: Any) -> List[Dict[str, Any]]:
+    """Extrai a lista de registros de uma resposta de dataset (content como lista ou {'values': [...]})"""
+    if not isinstance(dados, dict):
+        return []
+    content = dados.get('content')
+    if isinstance(content, dict):
+        content = content.get('values')
+    return [r for r in (content or []) if isinstance(r, dict)]
+
+
+def _id_registro(dataset_id: str, registro: Dict[str, Any]) -> str:
+    """Identificador estável do registro (campo de ID do dataset ou o próprio conteúdo)"""
+    campo_id = CAMPOS_ID_DATASET.get(dataset_id)
+    if campo_id and registro.get(campo_id) not in (None, ''):
+        return str(registro[campo_id])
+    return json.dumps(registro, sort_keys=True, ensure_ascii=False)
+
+
+class IndiceDataset:
+    """
+    Índice imutável de um dataset: registros por ID e, para cada campo de
+    busca, termo normalizado -> IDs dos registros
+
+    Uma nova sincronização cria outro IndiceDataset e troca a referência,
+    então leituras concorrentes nunca veem um índice pela metade.
+    """
+
+    def __init__(self, dataset_id: str, registros: Dict[str, Dict[str, Any]], sincronizado_em: Optional[str] = None):
+        self.dataset_id = dataset_id
+        self.registros = registros
+        self.sincronizado_em = sincronizado_em
+        self.indices: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+
+        for campo in campos_indexados(dataset_id):
+            indice: Dict[str, List[str]] = {}
+            for id_registro, registro in registros.items():
+                termo = normalizar_termo(registro.get(campo))
+                if termo:
+                    indice.setdefault(termo, []).append(id_registro)
+            self.indices[campo] = {termo: tuple(ids) for termo, ids in indice.items()}
+
+    def buscar(self, campo: str, valor: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca registros pelo campo/valor
+
+        Returns:
+            Lista de registros (cópias), lista vazia se o campo é indexado mas
+            não há registro, ou None se o campo não é indexado
+        """
+        indice = self.indices.get(campo)
+        if indice is None:
+            return None
+        ids = indice.get(normalizar_termo(valor), ())
+        return [dict(self.registros[i]) for i in ids]
+
+
+class DiretorioColaboradores:
+    """
+    Diretório de colaboradores de um ambiente (um IndiceDataset por dataset)
+
+    Attributes:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        datasets: Datasets sincronizados (ex.: ['colleague', 'ds_funcionarios'])
+        tamanho_pagina: Registros por requisição na sincronização
+        intervalo_minutos: Intervalo entre sincronizações
+    """
+
+    def __init__(
+        self,
+        ambiente: str,
+        datasets: List[str],
+        tamanho_pagina: int = 500,
+        intervalo_minutos: float = 360.0,
+        arquivo: Optional[Path] = None
+    ):
+        self.ambiente = ambiente.upper()
+        self.datasets = datasets
+        self.tamanho_pagina = max(1, int(tamanho_pagina))
+        self.intervalo_minutos = float(intervalo_minutos)
+        self.arquivo = arquivo or (Path(__file__).resolve().parent.parent / "json" / f"colaboradores_{self.ambiente.lower()}.json")
+
+        self._indices: Dict[str, IndiceDataset] = {}
+        self._lock_sincronizacao = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.sincronizacoes = 0
+        self.ultima_sincronizacao: Optional[Dict[str, Any]] = None
+
+    # ==================== CONSULTA ====================
+
+    def buscar(self, parametro: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Responde uma busca de Dataset_config a partir do índice local
+
+        Args:
+            parametro: Parâmetros montados por montar_busca_dataset (datasetId, filterFields)
+
+        Returns:
+            Resposta no formato do Fluig ({'content': [...]}) ou None em caso de miss
+            (dataset não sincronizado, campo não indexado ou nenhum registro)
+        """
+        indice = self._indices.get(parametro.get('datasetId'))
+        if indice is None:
+            return None
+
+        campo, _, valor = parametro.get('filterFields', '').partition(',')
+        registros = indice.buscar(campo, valor)
+        if not registros:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"[DiretorioColaboradores] {len(registros)} resultado(s) no diretório local - Ambiente: {self.ambiente}, Dataset: {indice.dataset_id}, Campo: {campo}")
+        return {'content': registros}
+
+    # ==================== PERSISTÊNCIA ====================
+
+    def carregar_do_disco(self) -> bool:
+        """
+        Carrega o último índice salvo (restart com diretório já preenchido)
+
+        Returns:
+            True se algum dataset foi carregado
+        """
+        try:
+            if not self.arquivo.exists():
+                logger.info(f"[DiretorioColaboradores] Nenhum diretório salvo em {self.arquivo.name} - aguardando primeira sincronização")
+                return False
+
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+
+            if conteudo.get('versao') != VERSAO_ARQUIVO:
+                logger.warning(f"[DiretorioColaboradores] Versão do arquivo {self.arquivo.name} incompatível - ignorando")
+                return False
+
+            for dataset_id, dados in conteudo.get('datasets', {}).items():
+                if dataset_id not in self.datasets:
+                    continue
+                registros = {_id_registro(dataset_id, r): r for r in dados.get('registros', [])}
+                self._indices[dataset_id] = IndiceDataset(dataset_id, registros, dados.get('sincronizado_em'))
+                logger.info(f"[DiretorioColaboradores] {len(registros)} registro(s) de '{dataset_id}' carregados do disco ({self.ambiente})")
+            return bool(self._indices)
+
+        except Exception as e:
+            logger.error(f"[DiretorioColaboradores] Erro ao carregar {self.arquivo.name}: {str(e)}")
+            return False
+
+    def _salvar_no_disco(self):
+        """Salva o índice atual em arquivo (escrita atômica via arquivo temporário)"""
+        try:
+            conteudo = {
+                'versao': VERSAO_ARQUIVO,
+                'ambiente': self.ambiente,
+                'datasets': {
+                    dataset_id: {
+                        'sincronizado_em': indice.sincronizado_em,
+                        'registros': list(indice.registros.values()),
+                    }
+                    for dataset_id, indice in self._indices.items()
+                },
+            }
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            temporario = self.arquivo.with_suffix('.tmp')
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(conteudo, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+            logger.debug(f"[DiretorioColaboradores] Diretório salvo em {self.arquivo}")
+        except Exception as e:
+            logger.error(f"[DiretorioColaboradores] Erro ao salvar {self.arquivo.name}: {str(e)}")
+
+    # ==================== SINCRONIZAÇÃO ====================
+
+    def _baixar_dataset(self, requests_fluig: RequestsFluig, dataset_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Baixa todos os registros do dataset em páginas (limit/offset)
+
+        Returns:
+            Registros por ID ou None se alguma página falhar (mantém o índice atual)
+        """
+        config = DatasetConfig()[dataset_id]
+        url = requests_fluig.url + config.get('url', '/api/public/ecm/dataset/search')
+        registros: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+
+        while not self._parar.is_set():
+            parametros = {'datasetId': config['datasetId'], 'limit': self.tamanho_pagina, 'offset': offset}
+            resposta = requests_fluig.RequestTipoGET(url, parametros, logar_conteudo=False)
+            if resposta.status_code != 200:
+                logger.error(f"[DiretorioColaboradores] Erro ao baixar '{dataset_id}' (offset {offset}) - Status: {resposta.status_code}")
+                return None
+
+            pagina = _extrair_registros(resposta.json())
+            novos = 0
+            for registro in pagina:
+                id_registro = _id_registro(dataset_id, registro)
+                if id_registro not in registros:
+                    novos += 1
+                registros[id_registro] = registro
+
+            logger.debug(f"[DiretorioColaboradores] '{dataset_id}' offset {offset}: {len(pagina)} registro(s), {novos} novo(s)")
+
+            # Última página (ou servidor ignorando offset e repetindo a mesma página)
+            if len(pagina) < self.tamanho_pagina or novos == 0:
+                break
+            offset += self.tamanho_pagina
+
+        return registros
+
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
+    def sincronizar(self) -> Dict[str, Any]:
+        """
+        Sincroniza os datasets com o Fluig aplicando apenas as diferenças
+
+        Os datasets não expõem data de alteração, então cada ciclo percorre as
+        páginas e compara com o índice atual: o índice só é reconstruído (e
+        o arquivo regravado) quando há registros incluídos, alterados ou removidos.
+
+        Returns:
+            Resumo por dataset (total, incluidos, alterados, removidos) e duração
+        """
+        with self._lock_sincronizacao:
+            inicio = time.monotonic()
+            resumo: Dict[str, Any] = {'ambiente': self.ambiente, 'datasets': {}}
+            houve_mudanca = False
+            requests_fluig = RequestsFluig(self.ambiente)
+
+            for dataset_id in self.datasets:
+                try:
+                    novos = self._baixar_dataset(requests_fluig, dataset_id)
+                except Exception as e:
+                    logger.error(f"[DiretorioColaboradores] Erro ao sincronizar '{dataset_id}': {str(e)}")
+                    novos = None
+
+                if novos is None:
+                    resumo['datasets'][dataset_id] = {'erro': True}
+                    continue
+
+                atual = self._indices.get(dataset_id)
+                antigos = atual.registros if atual else {}
+                incluidos = sum(1 for i in novos if i not in antigos)
+                removidos = sum(1 for i in antigos if i not in novos)
+                alterados = sum(1 for i, r in novos.items() if i in antigos and antigos[i] != r)
+                agora = datetime.now().isoformat(timespec='seconds')
+
+                if atual is None or incluidos or removidos or alterados:
+                    self._indices[dataset_id] = IndiceDataset(dataset_id, novos, agora)
+                    houve_mudanca = True
+                else:
+                    atual.sincronizado_em = agora
+
+                resumo['datasets'][dataset_id] = {
+                    'total': len(novos),
+                    'incluidos': incluidos,
+                    'alterados': alterados,
+                    'removidos': removidos,
+                }
+                logger.info(
+                    f"[DiretorioColaboradores] '{dataset_id}' sincronizado ({self.ambiente}) - Total: {len(novos)}, "
+                    f"Incluídos: {incluidos}, Alterados: {alterados}, Removidos: {removidos}"
+                )
+
+            if houve_mudanca:
+                self._salvar_no_disco()
+
+            self.sincronizacoes += 1
+            resumo['duracao_segundos'] = round(time.monotonic() - inicio, 3)
+            registrar_ciclo_loop(
+                f"diretorio_{self.ambiente.lower()}", resumo['duracao_segundos'],
+                sucesso=not any(d.get('erro') for d in resumo['datasets'].values())
+            )
+            resumo['finalizado_em'] = datetime.now().isoformat(timespec='seconds')
+            self.ultima_sincronizacao = resumo
+            return resumo
+
+    def _precisa_sincronizar(self) -> bool:
+        """Indica se algum dataset está ausente ou com sincronização mais antiga que o intervalo"""
+        for dataset_id in self.datasets:
+            indice = self._indices.get(dataset_id)
+            if indice is None or not indice.sincronizado_em:
+                return True
+            try:
+                idade = (datetime.now() - datetime.fromisoformat(indice.sincronizado_em)).total_seconds()
+            except ValueError:
+                return True
+            if idade >= self.intervalo_minutos * 60:
+                return True
+        return False
+
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
+    def _loop_sincronizacao(self):
+        """Thread que sincroniza o diretório periodicamente"""
+        logger.info(f"[DiretorioColaboradores] Thread de sincronização iniciada ({self.ambiente}, intervalo: {self.intervalo_minutos} minuto(s))")
+
+        if not self._precisa_sincronizar():
+            logger.info(f"[DiretorioColaboradores] Diretório do disco ainda válido ({self.ambiente}) - próxima sincronização em {self.intervalo_minutos} minuto(s)")
+            self._parar.wait(timeout=self.intervalo_minutos * 60)
+
+        while not self._parar.is_set():
+            try:
+                # Fluig indisponível (circuito aberto): mantém o diretório atual e tenta no próximo ciclo
+                if circuito_aberto(self.ambiente, [FAMILIA_DATASET]):
+                    logger.warning(f"[DiretorioColaboradores] Circuito de datasets aberto ({self.ambiente}) - sincronização adiada")
+                    self._parar.wait(timeout=60)
+                    continue
+                self.sincronizar()
+                self._parar.wait(timeout=self.intervalo_minutos * 60)
+            except Exception as e:
+                logger.error(f"[DiretorioColaboradores] Erro no loop de sincronização: {str(e)}")
+                self._parar.wait(timeout=60)  # Em caso de erro, aguarda 1 minuto
+
+        logger.info(f"[DiretorioColaboradores] Thread de sincronização encerrada ({self.ambiente})")
+
+    def iniciar(self):
+        """Carrega o diretório salvo e inicia a sincronização periódica em background"""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning(f"[DiretorioColaboradores] Sincronização já em execução ({self.ambiente})")
+            return
+
+        self.carregar_do_disco()
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop_sincronizacao,
+            name=f"DiretorioColaboradores_{self.ambiente}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        """Para a sincronização periódica"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna tamanho dos índices, hits/misses e resumo da última sincronização"""
+        consultas = self.hits + self.misses
+        return {
+            'datasets': {
+                dataset_id: {
+                    'registros': len(indice.registros),
+                    'termos_por_campo': {campo: len(termos) for campo, termos in indice.indices.items()},
+                    'sincronizado_em': indice.sincronizado_em,
+                }
+                for dataset_id, indice in self._indices.items()
+            },
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': round(self.hits / consultas, 4) if consultas else 0.0,
+            'sincronizacoes': self.sincronizacoes,
+            'sincronizando': self._lock_sincronizacao.locked(),
+            'ultima_sincronizacao': self.ultima_sincronizacao,
+        }
+
+
+# ==================== INSTÂNCIAS GLOBAIS ====================
+_diretorios: Dict[str, DiretorioColaboradores] = {}
+_diretorios_lock = threading.Lock()
+
+
+def _lista_configuracao(nome: str, padrao: str) -> List[str]:
+    """Lê uma configuração separada por vírgulas"""
+    valor = str(getattr(ConfigEnvSetings, nome, padrao) or '')
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+
+def get_diretorio_colaboradores(ambiente: str) -> Optional[DiretorioColaboradores]:
+    """
+    Retorna o diretório do ambiente (apenas se a sincronização foi iniciada)
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+
+    Returns:
+        DiretorioColaboradores ou None
+    """
+    return _diretorios.get(ambiente.upper())
+
+
+def buscar_no_diretorio(ambiente: str, parametro: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Tenta responder uma busca de Dataset_config pelo diretório local
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        parametro: Parâmetros montados por montar_busca_dataset
+
+    Returns:
+        Resposta no formato do Fluig ou None (buscar no Fluig)
+    """
+    diretorio = get_diretorio_colaboradores(ambiente)
+    if diretorio is None:
+        return None
+    return diretorio.buscar(parametro)
+
+
+def iniciar_sincronizacao_diretorio():
+    """Inicia o diretório de colaboradores dos ambientes configurados (DIRETORIO_COLABORADORES_*)"""
+    enabled = str(getattr(ConfigEnvSetings, 'DIRETORIO_COLABORADORES_ENABLED', 'true')).lower()
+    if enabled not in ('true', '1', 'yes'):
+        logger.info("[DiretorioColaboradores] Diretório de colaboradores desabilitado (DIRETORIO_COLABORADORES_ENABLED=false)")
+        return
+
+    datasets_config = DatasetConfig()
+    datasets = [d for d in _lista_configuracao('DIRETORIO_COLABORADORES_DATASETS', 'colleague') if d in datasets_config]
+    if not datasets:
+        logger.warning("[DiretorioColaboradores] Nenhum dataset válido em DIRETORIO_COLABORADORES_DATASETS")
+        return
+
+    with _diretorios_lock:
+        for ambiente in _lista_configuracao('DIRETORIO_COLABORADORES_AMBIENTES', 'PRD'):
+            ambiente = ambiente.upper()
+            if ambiente not in _diretorios:
+                _diretorios[ambiente] = DiretorioColaboradores(
+                    ambiente=ambiente,
+                    datasets=datasets,
+                    tamanho_pagina=int(getattr(ConfigEnvSetings, 'DIRETORIO_COLABORADORES_TAMANHO_PAGINA', 500)),
+                    intervalo_minutos=float(getattr(ConfigEnvSetings, 'DIRETORIO_COLABORADORES_INTERVALO_MINUTOS', 360.0)),
+                )
+            _diretorios[ambiente].iniciar()
+            logger.info(f"[DiretorioColaboradores] Diretório iniciado - Ambiente: {ambiente}, Datasets: {', '.join(datasets)}")
+
+
+def parar_sincronizacao_diretorio():
+    """Para a sincronização de todos os diretórios"""
+    with _diretorios_lock:
+        for diretorio in _diretorios.values():
+            diretorio.parar()
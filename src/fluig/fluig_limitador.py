@@ -0,0 +1,532 @@
+"""
+Limitador de taxa global das requisições ao Fluig (token bucket por ambiente)
+
+Webapp/API, abertura em lote (planilha) e monitores em background dividem o
+mesmo Fluig. Cada requisição de RequestsFluig/RequestsFluigAsync consome um
+token do bucket do ambiente; quando faltam tokens, as requisições esperam em
+fila ordenada por prioridade (interativa > lote > background) e, dentro da
+mesma prioridade, por ordem de chegada. Com prazo (prazo_fluig), a requisição
+desiste da fila sem consumir token quando o token não chegaria a tempo.
+
+A prioridade vem do contexto de execução (contextvars): o padrão é interativa
+e jobs/monitores marcam a própria execução com `prioridade_fluig(...)` ou o
+decorator `com_prioridade_fluig(...)`. asyncio.to_thread propaga o contexto;
+threads próprias e ThreadPoolExecutor não, por isso a marcação deve ser feita
+dentro da função executada na thread.
+
+LimitadorConcorrencia é o teto global de requisições simultâneas dos fan-outs
+assíncronos (detalhes das filas do webapp, busca de datasets em lote): em vez
+de cada requisição abrir até N requisições ao Fluig por conta própria, todas
+dividem as mesmas vagas, distribuídas em rodízio entre os chamadores.
+"""
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Dict, Any, Optional
+
+from src.fluig.fluig_resiliencia import PrazoExcedidoError
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_espera_fanout
+
+
+PRIORIDADE_INTERATIVA = "interativa"
+PRIORIDADE_LOTE = "lote"
+PRIORIDADE_BACKGROUND = "background"
+
+# Menor valor = atendido primeiro
+_ORDEM_PRIORIDADES = {
+    PRIORIDADE_INTERATIVA: 0,
+    PRIORIDADE_LOTE: 1,
+    PRIORIDADE_BACKGROUND: 2,
+}
+
+_prioridade_atual: contextvars.ContextVar[str] = contextvars.ContextVar(
+    'prioridade_fluig', default=PRIORIDADE_INTERATIVA
+)
+
+# Intervalo máximo entre reavaliações de quem está na fila
+_INTERVALO_REAVALIACAO = 0.05
+
+
+def obter_prioridade_atual() -> str:
+    """Prioridade das requisições ao Fluig no contexto atual"""
+    return _prioridade_atual.get()
+
+
+@contextmanager
+def prioridade_fluig(prioridade: str):
+    """
+    Define a prioridade das requisições ao Fluig feitas dentro do bloco
+
+    Args:
+        prioridade: PRIORIDADE_INTERATIVA, PRIORIDADE_LOTE ou PRIORIDADE_BACKGROUND
+
+    Raises:
+        ValueError: Se a prioridade for inválida
+    """
+    if prioridade not in _ORDEM_PRIORIDADES:
+        raise ValueError(f"Prioridade inválida: {prioridade}")
+    token = _prioridade_atual.set(prioridade)
+    try:
+        yield
+    finally:
+        _prioridade_atual.reset(token)
+
+
+def com_prioridade_fluig(prioridade: str):
+    """Decorator que executa a função (síncrona) com a prioridade informada"""
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with prioridade_fluig(prioridade):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _EstatisticasPrioridade:
+    """Contadores de fila de uma prioridade"""
+
+    def __init__(self):
+        self.requisicoes = 0
+        self.aguardaram = 0
+        self.em_espera = 0
+        self.desistiram = 0
+        self.tempo_fila_total = 0.0
+        self.tempo_fila_max = 0.0
+
+    def registrar(self, tempo_fila: float):
+        self.requisicoes += 1
+        if tempo_fila > 0.001:
+            self.aguardaram += 1
+        self.tempo_fila_total += tempo_fila
+        self.tempo_fila_max = max(self.tempo_fila_max, tempo_fila)
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            'requisicoes': self.requisicoes,
+            'aguardaram': self.aguardaram,
+            'em_espera': self.em_espera,
+            'desistiram': self.desistiram,
+            'tempo_fila_medio_segundos': round(self.tempo_fila_total / self.requisicoes, 4) if self.requisicoes else 0.0,
+            'tempo_fila_max_segundos': round(self.tempo_fila_max, 4),
+        }
+
+
+class LimitadorTaxa:
+    """
+    Token bucket com fila por prioridade, compartilhado entre threads e event loops
+
+    Attributes:
+        ambiente: Ambiente do Fluig
+        taxa: Tokens repostos por segundo (0 = sem limite)
+        rajada: Capacidade do bucket (requisições liberadas de uma vez)
+    """
+
+    def __init__(self, ambiente: str, taxa: float, rajada: int):
+        self.ambiente = ambiente
+        self.taxa = max(0.0, float(taxa))
+        self.rajada = max(1, int(rajada))
+        self._tokens = float(self.rajada)
+        self._ultima_reposicao = time.monotonic()
+        self._condicao = threading.Condition()
+        self._fila: list = []
+        self._sequencia = itertools.count()
+        self._estatisticas = {nome: _EstatisticasPrioridade() for nome in _ORDEM_PRIORIDADES}
+
+    def _repor(self, agora: float):
+        decorrido = agora - self._ultima_reposicao
+        if decorrido > 0:
+            self._tokens = min(float(self.rajada), self._tokens + decorrido * self.taxa)
+            self._ultima_reposicao = agora
+
+    def _entrar_na_fila(self, prioridade: str) -> tuple:
+        entrada = (_ORDEM_PRIORIDADES[prioridade], next(self._sequencia))
+        heapq.heappush(self._fila, entrada)
+        self._estatisticas[prioridade].em_espera += 1
+        return entrada
+
+    def _tentar_consumir(self, entrada: tuple, prioridade: str) -> float:
+        """
+        Consome um token se a entrada for a primeira da fila (chamar com o lock)
+
+        Returns:
+            0.0 se consumiu, senão quanto esperar antes de tentar de novo
+        """
+        agora = time.monotonic()
+        self._repor(agora)
+        if self._fila[0] != entrada:
+            return _INTERVALO_REAVALIACAO
+        if self._tokens >= 1:
+            self._tokens -= 1
+            heapq.heappop(self._fila)
+            self._estatisticas[prioridade].em_espera -= 1
+            # O próximo da fila pode ter token disponível
+            self._condicao.notify_all()
+            return 0.0
+        return max(0.001, min(_INTERVALO_REAVALIACAO, (1 - self._tokens) / self.taxa))
+
+    def _espera_minima(self, entrada: tuple) -> float:
+        """Tempo mínimo até a entrada receber um token: quem está à frente na fila também consome (chamar com o lock)"""
+        a_frente = sum(1 for outra in self._fila if outra < entrada)
+        return max(0.0, (a_frente + 1 - self._tokens) / self.taxa)
+
+    def _verificar_prazo(self, entrada: tuple, prioridade: str, limite: Optional[float]) -> Optional[float]:
+        """
+        Desiste da fila se o token não chegaria até o limite (chamar com o lock)
+
+        Returns:
+            Segundos até o limite (None se não há prazo)
+
+        Raises:
+            PrazoExcedidoError: Se o prazo não comporta a espera (a entrada sai da fila sem consumir token)
+        """
+        if limite is None:
+            return None
+        restante = limite - time.monotonic()
+        if restante <= 0 or self._espera_minima(entrada) > restante:
+            self._sair_da_fila(entrada, prioridade)
+            self._estatisticas[prioridade].desistiram += 1
+            raise PrazoExcedidoError(
+                f"Prazo da chamada ao Fluig esgotaria na fila do limitador ({self.ambiente}, {prioridade})"
+            )
+        return restante
+
+    def _sair_da_fila(self, entrada: tuple, prioridade: str):
+        """Remove uma entrada abandonada (ex.: task cancelada)"""
+        with self._condicao:
+            if entrada in self._fila:
+                self._fila.remove(entrada)
+                heapq.heapify(self._fila)
+                self._estatisticas[prioridade].em_espera -= 1
+                self._condicao.notify_all()
+
+    def adquirir(self, prioridade: Optional[str] = None, prazo_segundos: Optional[float] = None) -> float:
+        """
+        Aguarda um token (bloqueia a thread)
+
+        Args:
+            prioridade: Prioridade da requisição (padrão: a do contexto atual)
+            prazo_segundos: Tempo máximo de espera (padrão: sem limite)
+
+        Returns:
+            Tempo em fila (segundos)
+
+        Raises:
+            PrazoExcedidoError: Se o token não chegaria dentro do prazo (nenhum token é consumido)
+        """
+        prioridade = prioridade or obter_prioridade_atual()
+        if self.taxa <= 0:
+            with self._condicao:
+                self._estatisticas[prioridade].registrar(0.0)
+            return 0.0
+
+        inicio = time.monotonic()
+        limite = inicio + prazo_segundos if prazo_segundos is not None else None
+        with self._condicao:
+            entrada = self._entrar_na_fila(prioridade)
+            try:
+                while True:
+                    espera = self._tentar_consumir(entrada, prioridade)
+                    if espera == 0.0:
+                        break
+                    restante = self._verificar_prazo(entrada, prioridade, limite)
+                    self._condicao.wait(timeout=espera if restante is None else min(espera, restante))
+            except PrazoExcedidoError:
+                raise
+            except BaseException:
+                self._sair_da_fila(entrada, prioridade)
+                raise
+            tempo_fila = time.monotonic() - inicio
+            self._estatisticas[prioridade].registrar(tempo_fila)
+        return tempo_fila
+
+    async def adquirir_async(self, prioridade: Optional[str] = None, prazo_segundos: Optional[float] = None) -> float:
+        """
+        Aguarda um token sem bloquear o event loop
+
+        Args:
+            prioridade: Prioridade da requisição (padrão: a do contexto atual)
+            prazo_segundos: Tempo máximo de espera (padrão: sem limite)
+
+        Returns:
+            Tempo em fila (segundos)
+
+        Raises:
+            PrazoExcedidoError: Se o token não chegaria dentro do prazo (nenhum token é consumido)
+        """
+        prioridade = prioridade or obter_prioridade_atual()
+        if self.taxa <= 0:
+            with self._condicao:
+                self._estatisticas[prioridade].registrar(0.0)
+            return 0.0
+
+        inicio = time.monotonic()
+        limite = inicio + prazo_segundos if prazo_segundos is not None else None
+        with self._condicao:
+            entrada = self._entrar_na_fila(prioridade)
+        try:
+            while True:
+                with self._condicao:
+                    espera = self._tentar_consumir(entrada, prioridade)
+                    if espera == 0.0:
+                        tempo_fila = time.monotonic() - inicio
+                        self._estatisticas[prioridade].registrar(tempo_fila)
+                        return tempo_fila
+                    restante = self._verificar_prazo(entrada, prioridade, limite)
+                await asyncio.sleep(espera if restante is None else min(espera, restante))
+        except PrazoExcedidoError:
+            raise
+        except BaseException:
+            self._sair_da_fila(entrada, prioridade)
+            raise
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Configuração, tokens disponíveis e fila por prioridade"""
+        with self._condicao:
+            self._repor(time.monotonic())
+            return {
+                'taxa_por_segundo': self.taxa,
+                'rajada': self.rajada,
+                'tokens_disponiveis': round(self._tokens, 2) if self.taxa > 0 else None,
+                'em_espera': len(self._fila),
+                'prioridades': {nome: est.para_dict() for nome, est in self._estatisticas.items()},
+            }
+
+
+_limitadores: Dict[str, LimitadorTaxa] = {}
+_limitadores_lock = threading.Lock()
+
+
+def get_limitador_fluig(ambiente: str = "PRD") -> Optional[LimitadorTaxa]:
+    """
+    Retorna o limitador do ambiente (None se FLUIG_LIMITADOR_ENABLED estiver desabilitado)
+
+    Args:
+        ambiente: Ambiente do Fluig ('PRD' ou 'QLD')
+    """
+    habilitado = str(getattr(ConfigEnvSetings, 'FLUIG_LIMITADOR_ENABLED', 'true')).lower() in ('true', '1')
+    if not habilitado:
+        return None
+
+    ambiente = ambiente.upper()
+    limitador = _limitadores.get(ambiente)
+    if limitador is not None:
+        return limitador
+
+    with _limitadores_lock:
+        limitador = _limitadores.get(ambiente)
+        if limitador is None:
+            taxa = float(getattr(ConfigEnvSetings, f'FLUIG_LIMITADOR_TAXA_{ambiente}', 0) or 0)
+            rajada = int(getattr(ConfigEnvSetings, f'FLUIG_LIMITADOR_RAJADA_{ambiente}', 1) or 1)
+            limitador = LimitadorTaxa(ambiente, taxa, rajada)
+            _limitadores[ambiente] = limitador
+            logger.info(f"[fluig_limitador] Limitador criado - Ambiente: {ambiente}, Taxa: {taxa}/s, Rajada: {rajada}")
+        return limitador
+
+
+def obter_estatisticas_limitador(ambiente: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retorna as estatísticas dos limitadores já criados
+
+    Args:
+        ambiente: Ambiente específico (opcional, retorna todos se None)
+
+    Returns:
+        Dicionário {ambiente: estatisticas}
+    """
+    with _limitadores_lock:
+        limitadores = dict(_limitadores)
+    return {
+        nome: limitador.estatisticas()
+        for nome, limitador in limitadores.items()
+        if not ambiente or nome == ambiente.upper()
+    }
+
+
+def _entregar_vaga(futuro: asyncio.Future):
+    # Se a tarefa foi cancelada nesse meio tempo, quem aguardava devolve a vaga
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+class LimitadorConcorrencia:
+    """
+    Teto global de requisições simultâneas com rodízio entre chamadores
+
+    Cada fan-out se identifica como um chamador (ex.: a fila que está sendo
+    carregada) e ocupa no máximo max_por_chamador vagas. Sem vaga, a tarefa
+    espera na fila do próprio chamador (ordem de chegada) e as vagas liberadas
+    são entregues em rodízio entre os chamadores, então uma fila grande não
+    segura as menores. Seguro entre threads e event loops.
+
+    Attributes:
+        nome: Nome do limitador (logs, estatísticas e métricas)
+        max_concorrencia: Vagas no total
+        max_por_chamador: Vagas que um mesmo chamador pode ocupar
+    """
+
+    def __init__(self, nome: str, max_concorrencia: int, max_por_chamador: int):
+        self.nome = nome
+        self.max_concorrencia = max(1, int(max_concorrencia))
+        self.max_por_chamador = max(1, min(int(max_por_chamador), self.max_concorrencia))
+
+        self._lock = threading.Lock()
+        self._em_uso = 0
+        self._em_uso_por_chamador: Dict[str, int] = {}
+        # Ordem das chaves = ordem do rodízio
+        self._filas: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._aguardando = 0
+
+        self.liberadas = 0
+        self.aguardaram = 0
+        self.tempo_espera_total = 0.0
+        self.tempo_espera_max = 0.0
+
+    def _pode_ocupar(self, chamador: str) -> bool:
+        return (
+            self._em_uso < self.max_concorrencia
+            and self._em_uso_por_chamador.get(chamador, 0) < self.max_por_chamador
+        )
+
+    def _ocupar(self, chamador: str):
+        self._em_uso += 1
+        self._em_uso_por_chamador[chamador] = self._em_uso_por_chamador.get(chamador, 0) + 1
+
+    def _desocupar(self, chamador: str):
+        self._em_uso -= 1
+        restantes = self._em_uso_por_chamador.get(chamador, 0) - 1
+        if restantes > 0:
+            self._em_uso_por_chamador[chamador] = restantes
+        else:
+            self._em_uso_por_chamador.pop(chamador, None)
+
+    def _despachar(self):
+        """Entrega as vagas livres em rodízio entre os chamadores na fila (chamar com o lock)"""
+        while self._em_uso < self.max_concorrencia:
+            chamador = next((c for c in self._filas if self._pode_ocupar(c)), None)
+            if chamador is None:
+                return
+            fila = self._filas.pop(chamador)
+            futuro = fila.popleft()
+            self._aguardando -= 1
+            if fila:
+                # Volta para o fim do rodízio
+                self._filas[chamador] = fila
+            self._ocupar(chamador)
+            try:
+                futuro.get_loop().call_soon_threadsafe(_entregar_vaga, futuro)
+            except RuntimeError:
+                # Event loop de quem aguardava já foi encerrado
+                self._desocupar(chamador)
+
+    def _liberar(self, chamador: str):
+        with self._lock:
+            self._desocupar(chamador)
+            self._despachar()
+
+    async def adquirir(self, chamador: str) -> float:
+        """
+        Aguarda uma vaga para o chamador sem bloquear o event loop
+
+        Args:
+            chamador: Identifica o fan-out (as vagas são divididas entre chamadores)
+
+        Returns:
+            Tempo de espera (segundos)
+        """
+        inicio = time.monotonic()
+        with self._lock:
+            if chamador not in self._filas and self._pode_ocupar(chamador):
+                self._ocupar(chamador)
+                futuro = None
+            else:
+                futuro = asyncio.get_running_loop().create_future()
+                self._filas.setdefault(chamador, deque()).append(futuro)
+                self._aguardando += 1
+
+        if futuro is not None:
+            try:
+                await futuro
+            except BaseException:
+                with self._lock:
+                    fila = self._filas.get(chamador)
+                    na_fila = fila is not None and futuro in fila
+                    if na_fila:
+                        fila.remove(futuro)
+                        self._aguardando -= 1
+                        if not fila:
+                            del self._filas[chamador]
+                if not na_fila:
+                    # A vaga já tinha sido entregue
+                    self._liberar(chamador)
+                raise
+
+        espera = time.monotonic() - inicio
+        with self._lock:
+            self.liberadas += 1
+            if futuro is not None:
+                self.aguardaram += 1
+            self.tempo_espera_total += espera
+            self.tempo_espera_max = max(self.tempo_espera_max, espera)
+        registrar_espera_fanout(self.nome, espera)
+        return espera
+
+    @asynccontextmanager
+    async def vaga(self, chamador: str):
+        """Ocupa uma vaga durante o bloco (async with limitador.vaga(chamador): ...)"""
+        await self.adquirir(chamador)
+        try:
+            yield
+        finally:
+            self._liberar(chamador)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Vagas, fila por chamador e tempo de espera"""
+        with self._lock:
+            return {
+                'nome': self.nome,
+                'max_concorrencia': self.max_concorrencia,
+                'max_por_chamador': self.max_por_chamador,
+                'em_uso': self._em_uso,
+                'em_espera': self._aguardando,
+                'chamadores': {
+                    chamador: {
+                        'em_uso': self._em_uso_por_chamador.get(chamador, 0),
+                        'em_espera': len(self._filas.get(chamador, ())),
+                    }
+                    for chamador in set(self._em_uso_por_chamador) | set(self._filas)
+                },
+                'liberadas': self.liberadas,
+                'aguardaram': self.aguardaram,
+                'tempo_espera_medio_segundos': round(self.tempo_espera_total / self.liberadas, 4) if self.liberadas else 0.0,
+                'tempo_espera_max_segundos': round(self.tempo_espera_max, 4),
+            }
+
+
+_limitador_fanout: Optional[LimitadorConcorrencia] = None
+
+
+def get_limitador_fanout() -> LimitadorConcorrencia:
+    """Retorna o limitador global dos fan-outs assíncronos ao Fluig (FLUIG_FANOUT_*)"""
+    global _limitador_fanout
+    if _limitador_fanout is None:
+        with _limitadores_lock:
+            if _limitador_fanout is None:
+                _limitador_fanout = LimitadorConcorrencia(
+                    nome="fanout",
+                    max_concorrencia=int(getattr(ConfigEnvSetings, 'FLUIG_FANOUT_MAX_CONCORRENCIA', 30)),
+                    max_por_chamador=int(getattr(ConfigEnvSetings, 'FLUIG_FANOUT_MAX_POR_CHAMADOR', 10)),
+                )
+                logger.info(
+                    f"[fluig_limitador] Limitador de fan-out criado - Máx: {_limitador_fanout.max_concorrencia}, "
+                    f"por chamador: {_limitador_fanout.max_por_chamador}"
+                )
+    return _limitador_fanout
@@ -0,0 +1,331 @@
+"""
+Registro global de clientes HTTP do Fluig (um por ambiente)
+
+Mantém uma requests.Session com keep-alive e pool de conexões dimensionado,
+junto com o assinador OAuth 1.0, para que todas as instâncias de
+FluigCore/RequestsFluig do processo reutilizem as mesmas conexões TCP/TLS.
+
+Para o caminho assíncrono (AsyncFluigCore) mantém um httpx.AsyncClient por
+ambiente e event loop, assinando as requisições com o mesmo OAuth 1.0.
+"""
+import asyncio
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Any, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.auth.auth_fluig import AutenticarFluig
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+
+
+class EstatisticasPool:
+    """
+    Contadores de uso do pool de conexões de um ambiente
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: List[HTTPConnectionPool] = []
+        self.em_uso = 0
+        self.conexoes_novas = 0
+        self.conexoes_reutilizadas = 0
+
+    def registrar_pool(self, pool: HTTPConnectionPool):
+        with self._lock:
+            self._pools.append(pool)
+
+    def registrar_saida(self, reutilizada: bool):
+        with self._lock:
+            self.em_uso += 1
+            if reutilizada:
+                self.conexoes_reutilizadas += 1
+            else:
+                self.conexoes_novas += 1
+
+    def registrar_retorno(self):
+        with self._lock:
+            self.em_uso = max(0, self.em_uso - 1)
+
+    def _contar_ociosas(self) -> int:
+        ociosas = 0
+        for pool in self._pools:
+            fila = pool.pool
+            if fila is None:
+                continue
+            # A fila é pré-preenchida com None; só conta conexões reais
+            ociosas += sum(1 for conexao in list(fila.queue) if conexao is not None)
+        return ociosas
+
+    def para_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'em_uso': self.em_uso,
+                'ociosas': self._contar_ociosas(),
+                'conexoes_reutilizadas': self.conexoes_reutilizadas,
+                'conexoes_novas': self.conexoes_novas,
+            }
+
+
+class _PoolMonitoradoMixin:
+    """Mixin que registra saída/retorno de conexões do pool do urllib3"""
+
+    _estatisticas: EstatisticasPool = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._estatisticas.registrar_pool(self)
+
+    def _get_conn(self, timeout=None):
+        conexao = super()._get_conn(timeout=timeout)
+        # Conexão que sai do pool já conectada é reaproveitada (sem novo handshake)
+        self._estatisticas.registrar_saida(bool(getattr(conexao, 'is_connected', False)))
+        return conexao
+
+    def _put_conn(self, conn):
+        self._estatisticas.registrar_retorno()
+        super()._put_conn(conn)
+
+
+class _AdapterMonitorado(HTTPAdapter):
+    """HTTPAdapter que usa pools instrumentados com as estatísticas do cliente"""
+
+    def __init__(self, estatisticas: EstatisticasPool, **kwargs):
+        self._estatisticas = estatisticas
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        atributos = {'_estatisticas': self._estatisticas}
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('HTTPConnectionPoolFluig', (_PoolMonitoradoMixin, HTTPConnectionPool), atributos),
+            'https': type('HTTPSConnectionPoolFluig', (_PoolMonitoradoMixin, HTTPSConnectionPool), atributos),
+        }
+
+
+class ClienteFluig:
+    """
+    Cliente HTTP compartilhado de um ambiente do Fluig
+
+    Attributes:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        url: URL base do Fluig no ambiente
+        auth: Assinador OAuth 1.0
+        headers: Headers padrão das requisições JSON
+        sessao: requests.Session com keep-alive e pool de conexões
+    """
+
+    def __init__(self, ambiente: str, pool_conexoes: int, pool_tamanho: int):
+        if ambiente == "PRD":
+            self.url = ConfigEnvSetings.URL_FLUIG_PRD
+        elif ambiente == "QLD":
+            self.url = ConfigEnvSetings.URL_FLUIG_QLD
+        else:
+            raise ValueError(f"Ambiente inválido: {ambiente}")
+
+        self.ambiente = ambiente
+        self.auth, self.headers = AutenticarFluig(ambiente)
+        self.pool_tamanho = pool_tamanho
+        self.estatisticas = EstatisticasPool()
+
+        self.sessao = requests.Session()
+        # Sessão compartilhada entre usuários/rotas: não guarda cookies devolvidos pelo servidor
+        self.sessao.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = _AdapterMonitorado(
+            self.estatisticas,
+            pool_connections=pool_conexoes,
+            pool_maxsize=pool_tamanho,
+        )
+        self.sessao.mount('https://', adapter)
+        self.sessao.mount('http://', adapter)
+
+    def fechar(self):
+        """Fecha a sessão e todas as conexões do pool"""
+        self.sessao.close()
+
+
+_clientes: Dict[str, ClienteFluig] = {}
+_clientes_lock = threading.Lock()
+
+
+def obter_cliente_fluig(ambiente: str = "PRD") -> ClienteFluig:
+    """
+    Retorna o cliente compartilhado do ambiente, criando-o na primeira chamada
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+
+    Returns:
+        ClienteFluig do ambiente
+
+    Raises:
+        ValueError: Se o ambiente for inválido
+    """
+    cliente = _clientes.get(ambiente)
+    if cliente is not None:
+        return cliente
+
+    with _clientes_lock:
+        cliente = _clientes.get(ambiente)
+        if cliente is None:
+            pool_conexoes = int(getattr(ConfigEnvSetings, 'FLUIG_POOL_CONNECTIONS', 4))
+            pool_tamanho = int(getattr(ConfigEnvSetings, 'FLUIG_POOL_MAXSIZE', 20))
+            cliente = ClienteFluig(ambiente, pool_conexoes, pool_tamanho)
+            _clientes[ambiente] = cliente
+            logger.info(f"[fluig_pool] Cliente HTTP criado - Ambiente: {ambiente}, Pool: {pool_tamanho} conexão(ões)")
+        return cliente
+
+
+def obter_estatisticas_pool(ambiente: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retorna as estatísticas dos pools de conexão
+
+    Args:
+        ambiente: Ambiente específico (opcional, retorna todos se None)
+
+    Returns:
+        Dicionário {ambiente: {tamanho_pool, em_uso, ociosas, conexoes_reutilizadas, conexoes_novas}}
+    """
+    with _clientes_lock:
+        clientes = dict(_clientes)
+
+    estatisticas = {}
+    for nome, cliente in clientes.items():
+        if ambiente and nome != ambiente:
+            continue
+        dados = cliente.estatisticas.para_dict()
+        dados['tamanho_pool'] = cliente.pool_tamanho
+        estatisticas[nome] = dados
+    return estatisticas
+
+
+def fechar_clientes_fluig():
+    """Fecha todos os clientes registrados (usado no shutdown da aplicação)"""
+    with _clientes_lock:
+        for nome, cliente in _clientes.items():
+            try:
+                cliente.fechar()
+            except Exception as e:
+                logger.warning(f"[fluig_pool] Erro ao fechar cliente {nome}: {str(e)}")
+        _clientes.clear()
+    logger.info("[fluig_pool] Clientes HTTP do Fluig fechados")
+
+
+class AssinaturaOAuth1Httpx(httpx.Auth):
+    """
+    Assina requisições httpx com o mesmo cliente OAuth 1.0 do requests_oauthlib
+
+    Corpos JSON e multipart não entram na assinatura (mesmo comportamento do
+    requests_oauthlib); a query string faz parte da URI assinada.
+    """
+
+    def __init__(self, auth_oauth1):
+        self._client = auth_oauth1.client
+
+    def auth_flow(self, request: httpx.Request):
+        content_type = request.headers.get('Content-Type', '')
+        corpo = None
+        if 'application/x-www-form-urlencoded' in content_type:
+            corpo = request.content.decode('utf-8')
+        _, headers_assinados, _ = self._client.sign(
+            str(request.url),
+            http_method=request.method,
+            body=corpo,
+            headers={'Content-Type': content_type} if corpo else None,
+        )
+        # O cliente do requests_oauthlib devolve headers em bytes (decoding=None)
+        for nome, valor in headers_assinados.items():
+            nome = nome.decode('utf-8') if isinstance(nome, bytes) else nome
+            if nome.lower() == 'authorization':
+                request.headers['Authorization'] = valor.decode('utf-8') if isinstance(valor, bytes) else valor
+        yield request
+
+
+class ClienteFluigAsync:
+    """
+    Cliente HTTP assíncrono compartilhado de um ambiente do Fluig
+
+    Attributes:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        url: URL base do Fluig no ambiente
+        headers: Headers padrão das requisições JSON
+        cliente: httpx.AsyncClient com pool de conexões keep-alive
+    """
+
+    def __init__(self, cliente_sync: ClienteFluig, max_conexoes: int, max_keepalive: int):
+        self.ambiente = cliente_sync.ambiente
+        self.url = cliente_sync.url
+        self.headers = cliente_sync.headers
+        self.max_conexoes = max_conexoes
+        self.max_keepalive = max_keepalive
+
+        self.cliente = httpx.AsyncClient(
+            auth=AssinaturaOAuth1Httpx(cliente_sync.auth),
+            limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_keepalive),
+            timeout=httpx.Timeout(15.0),
+        )
+        # Cliente compartilhado entre usuários/rotas: não guarda cookies devolvidos pelo servidor
+        self.cliente.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    async def fechar(self):
+        """Fecha o cliente e todas as conexões do pool"""
+        await self.cliente.aclose()
+
+
+# Conexões httpx ficam presas ao event loop que as criou: um cliente por (ambiente, loop)
+_clientes_async: Dict[tuple, ClienteFluigAsync] = {}
+
+
+def obter_cliente_fluig_async(ambiente: str = "PRD") -> ClienteFluigAsync:
+    """
+    Retorna o cliente assíncrono do ambiente para o event loop atual
+
+    Deve ser chamado de dentro de uma corrotina.
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+
+    Returns:
+        ClienteFluigAsync do ambiente
+
+    Raises:
+        ValueError: Se o ambiente for inválido
+    """
+    loop = asyncio.get_running_loop()
+    chave = (ambiente, loop)
+    cliente = _clientes_async.get(chave)
+    if cliente is not None:
+        return cliente
+
+    # Reaproveita URL, headers e assinador do cliente síncrono (valida o ambiente)
+    cliente_sync = obter_cliente_fluig(ambiente)
+    with _clientes_lock:
+        cliente = _clientes_async.get(chave)
+        if cliente is None:
+            max_conexoes = int(getattr(ConfigEnvSetings, 'FLUIG_ASYNC_MAX_CONNECTIONS', 100))
+            max_keepalive = int(getattr(ConfigEnvSetings, 'FLUIG_POOL_MAXSIZE', 20))
+            # Descarta clientes de loops já encerrados (ex.: asyncio.run em threads)
+            for chave_antiga in [c for c in _clientes_async if c[1].is_closed()]:
+                _clientes_async.pop(chave_antiga, None)
+            cliente = ClienteFluigAsync(cliente_sync, max_conexoes, max_keepalive)
+            _clientes_async[chave] = cliente
+            logger.info(f"[fluig_pool] Cliente HTTP assíncrono criado - Ambiente: {ambiente}, Máx. conexões: {max_conexoes}")
+        return cliente
+
+
+async def fechar_clientes_fluig_async():
+    """Fecha os clientes assíncronos do event loop atual (usado no shutdown da aplicação)"""
+    loop = asyncio.get_running_loop()
+    with _clientes_lock:
+        chaves = [chave for chave in _clientes_async if chave[1] is loop]
+        clientes = [_clientes_async.pop(chave) for chave in chaves]
+    for cliente in clientes:
+        try:
+            await cliente.fechar()
+        except Exception as e:
+            logger.warning(f"[fluig_pool] Erro ao fechar cliente assíncrono {cliente.ambiente}: {str(e)}")
+    logger.info("[fluig_pool] Clientes HTTP assíncronos do Fluig fechados")
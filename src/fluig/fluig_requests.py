@@ -1,21 +1,145 @@
-from src.auth.auth_fluig import AutenticarFluig
-from src.modelo_dados.modelo_settings import ConfigEnvSetings
-from src.utilitarios_centrais.logger import logger
+import asyncio
+import time
+
+import httpx
 import requests
 
+from src.fluig.fluig_pool import obter_cliente_fluig, obter_cliente_fluig_async
+from src.fluig.fluig_comum import formatar_tamanho
+from src.fluig.fluig_cache import get_coalescedor_get, chave_requisicao_get
+from src.fluig.fluig_limitador import get_limitador_fluig
+from src.fluig.fluig_resiliencia import (
+    familia_endpoint, get_disjuntor, disjuntor_habilitado, max_tentativas_get,
+    calcular_backoff, timeout_com_prazo, tempo_restante, STATUS_TRANSITORIOS, PrazoExcedidoError,
+)
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_requisicao_fluig
+
+
+# Status que indicam Fluig indisponível (contam como falha no circuit breaker)
+_STATUS_FALHA_DISJUNTOR = {502, 503, 504}
+
+
+def _logar_conteudo_get(resposta):
+    """Loga o conteúdo da resposta GET (apenas tamanho para conteúdo binário)"""
+    # Verifica se é conteúdo binário (imagens, PDFs, etc.)
+    content_type = resposta.headers.get('Content-Type', '')
+    is_binary = False
+    
+    if content_type:
+        is_binary = any(tipo in content_type.lower() for tipo in [
+            'image/', 'application/octet-stream', 'application/pdf', 
+            'application/zip', 'application/x-zip', 'video/', 'audio/'
+        ])
+    
+    if is_binary:
+        # Para arquivos binários, loga apenas informações sobre o arquivo
+        tamanho_formatado = formatar_tamanho(len(resposta.content))
+        logger.info(f"[RequestsFluig] RequestTipoGET - Conteúdo binário (Content-Type: {content_type}, Tamanho: {tamanho_formatado})")
+    else:
+        # Para conteúdo de texto, loga normalmente (limita a 500 caracteres)
+        try:
+            texto = resposta.text[:500] if len(resposta.text) > 500 else resposta.text
+            logger.info(f"[RequestsFluig] RequestTipoGET - Text: {texto}")
+        except Exception:
+            # Se falhar ao converter para texto, pode ser binário
+            tamanho = len(resposta.content)
+            logger.info(f"[RequestsFluig] RequestTipoGET - Conteúdo não-texto (Tamanho: {tamanho} bytes)")
+
+
 """
     Classe para fazer requisições HTTP para o Fluig
+
+    Usa a sessão compartilhada do ambiente (fluig_pool), reaproveitando
+    conexões keep-alive entre instâncias.
 """
 class RequestsFluig():
     def __init__(self, ambiente: str = "PRD"):
-        self.auth, self.headers = AutenticarFluig(ambiente)
-        if ambiente == "PRD":
-            self.url = ConfigEnvSetings.URL_FLUIG_PRD
-        elif ambiente == "QLD":
-            self.url = ConfigEnvSetings.URL_FLUIG_QLD
-        else:
-            raise ValueError(f"Ambiente inválido: {ambiente}")
-        pass
+        cliente = obter_cliente_fluig(ambiente)
+        self.ambiente = ambiente
+        self.auth = cliente.auth
+        self.headers = cliente.headers
+        self.url = cliente.url
+        self.sessao = cliente.sessao
+    
+    def _aguardar_limitador(self, metodo: str):
+        """Aguarda a vez da requisição no limitador de taxa do ambiente"""
+        limitador = get_limitador_fluig(self.ambiente)
+        if limitador is None:
+            return
+        # Com prazo, desiste da fila (PrazoExcedidoError) em vez de gastar um token que chegaria tarde
+        tempo_fila = limitador.adquirir(prazo_segundos=tempo_restante())
+        if tempo_fila >= 1:
+            logger.info(f"[RequestsFluig] {metodo} - Aguardou {tempo_fila:.2f}s na fila do limitador")
+    
+    def _executar(self, metodo: str, url: str, enviar, timeout: float, idempotente: bool = False):
+        """
+        Envia a requisição passando por prazo, circuit breaker, limitador e retry
+        
+        Args:
+            metodo: Nome do método (para log)
+            url: URL da requisição (define a família do circuit breaker)
+            enviar: Função que recebe o timeout (segundos) e faz a requisição
+            timeout: Timeout padrão da requisição em segundos
+            idempotente: Se True, repete a requisição em falhas transitórias (GET)
+            
+        Raises:
+            CircuitoAbertoError: Se o circuito da família de endpoint estiver aberto
+            PrazoExcedidoError: Se o prazo da chamada se esgotar
+        """
+        familia = familia_endpoint(url)
+        metodo_metrica = metodo.removeprefix("RequestTipo").upper()
+        disjuntor = get_disjuntor(self.ambiente, familia) if disjuntor_habilitado() else None
+        tentativas = max_tentativas_get() if idempotente else 1
+        for tentativa in range(1, tentativas + 1):
+            timeout_com_prazo(timeout)
+            teste = disjuntor.permitir() if disjuntor is not None else False
+            try:
+                self._aguardar_limitador(metodo)
+                timeout_envio = timeout_com_prazo(timeout)
+            except BaseException:
+                # Desistiu antes de enviar: a vaga de teste do circuito meio-aberto volta para a próxima
+                if teste:
+                    disjuntor.liberar_teste()
+                raise
+            inicio = time.perf_counter()
+            try:
+                resposta = enviar(timeout_envio)
+            except requests.Timeout as e:
+                registrar_requisicao_fluig(self.ambiente, familia, metodo_metrica, "timeout", time.perf_counter() - inicio)
+                # Timeout encurtado pelo prazo da chamada não indica Fluig indisponível
+                if timeout_envio < timeout:
+                    if teste:
+                        disjuntor.liberar_teste()
+                    raise PrazoExcedidoError(f"Prazo da chamada ao Fluig esgotado ({metodo})") from e
+                if disjuntor is not None:
+                    disjuntor.registrar_falha(f"{type(e).__name__}: {e}")
+                if tentativa >= tentativas:
+                    raise
+                motivo = type(e).__name__
+            except requests.ConnectionError as e:
+                registrar_requisicao_fluig(self.ambiente, familia, metodo_metrica, "conexao", time.perf_counter() - inicio)
+                if disjuntor is not None:
+                    disjuntor.registrar_falha(f"{type(e).__name__}: {e}")
+                if tentativa >= tentativas:
+                    raise
+                motivo = type(e).__name__
+            else:
+                registrar_requisicao_fluig(
+                    self.ambiente, familia, metodo_metrica, str(resposta.status_code), time.perf_counter() - inicio
+                )
+                if disjuntor is not None:
+                    if resposta.status_code in _STATUS_FALHA_DISJUNTOR:
+                        disjuntor.registrar_falha(f"HTTP {resposta.status_code}")
+                    else:
+                        disjuntor.registrar_sucesso()
+                if resposta.status_code not in STATUS_TRANSITORIOS or tentativa >= tentativas:
+                    return resposta
+                motivo = f"HTTP {resposta.status_code}"
+            
+            espera = calcular_backoff(tentativa)
+            logger.warning(f"[RequestsFluig] {metodo} - Tentativa {tentativa}/{tentativas} falhou ({motivo}), nova tentativa em {espera:.2f}s")
+            time.sleep(espera)
     
     def RequestTipoGET(self,url: str, PARAMETROS: dict, logar_conteudo: bool = True):
         """
@@ -27,43 +151,35 @@ class RequestsFluig():
             logar_conteudo: Se True, loga o conteúdo da resposta (padrão: True)
         """
         logger.info(f"[RequestsFluig] RequestTipoGET - URL: {url}")
-        resposta = requests.get(url, headers=self.headers, auth=self.auth, params=PARAMETROS, timeout=15)
+        
+        def executar():
+            return self._executar(
+                "RequestTipoGET", url,
+                lambda timeout: self.sessao.get(url, headers=self.headers, auth=self.auth, params=PARAMETROS, timeout=timeout),
+                timeout=15, idempotente=True
+            )
+        
+        # GETs idênticos em andamento (mesmo ambiente, URL e parâmetros) compartilham a mesma resposta
+        coalescedor = get_coalescedor_get()
+        if coalescedor is not None:
+            resposta = coalescedor.executar(chave_requisicao_get(self.ambiente, url, PARAMETROS), executar)
+        else:
+            resposta = executar()
         logger.info(f"[RequestsFluig] RequestTipoGET - Status Code: {resposta.status_code}")
         
         if logar_conteudo:
-            # Verifica se é conteúdo binário (imagens, PDFs, etc.)
-            content_type = resposta.headers.get('Content-Type', '')
-            is_binary = False
-            
-            if content_type:
-                is_binary = any(tipo in content_type.lower() for tipo in [
-                    'image/', 'application/octet-stream', 'application/pdf', 
-                    'application/zip', 'application/x-zip', 'video/', 'audio/'
-                ])
-            
-            if is_binary:
-                # Para arquivos binários, loga apenas informações sobre o arquivo
-                tamanho = len(resposta.content)
-                if tamanho < 1024:
-                    tamanho_formatado = f"{tamanho} bytes"
-                elif tamanho < 1024 * 1024:
-                    tamanho_formatado = f"{tamanho / 1024:.2f} KB"
-                else:
-                    tamanho_formatado = f"{tamanho / (1024 * 1024):.2f} MB"
-                logger.info(f"[RequestsFluig] RequestTipoGET - Conteúdo binário (Content-Type: {content_type}, Tamanho: {tamanho_formatado})")
-            else:
-                # Para conteúdo de texto, loga normalmente (limita a 500 caracteres)
-                try:
-                    texto = resposta.text[:500] if len(resposta.text) > 500 else resposta.text
-                    logger.info(f"[RequestsFluig] RequestTipoGET - Text: {texto}")
-                except Exception:
-                    # Se falhar ao converter para texto, pode ser binário
-                    tamanho = len(resposta.content)
-                    logger.info(f"[RequestsFluig] RequestTipoGET - Conteúdo não-texto (Tamanho: {tamanho} bytes)")
+            _logar_conteudo_get(resposta)
         
         return resposta
 
-    def RequestTipoPOST(self, url: str, PARAMETROS: dict, headers_extra: dict = None):
+    def RequestTipoPOST(
+        self,
+        url: str,
+        PARAMETROS: dict,
+        headers_extra: dict = None,
+        logar_conteudo: bool = True,
+        timeout: float = 15
+    ):
         """
         Faz requisição POST usando OAuth 1.0
         
@@ -71,6 +187,8 @@ class RequestsFluig():
             url: URL da requisição
             PARAMETROS: Dicionário com os parâmetros do body (JSON)
             headers_extra: Dicionário opcional com headers adicionais a serem mesclados
+            logar_conteudo: Loga o corpo da resposta (desligar para respostas grandes)
+            timeout: Timeout da requisição em segundos
         """
         logger.info(f"[RequestsFluig] RequestTipoPOST - URL: {url}")
         
@@ -79,9 +197,14 @@ class RequestsFluig():
         if headers_extra:
             headers_finais.update(headers_extra)
         
-        resposta = requests.post(url, headers=headers_finais, auth=self.auth, json=PARAMETROS, timeout=15)
+        resposta = self._executar(
+            "RequestTipoPOST", url,
+            lambda timeout_envio: self.sessao.post(url, headers=headers_finais, auth=self.auth, json=PARAMETROS, timeout=timeout_envio),
+            timeout=timeout
+        )
         logger.info(f"[RequestsFluig] RequestTipoPOST - Status Code: {resposta.status_code}")
-        logger.info(f"[RequestsFluig] RequestTipoPOST - Text: {resposta.text}")
+        if logar_conteudo:
+            logger.info(f"[RequestsFluig] RequestTipoPOST - Text: {resposta.text}")
         return resposta
         
     def RequestTipoPostCookies(self,url: str, PARAMETROS: dict, cookies: dict):
@@ -89,7 +212,11 @@ class RequestsFluig():
             Usado para abertura dos Chamados em geral 
         """
         logger.info(f"[RequestsFluig] RequestTipoPostCookies - URL: {url}")
-        resposta = requests.post(url, headers=self.headers, auth=self.auth, json=PARAMETROS, cookies=cookies, timeout=15)
+        resposta = self._executar(
+            "RequestTipoPostCookies", url,
+            lambda timeout: self.sessao.post(url, headers=self.headers, auth=self.auth, json=PARAMETROS, cookies=cookies, timeout=timeout),
+            timeout=15
+        )
         logger.info(f"[RequestsFluig] RequestTipoPostCookies - Status Code: {resposta.status_code}")
         logger.info(f"[RequestsFluig] RequestTipoPostCookies - Text: {resposta.text}")
         return resposta
@@ -111,14 +238,195 @@ class RequestsFluig():
         # Para multipart/form-data, não deve definir Content-Type manualmente
         # O requests define automaticamente com boundary
         headers_multipart = {}
-        resposta = requests.post(
-            url,
-            files=files,
-            data=data,
-            headers=headers_multipart,
-            auth=self.auth,
+        resposta = self._executar(
+            "RequestTipoPOSTMultipart", url,
+            lambda timeout_envio: self.sessao.post(
+                url,
+                files=files,
+                data=data,
+                headers=headers_multipart,
+                auth=self.auth,
+                timeout=timeout_envio
+            ),
             timeout=timeout
         )
         logger.info(f"[RequestsFluig] RequestTipoPOSTMultipart - Status Code: {resposta.status_code}")
         logger.info(f"[RequestsFluig] RequestTipoPOSTMultipart - Text: {resposta.text[:500]}")
-        return resposta
\ No newline at end of file
+        return resposta
+
+
+"""
+    Versão assíncrona de RequestsFluig
+
+    Usa o httpx.AsyncClient compartilhado do ambiente (fluig_pool). Deve ser
+    instanciada dentro do event loop que fará as requisições.
+"""
+class RequestsFluigAsync():
+    def __init__(self, ambiente: str = "PRD"):
+        cliente = obter_cliente_fluig_async(ambiente)
+        self.ambiente = ambiente
+        self.headers = cliente.headers
+        self.url = cliente.url
+        self.cliente = cliente.cliente
+
+    async def _aguardar_limitador(self, metodo: str):
+        """Aguarda a vez da requisição no limitador de taxa do ambiente"""
+        limitador = get_limitador_fluig(self.ambiente)
+        if limitador is None:
+            return
+        # Com prazo, desiste da fila (PrazoExcedidoError) em vez de gastar um token que chegaria tarde
+        tempo_fila = await limitador.adquirir_async(prazo_segundos=tempo_restante())
+        if tempo_fila >= 1:
+            logger.info(f"[RequestsFluigAsync] {metodo} - Aguardou {tempo_fila:.2f}s na fila do limitador")
+
+    async def _executar(self, metodo: str, url: str, enviar, timeout: float, idempotente: bool = False):
+        """
+        Envia a requisição passando por prazo, circuit breaker, limitador e retry
+
+        Args:
+            metodo: Nome do método (para log)
+            url: URL da requisição (define a família do circuit breaker)
+            enviar: Função assíncrona que recebe o timeout (segundos) e faz a requisição
+            timeout: Timeout padrão da requisição em segundos
+            idempotente: Se True, repete a requisição em falhas transitórias (GET)
+
+        Raises:
+            CircuitoAbertoError: Se o circuito da família de endpoint estiver aberto
+            PrazoExcedidoError: Se o prazo da chamada se esgotar
+        """
+        familia = familia_endpoint(url)
+        metodo_metrica = metodo.removeprefix("RequestTipo").upper()
+        disjuntor = get_disjuntor(self.ambiente, familia) if disjuntor_habilitado() else None
+        tentativas = max_tentativas_get() if idempotente else 1
+        for tentativa in range(1, tentativas + 1):
+            timeout_com_prazo(timeout)
+            teste = disjuntor.permitir() if disjuntor is not None else False
+            try:
+                await self._aguardar_limitador(metodo)
+                timeout_envio = timeout_com_prazo(timeout)
+            except BaseException:
+                # Desistiu antes de enviar: a vaga de teste do circuito meio-aberto volta para a próxima
+                if teste:
+                    disjuntor.liberar_teste()
+                raise
+            inicio = time.perf_counter()
+            try:
+                resposta = await enviar(timeout_envio)
+            except asyncio.CancelledError:
+                if teste:
+                    disjuntor.liberar_teste()
+                raise
+            except httpx.TimeoutException as e:
+                registrar_requisicao_fluig(self.ambiente, familia, metodo_metrica, "timeout", time.perf_counter() - inicio)
+                # Timeout encurtado pelo prazo da chamada não indica Fluig indisponível
+                if timeout_envio < timeout:
+                    if teste:
+                        disjuntor.liberar_teste()
+                    raise PrazoExcedidoError(f"Prazo da chamada ao Fluig esgotado ({metodo})") from e
+                if disjuntor is not None:
+                    disjuntor.registrar_falha(f"{type(e).__name__}: {e}")
+                if tentativa >= tentativas:
+                    raise
+                motivo = type(e).__name__
+            except httpx.TransportError as e:
+                registrar_requisicao_fluig(self.ambiente, familia, metodo_metrica, "conexao", time.perf_counter() - inicio)
+                if disjuntor is not None:
+                    disjuntor.registrar_falha(f"{type(e).__name__}: {e}")
+                if tentativa >= tentativas:
+                    raise
+                motivo = type(e).__name__
+            else:
+                registrar_requisicao_fluig(
+                    self.ambiente, familia, metodo_metrica, str(resposta.status_code), time.perf_counter() - inicio
+                )
+                if disjuntor is not None:
+                    if resposta.status_code in _STATUS_FALHA_DISJUNTOR:
+                        disjuntor.registrar_falha(f"HTTP {resposta.status_code}")
+                    else:
+                        disjuntor.registrar_sucesso()
+                if resposta.status_code not in STATUS_TRANSITORIOS or tentativa >= tentativas:
+                    return resposta
+                motivo = f"HTTP {resposta.status_code}"
+
+            espera = calcular_backoff(tentativa)
+            logger.warning(f"[RequestsFluigAsync] {metodo} - Tentativa {tentativa}/{tentativas} falhou ({motivo}), nova tentativa em {espera:.2f}s")
+            await asyncio.sleep(espera)
+
+    async def RequestTipoGET(self, url: str, PARAMETROS: dict, logar_conteudo: bool = True):
+        """
+        Faz requisição GET usando OAuth 1.0
+
+        Args:
+            url: URL da requisição
+            PARAMETROS: Parâmetros da query string
+            logar_conteudo: Se True, loga o conteúdo da resposta (padrão: True)
+        """
+        logger.info(f"[RequestsFluigAsync] RequestTipoGET - URL: {url}")
+
+        async def executar():
+            return await self._executar(
+                "RequestTipoGET", url,
+                lambda timeout: self.cliente.get(url, headers=self.headers, params=PARAMETROS, timeout=timeout),
+                timeout=15, idempotente=True
+            )
+
+        coalescedor = get_coalescedor_get(assincrono=True)
+        if coalescedor is not None:
+            resposta = await coalescedor.executar_async(chave_requisicao_get(self.ambiente, url, PARAMETROS), executar)
+        else:
+            resposta = await executar()
+        logger.info(f"[RequestsFluigAsync] RequestTipoGET - Status Code: {resposta.status_code}")
+        
+        if logar_conteudo:
+            _logar_conteudo_get(resposta)
+        
+        return resposta
+
+    async def RequestTipoPOST(self, url: str, PARAMETROS: dict, headers_extra: dict = None, timeout: float = 15):
+        """
+        Faz requisição POST (JSON) usando OAuth 1.0
+        
+        Args:
+            url: URL da requisição
+            PARAMETROS: Dicionário com os parâmetros do body (JSON)
+            headers_extra: Dicionário opcional com headers adicionais a serem mesclados
+            timeout: Timeout da requisição em segundos
+        """
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOST - URL: {url}")
+        
+        headers_finais = self.headers.copy()
+        if headers_extra:
+            headers_finais.update(headers_extra)
+        
+        resposta = await self._executar(
+            "RequestTipoPOST", url,
+            lambda timeout_envio: self.cliente.post(url, headers=headers_finais, json=PARAMETROS, timeout=timeout_envio),
+            timeout=timeout
+        )
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOST - Status Code: {resposta.status_code}")
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOST - Text: {resposta.text}")
+        return resposta
+
+    async def RequestTipoPOSTMultipart(self, url: str, files: dict, data: dict, timeout: int = 60):
+        """
+        Faz requisição POST com multipart/form-data usando OAuth 1.0
+        
+        Args:
+            url: URL da requisição
+            files: Dicionário com arquivos para upload (mesmo formato do requests)
+            data: Dicionário com dados adicionais
+            timeout: Timeout da requisição em segundos
+            
+        Returns:
+            Resposta da requisição
+        """
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOSTMultipart - URL: {url}")
+        # Content-Type com boundary é definido pelo httpx
+        resposta = await self._executar(
+            "RequestTipoPOSTMultipart", url,
+            lambda timeout_envio: self.cliente.post(url, files=files, data=data, timeout=timeout_envio),
+            timeout=timeout
+        )
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOSTMultipart - Status Code: {resposta.status_code}")
+        logger.info(f"[RequestsFluigAsync] RequestTipoPOSTMultipart - Text: {resposta.text[:500]}")
+        return resposta
@@ -0,0 +1,337 @@
+"""
+Resiliência das requisições ao Fluig: prazos, retry com backoff e circuit breaker
+
+- Prazo (deadline): `prazo_fluig(segundos)` define até quando as requisições
+  feitas dentro do bloco podem rodar. Blocos aninhados só encurtam o prazo, e
+  o timeout de cada requisição é limitado ao tempo restante. O prazo segue o
+  contexto (contextvars): vale para chamadas encadeadas e tasks asyncio.
+- Retry: GETs (idempotentes) são repetidos em erro de conexão/timeout e em
+  respostas transitórias (429, 502, 503, 504), com backoff exponencial e jitter.
+- Circuit breaker: um disjuntor por ambiente e família de endpoint (tasks,
+  historico, dataset, processo, upload, outros). Após falhas consecutivas o
+  disjuntor abre e as requisições falham na hora com CircuitoAbertoError; depois
+  do tempo de espera uma requisição de teste decide se fecha novamente.
+"""
+import contextvars
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Optional
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+
+
+FAMILIA_TASKS = "tasks"
+FAMILIA_HISTORICO = "historico"
+FAMILIA_DATASET = "dataset"
+FAMILIA_PROCESSO = "processo"
+FAMILIA_UPLOAD = "upload"
+FAMILIA_OUTROS = "outros"
+
+# Ordem importa: a primeira expressão que casar com o caminho define a família
+_PADROES_FAMILIA = [
+    (re.compile(r"/histories\b"), FAMILIA_HISTORICO),
+    (re.compile(r"/api/v2/tasks\b"), FAMILIA_TASKS),
+    (re.compile(r"/dataset"), FAMILIA_DATASET),
+    (re.compile(r"/processes/[^/]+/start\b"), FAMILIA_PROCESSO),
+    (re.compile(r"/ecm/upload\b|/saveAttachments\b"), FAMILIA_UPLOAD),
+]
+
+# Respostas que indicam indisponibilidade momentânea do Fluig
+STATUS_TRANSITORIOS = {429, 502, 503, 504}
+
+ESTADO_FECHADO = "fechado"
+ESTADO_ABERTO = "aberto"
+ESTADO_MEIO_ABERTO = "meio_aberto"
+
+
+class CircuitoAbertoError(RuntimeError):
+    """Requisição recusada porque o disjuntor da família de endpoint está aberto"""
+
+    def __init__(self, ambiente: str, familia: str, reabre_em: float):
+        self.ambiente = ambiente
+        self.familia = familia
+        self.reabre_em = reabre_em
+        super().__init__(
+            f"Fluig indisponível ({ambiente}/{familia}): circuito aberto, nova tentativa em {reabre_em:.0f}s"
+        )
+
+
+class PrazoExcedidoError(TimeoutError):
+    """Prazo da chamada ao Fluig esgotado antes (ou durante) a requisição"""
+
+
+def familia_endpoint(url: str) -> str:
+    """Classifica a URL em uma família de endpoint do Fluig"""
+    for padrao, familia in _PADROES_FAMILIA:
+        if padrao.search(url):
+            return familia
+    return FAMILIA_OUTROS
+
+
+# ---------------------------------------------------------------------------
+# Prazos
+# ---------------------------------------------------------------------------
+
+_prazo_atual: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('prazo_fluig', default=None)
+
+
+@contextmanager
+def prazo_fluig(segundos: Optional[float]):
+    """
+    Limita o tempo das requisições ao Fluig feitas dentro do bloco
+
+    Args:
+        segundos: Tempo máximo a partir de agora (None ou <= 0 não altera o prazo atual)
+    """
+    if not segundos or segundos <= 0:
+        yield
+        return
+    novo_prazo = time.monotonic() + segundos
+    prazo_existente = _prazo_atual.get()
+    if prazo_existente is not None:
+        novo_prazo = min(novo_prazo, prazo_existente)
+    token = _prazo_atual.set(novo_prazo)
+    try:
+        yield
+    finally:
+        _prazo_atual.reset(token)
+
+
+def tempo_restante() -> Optional[float]:
+    """Segundos até o fim do prazo atual (None se não há prazo)"""
+    prazo = _prazo_atual.get()
+    if prazo is None:
+        return None
+    return prazo - time.monotonic()
+
+
+def timeout_com_prazo(timeout_padrao: Optional[float]) -> Optional[float]:
+    """
+    Timeout da próxima requisição, limitado ao prazo atual
+
+    Raises:
+        PrazoExcedidoError: Se o prazo já se esgotou
+    """
+    restante = tempo_restante()
+    if restante is None:
+        return timeout_padrao
+    if restante <= 0:
+        raise PrazoExcedidoError("Prazo da chamada ao Fluig esgotado")
+    return restante if timeout_padrao is None else min(timeout_padrao, restante)
+
+
+# ---------------------------------------------------------------------------
+# Retry
+# ---------------------------------------------------------------------------
+
+def max_tentativas_get() -> int:
+    """Total de tentativas de um GET (1 = sem retry)"""
+    return max(1, int(getattr(ConfigEnvSetings, 'FLUIG_RETRY_MAX_TENTATIVAS', 3)))
+
+
+def calcular_backoff(tentativa: int) -> float:
+    """
+    Espera antes da próxima tentativa (backoff exponencial com jitter completo)
+
+    Limitada ao prazo restante, se houver.
+
+    Args:
+        tentativa: Número da tentativa que falhou (1 = primeira)
+    """
+    base = float(getattr(ConfigEnvSetings, 'FLUIG_RETRY_BACKOFF_BASE_SEGUNDOS', 0.5))
+    maximo = float(getattr(ConfigEnvSetings, 'FLUIG_RETRY_BACKOFF_MAX_SEGUNDOS', 5.0))
+    espera = random.uniform(0, min(maximo, base * (2 ** (tentativa - 1))))
+    restante = tempo_restante()
+    if restante is not None:
+        espera = min(espera, max(0.0, restante))
+    return espera
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+class DisjuntorCircuito:
+    """
+    Circuit breaker de uma família de endpoint em um ambiente
+
+    Attributes:
+        ambiente: Ambiente do Fluig
+        familia: Família de endpoint
+        limite_falhas: Falhas consecutivas que abrem o circuito
+        tempo_aberto: Segundos em que o circuito fica aberto antes do teste
+    """
+
+    def __init__(self, ambiente: str, familia: str, limite_falhas: int, tempo_aberto: float):
+        self.ambiente = ambiente
+        self.familia = familia
+        self.limite_falhas = max(1, int(limite_falhas))
+        self.tempo_aberto = max(0.0, float(tempo_aberto))
+        self._lock = threading.Lock()
+        self._estado = ESTADO_FECHADO
+        self._falhas_consecutivas = 0
+        self._aberto_desde = 0.0
+        self._teste_desde: Optional[float] = None
+        self.aberturas = 0
+        self.rejeitadas = 0
+        self.ultimo_erro: Optional[str] = None
+
+    def _atualizar_estado(self, agora: float):
+        if self._estado == ESTADO_ABERTO and agora - self._aberto_desde >= self.tempo_aberto:
+            self._estado = ESTADO_MEIO_ABERTO
+            self._teste_desde = None
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            self._atualizar_estado(time.monotonic())
+            return self._estado
+
+    def permitir(self) -> bool:
+        """
+        Libera a requisição ou falha na hora se o circuito estiver aberto
+
+        No estado meio-aberto só uma requisição de teste é liberada por vez.
+
+        Returns:
+            True se a requisição é a de teste do estado meio-aberto (quem a recebe
+            registra sucesso/falha ou devolve a vaga com liberar_teste)
+
+        Raises:
+            CircuitoAbertoError: Se o circuito estiver aberto
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._atualizar_estado(agora)
+            if self._estado == ESTADO_FECHADO:
+                return False
+            if self._estado == ESTADO_MEIO_ABERTO:
+                # Teste sem resposta por mais de tempo_aberto é considerado perdido
+                if self._teste_desde is None or agora - self._teste_desde >= self.tempo_aberto:
+                    self._teste_desde = agora
+                    return True
+                reabre_em = self.tempo_aberto - (agora - self._teste_desde)
+            else:
+                reabre_em = self.tempo_aberto - (agora - self._aberto_desde)
+            self.rejeitadas += 1
+        raise CircuitoAbertoError(self.ambiente, self.familia, max(0.0, reabre_em))
+
+    def liberar_teste(self):
+        """
+        Devolve a vaga de teste do estado meio-aberto sem resultado
+
+        Para a requisição de teste que desistiu antes de ter resposta do Fluig
+        (prazo esgotado na fila do limitador, cancelamento): a próxima
+        requisição vira o teste, em vez de o circuito ficar fechado para
+        todas até o teste ser considerado perdido.
+        """
+        with self._lock:
+            if self._estado == ESTADO_MEIO_ABERTO:
+                self._teste_desde = None
+
+    def registrar_sucesso(self):
+        with self._lock:
+            if self._estado != ESTADO_FECHADO:
+                logger.info(f"[fluig_resiliencia] Circuito fechado - {self.ambiente}/{self.familia}")
+            self._estado = ESTADO_FECHADO
+            self._falhas_consecutivas = 0
+            self._teste_desde = None
+
+    def registrar_falha(self, erro: str):
+        with self._lock:
+            self._falhas_consecutivas += 1
+            self.ultimo_erro = erro
+            if self._estado == ESTADO_MEIO_ABERTO or (
+                self._estado == ESTADO_FECHADO and self._falhas_consecutivas >= self.limite_falhas
+            ):
+                self._estado = ESTADO_ABERTO
+                self._aberto_desde = time.monotonic()
+                self._teste_desde = None
+                self.aberturas += 1
+                logger.warning(
+                    f"[fluig_resiliencia] Circuito aberto - {self.ambiente}/{self.familia} "
+                    f"({self._falhas_consecutivas} falha(s) consecutiva(s), último erro: {erro})"
+                )
+
+    def para_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            agora = time.monotonic()
+            self._atualizar_estado(agora)
+            return {
+                'estado': self._estado,
+                'falhas_consecutivas': self._falhas_consecutivas,
+                'reabre_em_segundos': round(max(0.0, self.tempo_aberto - (agora - self._aberto_desde)), 1)
+                if self._estado == ESTADO_ABERTO else None,
+                'aberturas': self.aberturas,
+                'rejeitadas': self.rejeitadas,
+                'ultimo_erro': self.ultimo_erro,
+            }
+
+
+_disjuntores: Dict[tuple, DisjuntorCircuito] = {}
+_disjuntores_lock = threading.Lock()
+
+
+def get_disjuntor(ambiente: str, familia: str) -> DisjuntorCircuito:
+    """Retorna o disjuntor do ambiente/família, criando-o na primeira chamada"""
+    chave = (ambiente.upper(), familia)
+    disjuntor = _disjuntores.get(chave)
+    if disjuntor is not None:
+        return disjuntor
+
+    with _disjuntores_lock:
+        disjuntor = _disjuntores.get(chave)
+        if disjuntor is None:
+            disjuntor = DisjuntorCircuito(
+                chave[0],
+                familia,
+                int(getattr(ConfigEnvSetings, 'FLUIG_DISJUNTOR_LIMITE_FALHAS', 5)),
+                float(getattr(ConfigEnvSetings, 'FLUIG_DISJUNTOR_TEMPO_ABERTO_SEGUNDOS', 30.0)),
+            )
+            _disjuntores[chave] = disjuntor
+        return disjuntor
+
+
+def disjuntor_habilitado() -> bool:
+    """Indica se o circuit breaker está habilitado (FLUIG_DISJUNTOR_ENABLED)"""
+    return str(getattr(ConfigEnvSetings, 'FLUIG_DISJUNTOR_ENABLED', 'true')).lower() in ('true', '1')
+
+
+def circuito_aberto(ambiente: str, familias: Iterable[str]) -> bool:
+    """
+    Indica se alguma das famílias está com o circuito aberto no ambiente
+
+    Usado pelos monitores em background para pular o ciclo enquanto o Fluig
+    está indisponível, em vez de acumular trabalho.
+    """
+    if not disjuntor_habilitado():
+        return False
+    for familia in familias:
+        disjuntor = _disjuntores.get((ambiente.upper(), familia))
+        if disjuntor is not None and disjuntor.estado == ESTADO_ABERTO:
+            return True
+    return False
+
+
+def obter_estado_disjuntores(ambiente: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Retorna o estado dos disjuntores já criados
+
+    Args:
+        ambiente: Ambiente específico (opcional, retorna todos se None)
+
+    Returns:
+        Dicionário {ambiente: {familia: estado}}
+    """
+    with _disjuntores_lock:
+        disjuntores = dict(_disjuntores)
+    estados: Dict[str, Dict[str, Any]] = {}
+    for (nome_ambiente, familia), disjuntor in sorted(disjuntores.items()):
+        if ambiente and nome_ambiente != ambiente.upper():
+            continue
+        estados.setdefault(nome_ambiente, {})[familia] = disjuntor.para_dict()
+    return estados
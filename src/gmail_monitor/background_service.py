@@ -5,8 +5,11 @@ import threading
 import time
 from typing import Optional
 from src.gmail_monitor.gmail_service import GmailMonitorService
+from src.fluig.fluig_limitador import com_prioridade_fluig, PRIORIDADE_BACKGROUND
+from src.fluig.fluig_resiliencia import circuito_aberto, FAMILIA_PROCESSO, FAMILIA_DATASET
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import registrar_ciclo_loop
 
 
 class GmailMonitorBackgroundService:
@@ -77,6 +80,7 @@ class GmailMonitorBackgroundService:
         except Exception as e:
             logger.error(f"[gmail_background] Erro ao parar monitoramento: {str(e)}")
     
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
     def _loop(self):
         """Loop principal do monitoramento"""
         while self._running:
@@ -93,8 +97,21 @@ class GmailMonitorBackgroundService:
                     logger.info(f"[gmail_background] Intervalo atualizado: {self._interval/60} -> {novo_intervalo} minutos")
                     self._interval = novo_intervalo * 60
                 
+                # Fluig indisponível (circuito aberto): os emails ficam para o próximo ciclo
+                ambiente = getattr(ConfigEnvSetings, 'GMAIL_MONITOR_AMBIENTE', 'prd').upper()
+                if circuito_aberto(ambiente, [FAMILIA_PROCESSO, FAMILIA_DATASET]):
+                    logger.warning("[gmail_background] Circuito do Fluig aberto (abertura/dataset) - ciclo ignorado")
+                    time.sleep(self._interval)
+                    continue
+                
                 if self.gmail_monitor:
-                    self.gmail_monitor.processar_emails()
+                    inicio_ciclo = time.monotonic()
+                    try:
+                        self.gmail_monitor.processar_emails()
+                    except Exception:
+                        registrar_ciclo_loop("gmail", time.monotonic() - inicio_ciclo, sucesso=False)
+                        raise
+                    registrar_ciclo_loop("gmail", time.monotonic() - inicio_ciclo)
                 else:
                     logger.error("[gmail_background] GmailMonitorService não inicializado")
                     break
@@ -8,6 +8,7 @@ from googleapiclient.errors import HttpError
 from src.auth.auth_google_drive import criar_servico_drive
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import medir_drive
 
 
 def salvar_anexo_no_drive(conteudo_bytes: bytes, nome_arquivo: str, folder_id: Optional[str] = None) -> Optional[str]:
@@ -46,11 +47,12 @@ def salvar_anexo_no_drive(conteudo_bytes: bytes, nome_arquivo: str, folder_id: O
             resumable=True
         )
         
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
+        with medir_drive('upload'):
+            file = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id'
+            ).execute()
         
         file_id = file.get('id')
         logger.info(f"[drive_uploader] Arquivo salvo: {nome_arquivo} | ID: {file_id}")
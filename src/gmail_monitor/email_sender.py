@@ -14,6 +14,8 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import executar_google_api
+from src.utilitarios_centrais.rastreamento import com_span
 from src.historico_monitor.historico_fluxo import HistoricoFluxoManager
 
 
@@ -580,6 +582,7 @@ def criar_template_email_chamado(process_instance_id: int, link: str, email_reme
     return html_template
 
 
+@com_span("gmail.enviar_email")
 def enviar_email(
     destinatario: str, 
     assunto: str, 
@@ -670,10 +673,10 @@ def enviar_email(
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
         
         # Envia email
-        send_message = service.users().messages().send(
+        send_message = executar_google_api(service.users().messages().send(
             userId='me',
             body={'raw': raw_message}
-        ).execute()
+        ))
         
         logger.info(f"[email_sender] Email enviado para: {destinatario} | ID: {send_message.get('id')}")
         return True
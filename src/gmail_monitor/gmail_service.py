@@ -10,6 +10,8 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import executar_google_api
+from src.utilitarios_centrais.rastreamento import iniciar_rastro, finalizar_rastro, anotar_rastro, com_span
 from src.modelo_dados.modelos_fluig import AberturaChamado
 from src.fluig.fluig_core import FluigCore
 from .email_validator import validar_email_uisa, extrair_email_remetente
@@ -77,7 +79,7 @@ class GmailMonitorService:
         """Cria a label PROCESSADOS se não existir"""
         try:
             # Lista todas as labels
-            labels = self.gmail_service.users().labels().list(userId='me').execute()
+            labels = executar_google_api(self.gmail_service.users().labels().list(userId='me'))
             
             for label in labels.get('labels', []):
                 if label['name'] == self.label_processados:
@@ -92,10 +94,10 @@ class GmailMonitorService:
                 'messageListVisibility': 'show'
             }
             
-            created_label = self.gmail_service.users().labels().create(
+            created_label = executar_google_api(self.gmail_service.users().labels().create(
                 userId='me',
                 body=label_obj
-            ).execute()
+            ))
             
             self.label_id = created_label['id']
             logger.info(f"[gmail_service] Label '{self.label_processados}' criada (ID: {self.label_id})")
@@ -112,28 +114,31 @@ class GmailMonitorService:
             
             # Busca threads não lidas
             query = 'is:unread'
-            threads = self.gmail_service.users().threads().list(
+            threads = executar_google_api(self.gmail_service.users().threads().list(
                 userId='me',
                 q=query
-            ).execute()
+            ))
             
             thread_list = threads.get('threads', [])
             logger.info(f"[gmail_service] Encontradas {len(thread_list)} thread(s) não lida(s)")
             
             for thread_item in thread_list:
                 thread_id = thread_item['id']
+                # Rastro por email (amostrado): etapas e chamadas externas até a notificação
+                rastro = iniciar_rastro("email", thread_id=thread_id)
                 
                 try:
                     # Obtém detalhes da thread
-                    thread = self.gmail_service.users().threads().get(
+                    thread = executar_google_api(self.gmail_service.users().threads().get(
                         userId='me',
                         id=thread_id
-                    ).execute()
+                    ))
                     
                     # Verifica se já tem a label PROCESSADOS
                     labels = thread.get('labelIds', [])
                     if self.label_id and self.label_id in labels:
                         logger.info(f"[gmail_service] Email já processado - pulando thread ID: {thread_id}")
+                        anotar_rastro(resultado="ja_processado")
                         continue
                     
                     # Pega a primeira mensagem da thread
@@ -145,11 +150,11 @@ class GmailMonitorService:
                     message_id = message['id']
                     
                     # Obtém detalhes da mensagem
-                    message_detail = self.gmail_service.users().messages().get(
+                    message_detail = executar_google_api(self.gmail_service.users().messages().get(
                         userId='me',
                         id=message_id,
                         format='full'
-                    ).execute()
+                    ))
                     
                     # Extrai informações do email
                     headers = message_detail['payload'].get('headers', [])
@@ -161,12 +166,14 @@ class GmailMonitorService:
                     email_body = self._extrair_corpo_email(message_detail)
                     
                     logger.info(f"[gmail_service] Processando email de: {email_remetente}")
+                    anotar_rastro(remetente=email_remetente)
                     logger.info(f"[gmail_service] Assunto: {email_subject}")
                     
                     # Validação de segurança do domínio
                     validacao = validar_email_uisa(email_remetente)
                     if not validacao['valido']:
                         logger.info(f"[gmail_service] Email bloqueado - não processado: {email_remetente} - Motivo: {validacao['mensagem']}")
+                        anotar_rastro(resultado="bloqueado")
                         
                         # Se é da BLACK_LIST_EMAILS, apenas passa (não marca como processado)
                         if validacao.get('is_blacklist', False):
@@ -188,6 +195,7 @@ class GmailMonitorService:
                             f"Chamado existente: {process_id_existente if process_id_existente else 'N/A'}. "
                             f"Email não será processado."
                         )
+                        anotar_rastro(resultado="duplicado")
                         # Marca como processado para não tentar novamente
                         self._marcar_como_processado(thread_id)
                         continue
@@ -234,14 +242,21 @@ class GmailMonitorService:
                                 pass
                         
                         self.deduplicator.marcar_como_processado(email_subject, email_body, process_instance_id)
+                        anotar_rastro(resultado="chamado_aberto")
                     else:
+                        anotar_rastro(resultado="falha_abertura")
                         logger.warning(f"[gmail_service] Email NÃO será marcado como processado devido à falha. Permanecerá não lido para nova tentativa.")
                     
                 except Exception as e:
                     logger.error(f"[gmail_service] Erro ao processar thread {thread_id}: {str(e)}")
                     import traceback
                     logger.debug(f"[gmail_service] Traceback: {traceback.format_exc()}")
+                    anotar_rastro(resultado="erro")
+                    finalizar_rastro(rastro, e)
+                    rastro = None
                     continue
+                finally:
+                    finalizar_rastro(rastro)
             
             logger.info("[gmail_service] Processamento de emails concluído")
             
@@ -279,6 +294,7 @@ class GmailMonitorService:
             logger.error(f"[gmail_service] Erro ao extrair corpo do email: {str(e)}")
             return ""
     
+    @com_span("gmail.processar_anexos")
     def _processar_anexos(self, message_detail: Dict) -> List[Dict[str, str]]:
         """
         Processa anexos do email e retorna em formato base64 (sem salvar no Drive)
@@ -316,11 +332,11 @@ class GmailMonitorService:
                     # Esta part é um anexo
                     try:
                         # Baixa o anexo
-                        attachment = self.gmail_service.users().messages().attachments().get(
+                        attachment = executar_google_api(self.gmail_service.users().messages().attachments().get(
                             userId='me',
                             messageId=message_id,
                             id=attachment_id
-                        ).execute()
+                        ))
                         
                         # Decodifica o conteúdo (Gmail usa base64 URL-safe)
                         file_data = base64.urlsafe_b64decode(attachment['data'])
@@ -351,11 +367,11 @@ class GmailMonitorService:
                 if filename and attachment_id:
                     # Email simples com anexo
                     try:
-                        attachment = self.gmail_service.users().messages().attachments().get(
+                        attachment = executar_google_api(self.gmail_service.users().messages().attachments().get(
                             userId='me',
                             messageId=message_id,
                             id=attachment_id
-                        ).execute()
+                        ))
                         
                         file_data = base64.urlsafe_b64decode(attachment['data'])
                         conteudo_base64 = base64.b64encode(file_data).decode('utf-8')
@@ -385,6 +401,7 @@ class GmailMonitorService:
         
         return anexos
     
+    @com_span("gmail.chamar_api_chamado")
     def _chamar_api_chamado(self, assunto: str, corpo: str, email: str, anexos: List[Dict[str, str]]) -> Optional[str]:
         """Abre chamado usando funções internas do projeto com anexos diretos (base64)"""
         try:
@@ -442,6 +459,7 @@ class GmailMonitorService:
                 
                 if process_instance_id:
                     logger.info(f"[gmail_service] Chamado aberto com sucesso - ID: {process_instance_id}")
+                    anotar_rastro(process_instance_id=process_instance_id)
                     
                     # Salva histórico inicial do chamado (chamados abertos via email são monitorados)
                     try:
@@ -549,6 +567,7 @@ class GmailMonitorService:
             logger.debug(f"[gmail_service] Traceback: {traceback.format_exc()}")
             return None
     
+    @com_span("gmail.abrir_chamado_classificado")
     def _abrir_chamado_classificado(
         self, 
         assunto: str, 
@@ -737,6 +756,7 @@ class GmailMonitorService:
             logger.debug(f"[gmail_service] Traceback: {traceback.format_exc()}")
             return None
     
+    @com_span("gmail.processar_resposta_chamado")
     def _processar_resposta_chamado(self, resposta: Any, email_remetente: str, assunto_original: str) -> bool:
         """
         Processa a resposta da API e envia email de confirmação
@@ -808,23 +828,23 @@ class GmailMonitorService:
         """Marca a thread como processada"""
         try:
             if self.label_id:
-                self.gmail_service.users().threads().modify(
+                executar_google_api(self.gmail_service.users().threads().modify(
                     userId='me',
                     id=thread_id,
-                    body={'addLabelIds': [self.label_id],'removeLabelIds': ['UNREAD']}).execute()
+                    body={'addLabelIds': [self.label_id],'removeLabelIds': ['UNREAD']}))
             else:
                 # Se não tem label, apenas marca como lido
-                self.gmail_service.users().threads().modify(
+                executar_google_api(self.gmail_service.users().threads().modify(
                     userId='me',
                     id=thread_id,
-                    body={'removeLabelIds': ['UNREAD']}).execute()
+                    body={'removeLabelIds': ['UNREAD']}))
         except Exception as e:
             logger.error(f"[gmail_service] Erro ao adicionar label: {str(e)}")
             # Tenta apenas marcar como lido
             try:
-                self.gmail_service.users().threads().modify(
+                executar_google_api(self.gmail_service.users().threads().modify(
                     userId='me',
                     id=thread_id,
-                    body={'removeLabelIds': ['UNREAD']}).execute()
+                    body={'removeLabelIds': ['UNREAD']}))
             except:
                 pass
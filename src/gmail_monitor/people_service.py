@@ -6,8 +6,11 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import executar_google_api
+from src.utilitarios_centrais.rastreamento import com_span
 
 
+@com_span("people.buscar_telefone_no_diretorio")
 def buscar_telefone_no_diretorio(email_remetente: str) -> str:
     """
     Busca o telefone do contato no diretório do Google Workspace
@@ -25,11 +28,11 @@ def buscar_telefone_no_diretorio(email_remetente: str) -> str:
             return ""
         
         # Busca pessoa no diretório
-        results = service.people().searchDirectoryPeople(
+        results = executar_google_api(service.people().searchDirectoryPeople(
             query=email_remetente,
             readMask="phoneNumbers,emailAddresses",
             sources=["DIRECTORY_SOURCE_TYPE_DOMAIN_CONTACT", "DIRECTORY_SOURCE_TYPE_DOMAIN_PROFILE"]
-        ).execute()
+        ))
         
         people = results.get('people', [])
         
@@ -14,6 +14,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.rastreamento import com_span
 
 
 class HistoricoManager:
@@ -152,6 +153,7 @@ class HistoricoManager:
             logger.debug(f"[HistoricoManager] Erro ao verificar email excluído: {str(e)}")
             return False
     
+    @com_span("historico.salvar_historico")
     def salvar_historico(
         self,
         process_instance_id: int,
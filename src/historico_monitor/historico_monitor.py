@@ -4,17 +4,34 @@ Monitor de histórico de chamados
 Este módulo monitora periodicamente os chamados abertos via email
 e verifica se houve atualizações nos históricos.
 """
+import math
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+from src.fluig.fluig_cache import get_cache_detalhes_chamados
 from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_comum import marcador_historico
+from src.fluig.fluig_limitador import com_prioridade_fluig, LimitadorTaxa, PRIORIDADE_BACKGROUND
+from src.fluig.fluig_resiliencia import prazo_fluig, circuito_aberto, FAMILIA_HISTORICO
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import historico_monitorados, threadpool_fila, registrar_ciclo_loop
 from .historico_manager import HistoricoManager
 from src.gmail_monitor.email_sender import enviar_email, criar_template_email_atualizacao
 
 
+def _percentil(valores: List[float], percentil: float) -> Optional[float]:
+    """Percentil pelo método nearest-rank (None se a lista estiver vazia)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(percentil / 100 * len(ordenados)) - 1)
+    return round(ordenados[indice], 3)
+
+
 class HistoricoMonitor:
     """
     Monitora atualizações nos históricos de chamados abertos via email
@@ -47,6 +64,10 @@ class HistoricoMonitor:
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         
+        # Chamados ainda em verificação (ex.: abandonados por timeout no ciclo anterior)
+        self._em_verificacao: set = set()
+        self._em_verificacao_lock = threading.Lock()
+        
         logger.info(f"[HistoricoMonitor] Inicializado - Intervalo: {intervalo_minutos} minuto(s)")
     
     def verificar_atualizacoes_chamado(
@@ -83,11 +104,23 @@ class HistoricoMonitor:
                     'erro': 'Histórico antigo não encontrado'
                 }
             
-            # Obtém histórico atual do Fluig
+            # Obtém do Fluig apenas os itens mais novos que o último item salvo
             fluig_core = FluigCore(ambiente=ambiente)
-            historico_novo = fluig_core.obter_historico_chamado(process_instance_id)
+            items_antigos = historico_antigo.get('items', [])
+            marcador = marcador_historico(items_antigos)
+            incremental = any(v is not None for v in marcador.values())
+            
+            if incremental:
+                historico_delta = fluig_core.obter_historico_chamado(
+                    process_instance_id,
+                    page_size=int(getattr(ConfigEnvSetings, 'HISTORICO_INCREMENTAL_TAMANHO_PAGINA', 50)),
+                    **marcador
+                )
+            else:
+                # Sem itens salvos não há marcador: busca o histórico completo
+                historico_delta = fluig_core.obter_historico_chamado(process_instance_id)
             
-            if historico_novo is None:
+            if historico_delta is None:
                 logger.error(f"[HistoricoMonitor] Erro ao obter histórico atual do chamado {process_instance_id}")
                 return {
                     'sucesso': False,
@@ -96,18 +129,33 @@ class HistoricoMonitor:
                     'erro': 'Erro ao obter histórico atual do Fluig'
                 }
             
+            # Histórico completo = itens novos (mais recentes primeiro) + itens já salvos
+            if incremental:
+                historico_novo = {
+                    **historico_antigo,
+                    'items': historico_delta.get('items', []) + items_antigos,
+                    'hasNext': False
+                }
+            else:
+                historico_novo = historico_delta
+            
             # Compara históricos
             comparacao = self.historico_manager.comparar_historicos(
                 historico_antigo,
                 historico_novo
             )
             
-            # Atualiza histórico salvo (sempre atualiza para manter estrutura organizada)
-            self.historico_manager.atualizar_historico(
+            # Atualiza histórico salvo apenas quando há itens novos (evita regravar o Drive a cada ciclo)
+            if not incremental or historico_delta.get('items'):
+                self.historico_manager.atualizar_historico(
                     process_instance_id,
                     historico_novo,
                     ambiente
                 )
+                # Chamado mudou: descarta os detalhes em cache (webapp) para a próxima leitura buscar de novo
+                cache_detalhes = get_cache_detalhes_chamados()
+                if incremental and cache_detalhes is not None:
+                    cache_detalhes.invalidar(ambiente, process_instance_id)
                 
             # Verifica itens com email_enviado = false e envia email
             itens_nao_enviados = self.historico_manager.obter_itens_nao_enviados(
@@ -255,16 +303,16 @@ class HistoricoMonitor:
                         "não será enviada notificação"
                     )
             
-            # Retorna resultado
-                return {
-                    'sucesso': True,
+            # Retorna resultado (também quando não há itens pendentes de envio)
+            return {
+                'sucesso': True,
                 'tem_atualizacoes': comparacao.get('tem_atualizacoes', False),
-                    'novos_items': comparacao.get('novos_items', []),
+                'novos_items': comparacao.get('novos_items', []),
                 'itens_enviados': len(itens_nao_enviados) if itens_nao_enviados else 0,
-                    'quantidade_novos': comparacao.get('quantidade_novos', 0),
-                    'total_items_antigo': comparacao.get('total_items_antigo', 0),
-                    'total_items_novo': comparacao.get('total_items_novo', 0)
-                }
+                'quantidade_novos': comparacao.get('quantidade_novos', 0),
+                'total_items_antigo': comparacao.get('total_items_antigo', 0),
+                'total_items_novo': comparacao.get('total_items_novo', 0)
+            }
         except Exception as e:
             logger.error(f"[HistoricoMonitor] Erro ao verificar atualizações do chamado {process_instance_id}: {str(e)}")
             import traceback
@@ -276,10 +324,73 @@ class HistoricoMonitor:
                 'erro': str(e)
             }
     
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
+    def _verificar_chamado_monitorado(
+        self,
+        process_instance_id: int,
+        ambiente: str,
+        limitador: LimitadorTaxa
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verifica um chamado dentro do pool de workers
+        
+        Args:
+            process_instance_id: ID da instância do processo (número do chamado)
+            ambiente: Ambiente do Fluig (PRD ou QLD)
+            limitador: Limitador de taxa global do ciclo (espaça o início das verificações)
+            
+        Returns:
+            Detalhe da verificação (com 'latencia_segundos'), ou None se o chamado
+            foi ignorado (email excluído)
+        """
+        try:
+            limitador.adquirir()
+            inicio = time.monotonic()
+            
+            # Verifica se o email do remetente está na lista de exclusão
+            email_remetente = self.historico_manager.obter_email_remetente(process_instance_id)
+            
+            if email_remetente and self.historico_manager._email_excluido_do_historico(email_remetente):
+                logger.debug(f"[HistoricoMonitor] Chamado {process_instance_id} excluído do monitoramento (email: {email_remetente})")
+                return None
+            
+            try:
+                # Requisições ao Fluig param no timeout do chamado (não seguem rodando após abandonado)
+                timeout_chamado = float(getattr(ConfigEnvSetings, 'HISTORICO_TIMEOUT_CHAMADO_SEGUNDOS', 120.0))
+                with prazo_fluig(timeout_chamado):
+                    resultado = self.verificar_atualizacoes_chamado(process_instance_id, ambiente)
+                detalhe = {
+                    'process_instance_id': process_instance_id,
+                    'sucesso': resultado.get('sucesso', False),
+                    'tem_atualizacoes': resultado.get('tem_atualizacoes', False),
+                    'quantidade_novos': resultado.get('quantidade_novos', 0),
+                    'erro': resultado.get('erro')
+                }
+            except Exception as e:
+                logger.error(f"[HistoricoMonitor] Erro ao verificar chamado {process_instance_id}: {str(e)}")
+                detalhe = {
+                    'process_instance_id': process_instance_id,
+                    'sucesso': False,
+                    'tem_atualizacoes': False,
+                    'erro': str(e)
+                }
+            
+            detalhe['latencia_segundos'] = round(time.monotonic() - inicio, 3)
+            return detalhe
+        finally:
+            with self._em_verificacao_lock:
+                self._em_verificacao.discard(process_instance_id)
+    
     def verificar_todos_chamados(self, ambiente: str = "PRD") -> Dict[str, Any]:
         """
         Verifica atualizações em todos os chamados monitorados
         
+        Os chamados são verificados em paralelo (HISTORICO_MAX_CONCORRENCIA), com
+        limite global de início de verificações (HISTORICO_TAXA_MAX_POR_SEGUNDO) e
+        timeout por chamado (HISTORICO_TIMEOUT_CHAMADO_SEGUNDOS). Chamados que
+        estouram o timeout são contados como erro e seguem em background; enquanto
+        não terminarem, não são verificados novamente.
+        
         Args:
             ambiente: Ambiente do Fluig (PRD ou QLD)
             
@@ -289,13 +400,17 @@ class HistoricoMonitor:
             - chamados_com_atualizacoes: int
             - chamados_verificados: int
             - chamados_com_erro: int
-            - detalhes: Lista com detalhes de cada chamado
+            - detalhes: Lista com detalhes de cada chamado (na ordem da listagem)
+            - duracao_ciclo_segundos: float
+            - latencia_p50_segundos / latencia_p95_segundos: latência por chamado (None sem dados)
         """
+        inicio_ciclo = time.monotonic()
         try:
             logger.info("[HistoricoMonitor] Iniciando verificação de todos os chamados monitorados...")
             
             # Lista todos os chamados monitorados
             chamados = self.historico_manager.listar_chamados_monitorados()
+            historico_monitorados.definir(len(chamados))
             
             if not chamados:
                 logger.info("[HistoricoMonitor] Nenhum chamado monitorado encontrado")
@@ -304,54 +419,87 @@ class HistoricoMonitor:
                     'chamados_com_atualizacoes': 0,
                     'chamados_verificados': 0,
                     'chamados_com_erro': 0,
-                    'detalhes': []
+                    'detalhes': [],
+                    'duracao_ciclo_segundos': round(time.monotonic() - inicio_ciclo, 3),
+                    'latencia_p50_segundos': None,
+                    'latencia_p95_segundos': None
                 }
             
-            logger.info(f"[HistoricoMonitor] Verificando {len(chamados)} chamado(s) monitorado(s)...")
+            max_concorrencia = max(1, int(getattr(ConfigEnvSetings, 'HISTORICO_MAX_CONCORRENCIA', 5)))
+            taxa = float(getattr(ConfigEnvSetings, 'HISTORICO_TAXA_MAX_POR_SEGUNDO', 5.0))
+            timeout_chamado = float(getattr(ConfigEnvSetings, 'HISTORICO_TIMEOUT_CHAMADO_SEGUNDOS', 120.0))
+            # Rajada 1: as verificações começam espaçadas, no máximo `taxa` por segundo (0 = sem limite)
+            limitador = LimitadorTaxa("HISTORICO", taxa=taxa, rajada=1)
             
-            chamados_com_atualizacoes = 0
-            chamados_verificados = 0
-            chamados_com_erro = 0
-            detalhes = []
+            logger.info(
+                f"[HistoricoMonitor] Verificando {len(chamados)} chamado(s) monitorado(s) "
+                f"(concorrência: {max_concorrencia}, taxa máx.: {taxa}/s)..."
+            )
             
-            for process_instance_id in chamados:
-                try:
-                    # Verifica se o email do remetente está na lista de exclusão
-                    email_remetente = self.historico_manager.obter_email_remetente(process_instance_id)
-                    
-                    if email_remetente and self.historico_manager._email_excluido_do_historico(email_remetente):
-                        logger.debug(f"[HistoricoMonitor] Chamado {process_instance_id} excluído do monitoramento (email: {email_remetente})")
-                        continue
-                    
-                    resultado = self.verificar_atualizacoes_chamado(process_instance_id, ambiente)
-                    
-                    if resultado.get('sucesso'):
-                        chamados_verificados += 1
-                        if resultado.get('tem_atualizacoes'):
-                            chamados_com_atualizacoes += 1
-                    else:
-                        chamados_com_erro += 1
-                    
-                    detalhes.append({
-                        'process_instance_id': process_instance_id,
-                        'sucesso': resultado.get('sucesso', False),
-                        'tem_atualizacoes': resultado.get('tem_atualizacoes', False),
-                        'quantidade_novos': resultado.get('quantidade_novos', 0),
-                        'erro': resultado.get('erro')
-                    })
+            detalhes_por_chamado: Dict[int, Dict[str, Any]] = {}
+            executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix="historico-monitor")
+            try:
+                futures = {}
+                for process_instance_id in chamados:
+                    with self._em_verificacao_lock:
+                        if process_instance_id in self._em_verificacao:
+                            logger.warning(f"[HistoricoMonitor] Chamado {process_instance_id} ainda em verificação no ciclo anterior - ignorado")
+                            continue
+                        self._em_verificacao.add(process_instance_id)
+                    future = executor.submit(self._verificar_chamado_monitorado, process_instance_id, ambiente, limitador)
+                    futures[future] = process_instance_id
+                
+                # O prazo de cada chamado começa a contar quando um worker o assume
+                inicio_execucao: Dict[Any, float] = {}
+                pendentes = set(futures)
+                while pendentes:
+                    concluidos, pendentes = wait(pendentes, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in concluidos:
+                        process_instance_id = futures[future]
+                        try:
+                            detalhe = future.result()
+                        except Exception as e:
+                            detalhe = {
+                                'process_instance_id': process_instance_id,
+                                'sucesso': False,
+                                'tem_atualizacoes': False,
+                                'erro': str(e)
+                            }
+                        if detalhe is not None:
+                            detalhes_por_chamado[process_instance_id] = detalhe
                     
-                except Exception as e:
-                    logger.error(f"[HistoricoMonitor] Erro ao verificar chamado {process_instance_id}: {str(e)}")
-                    chamados_com_erro += 1
-                    detalhes.append({
-                        'process_instance_id': process_instance_id,
-                        'sucesso': False,
-                        'tem_atualizacoes': False,
-                        'erro': str(e)
-                    })
+                    agora = time.monotonic()
+                    for future in list(pendentes):
+                        if future not in inicio_execucao:
+                            if future.running():
+                                inicio_execucao[future] = agora
+                            continue
+                        if timeout_chamado > 0 and agora - inicio_execucao[future] > timeout_chamado:
+                            process_instance_id = futures[future]
+                            logger.error(f"[HistoricoMonitor] Timeout de {timeout_chamado}s ao verificar chamado {process_instance_id}")
+                            pendentes.discard(future)
+                            detalhes_por_chamado[process_instance_id] = {
+                                'process_instance_id': process_instance_id,
+                                'sucesso': False,
+                                'tem_atualizacoes': False,
+                                'erro': f"Timeout de {timeout_chamado}s na verificação",
+                                'latencia_segundos': round(agora - inicio_execucao[future], 3)
+                            }
+                    threadpool_fila.definir(sum(1 for f in pendentes if f not in inicio_execucao), pool="historico_monitor")
+            finally:
+                # Não espera chamados abandonados por timeout
+                executor.shutdown(wait=False)
+                threadpool_fila.definir(0, pool="historico_monitor")
+            
+            detalhes = [detalhes_por_chamado[pid] for pid in chamados if pid in detalhes_por_chamado]
+            chamados_verificados = sum(1 for d in detalhes if d.get('sucesso'))
+            chamados_com_atualizacoes = sum(1 for d in detalhes if d.get('sucesso') and d.get('tem_atualizacoes'))
+            chamados_com_erro = sum(1 for d in detalhes if not d.get('sucesso'))
+            latencias = [d['latencia_segundos'] for d in detalhes if 'latencia_segundos' in d]
+            duracao_ciclo = round(time.monotonic() - inicio_ciclo, 3)
             
             logger.info(
-                f"[HistoricoMonitor] Verificação concluída: "
+                f"[HistoricoMonitor] Verificação concluída em {duracao_ciclo}s: "
                 f"{chamados_verificados} verificado(s), "
                 f"{chamados_com_atualizacoes} com atualizações, "
                 f"{chamados_com_erro} com erro"
@@ -362,7 +510,10 @@ class HistoricoMonitor:
                 'chamados_com_atualizacoes': chamados_com_atualizacoes,
                 'chamados_verificados': chamados_verificados,
                 'chamados_com_erro': chamados_com_erro,
-                'detalhes': detalhes
+                'detalhes': detalhes,
+                'duracao_ciclo_segundos': duracao_ciclo,
+                'latencia_p50_segundos': _percentil(latencias, 50),
+                'latencia_p95_segundos': _percentil(latencias, 95)
             }
             
         except Exception as e:
@@ -375,9 +526,13 @@ class HistoricoMonitor:
                 'chamados_verificados': 0,
                 'chamados_com_erro': 1,
                 'detalhes': [],
-                'erro': str(e)
+                'erro': str(e),
+                'duracao_ciclo_segundos': round(time.monotonic() - inicio_ciclo, 3),
+                'latencia_p50_segundos': None,
+                'latencia_p95_segundos': None
             }
     
+    @com_prioridade_fluig(PRIORIDADE_BACKGROUND)
     def _loop_verificacao(self, ambiente: str = "PRD"):
         """
         Loop principal de verificação (executado em thread separada)
@@ -404,8 +559,18 @@ class HistoricoMonitor:
                     self.intervalo_minutos = novo_intervalo
                     self.intervalo_segundos = novo_intervalo * 60
                 
+                # Fluig indisponível (circuito aberto): pula o ciclo em vez de acumular verificações
+                if circuito_aberto(ambiente, [FAMILIA_HISTORICO]):
+                    logger.warning("[HistoricoMonitor] Circuito do histórico aberto (Fluig indisponível) - ciclo ignorado")
+                    if self._stop_event.wait(timeout=self.intervalo_segundos):
+                        break
+                    continue
+                
                 # Verifica todos os chamados
                 resultado = self.verificar_todos_chamados(ambiente)
+                registrar_ciclo_loop(
+                    "historico", resultado.get('duracao_ciclo_segundos', 0.0), sucesso='erro' not in resultado
+                )
                 
                 logger.info(
                     f"[HistoricoMonitor] Verificação periódica concluída: "
@@ -125,6 +125,18 @@ class ConfigEnv(BaseSettings):
     # Habilita ou desabilita o monitoramento de histórico
     HISTORICO_MONITOR_ENABLED: str = "true"
     
+    # Registros por página na busca incremental de histórico (apenas itens novos)
+    HISTORICO_INCREMENTAL_TAMANHO_PAGINA: int = 50
+    
+    # Verificações de chamados em paralelo por ciclo do monitor de histórico
+    HISTORICO_MAX_CONCORRENCIA: int = 5
+    
+    # Limite global de verificações iniciadas por segundo (0 = sem limite)
+    HISTORICO_TAXA_MAX_POR_SEGUNDO: float = 5.0
+    
+    # Tempo máximo (em segundos) de verificação de um chamado antes de ser contado como erro
+    HISTORICO_TIMEOUT_CHAMADO_SEGUNDOS: float = 120.0
+    
     # Padrões para deduplicação de emails (regex ou palavras-chave separadas por vírgula)
     # Exemplo: UUID:.*,MAC:.*,Processo ID:.*
     # Ou palavras-chave simples: UUID:,MAC:,Processo ID:
@@ -136,6 +148,168 @@ class ConfigEnv(BaseSettings):
     EMAIL_DEDUPLICATION_EMAILS: str = ""
     #-----------------------------------------------------------------------
 
+    #-------------------------POOL HTTP FLUIG (Conexões compartilhadas)----
+    # Quantidade de hosts distintos mantidos no pool por ambiente
+    FLUIG_POOL_CONNECTIONS: int = 4
+    # Máximo de conexões keep-alive mantidas por host do Fluig
+    FLUIG_POOL_MAXSIZE: int = 20
+    # Máximo de conexões simultâneas do cliente assíncrono (AsyncFluigCore) por ambiente
+    # (as conexões keep-alive ociosas seguem FLUIG_POOL_MAXSIZE)
+    FLUIG_ASYNC_MAX_CONNECTIONS: int = 100
+    # GETs idênticos simultâneos (mesma URL/parâmetros) compartilham uma única requisição ao Fluig
+    FLUIG_GET_COALESCING_ENABLED: str = "true"
+    # Registros por página nos iteradores paginados (tasks e histórico)
+    FLUIG_PAGINACAO_TAMANHO_PAGINA: int = 500
+    # Limite de páginas percorridas por iteração (proteção contra hasNext infinito)
+    FLUIG_PAGINACAO_MAX_PAGINAS: int = 500
+    #-----------------------------------------------------------------------
+
+    #-------------------------LIMITADOR DE TAXA FLUIG (Token bucket)-------
+    # Limita as requisições ao Fluig por ambiente; na fila, webapp/API > lote (planilha) > monitores
+    FLUIG_LIMITADOR_ENABLED: str = "true"
+    # Requisições por segundo liberadas para o ambiente (0 = sem limite)
+    FLUIG_LIMITADOR_TAXA_PRD: float = 20.0
+    FLUIG_LIMITADOR_TAXA_QLD: float = 10.0
+    # Requisições que podem sair de uma vez quando o bucket está cheio
+    FLUIG_LIMITADOR_RAJADA_PRD: int = 40
+    FLUIG_LIMITADOR_RAJADA_QLD: int = 20
+    #-----------------------------------------------------------------------
+
+    #-------------------------LIMITADOR DE FAN-OUT FLUIG (Concorrência)-----
+    # Requisições simultâneas ao Fluig somando todos os fan-outs (detalhes das filas, datasets em lote)
+    FLUIG_FANOUT_MAX_CONCORRENCIA: int = 30
+    # Vagas que um mesmo fan-out (ex.: uma fila) pode ocupar; as vagas livres são divididas em rodízio
+    FLUIG_FANOUT_MAX_POR_CHAMADOR: int = 10
+    #-----------------------------------------------------------------------
+
+    #-------------------------RESILIÊNCIA FLUIG (Retry/Circuit breaker)----
+    # Total de tentativas de um GET em falha de conexão/timeout ou HTTP 429/502/503/504 (1 = sem retry)
+    FLUIG_RETRY_MAX_TENTATIVAS: int = 3
+    # Backoff exponencial com jitter entre tentativas: base * 2^(tentativa-1), limitado ao máximo
+    FLUIG_RETRY_BACKOFF_BASE_SEGUNDOS: float = 0.5
+    FLUIG_RETRY_BACKOFF_MAX_SEGUNDOS: float = 5.0
+    # Circuit breaker por família de endpoint (tasks, historico, dataset, processo, upload, outros)
+    FLUIG_DISJUNTOR_ENABLED: str = "true"
+    # Falhas consecutivas que abrem o circuito (requisições passam a falhar na hora)
+    FLUIG_DISJUNTOR_LIMITE_FALHAS: int = 5
+    # Tempo (em segundos) com o circuito aberto antes de liberar uma requisição de teste
+    FLUIG_DISJUNTOR_TEMPO_ABERTO_SEGUNDOS: float = 30.0
+    # Prazo (em segundos) da busca de detalhes de cada chamado nas listagens do webapp (contado após a vaga do fan-out)
+    FLUIG_PRAZO_DETALHES_CHAMADOS_SEGUNDOS: float = 10.0
+    #-----------------------------------------------------------------------
+
+    #-------------------------CACHE DE DATASETS (Dataset_config)-----------
+    # Habilita o cache em memória das buscas de dataset (colleague, ds_funcionarios...)
+    DATASET_CACHE_ENABLED: str = "true"
+    # Validade (em segundos) de uma busca com resultado
+    DATASET_CACHE_TTL_SEGUNDOS: int = 900
+    # Validade (em segundos) de uma busca sem resultado ("não encontrado")
+    DATASET_CACHE_TTL_NEGATIVO_SEGUNDOS: int = 60
+    # Máximo de buscas mantidas em memória (as menos usadas são descartadas)
+    DATASET_CACHE_MAX_ENTRADAS: int = 2000
+    # Máximo de itens aceitos por chamada em /datasets/buscar-lote
+    DATASET_LOTE_MAX_ITENS: int = 500
+    # Buscas simultâneas ao Fluig durante um lote
+    DATASET_LOTE_MAX_CONCORRENCIA: int = 10
+    #-----------------------------------------------------------------------
+
+    #-------------------------DETALHES DE SERVIÇO (catálogo)---------------
+    # Validade (em segundos) em memória dos detalhes de serviços fora do snapshot do catálogo (0 = sempre busca no Fluig)
+    SERVICO_DETALHES_TTL_SEGUNDOS: int = 3600
+    # Validade (em segundos) de uma busca sem resultado
+    SERVICO_DETALHES_TTL_NEGATIVO_SEGUNDOS: int = 60
+    # Máximo de serviços mantidos em memória
+    SERVICO_DETALHES_MAX_ENTRADAS: int = 500
+    #-----------------------------------------------------------------------
+
+    #-------------------------CACHE DAS FILAS DE CHAMADOS (webapp)--------
+    # Idade (em segundos) até a qual /api/chamados/fila e /grupo-itsm-todos respondem do cache sem atualizar
+    FILA_CACHE_TTL_SEGUNDOS: int = 300
+    # Idade máxima (em segundos) em que a fila vencida ainda é servida enquanto atualiza em background
+    FILA_CACHE_MAX_OBSOLETO_SEGUNDOS: int = 1800
+    # Máximo de filas (usuários + grupo) mantidas em memória
+    FILA_CACHE_MAX_ENTRADAS: int = 200
+    # Máximo de bytes (JSON serializado) somando todas as filas
+    FILA_CACHE_MAX_BYTES: int = 67108864
+    #-----------------------------------------------------------------------
+
+    #-------------------------FILAS EM TEMPO REAL (SSE /api/chamados/eventos)
+    # Um poller por fila distinta envia aos navegadores só os chamados adicionados/removidos/alterados
+    FILA_PUSH_ENABLED: str = "true"
+    # Intervalo (em segundos) entre recargas de cada fila com inscritos
+    FILA_PUSH_INTERVALO_SEGUNDOS: float = 30.0
+    # Tempo (em segundos) sem inscritos até o poller da fila ser encerrado
+    FILA_PUSH_OCIOSIDADE_SEGUNDOS: float = 120.0
+    # Intervalo (em segundos) dos comentários de keepalive na conexão SSE
+    FILA_PUSH_KEEPALIVE_SEGUNDOS: float = 15.0
+    #-----------------------------------------------------------------------
+
+    #-------------------------FILAS MATERIALIZADAS (pré-carga em background)
+    # Mantém no cache das filas a resposta pronta da fila do grupo e de cada usuário ativo
+    FILA_MATERIALIZADA_ENABLED: str = "true"
+    # Intervalo (em segundos) entre recargas de cada fila; menor que FILA_CACHE_TTL_SEGUNDOS para as consultas serem hit
+    FILA_MATERIALIZADA_INTERVALO_SEGUNDOS: float = 120.0
+    # Variação relativa do intervalo (0.2 = ±20%) para espalhar as recargas
+    FILA_MATERIALIZADA_JITTER: float = 0.2
+    # Horas desde o último acesso ao webapp em que a fila do usuário continua sendo mantida
+    FILA_MATERIALIZADA_ATIVIDADE_HORAS: float = 12.0
+    # Máximo de filas de usuário mantidas (as de acesso mais antigo saem primeiro)
+    FILA_MATERIALIZADA_MAX_USUARIOS: int = 150
+    # Recargas de fila simultâneas
+    FILA_MATERIALIZADA_CONCORRENCIA: int = 4
+    #-----------------------------------------------------------------------
+
+    #-------------------------CACHE DE DETALHES DE CHAMADOS----------------
+    # Reaproveita os detalhes de chamados que não mudaram (movementSequence/estado da listagem de tasks)
+    CHAMADO_DETALHES_CACHE_ENABLED: str = "true"
+    # Máximo de chamados mantidos em memória
+    CHAMADO_DETALHES_CACHE_MAX_ENTRADAS: int = 5000
+    # Idade máxima (em segundos) dos detalhes mesmo sem mudança na task
+    CHAMADO_DETALHES_CACHE_TTL_SEGUNDOS: int = 3600
+    #-----------------------------------------------------------------------
+
+    #-------------------------SINCRONIZAÇÃO DO CATÁLOGO DE SERVIÇOS--------
+    # Baixa o dataset ITSM_Catalogo_Servico completo em background (src/json/catalogo_servicos_{ambiente}.json)
+    CATALOGO_SYNC_ENABLED: str = "true"
+    # Ambientes sincronizados (separados por vírgula)
+    CATALOGO_SYNC_AMBIENTES: str = "PRD"
+    # Intervalo entre sincronizações (em minutos)
+    CATALOGO_SYNC_INTERVALO_MINUTOS: float = 360.0
+    # documentids por página na listagem do catálogo
+    CATALOGO_SYNC_TAMANHO_PAGINA: int = 500
+    # Serviços por requisição de detalhes (constraints SHOULD de documentid na mesma consulta)
+    CATALOGO_SYNC_TAMANHO_LOTE: int = 50
+    #-----------------------------------------------------------------------
+
+    #-------------------------DIRETÓRIO LOCAL DE COLABORADORES-------------
+    # Sincroniza os datasets de usuários em background e responde Dataset_config localmente
+    DIRETORIO_COLABORADORES_ENABLED: str = "true"
+    # Ambientes sincronizados (separados por vírgula)
+    DIRETORIO_COLABORADORES_AMBIENTES: str = "PRD"
+    # Datasets sincronizados (separados por vírgula): colleague e/ou ds_funcionarios
+    DIRETORIO_COLABORADORES_DATASETS: str = "colleague"
+    # Intervalo entre sincronizações (em minutos)
+    DIRETORIO_COLABORADORES_INTERVALO_MINUTOS: float = 360.0
+    # Registros por página na sincronização
+    DIRETORIO_COLABORADORES_TAMANHO_PAGINA: int = 500
+    #-----------------------------------------------------------------------
+
+    #-------------------------MÉTRICAS (GET /metrics)----------------------
+    # Coleta de métricas no formato Prometheus (latência do Fluig, Drive, Gmail, rotas e loops)
+    METRICAS_ENABLED: str = "true"
+    #-----------------------------------------------------------------------
+
+    #-------------------------RASTREAMENTO (traces por email)---------------
+    # Rastro por email processado (Gmail → chamado → histórico → notificação)
+    RASTREAMENTO_ENABLED: str = "true"
+    # Fração dos emails rastreados (0.0 a 1.0)
+    RASTREAMENTO_TAXA_AMOSTRAGEM: float = 1.0
+    # Quantidade de rastros mantidos em memória (GET /fluig/diagnostico/rastros)
+    RASTREAMENTO_MAX_RASTROS: int = 200
+    # Arquivo JSONL onde cada rastro é gravado (vazio = apenas em memória)
+    RASTREAMENTO_ARQUIVO: str = ""
+    #-----------------------------------------------------------------------
+
     #-------------------------FORESCOUT API (Integração Forescout)---------
     # Credenciais para autenticação na API do Forescout
     # Host do servidor Forescout (ex: forescout.example.com)
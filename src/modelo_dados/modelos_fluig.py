@@ -54,6 +54,10 @@ class Datasets(BaseModel):
     dataset_id: str
     user: str
 
+# Dados para a rota fluig/{ambiente}/datasets/buscar-lote
+class DatasetsLote(BaseModel):
+    itens: list[Datasets]
+
 def DatasetConfig():
     return {
         'colleague': {
@@ -4,8 +4,9 @@ from src.modelo_dados.modelos_fluig import AberturaChamadoClassificado, Detalhes
 from src.web.web_auth_manager import obter_cookies_validos
 from src.utilitarios_centrais.logger import logger
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
-from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_core_async import AsyncFluigCore
 from src.historico_monitor.historico_manager import HistoricoManager
+import asyncio
 import base64
 
 rt_fluig_chamados = APIRouter(prefix="/fluig/{ambiente}/chamados", tags=["fluig-chamados"])
@@ -78,8 +79,8 @@ async def AberturaDeChamados(
                     logger.error(f"[Anexos] Erro ao processar anexo {anexo.nome}: {str(e)} - continuando sem anexo")
         
         # 2. Abrir chamado normalmente
-        fluig_core = FluigCore(ambiente=ambiente_validado)
-        resposta = fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=Item)
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        resposta = await fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=Item)
         
         if resposta.get('sucesso'):
             dados = resposta.get('dados', {})
@@ -105,7 +106,7 @@ async def AberturaDeChamados(
                         for arquivo in arquivos_processados:
                             try:
                                 logger.info(f"[Anexos] Fazendo upload do arquivo: {arquivo['nome']}")
-                                resultado_upload = fluig_core.upload_arquivo_fluig(
+                                resultado_upload = await fluig_core.upload_arquivo_fluig(
                                     arquivo_bytes=arquivo['bytes'],
                                     nome_arquivo=arquivo['nome'],
                                     colleague_id=colleague_id
@@ -116,7 +117,7 @@ async def AberturaDeChamados(
                                     
                                     # Anexa ao chamado
                                     logger.info(f"[Anexos] Anexando arquivo {arquivo['nome']} ao chamado {process_instance_id}")
-                                    sucesso_anexo = fluig_core.anexar_arquivo_chamado(
+                                    sucesso_anexo = await fluig_core.anexar_arquivo_chamado(
                                         process_instance_id=process_instance_id,
                                         nome_arquivo=arquivo['nome']
                                     )
@@ -208,8 +209,8 @@ async def AberturaDeChamadosClassificado(
                     logger.error(f"[Anexos] Erro ao processar anexo {anexo.nome}: {str(e)} - continuando sem anexo")
         
         # 2. Abrir chamado classificado
-        fluig_core = FluigCore(ambiente=ambiente_validado)
-        resposta = fluig_core.AberturaDeChamado(tipo_chamado="classificado", Item=Item)
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        resposta = await fluig_core.AberturaDeChamado(tipo_chamado="classificado", Item=Item)
                 
         if not resposta.get('sucesso'):
             logger.error(f"[AberturaDeChamadosClassificado] Falha ao abrir chamado - Status: {resposta.get('status_code')}")
@@ -241,7 +242,7 @@ async def AberturaDeChamadosClassificado(
                     for arquivo in arquivos_processados:
                         try:
                             logger.info(f"[Anexos] Fazendo upload do arquivo: {arquivo['nome']}")
-                            resultado_upload = fluig_core.upload_arquivo_fluig(
+                            resultado_upload = await fluig_core.upload_arquivo_fluig(
                                 arquivo_bytes=arquivo['bytes'],
                                 nome_arquivo=arquivo['nome'],
                                 colleague_id=colleague_id
@@ -252,7 +253,7 @@ async def AberturaDeChamadosClassificado(
                                 
                                 # Anexa ao chamado
                                 logger.info(f"[Anexos] Anexando arquivo {arquivo['nome']} ao chamado {process_instance_id}")
-                                sucesso_anexo = fluig_core.anexar_arquivo_chamado(
+                                sucesso_anexo = await fluig_core.anexar_arquivo_chamado(
                                     process_instance_id=process_instance_id,
                                     nome_arquivo=arquivo['nome']
                                 )
@@ -346,19 +347,15 @@ async def BuscarDetalhesChamado(
             usuario = ConfigEnvSetings.FLUIG_ADMIN_USER
             senha = ConfigEnvSetings.FLUIG_ADMIN_PASS
 
-        cookies = obter_cookies_validos(ambiente_validado, forcar_login=False, usuario=usuario, senha=senha)
+        cookies = await asyncio.to_thread(obter_cookies_validos, ambiente_validado, forcar_login=False, usuario=usuario, senha=senha)
         
         if not cookies:
             logger.error("[BuscarDetalhesChamado] Falha ao obter autenticação válida")
             raise HTTPException(status_code=500, detail="Falha ao obter autenticação válida no Fluig")
 
         logger.info(f"[BuscarDetalhesChamado] Buscando detalhes...")
-        fluig_core = FluigCore(ambiente=ambiente_validado)
-        detalhes = fluig_core.obter_detalhes_chamado(
-            process_instance_id=Item.process_instance_id,
-            cookies_list=cookies,
-            usuario=usuario
-        )
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        detalhes = await fluig_core.obter_detalhes_chamado(process_instance_id=Item.process_instance_id)
         
         if not detalhes:
             logger.error("[BuscarDetalhesChamado] Falha ao obter detalhes do chamado")
@@ -437,8 +434,8 @@ async def AberturaDeChamadosEmail(
             anexos=Item.anexos
         )
         
-        fluig_core = FluigCore(ambiente=ambiente_validado)
-        resposta = fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=item_chamado)
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        resposta = await fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=item_chamado)
         
         if resposta.get('sucesso'):
             dados = resposta.get('dados', {})
@@ -453,13 +450,15 @@ async def AberturaDeChamadosEmail(
                 # 3. Salva histórico inicial do chamado (chamados abertos via email são monitorados)
                 try:
                     logger.info(f"[AberturaDeChamadosEmail] Salvando histórico inicial do chamado {process_instance_id}...")
-                    historico_manager = HistoricoManager()
+                    historico_manager = await asyncio.to_thread(HistoricoManager)
                     
                     # Obtém histórico inicial do Fluig
-                    historico_inicial = fluig_core.obter_historico_chamado(process_instance_id)
+                    historico_inicial = await fluig_core.obter_historico_chamado(process_instance_id)
                     
                     if historico_inicial:
-                        sucesso_salvamento = historico_manager.salvar_historico(
+                        # Gravação no Google Drive é bloqueante: roda fora do event loop
+                        sucesso_salvamento = await asyncio.to_thread(
+                            historico_manager.salvar_historico,
                             process_instance_id=process_instance_id,
                             historico_data=historico_inicial,
                             ambiente=ambiente_validado,
@@ -491,7 +490,7 @@ async def AberturaDeChamadosEmail(
                         for arquivo in arquivos_processados:
                             try:
                                 logger.info(f"[Anexos] Fazendo upload do arquivo: {arquivo['nome']}")
-                                resultado_upload = fluig_core.upload_arquivo_fluig(
+                                resultado_upload = await fluig_core.upload_arquivo_fluig(
                                     arquivo_bytes=arquivo['bytes'],
                                     nome_arquivo=arquivo['nome'],
                                     colleague_id=colleague_id
@@ -502,7 +501,7 @@ async def AberturaDeChamadosEmail(
                                     
                                     # Anexa ao chamado
                                     logger.info(f"[Anexos] Anexando arquivo {arquivo['nome']} ao chamado {process_instance_id}")
-                                    sucesso_anexo = fluig_core.anexar_arquivo_chamado(
+                                    sucesso_anexo = await fluig_core.anexar_arquivo_chamado(
                                         process_instance_id=process_instance_id,
                                         nome_arquivo=arquivo['nome']
                                     )
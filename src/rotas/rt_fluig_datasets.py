@@ -1,8 +1,13 @@
+import asyncio
+import uuid
+from typing import Any, Dict, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Path
 from src.auth.auth_api import Auth_API_KEY
-from src.modelo_dados.modelos_fluig import Datasets
+from src.modelo_dados.modelos_fluig import Datasets, DatasetsLote
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.utilitarios_centrais.logger import logger
-from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_core_async import AsyncFluigCore
+from src.fluig.fluig_limitador import get_limitador_fanout
 
 rt_fluig_datasets = APIRouter(prefix="/fluig/{ambiente}/datasets", tags=["fluig-datasets"])
 
@@ -43,8 +48,8 @@ async def BuscarDataset(
     try:
         logger.info(f"[BuscarDataset] Iniciando busca - Dataset: {Item.dataset_id}, User: {Item.user}, Ambiente: {ambiente_validado}")
         
-        fluig_core = FluigCore(ambiente=ambiente_validado)
-        resultado = fluig_core.Dataset_config(dataset_id=Item.dataset_id, user=Item.user)
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        resultado = await fluig_core.Dataset_config(dataset_id=Item.dataset_id, user=Item.user)
         
         logger.info(f"[BuscarDataset] Busca concluída com sucesso")
         return resultado
@@ -56,3 +61,95 @@ async def BuscarDataset(
         logger.error(f"[BuscarDataset] Erro inesperado: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
 
+
+
+def _chave_lote(item: Datasets) -> Tuple[str, str]:
+    """Chave de de-duplicação do lote (mesmo dataset e mesmo usuário, sem diferença de caixa/espaços)"""
+    return (item.dataset_id, item.user.strip().casefold())
+
+
+async def _resolver_item_lote(fluig_core: AsyncFluigCore, item: Datasets, semaforo: asyncio.Semaphore, chamador: str) -> Dict[str, Any]:
+    """
+    Resolve um item do lote, convertendo falhas em erro do próprio item
+
+    Returns:
+        {"sucesso": True, "dados": ...} ou {"sucesso": False, "erro": ..., "status_code": ...}
+    """
+    async with semaforo, get_limitador_fanout().vaga(chamador):
+        try:
+            resultado = await fluig_core.Dataset_config(dataset_id=item.dataset_id, user=item.user)
+        except ValueError as e:
+            return {"sucesso": False, "status_code": 400, "erro": str(e)}
+        except Exception as e:
+            logger.error(f"[BuscarDatasetLote] Erro ao buscar {item.dataset_id}/{item.user}: {str(e)}")
+            return {"sucesso": False, "status_code": 500, "erro": f"Erro ao consultar o Fluig: {str(e)}"}
+
+    # Dataset_config devolve a própria resposta HTTP em caso de erro do Fluig
+    if hasattr(resultado, 'status_code'):
+        return {"sucesso": False, "status_code": resultado.status_code, "erro": f"Erro HTTP {resultado.status_code} na consulta ao Fluig"}
+    return {"sucesso": True, "dados": resultado}
+
+
+@rt_fluig_datasets.post("/buscar-lote")
+async def BuscarDatasetLote(
+    Item: DatasetsLote,
+    ambiente: str = Path(..., description="Ambiente do Fluig (prd ou qld)"),
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Consulta vários usuários em datasets do Fluig em uma única chamada
+
+    **Funcionalidades:**
+    - Itens repetidos (mesmo dataset e usuário, ignorando caixa/espaços) são consultados uma única vez
+    - Consultas ao Fluig em paralelo, limitadas por DATASET_LOTE_MAX_CONCORRENCIA
+    - Passa pelo diretório local e pelo cache de datasets, como /buscar
+    - Erro em um item não interrompe o lote: cada resultado indica seu próprio sucesso/erro
+
+    Args:
+        Item: Objeto contendo:
+            - itens: Lista de {dataset_id, user}
+        ambiente: Ambiente do Fluig (prd ou qld)
+
+    Returns:
+        dict: Totais e lista de resultados na mesma ordem dos itens enviados
+    """
+    ambiente_validado = validar_ambiente(ambiente)
+
+    max_itens = int(getattr(ConfigEnvSetings, 'DATASET_LOTE_MAX_ITENS', 500))
+    if len(Item.itens) > max_itens:
+        raise HTTPException(status_code=400, detail=f"Lote com {len(Item.itens)} itens excede o máximo de {max_itens}")
+
+    try:
+        unicos: Dict[Tuple[str, str], Datasets] = {}
+        for item in Item.itens:
+            unicos.setdefault(_chave_lote(item), item)
+
+        logger.info(f"[BuscarDatasetLote] Iniciando lote - Itens: {len(Item.itens)}, Únicos: {len(unicos)}, Ambiente: {ambiente_validado}")
+
+        fluig_core = AsyncFluigCore(ambiente=ambiente_validado)
+        semaforo = asyncio.Semaphore(max(1, int(getattr(ConfigEnvSetings, 'DATASET_LOTE_MAX_CONCORRENCIA', 10))))
+        # Cada lote é um chamador próprio no limitador global de fan-out
+        chamador = f"datasets_lote:{uuid.uuid4().hex[:8]}"
+        respostas = await asyncio.gather(
+            *[_resolver_item_lote(fluig_core, item, semaforo, chamador) for item in unicos.values()]
+        )
+        por_chave = dict(zip(unicos.keys(), respostas))
+
+        resultados = [
+            {"dataset_id": item.dataset_id, "user": item.user, **por_chave[_chave_lote(item)]}
+            for item in Item.itens
+        ]
+        erros = sum(1 for r in resultados if not r["sucesso"])
+
+        logger.info(f"[BuscarDatasetLote] Lote concluído - Itens: {len(resultados)}, Erros: {erros}")
+        return {
+            "total": len(resultados),
+            "unicos": len(unicos),
+            "sucesso": len(resultados) - erros,
+            "erros": erros,
+            "resultados": resultados,
+        }
+
+    except Exception as e:
+        logger.error(f"[BuscarDatasetLote] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
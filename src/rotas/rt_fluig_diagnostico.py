@@ -0,0 +1,465 @@
+"""Rotas de diagnóstico da integração com o Fluig"""
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from src.auth.auth_api import Auth_API_KEY
+from src.fluig.fluig_pool import obter_estatisticas_pool
+from src.fluig.fluig_cache import get_cache_datasets, get_cache_detalhes_chamados, get_cache_filas_chamados, get_coalescedor_get, obter_estatisticas_coalescencia
+from src.fluig.fluig_catalogo import get_catalogo_servicos, get_sincronizador_catalogo
+from src.fluig.fluig_diretorio import get_diretorio_colaboradores
+from src.fluig.fluig_limitador import get_limitador_fanout, get_limitador_fluig, obter_estatisticas_limitador
+from src.fluig.fluig_resiliencia import disjuntor_habilitado, obter_estado_disjuntores
+from src.site.filas_materializadas import get_atualizador_filas
+from src.site.filas_push import get_publicador_filas
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.rastreamento import exportar_rastros, rastreamento_habilitado
+
+rt_fluig_diagnostico = APIRouter(prefix="/fluig/diagnostico", tags=["fluig-diagnostico"])
+
+
+@rt_fluig_diagnostico.get("/pool")
+async def EstatisticasPool(
+    ambiente: Optional[str] = None,
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna as estatísticas do pool de conexões HTTP com o Fluig
+
+    **Campos por ambiente:**
+    - tamanho_pool: Máximo de conexões keep-alive mantidas
+    - em_uso: Conexões emprestadas no momento
+    - ociosas: Conexões abertas aguardando reutilização
+    - conexoes_reutilizadas: Requisições que reaproveitaram uma conexão aberta
+    - conexoes_novas: Requisições que precisaram abrir conexão (handshake TCP/TLS)
+
+    Args:
+        ambiente: Filtra por ambiente (prd ou qld). Se omitido, retorna todos
+
+    Returns:
+        dict: Estatísticas por ambiente
+    """
+    try:
+        return obter_estatisticas_pool(ambiente.upper() if ambiente else None)
+    except Exception as e:
+        logger.error(f"[EstatisticasPool] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/coalescencia")
+async def EstatisticasCoalescencia(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna as estatísticas de coalescência de GETs ao Fluig
+
+    GETs idênticos (mesmo ambiente, URL e parâmetros) feitos ao mesmo tempo
+    compartilham uma única requisição.
+
+    **Campos (sync = FluigCore, async = AsyncFluigCore):**
+    - execucoes: Requisições realmente enviadas ao Fluig
+    - coalescidas: Chamadas atendidas pela requisição idêntica já em andamento
+    - em_voo: Requisições em andamento no momento
+
+    Returns:
+        dict: Estatísticas por tipo de cliente
+    """
+    try:
+        return {"habilitado": get_coalescedor_get() is not None, **obter_estatisticas_coalescencia()}
+    except Exception as e:
+        logger.error(f"[EstatisticasCoalescencia] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/limitador")
+async def EstatisticasLimitador(
+    ambiente: Optional[str] = None,
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna o estado do limitador de taxa das requisições ao Fluig
+
+    Cada requisição consome um token do ambiente; sem tokens, aguarda em fila
+    por prioridade (interativa > lote > background).
+
+    Em "fanout", o teto global de requisições simultâneas dos fan-outs
+    assíncronos (detalhes das filas do webapp, datasets em lote), com vagas
+    em uso, fila por chamador e tempo de espera.
+
+    **Campos por prioridade:**
+    - requisicoes: Requisições liberadas
+    - aguardaram: Requisições que precisaram esperar na fila
+    - em_espera: Requisições na fila no momento
+    - desistiram: Requisições que saíram da fila sem token porque o prazo (prazo_fluig) não comportava a espera
+    - tempo_fila_medio_segundos / tempo_fila_max_segundos: Tempo em fila
+
+    Args:
+        ambiente: Filtra por ambiente (prd ou qld). Se omitido, retorna todos
+
+    Returns:
+        dict: Estatísticas por ambiente
+    """
+    try:
+        return {
+            "habilitado": get_limitador_fluig() is not None,
+            "ambientes": obter_estatisticas_limitador(ambiente),
+            "fanout": get_limitador_fanout().estatisticas()
+        }
+    except Exception as e:
+        logger.error(f"[EstatisticasLimitador] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+@rt_fluig_diagnostico.get("/disjuntores")
+async def EstadoDisjuntores(
+    ambiente: Optional[str] = None,
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna o estado dos circuit breakers das requisições ao Fluig
+
+    Há um disjuntor por ambiente e família de endpoint (tasks, historico,
+    dataset, processo, upload, outros), criado na primeira requisição.
+
+    **Campos por família:**
+    - estado: fechado, aberto (falha na hora) ou meio_aberto (aguardando requisição de teste)
+    - falhas_consecutivas: Falhas desde o último sucesso
+    - reabre_em_segundos: Tempo até a requisição de teste (apenas aberto)
+    - aberturas / rejeitadas: Vezes que abriu e requisições recusadas com o circuito aberto
+    - ultimo_erro: Última falha registrada
+
+    Args:
+        ambiente: Filtra por ambiente (prd ou qld). Se omitido, retorna todos
+
+    Returns:
+        dict: Estado por ambiente e família
+    """
+    try:
+        return {"habilitado": disjuntor_habilitado(), "ambientes": obter_estado_disjuntores(ambiente)}
+    except Exception as e:
+        logger.error(f"[EstadoDisjuntores] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+@rt_fluig_diagnostico.get("/cache-datasets")
+async def EstatisticasCacheDatasets(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna as estatísticas do cache de buscas de dataset (Dataset_config)
+
+    **Campos:**
+    - tamanho: Buscas armazenadas no momento
+    - hits / misses: Consultas respondidas pelo cache / pelo Fluig
+    - hits_negativos: Hits em buscas sem resultado ("não encontrado")
+    - coalescidos: Consultas que aguardaram uma busca idêntica já em andamento
+    - expirados / descartados: Entradas removidas por TTL / por limite (LRU)
+    - taxa_acerto: (hits + coalescidos) / total de consultas
+
+    Returns:
+        dict: Estatísticas do cache ou {"habilitado": false}
+    """
+    try:
+        cache = get_cache_datasets()
+        if cache is None:
+            return {"habilitado": False}
+        return {"habilitado": True, **cache.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasCacheDatasets] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.delete("/cache-datasets")
+async def LimparCacheDatasets(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Esvazia o cache de buscas de dataset (ex.: após alteração de usuários no Fluig)
+
+    Returns:
+        dict: Quantidade de entradas removidas
+    """
+    try:
+        cache = get_cache_datasets()
+        removidas = cache.invalidar() if cache is not None else 0
+        logger.info(f"[LimparCacheDatasets] Cache de datasets esvaziado - {removidas} entradas removidas")
+        return {"removidas": removidas}
+    except Exception as e:
+        logger.error(f"[LimparCacheDatasets] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/cache-filas")
+async def EstatisticasCacheFilas(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna as estatísticas do cache das filas do webapp (/api/chamados/fila e /grupo-itsm-todos)
+
+    **Campos:**
+    - tamanho / bytes: Filas armazenadas e bytes ocupados (limites em max_entradas / max_bytes)
+    - hits: Respostas dentro de ttl_segundos
+    - obsoletos: Respostas vencidas servidas enquanto a fila atualizava em background
+    - misses / coalescidos: Cargas sem entrada no cache / consultas que aguardaram a mesma carga
+    - atualizacoes / erros_atualizacao: Cargas executadas e quantas falharam
+    - recusados: Filas não guardadas por terem chamados sem detalhes (falha ou prazo esgotado)
+    - em_voo: Cargas em andamento (no máximo uma por fila)
+
+    Returns:
+        dict: Estatísticas do cache
+    """
+    try:
+        return get_cache_filas_chamados().estatisticas()
+    except Exception as e:
+        logger.error(f"[EstatisticasCacheFilas] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.delete("/cache-filas")
+async def LimparCacheFilas(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Esvazia o cache das filas do webapp (a próxima consulta de cada fila vai ao Fluig)
+
+    Returns:
+        dict: Quantidade de entradas removidas
+    """
+    try:
+        removidas = get_cache_filas_chamados().invalidar()
+        logger.info(f"[LimparCacheFilas] Cache das filas esvaziado - {removidas} entradas removidas")
+        return {"removidas": removidas}
+    except Exception as e:
+        logger.error(f"[LimparCacheFilas] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/cache-detalhes-chamados")
+async def EstatisticasCacheDetalhesChamados(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna as estatísticas do cache de detalhes de chamados (filas do webapp)
+
+    **Campos:**
+    - hits: Detalhes reaproveitados (versão da task igual à salva)
+    - misses / alterados / expirados: Chamados sem entrada, que se moveram ou com entrada vencida
+    - cargas / coalescidos: Buscas feitas no Fluig / consultas que aguardaram a mesma busca
+    - invalidados: Entradas removidas pelo monitor de histórico ou manualmente
+
+    Returns:
+        dict: Estatísticas do cache (ou {"habilitado": false})
+    """
+    try:
+        cache = get_cache_detalhes_chamados()
+        if cache is None:
+            return {"habilitado": False}
+        return {"habilitado": True, **cache.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasCacheDetalhesChamados] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.delete("/cache-detalhes-chamados")
+async def LimparCacheDetalhesChamados(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Esvazia o cache de detalhes de chamados (a próxima carga de fila busca todos no Fluig)
+
+    Returns:
+        dict: Quantidade de entradas removidas
+    """
+    try:
+        cache = get_cache_detalhes_chamados()
+        removidas = cache.invalidar() if cache is not None else 0
+        logger.info(f"[LimparCacheDetalhesChamados] Cache de detalhes esvaziado - {removidas} entradas removidas")
+        return {"removidas": removidas}
+    except Exception as e:
+        logger.error(f"[LimparCacheDetalhesChamados] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/filas-push")
+async def EstatisticasFilasPush(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna o estado dos pollers das filas em tempo real (/api/chamados/eventos)
+
+    **Campos:**
+    - filas: Um item por fila com poller (inscritos, chamados, versão, recargas, erros)
+    - desinscritos_por_atraso: Conexões derrubadas por não acompanharem os eventos
+
+    Returns:
+        dict: Estado do publicador (ou {"habilitado": false})
+    """
+    try:
+        publicador = get_publicador_filas()
+        if publicador is None:
+            return {"habilitado": False}
+        return {"habilitado": True, **publicador.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasFilasPush] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/filas-materializadas")
+async def EstatisticasFilasMaterializadas(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna o estado das filas do webapp mantidas em background
+
+    **Campos:**
+    - filas: Uma por fila mantida (fixa = grupo), com idade no cache e próxima recarga
+    - puladas: Rodadas em que a fila já tinha sido recarregada por outro caminho
+    - usuarios: Usuários com acesso dentro de atividade_segundos (limite em max_usuarios)
+
+    Returns:
+        dict: Estado do atualizador (ou {"habilitado": false})
+    """
+    try:
+        atualizador = get_atualizador_filas()
+        if atualizador is None:
+            return {"habilitado": False}
+        return {"habilitado": True, **atualizador.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasFilasMaterializadas] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/diretorio")
+async def EstatisticasDiretorio(
+    ambiente: str = "prd",
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna o estado do diretório local de colaboradores
+
+    **Campos:**
+    - datasets: Registros e termos indexados por dataset, com a data da última sincronização
+    - hits / misses: Buscas de Dataset_config respondidas localmente / enviadas ao Fluig
+    - ultima_sincronizacao: Incluídos, alterados e removidos por dataset no último ciclo
+
+    Args:
+        ambiente: Ambiente (prd ou qld)
+
+    Returns:
+        dict: Estatísticas do diretório ou {"habilitado": false}
+    """
+    try:
+        diretorio = get_diretorio_colaboradores(ambiente)
+        if diretorio is None:
+            return {"habilitado": False}
+        return {"habilitado": True, "ambiente": diretorio.ambiente, **diretorio.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasDiretorio] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.post("/diretorio/sincronizar")
+async def SincronizarDiretorio(
+    ambiente: str = "prd",
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Dispara uma sincronização imediata do diretório de colaboradores (em background)
+
+    Args:
+        ambiente: Ambiente (prd ou qld)
+
+    Returns:
+        dict: Confirmação do disparo
+    """
+    diretorio = get_diretorio_colaboradores(ambiente)
+    if diretorio is None:
+        raise HTTPException(status_code=404, detail=f"Diretório de colaboradores não iniciado para o ambiente {ambiente.upper()}")
+
+    try:
+        threading.Thread(
+            target=diretorio.sincronizar,
+            name=f"DiretorioColaboradores_{diretorio.ambiente}_manual",
+            daemon=True
+        ).start()
+        logger.info(f"[SincronizarDiretorio] Sincronização manual disparada - Ambiente: {diretorio.ambiente}")
+        return {"sincronizacao_iniciada": True, "ambiente": diretorio.ambiente}
+    except Exception as e:
+        logger.error(f"[SincronizarDiretorio] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/catalogo")
+async def EstatisticasCatalogo(
+    ambiente: str = "prd",
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna o estado do catálogo de serviços local
+
+    **Campos:**
+    - origem: Arquivo carregado (snapshot catalogo_servicos_{ambiente}.json ou a lista servicos_{ambiente}.json)
+    - revisao / sincronizado_em: Revisão do snapshot e data da sincronização que a gerou
+    - servicos / recargas: Serviços indexados e quantas vezes o arquivo foi recarregado
+    - ultima_sincronizacao: Incluídos, alterados, removidos e requisições de detalhes no último ciclo
+
+    Args:
+        ambiente: Ambiente (prd ou qld)
+
+    Returns:
+        dict: Estatísticas do catálogo (habilitado indica se a sincronização está ativa)
+    """
+    try:
+        sincronizador = get_sincronizador_catalogo(ambiente)
+        if sincronizador is None:
+            return {"habilitado": False, **get_catalogo_servicos(ambiente).estatisticas()}
+        return {"habilitado": True, **sincronizador.estatisticas()}
+    except Exception as e:
+        logger.error(f"[EstatisticasCatalogo] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.post("/catalogo/sincronizar")
+async def SincronizarCatalogo(
+    ambiente: str = "prd",
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Dispara uma sincronização imediata do catálogo de serviços (em background)
+
+    Args:
+        ambiente: Ambiente (prd ou qld)
+
+    Returns:
+        dict: Confirmação do disparo
+    """
+    sincronizador = get_sincronizador_catalogo(ambiente)
+    if sincronizador is None:
+        raise HTTPException(status_code=404, detail=f"Sincronização do catálogo não iniciada para o ambiente {ambiente.upper()}")
+
+    try:
+        threading.Thread(
+            target=sincronizador.sincronizar,
+            name=f"SincronizadorCatalogo_{sincronizador.ambiente}_manual",
+            daemon=True
+        ).start()
+        logger.info(f"[SincronizarCatalogo] Sincronização manual disparada - Ambiente: {sincronizador.ambiente}")
+        return {"sincronizacao_iniciada": True, "ambiente": sincronizador.ambiente}
+    except Exception as e:
+        logger.error(f"[SincronizarCatalogo] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
+
+@rt_fluig_diagnostico.get("/rastros")
+async def RastrosEmails(
+    limite: int = 20,
+    duracao_minima_ms: float = 0.0,
+    nome: Optional[str] = None,
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Retorna os rastros mais recentes do processamento de emails (mais novo primeiro)
+
+    Cada rastro cobre um email: spans das etapas (abertura do chamado, FluigCore,
+    Drive, envio de email) e as chamadas externas feitas em cada uma.
+
+    **Campos por rastro:**
+    - duracao_ms / atributos: Duração total, thread_id, remetente, resultado, process_instance_id
+    - chamadas_externas: Total, tempo e operações por serviço (fluig, drive, gmail, people)
+    - spans: id, pai, nome, inicio_ms (relativo ao início do rastro), duracao_ms, erro
+
+    Args:
+        limite: Quantidade máxima de rastros
+        duracao_minima_ms: Retorna só rastros com pelo menos essa duração
+        nome: Filtra pelo nome do rastro (ex.: email)
+
+    Returns:
+        dict: Rastros em memória
+    """
+    try:
+        return {
+            "habilitado": rastreamento_habilitado(),
+            "rastros": exportar_rastros(limite, duracao_minima_ms, nome)
+        }
+    except Exception as e:
+        logger.error(f"[RastrosEmails] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
@@ -4,7 +4,7 @@ Permite iniciar qualquer processo/formulário do Fluig com payload genérico
 """
 from fastapi import APIRouter, Depends, HTTPException, Path, UploadFile, File, Form, Request, Header
 from src.auth.auth_api import Auth_API_KEY
-from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_core_async import AsyncFluigCore
 from src.utilitarios_centrais.logger import logger
 from src.modelo_dados.modelos_fluig import AnexoBase64
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
@@ -111,11 +111,11 @@ async def iniciar_processo_fluig(
                 detail="payload é obrigatório e não pode estar vazio"
             )
         
-        # Inicializa FluigCore
-        fluig = FluigCore(ambiente=ambiente_validado)
+        # Inicializa AsyncFluigCore
+        fluig = AsyncFluigCore(ambiente=ambiente_validado)
         
         # Inicia o processo
-        resultado = fluig.IniciarProcesso(
+        resultado = await fluig.IniciarProcesso(
             process_id=process_id,
             payload=dados.payload
         )
@@ -222,8 +222,8 @@ async def upload_arquivo_fluig(
         
         logger.info(f"[upload_arquivo_fluig] Usando colleague_id: {colleague_id}")
         
-        # Inicializa FluigCore
-        fluig = FluigCore(ambiente=ambiente_validado)
+        # Inicializa AsyncFluigCore
+        fluig = AsyncFluigCore(ambiente=ambiente_validado)
         
         # Processa cada arquivo
         arquivos_enviados = []
@@ -264,7 +264,7 @@ async def upload_arquivo_fluig(
                     continue
                 
                 # Faz upload do arquivo
-                resultado_upload = fluig.upload_arquivo_fluig(
+                resultado_upload = await fluig.upload_arquivo_fluig(
                     arquivo_bytes=conteudo_bytes,
                     nome_arquivo=arquivo.nome,
                     colleague_id=colleague_id
@@ -456,12 +456,12 @@ async def anexar_arquivo_processo_upload(
                 detail="Nenhum arquivo válido fornecido"
             )
         
-        # Inicializa FluigCore
-        fluig = FluigCore(ambiente=ambiente_validado)
+        # Inicializa AsyncFluigCore
+        fluig = AsyncFluigCore(ambiente=ambiente_validado)
         
         # Obtém detalhes da atividade automaticamente para processVersion, movementSequence e attachedActivity
         logger.info(f"[anexar_arquivo_processo_upload] Obtendo detalhes da atividade para processInstanceId: {process_instance_id}")
-        detalhes_atividade = fluig.obter_detalhes_atividade(process_instance_id=process_instance_id)
+        detalhes_atividade = await fluig.obter_detalhes_atividade(process_instance_id=process_instance_id)
         
         if not detalhes_atividade:
             logger.warning(f"[anexar_arquivo_processo_upload] Não foi possível obter detalhes da atividade, usando valores padrão")
@@ -522,7 +522,7 @@ async def anexar_arquivo_processo_upload(
                 try:
                     logger.info(f"[anexar_arquivo_processo_upload] Fazendo upload do arquivo {nome_arquivo} primeiro...")
                     
-                    resultado_upload = fluig.upload_arquivo_fluig(
+                    resultado_upload = await fluig.upload_arquivo_fluig(
                         arquivo_bytes=conteudo_bytes,
                         nome_arquivo=nome_arquivo,
                         colleague_id=colleague_id
@@ -554,7 +554,7 @@ async def anexar_arquivo_processo_upload(
                 
                 # Agora anexa o arquivo ao chamado usando saveAttachments
                 # Se document_id não estiver disponível, o método usará documentId: 0
-                resultado_anexo = fluig.AnexarArquivoProcesso(
+                resultado_anexo = await fluig.AnexarArquivoProcesso(
                     process_id=process_id,
                     process_instance_id=process_instance_id,
                     nome_arquivo=nome_arquivo,
@@ -737,12 +737,12 @@ async def anexar_arquivo_processo(
         
         logger.info(f"[anexar_arquivo_processo] Total de arquivos para processar: {len(arquivos_para_processar)}")
         
-        # Inicializa FluigCore
-        fluig = FluigCore(ambiente=ambiente_validado)
+        # Inicializa AsyncFluigCore
+        fluig = AsyncFluigCore(ambiente=ambiente_validado)
         
         # Obtém detalhes da atividade automaticamente para processVersion, movementSequence e attachedActivity
         logger.info(f"[anexar_arquivo_processo] Obtendo detalhes da atividade para processInstanceId: {dados.process_instance_id}")
-        detalhes_atividade = fluig.obter_detalhes_atividade(process_instance_id=dados.process_instance_id)
+        detalhes_atividade = await fluig.obter_detalhes_atividade(process_instance_id=dados.process_instance_id)
         
         if not detalhes_atividade:
             logger.warning(f"[anexar_arquivo_processo] Não foi possível obter detalhes da atividade, usando valores padrão")
@@ -804,7 +804,7 @@ async def anexar_arquivo_processo(
                 try:
                     logger.info(f"[anexar_arquivo_processo] Fazendo upload do arquivo {nome_arquivo} primeiro...")
                     
-                    resultado_upload = fluig.upload_arquivo_fluig(
+                    resultado_upload = await fluig.upload_arquivo_fluig(
                         arquivo_bytes=conteudo_bytes,
                         nome_arquivo=nome_arquivo,
                         colleague_id=dados.colleague_id
@@ -836,7 +836,7 @@ async def anexar_arquivo_processo(
                 
                 # Agora anexa o arquivo ao chamado usando saveAttachments
                 # Se document_id não estiver disponível, o método usará documentId: 0
-                resultado_anexo = fluig.AnexarArquivoProcesso(
+                resultado_anexo = await fluig.AnexarArquivoProcesso(
                     process_id=dados.process_id,
                     process_instance_id=dados.process_instance_id,
                     nome_arquivo=nome_arquivo,
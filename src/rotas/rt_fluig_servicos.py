@@ -1,10 +1,12 @@
 """Rotas para serviços do Fluig"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Path
 from src.auth.auth_api import Auth_API_KEY
-from src.web.web_servicos_fluig import obter_servicos_fluig, obter_detalhes_servico_fluig
+from src.web.web_servicos_fluig import obter_servicos_fluig
+from src.fluig.fluig_catalogo import get_catalogo_servicos, obter_detalhes_servico
 from src.web.web_auth_manager import obter_cookies_validos
 from src.utilitarios_centrais.logger import logger
-from src.utilitarios_centrais.json_utils import salvar_servicos_json, salvar_detalhes_servico_json
+from src.utilitarios_centrais.json_utils import salvar_servicos_json
 from src.modelo_dados.modelos_fluig import DetalhesServicos
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 
@@ -84,10 +86,46 @@ async def ObterListaServicos(
         logger.error(f"[ObterListaServicos] Erro inesperado: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
 
+@rt_fluig_servicos.get("/buscar")
+async def BuscarServicos(
+    q: str,
+    ambiente: str = Path(..., description="Ambiente do Fluig (prd ou qld)"),
+    limite: int = 10,
+    api_key: str = Depends(Auth_API_KEY)
+):
+    """
+    Busca serviços do catálogo local por texto (typeahead)
+    
+    **Funcionalidades:**
+    - Pesquisa em servico, item_servico e grupo_servico, sem acento/caixa
+    - Aceita palavras incompletas (prefixo) e erros de digitação (trigramas)
+    - Resultados ordenados por relevância, sem chamada ao Fluig
+    
+    Args:
+        q: Texto digitado
+        ambiente: Ambiente do Fluig (prd ou qld)
+        limite: Quantidade máxima de resultados (padrão: 10, máximo: 50)
+    
+    Returns:
+        dict: {"servicos": [...]} com servico, documentid, grupo_servico, item_servico e pontuacao
+    """
+    ambiente_validado = validar_ambiente(ambiente)
+    try:
+        indice = await get_catalogo_servicos(ambiente_validado).indice_async()
+        if indice is None:
+            raise HTTPException(status_code=404, detail="Catálogo de serviços não encontrado")
+        return {"servicos": indice.buscar(q, limite)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[BuscarServicos] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
+
 @rt_fluig_servicos.post("/detalhes")
 async def ObterDetalhesServico(
     Item: DetalhesServicos,
     ambiente: str = Path(..., description="Ambiente do Fluig (prd ou qld)"),
+    forcar_atualizacao: bool = False,
     api_key: str = Depends(Auth_API_KEY)
 ):
     """
@@ -104,12 +142,17 @@ async def ObterDetalhesServico(
     
     **Retorno:**
     - Objeto contendo todas as informações detalhadas do serviço
-    - Dados salvos automaticamente em arquivo JSON no sistema
+    
+    **Cache:**
+    - Serviços presentes no snapshot do catálogo (sincronizado em background) são respondidos localmente
+    - Os demais ficam em memória por SERVICO_DETALHES_TTL_SEGUNDOS (mesmo resolvedor usado pelo webapp);
+      buscas simultâneas do mesmo serviço fazem uma única requisição
     
     Args:
         Item: Objeto contendo:
             - id_servico: ID único do serviço no Fluig
         ambiente: Ambiente do Fluig onde o serviço está localizado (prd ou qld)
+        forcar_atualizacao: Ignora o cache e busca no Fluig (padrão: False)
     
     Returns:
         dict: Objeto contendo todas as informações detalhadas do serviço solicitado
@@ -118,22 +161,15 @@ async def ObterDetalhesServico(
     try:
         logger.info(f"[ObterDetalhesServico] Buscando detalhes do serviço {Item.id_servico} - Ambiente: {ambiente_validado}")
 
-        usuario = ConfigEnvSetings.FLUIG_ADMIN_USER
-        senha = ConfigEnvSetings.FLUIG_ADMIN_PASS
-
-        logger.info(f"[ObterDetalhesServico] Buscando detalhes usando OAuth 1.0...")
-        detalhes = obter_detalhes_servico_fluig(
-            document_id=Item.id_servico,
-            ambiente=ambiente_validado
+        detalhes, fonte = await asyncio.to_thread(
+            obter_detalhes_servico, Item.id_servico, ambiente_validado, forcar_atualizacao
         )
         
         if not detalhes:
             logger.error("[ObterDetalhesServico] Falha ao obter detalhes do serviço")
             raise HTTPException(status_code=500, detail="Falha ao obter detalhes do serviço")
-        logger.info(f"[ObterDetalhesServico] Salvando detalhes em JSON...")
-        arquivo_salvo = salvar_detalhes_servico_json(detalhes, Item.id_servico, ambiente_validado)
         
-        logger.info(f"[ObterDetalhesServico] Detalhes obtidos e salvos com sucesso - Arquivo: {arquivo_salvo}")
+        logger.info(f"[ObterDetalhesServico] Detalhes obtidos com sucesso - Fonte: {fonte}")
         return detalhes
         
     except HTTPException:
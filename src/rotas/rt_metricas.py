@@ -0,0 +1,89 @@
+"""Rota de métricas da aplicação (formato de exposição do Prometheus)"""
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from src.auth.auth_api import Auth_API_KEY
+from src.configs import drive_config_manager
+from src.fluig.fluig_cache import get_cache_datasets, get_cache_detalhes_chamados, get_cache_filas_chamados
+from src.fluig.fluig_diretorio import get_diretorio_colaboradores
+from src.fluig.fluig_limitador import get_limitador_fanout, obter_estatisticas_limitador
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.metricas import (
+    get_registro_metricas, metricas_habilitadas, cache_bytes, cache_entradas, fanout_em_uso, fanout_fila, limitador_fila,
+    threadpool_fila,
+)
+
+rt_metricas = APIRouter(tags=["metricas"])
+
+TIPO_CONTEUDO_PROMETHEUS = "text/plain; version=0.0.4"
+
+
+def _coletar_estado():
+    """Atualiza os medidores de caches e filas a partir do estado dos outros módulos"""
+    cache_entradas.limpar()
+    cache = get_cache_datasets()
+    if cache is not None:
+        cache_entradas.definir(cache.estatisticas().get('tamanho', 0), cache="datasets")
+    detalhes = get_cache_detalhes_chamados()
+    if detalhes is not None:
+        cache_entradas.definir(detalhes.estatisticas().get('tamanho', 0), cache="detalhes_chamados")
+    cache_bytes.limpar()
+    filas = get_cache_filas_chamados().estatisticas()
+    cache_entradas.definir(filas['tamanho'], cache="filas_chamados")
+    cache_bytes.definir(filas['bytes'], cache="filas_chamados")
+    for ambiente in ("PRD", "QLD"):
+        diretorio = get_diretorio_colaboradores(ambiente)
+        if diretorio is None:
+            continue
+        for dataset_id, dados in diretorio.estatisticas()['datasets'].items():
+            cache_entradas.definir(dados['registros'], cache=f"diretorio_{ambiente.lower()}_{dataset_id}")
+    # Não inicializa o Drive só para coletar métricas
+    drive_manager = drive_config_manager._drive_config_manager
+    if drive_manager is not None:
+        cache_entradas.definir(len(getattr(drive_manager, '_pastas', {})), cache="drive_pastas")
+
+    limitador_fila.limpar()
+    for ambiente, estatisticas in obter_estatisticas_limitador().items():
+        for prioridade, dados in estatisticas['prioridades'].items():
+            limitador_fila.definir(dados['em_espera'], ambiente=ambiente, prioridade=prioridade)
+
+    fanout = get_limitador_fanout().estatisticas()
+    fanout_em_uso.definir(fanout['em_uso'], limitador=fanout['nome'])
+    fanout_fila.definir(fanout['em_espera'], limitador=fanout['nome'])
+
+
+get_registro_metricas().registrar_coletor(_coletar_estado)
+
+
+@rt_metricas.get("/metrics", response_class=PlainTextResponse)
+async def Metricas(api_key: str = Depends(Auth_API_KEY)):
+    """
+    Retorna as métricas da aplicação no formato de exposição do Prometheus
+
+    **Métricas (prefixo api_fluig_):**
+    - fluig_requisicoes_total / fluig_requisicao_duracao_segundos: por ambiente, família de endpoint, método e status
+    - drive_operacoes_total / drive_operacao_duracao_segundos: por operação (listar, buscar, download, upload, ...)
+    - google_api_chamadas_total / google_api_duracao_segundos: Gmail e People por método
+    - http_requisicoes_total / http_requisicao_duracao_segundos: por rota (template), método e status
+    - loop_ciclos_total / loop_ciclo_duracao_segundos / loop_ultimo_ciclo_duracao_segundos: loops em background
+    - cache_consultas_total / cache_atualizacao_duracao_segundos: caches com revalidação (hit, obsoleto, miss, coalescido) e de detalhes de chamados (hit, miss, alterado, expirado)
+    - historico_chamados_monitorados, cache_entradas, cache_bytes, threadpool_fila, limitador_fila
+    - fanout_em_uso / fanout_fila / fanout_espera_segundos: limitador global de fan-out (vagas, fila e espera)
+
+    Returns:
+        PlainTextResponse: Métricas em texto (text/plain; version=0.0.4)
+    """
+    if not metricas_habilitadas():
+        raise HTTPException(status_code=404, detail="Métricas desabilitadas (METRICAS_ENABLED=false)")
+    try:
+        # Fila do executor padrão (asyncio.to_thread) do event loop da API
+        executor = getattr(asyncio.get_running_loop(), '_default_executor', None)
+        fila = getattr(executor, '_work_queue', None)
+        threadpool_fila.definir(fila.qsize() if fila is not None else 0, pool="asyncio_padrao")
+
+        conteudo = get_registro_metricas().exportar()
+        return PlainTextResponse(conteudo, media_type=TIPO_CONTEUDO_PROMETHEUS)
+    except Exception as e:
+        logger.error(f"[Metricas] Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar requisição: {str(e)}")
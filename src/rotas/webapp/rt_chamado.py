@@ -1,171 +1,189 @@
 from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Form, Header
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple, AsyncIterator, Iterator
 from pydantic import BaseModel
 from src.modelo_dados.modelo_sites import DadosFuncionario, DadosFuncionarioForm, DadosChamado, PayloadFuncionario
 from src.modelo_dados.modelos_fluig import AberturaChamadoClassificado
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from src.utilitarios_centrais.logger import logger
 from src.site.planilha import Planilha, PATH_TO_TEMP, obter_caminho_temp_por_email
 from src.site.abrir_chamados import AbrirChamados
 from src.fluig.fluig_core import FluigCore
-from src.web.web_servicos_fluig import obter_detalhes_servico_fluig
-from src.utilitarios_centrais.json_utils import salvar_detalhes_servico_json
+from src.fluig.fluig_core_async import AsyncFluigCore
+from src.fluig.fluig_limitador import get_limitador_fanout
+from src.fluig.fluig_resiliencia import prazo_fluig
+from src.fluig.fluig_cache import FilaSerializada, get_cache_detalhes_chamados, get_cache_filas_chamados, versao_task
+from src.fluig.fluig_catalogo import get_catalogo_servicos, obter_detalhes_servico
+from src.site.filas_materializadas import get_atualizador_filas
+from src.site.filas_push import MAX_EVENTOS_PENDENTES, get_publicador_filas
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.configs.user_template_manager import get_user_template_manager
 import os
 import tempfile
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
+import asyncio
 
 router = APIRouter()
 templates = Jinja2Templates(directory="src/site/templates")
 
-# ==================== SISTEMA DE CACHE ====================
-# Cache em memória para chamados
-_chamados_cache: Dict[str, Dict] = {}
-_cache_lock = threading.Lock()
-CACHE_TTL_MINUTES = 5  # Cache válido por 5 minutos
+# ==================== CACHE DAS FILAS ====================
+def _serializar_resposta_fila(resposta: Dict, completa: bool = True) -> FilaSerializada:
+    """
+    Serializa a resposta da fila uma vez (o cache guarda e devolve os bytes prontos)
+    
+    Args:
+        resposta: Resposta da fila
+        completa: False se algum chamado ficou sem detalhes (a fila não vai para o cache)
+    """
+    corpo = json.dumps(resposta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return FilaSerializada(corpo, completa)
 
-def _gerar_chave_cache(tipo: str, identificador: str) -> str:
-    """Gera chave única para o cache"""
-    return f"{tipo}:{identificador}"
 
-def _obter_do_cache(chave: str) -> Optional[Dict]:
-    """Obtém dados do cache se ainda válidos"""
-    with _cache_lock:
-        if chave not in _chamados_cache:
-            return None
-        
-        cache_entry = _chamados_cache[chave]
-        agora = datetime.now()
-        
-        # Verifica se cache expirou
-        if agora > cache_entry['expira_em']:
-            del _chamados_cache[chave]
-            logger.debug(f"[Cache] Cache expirado para chave: {chave}")
-            return None
-        
-        logger.debug(f"[Cache] Cache hit para chave: {chave}")
-        return cache_entry['dados']
-
-def _salvar_no_cache(chave: str, dados: Dict):
-    """Salva dados no cache com TTL"""
-    with _cache_lock:
-        expira_em = datetime.now() + timedelta(minutes=CACHE_TTL_MINUTES)
-        _chamados_cache[chave] = {
-            'dados': dados,
-            'expira_em': expira_em,
-            'criado_em': datetime.now()
-        }
-        logger.debug(f"[Cache] Dados salvos no cache para chave: {chave} (expira em {CACHE_TTL_MINUTES} minutos)")
-
-def _limpar_cache_expirado():
-    """Remove entradas expiradas do cache (limpeza periódica)"""
-    with _cache_lock:
-        agora = datetime.now()
-        chaves_remover = [
-            chave for chave, entry in _chamados_cache.items()
-            if agora > entry['expira_em']
-        ]
-        for chave in chaves_remover:
-            del _chamados_cache[chave]
-        if chaves_remover:
-            logger.debug(f"[Cache] Removidas {len(chaves_remover)} entradas expiradas do cache")
+def _resposta_fila_cache(fila: FilaSerializada, resultado: str) -> Response:
+    """Resposta JSON com o corpo do cache e o resultado da consulta em X-Cache (hit, obsoleto, miss, coalescido)"""
+    return Response(content=fila.corpo, media_type="application/json", headers={"X-Cache": resultado})
+
+
+def _linha_ndjson(dados: Dict) -> bytes:
+    """Serializa um objeto como uma linha NDJSON"""
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
 
 # ==================== BUSCA PARALELA DE DETALHES ====================
-def _buscar_detalhes_paralelo(fluig_core: FluigCore, items: list, max_workers: int = 10) -> list:
+def _montar_chamado_completo(item: dict, process_instance_id, detalhes: Optional[Dict]) -> Dict:
+    """Monta o chamado da fila com os dados básicos da task e os detalhes (ou None)"""
+    return {
+        "processInstanceId": process_instance_id,
+        "processId": item.get('processId', ''),
+        "processDescription": item.get('processDescription', ''),
+        "status": item.get('status', ''),
+        "slaStatus": item.get('slaStatus', ''),
+        "startDate": item.get('startDate', ''),
+        "assignStartDate": item.get('assignStartDate', ''),
+        "requester": item.get('requester', {}),
+        "assignee": item.get('assignee', {}),
+        "state": item.get('state', {}),
+        "detalhes": detalhes
+    }
+
+
+def _detalhes_completos(chamados: List[Dict]) -> bool:
+    """Indica se todos os chamados vieram com detalhes (nenhuma busca falhou ou estourou o prazo)"""
+    return all(chamado["detalhes"] is not None for chamado in chamados)
+
+def _iniciar_busca_detalhes(fluig_core: AsyncFluigCore, items: list, chamador: str) -> Tuple[List[asyncio.Task], Dict[str, int]]:
     """
-    Busca detalhes de múltiplos chamados em paralelo usando ThreadPoolExecutor
+    Dispara uma tarefa de busca de detalhes por chamado (na ordem da listagem)
+    
+    Com o cache de detalhes habilitado (CHAMADO_DETALHES_CACHE_*), chamados cuja
+    versão na listagem (movementSequence/estado) não mudou são respondidos da
+    memória; só os que se moveram são buscados no Fluig.
+    
+    As requisições ao Fluig ocupam vagas do limitador global de fan-out
+    (FLUIG_FANOUT_*), dividido em rodízio entre as filas carregadas ao mesmo tempo.
     
     Args:
-        fluig_core: Instância de FluigCore
+        fluig_core: Instância de AsyncFluigCore
         items: Lista de itens de chamados (com processInstanceId)
-        max_workers: Número máximo de threads paralelas (padrão: 10)
+        chamador: Fila sendo carregada (ex.: "grupo:ITSM_TODOS"), usada no rodízio de vagas
     
     Returns:
-        Lista de chamados com detalhes completos
+        Tupla (tarefas, resultados do cache de detalhes); cada tarefa resulta no
+        chamado montado, ou None para itens sem processInstanceId
     """
-    chamados_detalhados = []
+    limitador = get_limitador_fanout()
+    cache = get_cache_detalhes_chamados()
+    resultados_cache: Dict[str, int] = {}
     
-    def buscar_detalhe(item):
-        """Função auxiliar para buscar detalhes de um chamado"""
+    async def buscar_detalhe(item):
+        """Busca detalhes de um chamado; em caso de erro retorna apenas os dados básicos"""
         process_instance_id = item.get('processInstanceId')
         if not process_instance_id:
             return None
         
+        async def carregar():
+            async with limitador.vaga(chamador):
+                # Prazo por chamado, contado a partir da vaga: o tempo total cresce com a fila
+                with prazo_fluig(prazo):
+                    return await fluig_core.obter_detalhes_chamado(process_instance_id=process_instance_id)
+        
         try:
-            detalhes = fluig_core.obter_detalhes_chamado(
-                process_instance_id=process_instance_id,
-                usuario=ConfigEnvSetings.FLUIG_ADMIN_USER
-            )
-            return {
-                'item': item,
-                'detalhes': detalhes,
-                'process_instance_id': process_instance_id,
-                'sucesso': True
-            }
+            if cache is None:
+                detalhes = await carregar()
+            else:
+                detalhes, resultado = await cache.obter_ou_carregar_async(
+                    fluig_core.ambiente, process_instance_id, versao_task(item), carregar
+                )
+                resultados_cache[resultado] = resultados_cache.get(resultado, 0) + 1
         except Exception as e:
             logger.error(f"[_buscar_detalhes_paralelo] Erro ao buscar detalhes do chamado {process_instance_id}: {str(e)}")
-            return {
-                'item': item,
-                'detalhes': None,
-                'process_instance_id': process_instance_id,
-                'sucesso': False,
-                'erro': str(e)
-            }
+            detalhes = None
+        # Se não conseguir detalhes, retorna pelo menos os dados básicos
+        return _montar_chamado_completo(item, process_instance_id, detalhes)
     
-    # Executa buscas em paralelo
-    logger.info(f"[_buscar_detalhes_paralelo] Iniciando busca paralela de {len(items)} chamado(s) com {max_workers} workers")
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(buscar_detalhe, item): item for item in items}
-        
-        for future in as_completed(futures):
-            resultado = future.result()
-            if not resultado:
-                continue
-            
-            item = resultado['item']
-            detalhes = resultado['detalhes']
-            process_instance_id = resultado['process_instance_id']
-            
-            if detalhes:
-                chamado_completo = {
-                    "processInstanceId": process_instance_id,
-                    "processId": item.get('processId', ''),
-                    "processDescription": item.get('processDescription', ''),
-                    "status": item.get('status', ''),
-                    "slaStatus": item.get('slaStatus', ''),
-                    "startDate": item.get('startDate', ''),
-                    "assignStartDate": item.get('assignStartDate', ''),
-                    "requester": item.get('requester', {}),
-                    "assignee": item.get('assignee', {}),
-                    "state": item.get('state', {}),
-                    "detalhes": detalhes
-                }
-            else:
-                # Se não conseguir detalhes, retorna pelo menos os dados básicos
-                chamado_completo = {
-                    "processInstanceId": process_instance_id,
-                    "processId": item.get('processId', ''),
-                    "processDescription": item.get('processDescription', ''),
-                    "status": item.get('status', ''),
-                    "slaStatus": item.get('slaStatus', ''),
-                    "startDate": item.get('startDate', ''),
-                    "assignStartDate": item.get('assignStartDate', ''),
-                    "requester": item.get('requester', {}),
-                    "assignee": item.get('assignee', {}),
-                    "state": item.get('state', {}),
-                    "detalhes": None
-                }
-            
-            chamados_detalhados.append(chamado_completo)
+    logger.info(
+        f"[_buscar_detalhes_paralelo] Iniciando busca paralela de {len(items)} chamado(s) de {chamador} "
+        f"(até {limitador.max_por_chamador} de {limitador.max_concorrencia} requisições simultâneas)"
+    )
+    # Com o Fluig lento, chamados cuja busca estourar o prazo ficam só com os dados básicos
+    # (e a fila não é guardada no cache das filas, ver _detalhes_completos)
+    prazo = float(getattr(ConfigEnvSetings, 'FLUIG_PRAZO_DETALHES_CHAMADOS_SEGUNDOS', 10.0))
+    tarefas = [asyncio.ensure_future(buscar_detalhe(item)) for item in items]
+    return tarefas, resultados_cache
+
+
+def _logar_fim_busca_detalhes(processados: int, resultados_cache: Dict[str, int]):
+    cache = f" - cache de detalhes: {resultados_cache}" if resultados_cache else ""
+    logger.info(f"[_buscar_detalhes_paralelo] Busca paralela concluída: {processados} chamado(s) processado(s){cache}")
+
+
+async def _buscar_detalhes_paralelo(fluig_core: AsyncFluigCore, items: list, chamador: str) -> Tuple[list, bool]:
+    """
+    Busca detalhes de múltiplos chamados em paralelo (fan-out assíncrono)
+    
+    Args:
+        fluig_core: Instância de AsyncFluigCore
+        items: Lista de itens de chamados (com processInstanceId)
+        chamador: Fila sendo carregada (rodízio de vagas do limitador de fan-out)
+    
+    Returns:
+        Tupla (chamados na ordem da listagem, se todos vieram com detalhes)
+    """
+    tarefas, resultados_cache = _iniciar_busca_detalhes(fluig_core, items, chamador)
+    resultados = await asyncio.gather(*tarefas)
+    chamados_detalhados = [chamado for chamado in resultados if chamado]
     
-    logger.info(f"[_buscar_detalhes_paralelo] Busca paralela concluída: {len(chamados_detalhados)} chamado(s) processado(s)")
-    return chamados_detalhados
+    _logar_fim_busca_detalhes(len(chamados_detalhados), resultados_cache)
+    return chamados_detalhados, _detalhes_completos(chamados_detalhados)
+
+
+async def _iterar_detalhes_paralelo(
+    fluig_core: AsyncFluigCore,
+    items: list,
+    chamador: str
+) -> AsyncIterator[Tuple[int, Dict]]:
+    """
+    Versão incremental de _buscar_detalhes_paralelo: entrega cada chamado assim que seus detalhes chegam
+    
+    Se o consumidor parar antes do fim (ex.: cliente desconectou), as buscas em
+    andamento seguem até o prazo e alimentam o cache de detalhes.
+    
+    Yields:
+        Tuplas (posição na listagem, chamado com detalhes), na ordem de conclusão
+    """
+    tarefas, resultados_cache = _iniciar_busca_detalhes(fluig_core, items, chamador)
+    posicoes = {tarefa: posicao for posicao, tarefa in enumerate(tarefas)}
+    pendentes = set(tarefas)
+    processados = 0
+    while pendentes:
+        concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+        for tarefa in sorted(concluidas, key=posicoes.get):
+            chamado = tarefa.result()
+            if chamado:
+                processados += 1
+                yield posicoes[tarefa], chamado
+    
+    _logar_fim_busca_detalhes(processados, resultados_cache)
 
 
 def buscar_funcionario(email_ou_chapa: str, ambiente: str = "PRD", obrigatorio: bool = True) -> Optional[DadosFuncionario]:
@@ -375,9 +393,12 @@ async def chamado(request: Request):
     if not email:
         return RedirectResponse(url="/login")
     
+    # Começa a pré-carregar a fila do usuário enquanto a página é montada
+    _registrar_acesso_fila(email)
+    
     try:
         # Buscar funcionário usando dataset interno do Fluig
-        funcionario = buscar_funcionario(email, ambiente="PRD", obrigatorio=True)
+        funcionario = await asyncio.to_thread(buscar_funcionario, email, ambiente="PRD", obrigatorio=True)
         
         # Criar dados formatados para o formulário
         dados_funcionario = DadosFuncionarioForm(
@@ -894,7 +915,7 @@ async def criar_chamado(
     
     try:
         # Buscar dados do funcionário novamente usando dataset interno do Fluig
-        funcionario = buscar_funcionario(email, ambiente="PRD", obrigatorio=True)
+        funcionario = await asyncio.to_thread(buscar_funcionario, email, ambiente="PRD", obrigatorio=True)
         
         # Validar telefone obrigatório
         # Priorizar telefone preenchido no campo "Telefone de Contato" do formulário
@@ -995,7 +1016,9 @@ async def criar_chamado(
                 # Usar o novo módulo para abrir chamados em sequência
                 ignorar_cabecalho = ignorar_primeira_linha == "1"
                 abrir_chamados = AbrirChamados(email)
-                resultado = abrir_chamados.abrir_chamados_sequencia(
+                # Abertura em lote é síncrona (FluigCore): roda fora do event loop
+                resultado = await asyncio.to_thread(
+                    abrir_chamados.abrir_chamados_sequencia,
                     titulo=ds_titulo,
                     descricao=ds_chamado,
                     qtd_chamados=qtd_chamados,
@@ -1060,7 +1083,7 @@ async def criar_chamado(
                 # Usar colleagueName do dataset colleague para obter nome formatado corretamente
                 if solicitante and solicitante.strip():
                     try:
-                        usuario_atendido = buscar_colleague_name(solicitante.strip(), ambiente=ambiente)
+                        usuario_atendido = await asyncio.to_thread(buscar_colleague_name, solicitante.strip(), ambiente=ambiente)
                         if usuario_atendido:
                             logger.info(f"[criar_chamado] UsuarioAtendido encontrado (colleagueName): {usuario_atendido}")
                         else:
@@ -1081,9 +1104,9 @@ async def criar_chamado(
                     
                     logger.info(f"[criar_chamado] Criando chamado classificado - Serviço: {servico_id}, Usuário: {email}")
                     
-                    # Chamar diretamente a função FluigCore
-                    fluig_core = FluigCore(ambiente=ambiente)
-                    resposta = fluig_core.AberturaDeChamado(tipo_chamado="classificado", Item=payload_chamado, usuario_atendido=usuario_atendido)
+                    # Chamar diretamente a função AsyncFluigCore
+                    fluig_core = AsyncFluigCore(ambiente=ambiente)
+                    resposta = await fluig_core.AberturaDeChamado(tipo_chamado="classificado", Item=payload_chamado, usuario_atendido=usuario_atendido)
                     
                     if not resposta.get('sucesso'):
                         logger.error(f"[criar_chamado] Falha ao abrir chamado classificado - Status: {resposta.get('status_code')}")
@@ -1114,9 +1137,9 @@ async def criar_chamado(
                     
                     logger.info(f"[criar_chamado] Criando chamado normal - Usuário: {email}")
                     
-                    # Chamar diretamente a função FluigCore
-                    fluig_core = FluigCore(ambiente=ambiente)
-                    resposta = fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=payload_chamado, usuario_atendido=usuario_atendido)
+                    # Chamar diretamente a função AsyncFluigCore
+                    fluig_core = AsyncFluigCore(ambiente=ambiente)
+                    resposta = await fluig_core.AberturaDeChamado(tipo_chamado="normal", Item=payload_chamado, usuario_atendido=usuario_atendido)
                     
                     if not resposta.get('sucesso'):
                         logger.error(f"[criar_chamado] Falha ao abrir chamado normal - Status: {resposta.get('status_code')}")
@@ -1407,43 +1430,28 @@ async def listar_servicos():
     """
     Retorna a lista de serviços do arquivo servicos_prd.json
     Endpoint interno sem autenticação para uso no webapp
+    
+    O corpo vem pronto do catálogo em memória (recarregado quando o arquivo muda).
     """
     try:
-        # Caminho relativo ao diretório raiz do projeto
-        # __file__ está em src/rotas/webapp/rt_chamado.py
-        # Precisamos subir 3 níveis para chegar em src/
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        json_path = os.path.join(base_dir, "json", "servicos_prd.json")
-        
-        if not os.path.exists(json_path):
-            logger.error(f"Arquivo de serviços não encontrado: {json_path}")
+        catalogo = get_catalogo_servicos("PRD")
+        try:
+            indice = await catalogo.indice_async()
+        except ValueError:
             return JSONResponse(
-                status_code=404,
-                content={"sucesso": False, "erro": "Arquivo de serviços não encontrado"}
+                status_code=500,
+                content={"sucesso": False, "erro": "Formato inválido do arquivo de serviços"}
             )
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Retornar os serviços com os campos necessários
-        if data.get('content') and isinstance(data['content'], list):
-            servicos = []
-            for servico in data['content']:
-                servicos.append({
-                    'servico': servico.get('servico', ''),
-                    'documentid': str(servico.get('documentid', '')),
-                    'grupo_servico': servico.get('grupo_servico', ''),
-                    'item_servico': servico.get('item_servico', ''),
-                    'numero_documento': str(servico.get('documentid', ''))
-                })
-            
-            logger.info(f"[listar_servicos] {len(servicos)} serviços retornados")
-            return JSONResponse(content={"sucesso": True, "servicos": servicos})
-        else:
+        if indice is None:
+            logger.error(f"Arquivo de serviços não encontrado: {catalogo.arquivo}")
             return JSONResponse(
-                status_code=500,
-                content={"sucesso": False, "erro": "Formato inválido do arquivo de serviços"}
+                status_code=404,
+                content={"sucesso": False, "erro": "Arquivo de serviços não encontrado"}
             )
+        
+        logger.info(f"[listar_servicos] {len(indice.servicos)} serviços retornados")
+        return Response(content=indice.corpo_lista, media_type="application/json")
             
     except Exception as e:
         logger.error(f"Erro ao carregar serviços: {str(e)}")
@@ -1455,6 +1463,56 @@ async def listar_servicos():
         )
 
 
+@router.get("/buscar_servicos", response_class=JSONResponse)
+async def buscar_servicos(q: str = "", limite: int = 20):
+    """
+    Busca serviços por texto para o autocomplete do campo de serviço
+    Endpoint interno sem autenticação para uso no webapp (mesmos dados de /listar_servicos)
+    
+    Busca no índice em memória do catálogo: sem acento/caixa, por prefixo e
+    tolerante a erros de digitação, ordenada por relevância.
+    """
+    try:
+        indice = await get_catalogo_servicos("PRD").indice_async()
+        if indice is None:
+            return JSONResponse(
+                status_code=404,
+                content={"sucesso": False, "erro": "Arquivo de serviços não encontrado"}
+            )
+        return JSONResponse(content={"sucesso": True, "servicos": indice.buscar(q, limite)})
+    except Exception as e:
+        logger.error(f"[buscar_servicos] Erro ao buscar serviços: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"sucesso": False, "erro": f"Erro ao buscar serviços: {str(e)}"}
+        )
+
+
+def _formatar_detalhes_servico(detalhes: Dict) -> Optional[Dict]:
+    """Extrai do retorno do dataset ITSM_Catalogo_Servico os campos usados pelo webapp"""
+    if detalhes.get('content') and detalhes['content'].get('values'):
+        servico_data = detalhes['content']['values'][0]
+    elif detalhes.get('values'):
+        servico_data = detalhes['values'][0]
+    else:
+        servico_data = detalhes
+    
+    if not servico_data:
+        return None
+    return {
+        "servico": servico_data.get('servico', ''),
+        "documentid": str(servico_data.get('documentid', '')),
+        "grupo_servico": servico_data.get('grupo_servico', ''),
+        "item_servico": servico_data.get('item_servico', ''),
+        "urgencia_alta": servico_data.get('urgencia_alta', ''),
+        "urgencia_media": servico_data.get('urgencia_media', ''),
+        "urgencia_baixa": servico_data.get('urgencia_baixa', ''),
+        "ds_responsavel": servico_data.get('ds_responsavel', ''),
+        "equipe_executante": servico_data.get('equipe_executante', ''),
+        "impacto": servico_data.get('impacto', '')
+    }
+
+
 class BuscarServicoRequest(BaseModel):
     """Modelo para requisição de busca de serviço"""
     nome_servico: str
@@ -1478,28 +1536,17 @@ async def buscar_servico(request: Request, busca: BuscarServicoRequest):
         )
     
     try:
-        # Primeiro, buscar o documentid do serviço no arquivo servicos_prd.json
-        # __file__ está em src/rotas/webapp/rt_chamado.py
-        # Precisamos subir 3 níveis para chegar em src/
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        json_path = os.path.join(base_dir, "json", "servicos_prd.json")
+        # Primeiro, buscar o documentid do serviço no catálogo (servicos_prd.json em memória)
+        indice = await get_catalogo_servicos("PRD").indice_async()
         
-        if not os.path.exists(json_path):
+        if indice is None:
             return JSONResponse(
                 status_code=404,
                 content={"sucesso": False, "erro": "Arquivo de serviços não encontrado"}
             )
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Encontrar o serviço pelo nome
-        servico_encontrado = None
-        if data.get('content') and isinstance(data['content'], list):
-            for servico in data['content']:
-                if servico.get('servico', '').strip() == busca.nome_servico.strip():
-                    servico_encontrado = servico
-                    break
+        # Encontrar o serviço pelo nome (índice por nome normalizado)
+        servico_encontrado = indice.buscar_por_nome(busca.nome_servico)
         
         if not servico_encontrado:
             return JSONResponse(
@@ -1509,58 +1556,21 @@ async def buscar_servico(request: Request, busca: BuscarServicoRequest):
         
         documentid = str(servico_encontrado.get('documentid', ''))
         
-        # Buscar detalhes do serviço usando a API interna
-        base_url = str(request.base_url).rstrip('/')
-        headers = {
-            ConfigEnvSetings.API_NAME: ConfigEnvSetings.API_KEY
-        }
-        
-        response = requests.post(
-            f"{base_url}/api/v1/fluig/prd/servicos/detalhes",
-            json={"id_servico": documentid},
-            headers=headers,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            detalhes = response.json()
-            
-            # Processar resposta do serviço
-            servico_data = None
-            if detalhes.get('content') and detalhes['content'].get('values'):
-                servico_data = detalhes['content']['values'][0]
-            elif detalhes.get('values'):
-                servico_data = detalhes['values'][0]
-            else:
-                servico_data = detalhes
-            
-            if servico_data:
-                # Retornar dados formatados
-                return JSONResponse(content={
-                    "sucesso": True,
-                    "servico": {
-                        "servico": servico_data.get('servico', ''),
-                        "documentid": str(servico_data.get('documentid', '')),
-                        "grupo_servico": servico_data.get('grupo_servico', ''),
-                        "item_servico": servico_data.get('item_servico', ''),
-                        "urgencia_alta": servico_data.get('urgencia_alta', ''),
-                        "urgencia_media": servico_data.get('urgencia_media', ''),
-                        "urgencia_baixa": servico_data.get('urgencia_baixa', ''),
-                        "ds_responsavel": servico_data.get('ds_responsavel', ''),
-                        "equipe_executante": servico_data.get('equipe_executante', ''),
-                        "impacto": servico_data.get('impacto', '')
-                    }
-                })
-            else:
-                return JSONResponse(
-                    status_code=500,
-                    content={"sucesso": False, "erro": "Dados do serviço não encontrados"}
-                )
-        else:
+        # Detalhes pelo resolvedor compartilhado com /fluig/{ambiente}/servicos/detalhes (sem chamada HTTP à própria API)
+        detalhes, fonte = await asyncio.to_thread(obter_detalhes_servico, documentid, "PRD")
+        if not detalhes:
             return JSONResponse(
-                status_code=response.status_code,
-                content={"sucesso": False, "erro": f"Erro ao buscar detalhes do serviço: {response.text}"}
+                status_code=500,
+                content={"sucesso": False, "erro": "Falha ao obter detalhes do serviço do Fluig"}
             )
+        
+        servico = _formatar_detalhes_servico(detalhes)
+        if servico:
+            return JSONResponse(content={"sucesso": True, "servico": servico})
+        return JSONResponse(
+            status_code=500,
+            content={"sucesso": False, "erro": "Dados do serviço não encontrados"}
+        )
             
     except Exception as e:
         logger.error(f"Erro ao buscar serviço: {str(e)}")
@@ -1576,8 +1586,8 @@ async def buscar_servico(request: Request, busca: BuscarServicoRequest):
 async def buscar_detalhes_servico(request: Request, busca: BuscarDetalhesServicoRequest):
     """
     Busca os detalhes de um serviço por documentid.
-    Primeiro verifica se o arquivo JSON já existe localmente.
-    Se não existir, busca da API e salva o arquivo.
+    Usa o resolvedor compartilhado (snapshot do catálogo, memória ou Fluig).
+    "fonte": catalogo, cache ou api.
     """
     user = request.session.get('user')
     if not user:
@@ -1594,118 +1604,27 @@ async def buscar_detalhes_servico(request: Request, busca: BuscarDetalhesServico
                 content={"sucesso": False, "erro": "DocumentID não fornecido"}
             )
         
-        # Caminho do arquivo JSON local (na pasta services/)
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        services_path = os.path.join(base_dir, "json", "services", f"servico_detalhes_{documentid}_prd.json")
-        
-        # Verificar se o arquivo já existe na pasta services/
-        if os.path.exists(services_path):
-            logger.info(f"[buscar_detalhes_servico] Arquivo local encontrado: {services_path}")
-            with open(services_path, 'r', encoding='utf-8') as f:
-                detalhes = json.load(f)
-            
-            # Processar resposta do serviço
-            servico_data = None
-            if detalhes.get('content') and detalhes['content'].get('values'):
-                servico_data = detalhes['content']['values'][0]
-            elif detalhes.get('values'):
-                servico_data = detalhes['values'][0]
-            else:
-                servico_data = detalhes
-            
-            if servico_data:
-                return JSONResponse(content={
-                    "sucesso": True,
-                    "servico": {
-                        "servico": servico_data.get('servico', ''),
-                        "documentid": str(servico_data.get('documentid', '')),
-                        "grupo_servico": servico_data.get('grupo_servico', ''),
-                        "item_servico": servico_data.get('item_servico', ''),
-                        "urgencia_alta": servico_data.get('urgencia_alta', ''),
-                        "urgencia_media": servico_data.get('urgencia_media', ''),
-                        "urgencia_baixa": servico_data.get('urgencia_baixa', ''),
-                        "ds_responsavel": servico_data.get('ds_responsavel', ''),
-                        "equipe_executante": servico_data.get('equipe_executante', ''),
-                        "impacto": servico_data.get('impacto', '')
-                    },
-                    "fonte": "local"
-                })
-        
-        # Se o arquivo não existe, buscar diretamente da função (sem requisição HTTP interna)
-        logger.info(f"[buscar_detalhes_servico] Arquivo local não encontrado, buscando do Fluig: {documentid}")
+        # Snapshot do catálogo -> memória -> Fluig
+        detalhes, fonte = await asyncio.to_thread(obter_detalhes_servico, documentid, "PRD")
         
-        try:
-            ambiente = "PRD"
-            usuario = ConfigEnvSetings.FLUIG_ADMIN_USER
-            senha = ConfigEnvSetings.FLUIG_ADMIN_PASS
-            
-            # Buscar detalhes usando OAuth 1.0
-            logger.info("[buscar_detalhes_servico] Buscando detalhes usando OAuth 1.0...")
-            detalhes = obter_detalhes_servico_fluig(
-                document_id=documentid,
-                ambiente=ambiente
-            )
-            
-            if not detalhes:
-                logger.error("[buscar_detalhes_servico] Falha ao obter detalhes do serviço")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "sucesso": False,
-                        "erro": "Falha ao obter detalhes do serviço do Fluig"
-                    }
-                )
-            
-            # Salvar o arquivo JSON
-            logger.info(f"[buscar_detalhes_servico] Salvando detalhes em JSON...")
-            arquivo_salvo = salvar_detalhes_servico_json(detalhes, documentid, ambiente)
-            logger.info(f"[buscar_detalhes_servico] Detalhes salvos em: {arquivo_salvo}")
-            
-            # Processar resposta do serviço
-            servico_data = None
-            if detalhes.get('content') and detalhes['content'].get('values'):
-                servico_data = detalhes['content']['values'][0]
-            elif detalhes.get('values'):
-                servico_data = detalhes['values'][0]
-            else:
-                servico_data = detalhes
-            
-            if servico_data:
-                return JSONResponse(content={
-                    "sucesso": True,
-                    "servico": {
-                        "servico": servico_data.get('servico', ''),
-                        "documentid": str(servico_data.get('documentid', '')),
-                        "grupo_servico": servico_data.get('grupo_servico', ''),
-                        "item_servico": servico_data.get('item_servico', ''),
-                        "urgencia_alta": servico_data.get('urgencia_alta', ''),
-                        "urgencia_media": servico_data.get('urgencia_media', ''),
-                        "urgencia_baixa": servico_data.get('urgencia_baixa', ''),
-                        "ds_responsavel": servico_data.get('ds_responsavel', ''),
-                        "equipe_executante": servico_data.get('equipe_executante', ''),
-                        "impacto": servico_data.get('impacto', '')
-                    },
-                    "fonte": "api"
-                })
-            else:
-                return JSONResponse(
-                    status_code=500,
-                    content={"sucesso": False, "erro": "Dados do serviço não encontrados na resposta"}
-                )
-                
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"[buscar_detalhes_servico] Erro ao buscar detalhes do serviço {documentid}: {str(e)}")
-            import traceback
-            logger.debug(f"Traceback: {traceback.format_exc()}")
+        if not detalhes:
+            logger.error("[buscar_detalhes_servico] Falha ao obter detalhes do serviço")
             return JSONResponse(
                 status_code=500,
                 content={
                     "sucesso": False,
-                    "erro": f"Erro ao buscar detalhes do serviço: {str(e)}"
+                    "erro": "Falha ao obter detalhes do serviço do Fluig"
                 }
             )
+        
+        logger.info(f"[buscar_detalhes_servico] Detalhes do serviço {documentid} obtidos - fonte: {fonte}")
+        servico = _formatar_detalhes_servico(detalhes)
+        if servico:
+            return JSONResponse(content={"sucesso": True, "servico": servico, "fonte": fonte})
+        return JSONResponse(
+            status_code=500,
+            content={"sucesso": False, "erro": "Dados do serviço não encontrados na resposta"}
+        )
             
     except Exception as e:
         logger.error(f"[buscar_detalhes_servico] Erro inesperado ao buscar detalhes do serviço: {str(e)}")
@@ -1720,12 +1639,50 @@ async def buscar_detalhes_servico(request: Request, busca: BuscarDetalhesServico
         )
 
 
+async def _carregar_fila_usuario(email: str) -> FilaSerializada:
+    """Carrega a fila do usuário (email -> colleagueId -> tasks -> detalhes), resposta já serializada"""
+    ambiente = "PRD"
+    
+    # 1. Buscar colleagueId pelo email
+    logger.info(f"[obter_chamados_fila] Buscando colleagueId para email: {email}")
+    colleague_id = await asyncio.to_thread(buscar_colleague_id, email, ambiente)
+    
+    if not colleague_id:
+        logger.warning(f"[obter_chamados_fila] colleagueId não encontrado para: {email}")
+        return _serializar_resposta_fila({"sucesso": True, "chamados": [], "erro": "ColleagueId não encontrado para o usuário"})
+    
+    logger.info(f"[obter_chamados_fila] colleagueId encontrado: {colleague_id}")
+    
+    # 2. Listar chamados usando o colleagueId
+    logger.info(f"[obter_chamados_fila] Listando chamados para colleagueId: {colleague_id}")
+    fluig_core = AsyncFluigCore(ambiente=ambiente)
+    # Percorre todas as páginas (hasNext); falha em qualquer página propaga a exceção (sem cachear)
+    items = [item async for item in fluig_core.iterar_chamados_tasks(assignee=colleague_id, prefetch=True)]
+    if not items:
+        return _serializar_resposta_fila({"sucesso": True, "chamados": []})
+    
+    logger.info(f"[obter_chamados_fila] {len(items)} chamado(s) encontrado(s)")
+    
+    # 3. Buscar detalhes de cada chamado em paralelo
+    chamados_detalhados, completa = await _buscar_detalhes_paralelo(fluig_core, items, chamador=f"fila:{email}")
+    
+    logger.info(f"[obter_chamados_fila] {len(chamados_detalhados)} chamado(s) processado(s) com sucesso")
+    
+    return _serializar_resposta_fila({
+        "sucesso": True,
+        "chamados": chamados_detalhados,
+        "total": len(chamados_detalhados)
+    }, completa)
+
+
 @router.get("/api/chamados/fila")
 async def obter_chamados_fila(request: Request):
     """
     Retorna a lista de chamados da fila do usuário logado
     Segue o fluxo: email -> colleagueId -> listar chamados -> detalhes de cada chamado
-    Utiliza cache para melhorar performance
+    Utiliza cache com revalidação em background (FILA_CACHE_*): fila vencida é servida
+    enquanto uma única atualização roda. Com FILA_MATERIALIZADA_*, a fila de quem usa o
+    webapp é recarregada em background e a consulta é respondida direto do cache
     """
     user = request.session.get('user')
     if not user:
@@ -1741,84 +1698,12 @@ async def obter_chamados_fila(request: Request):
             content={"sucesso": False, "erro": "Email do usuário não encontrado"}
         )
     
-    # Limpar cache expirado periodicamente
-    _limpar_cache_expirado()
-    
-    # Verificar cache
-    chave_cache = _gerar_chave_cache('fila', email)
-    dados_cache = _obter_do_cache(chave_cache)
-    
-    if dados_cache:
-        logger.info(f"[obter_chamados_fila] Retornando dados do cache para {email}")
-        return JSONResponse(
-            status_code=200,
-            content=dados_cache
-        )
-    
     try:
-        ambiente = "PRD"
-        
-        # 1. Buscar colleagueId pelo email
-        logger.info(f"[obter_chamados_fila] Buscando colleagueId para email: {email}")
-        colleague_id = buscar_colleague_id(email, ambiente)
-        
-        if not colleague_id:
-            logger.warning(f"[obter_chamados_fila] colleagueId não encontrado para: {email}")
-            resposta_vazia = {"sucesso": True, "chamados": [], "erro": "ColleagueId não encontrado para o usuário"}
-            _salvar_no_cache(chave_cache, resposta_vazia)
-            return JSONResponse(
-                status_code=200,
-                content=resposta_vazia
-            )
-        
-        logger.info(f"[obter_chamados_fila] colleagueId encontrado: {colleague_id}")
-        
-        # 2. Listar chamados usando o colleagueId
-        logger.info(f"[obter_chamados_fila] Listando chamados para colleagueId: {colleague_id}")
-        fluig_core = FluigCore(ambiente=ambiente)
-        chamados_lista = fluig_core.listar_chamados_tasks(
-            assignee=colleague_id,
-            usuario=ConfigEnvSetings.FLUIG_ADMIN_USER
-        )
-        
-        if not chamados_lista:
-            logger.info(f"[obter_chamados_fila] listar_chamados_tasks retornou None ou vazio")
-            resposta_vazia = {"sucesso": True, "chamados": []}
-            _salvar_no_cache(chave_cache, resposta_vazia)
-            return JSONResponse(
-                status_code=200,
-                content=resposta_vazia
-            )
-        
-        items = chamados_lista.get('items', [])
-        if not items:
-            resposta_vazia = {"sucesso": True, "chamados": []}
-            _salvar_no_cache(chave_cache, resposta_vazia)
-            return JSONResponse(
-                status_code=200,
-                content=resposta_vazia
-            )
-        
-        logger.info(f"[obter_chamados_fila] {len(items)} chamado(s) encontrado(s)")
-        
-        # 3. Buscar detalhes de cada chamado em paralelo
-        chamados_detalhados = _buscar_detalhes_paralelo(fluig_core, items, max_workers=10)
-        
-        logger.info(f"[obter_chamados_fila] {len(chamados_detalhados)} chamado(s) processado(s) com sucesso")
-        
-        resposta = {
-            "sucesso": True,
-            "chamados": chamados_detalhados,
-            "total": len(chamados_detalhados)
-        }
-        
-        # Salvar no cache antes de retornar
-        _salvar_no_cache(chave_cache, resposta)
-        
-        return JSONResponse(
-            status_code=200,
-            content=resposta
-        )
+        _registrar_acesso_fila(email)
+        # Fila vencida é servida enquanto uma única atualização roda em background
+        fila, resultado = await get_cache_filas_chamados().obter_ou_carregar(('fila', email), lambda: _carregar_fila_usuario(email))
+        logger.info(f"[obter_chamados_fila] Fila de {email} retornada - cache: {resultado}")
+        return _resposta_fila_cache(fila, resultado)
         
     except Exception as e:
         logger.error(f"[obter_chamados_fila] Erro ao obter chamados: {str(e)}")
@@ -1833,12 +1718,72 @@ async def obter_chamados_fila(request: Request):
         )
 
 
+# Chave fixa para o grupo (compartilhada por todos os usuários)
+_CHAVE_CACHE_GRUPO_ITSM = ('grupo', 'ITSM_TODOS')
+
+
+async def _listar_chamados_grupo_itsm(fluig_core: AsyncFluigCore) -> list:
+    """Lista as tasks do grupo Pool:Group:ITSM_TODOS (NOT_COMPLETED, ON_TIME), todas as páginas"""
+    assignee_grupo = "Pool:Group:ITSM_TODOS"
+    logger.info(f"[obter_chamados_grupo_itsm_todos] Listando chamados do grupo: {assignee_grupo}")
+    return [
+        item async for item in fluig_core.iterar_chamados_tasks(
+            assignee=assignee_grupo,
+            status="NOT_COMPLETED",
+            sla_status="ON_TIME",
+            prefetch=True
+        )
+    ]
+
+
+async def _carregar_fila_grupo_itsm() -> FilaSerializada:
+    """Carrega a fila do grupo ITSM_TODOS com os detalhes de cada chamado (resposta já serializada)"""
+    fluig_core = AsyncFluigCore(ambiente="PRD")
+    items = await _listar_chamados_grupo_itsm(fluig_core)
+    if not items:
+        return _serializar_resposta_fila({"sucesso": True, "chamados": []})
+    
+    logger.info(f"[obter_chamados_grupo_itsm_todos] {len(items)} chamado(s) encontrado(s)")
+    
+    # Buscar detalhes de cada chamado em paralelo
+    chamados_detalhados, completa = await _buscar_detalhes_paralelo(fluig_core, items, chamador="grupo:ITSM_TODOS")
+    
+    logger.info(f"[obter_chamados_grupo_itsm_todos] {len(chamados_detalhados)} chamado(s) processado(s) com sucesso")
+    
+    return _serializar_resposta_fila({
+        "sucesso": True,
+        "chamados": chamados_detalhados,
+        "total": len(chamados_detalhados)
+    }, completa)
+
+
+def _fila_materializada_usuario(email: str):
+    """Chave no cache das filas e carregador da fila de um usuário (filas materializadas)"""
+    return ('fila', email), lambda: _carregar_fila_usuario(email)
+
+
+def _registrar_acesso_fila(email: str):
+    """Mantém a fila do usuário pré-carregada em background enquanto ele usar o webapp"""
+    atualizador = get_atualizador_filas()
+    if atualizador is not None:
+        atualizador.registrar_acesso(email)
+
+
+# A fila do grupo é sempre mantida; as dos usuários entram ao abrirem o webapp
+if get_atualizador_filas() is not None:
+    get_atualizador_filas().configurar(
+        _fila_materializada_usuario,
+        {_CHAVE_CACHE_GRUPO_ITSM: _carregar_fila_grupo_itsm}
+    )
+
+
 @router.get("/api/chamados/grupo-itsm-todos")
 async def obter_chamados_grupo_itsm_todos(request: Request):
     """
     Retorna a lista de chamados do grupo Pool:Group:ITSM_TODOS
     Com filtros: status=NOT_COMPLETED e slaStatus=ON_TIME
-    Utiliza cache para melhorar performance
+    Utiliza cache com revalidação em background (FILA_CACHE_*): fila vencida é servida
+    enquanto uma única atualização roda
     """
     user = request.session.get('user')
     if not user:
@@ -1847,72 +1792,10 @@ async def obter_chamados_grupo_itsm_todos(request: Request):
             content={"sucesso": False, "erro": "Usuário não autenticado"}
         )
     
-    # Limpar cache expirado periodicamente
-    _limpar_cache_expirado()
-    
-    # Verificar cache (chave fixa para grupo)
-    chave_cache = _gerar_chave_cache('grupo', 'ITSM_TODOS')
-    dados_cache = _obter_do_cache(chave_cache)
-    
-    if dados_cache:
-        logger.info(f"[obter_chamados_grupo_itsm_todos] Retornando dados do cache")
-        return JSONResponse(
-            status_code=200,
-            content=dados_cache
-        )
-    
     try:
-        ambiente = "PRD"
-        assignee_grupo = "Pool:Group:ITSM_TODOS"
-        
-        # Listar chamados do grupo ITSM_TODOS
-        logger.info(f"[obter_chamados_grupo_itsm_todos] Listando chamados do grupo: {assignee_grupo}")
-        fluig_core = FluigCore(ambiente=ambiente)
-        chamados_lista = fluig_core.listar_chamados_tasks(
-            assignee=assignee_grupo,
-            status="NOT_COMPLETED",
-            sla_status="ON_TIME",
-            usuario=ConfigEnvSetings.FLUIG_ADMIN_USER
-        )
-        
-        if not chamados_lista:
-            logger.info(f"[obter_chamados_grupo_itsm_todos] listar_chamados_tasks retornou None ou vazio")
-            resposta_vazia = {"sucesso": True, "chamados": []}
-            _salvar_no_cache(chave_cache, resposta_vazia)
-            return JSONResponse(
-                status_code=200,
-                content=resposta_vazia
-            )
-        
-        items = chamados_lista.get('items', [])
-        if not items:
-            resposta_vazia = {"sucesso": True, "chamados": []}
-            _salvar_no_cache(chave_cache, resposta_vazia)
-            return JSONResponse(
-                status_code=200,
-                content=resposta_vazia
-            )
-        
-        logger.info(f"[obter_chamados_grupo_itsm_todos] {len(items)} chamado(s) encontrado(s)")
-        
-        # Buscar detalhes de cada chamado em paralelo
-        chamados_detalhados = _buscar_detalhes_paralelo(fluig_core, items, max_workers=10)
-        
-        logger.info(f"[obter_chamados_grupo_itsm_todos] {len(chamados_detalhados)} chamado(s) processado(s) com sucesso")
-        
-        resposta = {
-            "sucesso": True,
-            "chamados": chamados_detalhados,
-            "total": len(chamados_detalhados)
-        }
-        
-        # Salvar no cache antes de retornar
-        _salvar_no_cache(chave_cache, resposta)
-        
-        return JSONResponse(
-            status_code=200,
-            content=resposta
-        )
+        fila, resultado = await get_cache_filas_chamados().obter_ou_carregar(_CHAVE_CACHE_GRUPO_ITSM, _carregar_fila_grupo_itsm)
+        logger.info(f"[obter_chamados_grupo_itsm_todos] Fila do grupo retornada - cache: {resultado}")
+        return _resposta_fila_cache(fila, resultado)
         
     except Exception as e:
         logger.error(f"[obter_chamados_grupo_itsm_todos] Erro ao obter chamados: {str(e)}")
@@ -1927,6 +1810,173 @@ async def obter_chamados_grupo_itsm_todos(request: Request):
         )
 
 
+@router.get("/api/chamados/grupo-itsm-todos/stream")
+async def obter_chamados_grupo_itsm_todos_stream(request: Request):
+    """
+    Versão em streaming (NDJSON) de /api/chamados/grupo-itsm-todos, para renderização progressiva
+    Cada linha é um objeto JSON:
+    - {"tipo": "inicio", "total": N}: quantidade de chamados na listagem
+    - {"tipo": "chamado", "posicao": i, "chamado": {...}}: um por chamado, assim que seus detalhes
+      chegam (fora da ordem; posicao é a ordem da listagem)
+    - {"tipo": "fim", "sucesso": true, "total": n} ou {"tipo": "erro", "sucesso": false, "erro": "..."}
+    A fila passa pelo cache (FILA_CACHE_*) como em /grupo-itsm-todos, e X-Cache traz o resultado
+    da consulta: com entrada (hit ou obsoleto) as linhas saem do cache; aguardando a carga de
+    outra requisição (coalescido) saem ao fim dela; se esta requisição dispara a carga (miss),
+    os chamados são transmitidos conforme chegam e a fila completa fica no cache ao final
+    """
+    user = request.session.get('user')
+    if not user:
+        return JSONResponse(
+            status_code=401,
+            content={"sucesso": False, "erro": "Usuário não autenticado"}
+        )
+    
+    linhas: asyncio.Queue = asyncio.Queue()
+    
+    async def carregar_transmitindo() -> FilaSerializada:
+        # Mesma carga de _carregar_fila_grupo_itsm, enviando as linhas a esta requisição
+        try:
+            fluig_core = AsyncFluigCore(ambiente="PRD")
+            items = await _listar_chamados_grupo_itsm(fluig_core)
+            logger.info(f"[obter_chamados_grupo_itsm_todos_stream] {len(items)} chamado(s) encontrado(s)")
+            linhas.put_nowait(_linha_ndjson({"tipo": "inicio", "total": len(items)}))
+            
+            por_posicao: Dict[int, Dict] = {}
+            async for posicao, chamado in _iterar_detalhes_paralelo(fluig_core, items, chamador="grupo:ITSM_TODOS"):
+                por_posicao[posicao] = chamado
+                linhas.put_nowait(_linha_ndjson({"tipo": "chamado", "posicao": posicao, "chamado": chamado}))
+            
+            # Fila completa na ordem da listagem, como se viesse de /grupo-itsm-todos
+            chamados = [por_posicao[posicao] for posicao in sorted(por_posicao)]
+            return _serializar_resposta_fila(
+                {"sucesso": True, "chamados": chamados, "total": len(chamados)}, _detalhes_completos(chamados)
+            )
+        finally:
+            linhas.put_nowait(None)
+    
+    fila, resultado, carga = get_cache_filas_chamados().consultar(_CHAVE_CACHE_GRUPO_ITSM, carregar_transmitindo)
+    logger.info(f"[obter_chamados_grupo_itsm_todos_stream] Fila do grupo - cache: {resultado}")
+    
+    def linhas_da_fila(fila: FilaSerializada) -> Iterator[bytes]:
+        chamados = json.loads(fila.corpo).get("chamados", [])
+        yield _linha_ndjson({"tipo": "inicio", "total": len(chamados)})
+        for posicao, chamado in enumerate(chamados):
+            yield _linha_ndjson({"tipo": "chamado", "posicao": posicao, "chamado": chamado})
+        yield _linha_ndjson({"tipo": "fim", "sucesso": True, "total": len(chamados)})
+    
+    async def gerar() -> AsyncIterator[bytes]:
+        try:
+            if carga is None:
+                for linha in linhas_da_fila(fila):
+                    yield linha
+            elif resultado == 'coalescido':
+                # shield: o cliente desconectar não cancela a carga compartilhada
+                for linha in linhas_da_fila(await asyncio.shield(carga)):
+                    yield linha
+            else:
+                while (linha := await linhas.get()) is not None:
+                    yield linha
+                total = len(json.loads((await asyncio.shield(carga)).corpo).get("chamados", []))
+                yield _linha_ndjson({"tipo": "fim", "sucesso": True, "total": total})
+        except Exception as e:
+            # O status 200 já foi enviado: o erro vai como última linha
+            logger.error(f"[obter_chamados_grupo_itsm_todos_stream] Erro ao obter chamados: {str(e)}")
+            yield _linha_ndjson({"tipo": "erro", "sucesso": False, "erro": f"Erro ao obter chamados: {str(e)}"})
+    
+    return StreamingResponse(
+        gerar(),
+        media_type="application/x-ndjson",
+        headers={"X-Cache": resultado, "Cache-Control": "no-store"}
+    )
+
+
+def _carregador_push(chave, carregar):
+    """
+    Carregador do poller de push para uma fila
+    A primeira carga aproveita o cache das filas (a página acabou de carregar a mesma fila);
+    as seguintes consultam o Fluig pelo cache (uma carga em andamento da mesma fila é reaproveitada)
+    """
+    primeira = True
+    
+    async def recarregar() -> bytes:
+        nonlocal primeira
+        cache_filas = get_cache_filas_chamados()
+        if primeira:
+            primeira = False
+            fila, _ = await cache_filas.obter_ou_carregar(chave, carregar)
+            return fila.corpo
+        return (await cache_filas.atualizar(chave, carregar)).corpo
+    return recarregar
+
+
+def _evento_sse(tipo: str, dados: Dict) -> str:
+    """Formata um evento Server-Sent Events (uma linha de data com o JSON)"""
+    return f"event: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+@router.get("/api/chamados/eventos")
+async def eventos_chamados(request: Request):
+    """
+    Atualizações das filas em tempo real (Server-Sent Events, text/event-stream)
+    Inscreve o navegador na fila do usuário ("minha") e na do grupo ITSM_TODOS ("grupo").
+    Cada fila tem um único poller no servidor, compartilhado por todas as abas (FILA_PUSH_*).
+    Eventos (data em JSON, sempre com "fila"):
+    - snapshot: {"fila", "versao", "chamados"} ao conectar
+    - diff: {"fila", "versao", "adicionados", "removidos", "alterados"} (removidos = processInstanceIds)
+    - erro: {"fila", "erro"} quando uma atualização falha
+    """
+    user = request.session.get('user')
+    if not user:
+        return JSONResponse(
+            status_code=401,
+            content={"sucesso": False, "erro": "Usuário não autenticado"}
+        )
+    
+    email = user.get('email')
+    if not email:
+        return JSONResponse(
+            status_code=400,
+            content={"sucesso": False, "erro": "Email do usuário não encontrado"}
+        )
+    
+    publicador = get_publicador_filas()
+    if publicador is None:
+        return JSONResponse(
+            status_code=404,
+            content={"sucesso": False, "erro": "Atualização em tempo real desabilitada (FILA_PUSH_ENABLED=false)"}
+        )
+    
+    inscricao: asyncio.Queue = asyncio.Queue(maxsize=MAX_EVENTOS_PENDENTES)
+    chave_usuario = ('fila', email)
+    publicador.inscrever(inscricao, chave_usuario, "minha", _carregador_push(chave_usuario, lambda: _carregar_fila_usuario(email)))
+    publicador.inscrever(inscricao, _CHAVE_CACHE_GRUPO_ITSM, "grupo", _carregador_push(_CHAVE_CACHE_GRUPO_ITSM, _carregar_fila_grupo_itsm))
+    keepalive = float(getattr(ConfigEnvSetings, 'FILA_PUSH_KEEPALIVE_SEGUNDOS', 15))
+    
+    async def gerar():
+        try:
+            # Reconexão automática do EventSource após 5s
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    rotulo, tipo, dados = await asyncio.wait_for(inscricao.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    # Desinscrita por atraso: encerra para o navegador reconectar e receber snapshot
+                    if not publicador.inscrita(inscricao):
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield _evento_sse(tipo, {"fila": rotulo, **dados})
+        finally:
+            publicador.cancelar(inscricao)
+            logger.info(f"[eventos_chamados] Conexão de {email} encerrada")
+    
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 # ==================== ENDPOINTS DE TEMPLATES ====================
 
 @router.post("/chamado/template/salvar", response_class=JSONResponse)
@@ -8,6 +8,7 @@ from src.modelo_dados.modelo_sites import DadosChamado
 from src.modelo_dados.modelo_settings import ConfigEnvSetings
 from src.modelo_dados.modelos_fluig import AberturaChamadoClassificado
 from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_limitador import com_prioridade_fluig, PRIORIDADE_LOTE
 
 
 class AbrirChamados:
@@ -217,6 +218,7 @@ class AbrirChamados:
                 'dados': {}
             }
     
+    @com_prioridade_fluig(PRIORIDADE_LOTE)
     def abrir_chamados_sequencia(
         self, 
         titulo: str, 
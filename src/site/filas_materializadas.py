@@ -0,0 +1,342 @@
+"""
+Filas materializadas do webapp, mantidas em background
+
+Mantém atualizada no cache das filas (FILA_CACHE_*) a resposta já serializada
+de cada fila ativa: a do grupo (fixa) e a de cada usuário que abriu o webapp
+nas últimas FILA_MATERIALIZADA_ATIVIDADE_HORAS. Assim /api/chamados/fila e
+/api/chamados/grupo-itsm-todos respondem com um hit no cache, sem consultar
+colleagueId, tasks e detalhes no Fluig durante a requisição.
+
+Cada fila é recarregada a cada FILA_MATERIALIZADA_INTERVALO_SEGUNDOS, com
+jitter de ±FILA_MATERIALIZADA_JITTER para espalhar as recargas. A recarga é
+incremental: só os chamados cuja versão mudou vão ao Fluig buscar detalhes
+(cache de detalhes). Uma fila que acabou de ser recarregada por outro caminho
+(consulta, poller de push) fica para a próxima vez. Cada fila tem a própria
+tarefa e a própria agenda: uma fila registrada agora começa a carregar na
+hora, sem esperar as recargas das outras. As recargas periódicas usam
+PRIORIDADE_BACKGROUND no limitador do Fluig; só a primeira carga de quem
+acabou de abrir o webapp (há alguém esperando por ela) é interativa.
+
+Os usuários ativos são salvos em src/json/filas_ativas.json, então um restart
+volta a pré-carregar as mesmas filas.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from src.fluig.fluig_cache import get_cache_filas_chamados
+from src.fluig.fluig_limitador import PRIORIDADE_BACKGROUND, PRIORIDADE_INTERATIVA, prioridade_fluig
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+
+ARQUIVO_FILAS_ATIVAS = Path(__file__).resolve().parent.parent / "json" / "filas_ativas.json"
+
+Carregador = Callable[[], Awaitable[bytes]]
+
+
+class _FilaMaterializada:
+    """Uma fila mantida em background: como carregar, último acesso e agenda da próxima recarga"""
+
+    def __init__(self, chave: Hashable, carregador: Carregador, fixa: bool, ultimo_acesso: float):
+        self.chave = chave
+        self.carregador = carregador
+        self.fixa = fixa
+        self.ultimo_acesso = ultimo_acesso
+        self.proxima = 0.0
+        self.atualizacoes = 0
+        self.puladas = 0
+        self.erros = 0
+        self.ultima_duracao: Optional[float] = None
+        self.tarefa: Optional[asyncio.Task] = None
+        # Primeira carga pedida por um acesso ao webapp: há um usuário esperando por ela
+        self.acesso_pendente = False
+
+
+class AtualizadorFilas:
+    """
+    Recarrega em background as filas ativas do webapp
+
+    Attributes:
+        intervalo_segundos: Intervalo entre recargas de cada fila
+        jitter: Variação relativa do intervalo (0.2 = ±20%)
+        atividade_segundos: Tempo desde o último acesso em que a fila do usuário é mantida
+        max_usuarios: Máximo de filas de usuário mantidas (as de acesso mais antigo saem)
+        concorrencia: Recargas simultâneas
+        arquivo: Onde os usuários ativos são salvos
+    """
+
+    def __init__(
+        self,
+        intervalo_segundos: float,
+        jitter: float,
+        atividade_segundos: float,
+        max_usuarios: int,
+        concorrencia: int,
+        arquivo: Path = ARQUIVO_FILAS_ATIVAS
+    ):
+        self.intervalo_segundos = max(5.0, float(intervalo_segundos))
+        self.jitter = min(max(0.0, float(jitter)), 0.9)
+        self.atividade_segundos = max(0.0, float(atividade_segundos))
+        self.max_usuarios = max(0, int(max_usuarios))
+        self.concorrencia = max(1, int(concorrencia))
+        self.arquivo = arquivo
+
+        self._fila_usuario: Optional[Callable[[str], Tuple[Hashable, Carregador]]] = None
+        self._filas: Dict[Hashable, _FilaMaterializada] = {}
+        # email -> chave da fila do usuário
+        self._usuarios: Dict[str, Hashable] = {}
+        # Definidos em iniciar(): event loop das tarefas, vagas de recarga e a tarefa de expiração
+        self._loop_evento: Optional[asyncio.AbstractEventLoop] = None
+        self._limite: Optional[asyncio.Semaphore] = None
+        self._tarefa_expiracao: Optional[asyncio.Task] = None
+
+    # ==================== FILAS ====================
+
+    def configurar(self, fila_usuario: Callable[[str], Tuple[Hashable, Carregador]], filas_fixas: Dict[Hashable, Carregador]):
+        """
+        Define como montar a fila de um usuário e quais filas são sempre mantidas
+
+        Args:
+            fila_usuario: email -> (chave no cache das filas, carregador)
+            filas_fixas: chave -> carregador (ex.: o pool do grupo)
+        """
+        self._fila_usuario = fila_usuario
+        for chave, carregador in filas_fixas.items():
+            if chave not in self._filas:
+                self._filas[chave] = _FilaMaterializada(chave, carregador, fixa=True, ultimo_acesso=time.time())
+
+    def _agendar(self, fila: _FilaMaterializada):
+        variacao = random.uniform(-self.jitter, self.jitter)
+        fila.proxima = time.monotonic() + self.intervalo_segundos * (1 + variacao)
+
+    def _iniciar_tarefa(self, fila: _FilaMaterializada):
+        """Cria a tarefa que mantém a fila (chamar no event loop do atualizador, depois de iniciar())"""
+        if self._loop_evento is None or (fila.tarefa is not None and not fila.tarefa.done()):
+            return
+        fila.tarefa = self._loop_evento.create_task(self._manter(fila))
+
+    def _cancelar_tarefa(self, fila: _FilaMaterializada):
+        if fila.tarefa is not None:
+            fila.tarefa.cancel()
+            fila.tarefa = None
+
+    def registrar_acesso(self, email: str):
+        """
+        Marca o usuário como ativo; uma fila nova começa a carregar imediatamente
+
+        Args:
+            email: Email do usuário logado
+        """
+        if not email or self._fila_usuario is None or self.max_usuarios == 0:
+            return
+        chave = self._usuarios.get(email)
+        fila = self._filas.get(chave) if chave is not None else None
+        if fila is not None:
+            fila.ultimo_acesso = time.time()
+            return
+
+        chave, carregador = self._fila_usuario(email)
+        self._usuarios[email] = chave
+        fila = _FilaMaterializada(chave, carregador, fixa=False, ultimo_acesso=time.time())
+        fila.acesso_pendente = True
+        self._filas[chave] = fila
+        self._limitar_usuarios()
+        self._salvar()
+        logger.info(f"[AtualizadorFilas] Fila de {email} passa a ser mantida em background ({len(self._usuarios)} usuário(s))")
+        if chave in self._filas:
+            self._iniciar_tarefa(fila)
+
+    def _remover_usuario(self, email: str):
+        chave = self._usuarios.pop(email, None)
+        fila = self._filas.pop(chave, None) if chave is not None else None
+        if fila is not None:
+            self._cancelar_tarefa(fila)
+
+    def _limitar_usuarios(self):
+        """Remove os usuários de acesso mais antigo acima de max_usuarios"""
+        excedentes = len(self._usuarios) - self.max_usuarios
+        if excedentes <= 0:
+            return
+        antigos = sorted(self._usuarios, key=lambda e: self._filas[self._usuarios[e]].ultimo_acesso)[:excedentes]
+        for email in antigos:
+            self._remover_usuario(email)
+
+    def _expirar_inativos(self) -> int:
+        limite = time.time() - self.atividade_segundos
+        inativos = [e for e, chave in self._usuarios.items() if self._filas[chave].ultimo_acesso < limite]
+        for email in inativos:
+            self._remover_usuario(email)
+        if inativos:
+            logger.info(f"[AtualizadorFilas] {len(inativos)} fila(s) de usuário sem acesso recente deixaram de ser mantidas")
+            self._salvar()
+        return len(inativos)
+
+    # ==================== PERSISTÊNCIA ====================
+
+    def _carregar_arquivo(self):
+        """Recupera os usuários ativos salvos (acessos dentro da janela de atividade)"""
+        if self._fila_usuario is None or not self.arquivo.exists():
+            return
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                acessos = json.load(f).get('usuarios') or {}
+            limite = time.time() - self.atividade_segundos
+            for email, ultimo_acesso in acessos.items():
+                if float(ultimo_acesso) >= limite and email not in self._usuarios:
+                    chave, carregador = self._fila_usuario(email)
+                    self._usuarios[email] = chave
+                    self._filas[chave] = _FilaMaterializada(chave, carregador, fixa=False, ultimo_acesso=float(ultimo_acesso))
+            self._limitar_usuarios()
+            logger.info(f"[AtualizadorFilas] {len(self._usuarios)} usuário(s) ativo(s) recuperado(s) de {self.arquivo.name}")
+        except Exception as e:
+            logger.error(f"[AtualizadorFilas] Erro ao ler {self.arquivo.name}: {str(e)}")
+
+    def _salvar(self):
+        try:
+            conteudo = {'usuarios': {e: self._filas[chave].ultimo_acesso for e, chave in self._usuarios.items()}}
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            temporario = self.arquivo.with_suffix('.tmp')
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(conteudo, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+        except Exception as e:
+            logger.error(f"[AtualizadorFilas] Erro ao salvar {self.arquivo.name}: {str(e)}")
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    async def _atualizar(self, fila: _FilaMaterializada):
+        # A primeira carga de um usuário que acabou de abrir o webapp não espera vaga nem cede prioridade
+        if fila.acesso_pendente:
+            fila.acesso_pendente = False
+            await self._recarregar(fila, PRIORIDADE_INTERATIVA)
+            return
+        async with self._limite:
+            await self._recarregar(fila, PRIORIDADE_BACKGROUND)
+
+    async def _recarregar(self, fila: _FilaMaterializada, prioridade: str):
+        """Recarrega a fila no cache (ou pula, se outro caminho acabou de recarregar) e agenda a próxima"""
+        cache_filas = get_cache_filas_chamados()
+        idade = cache_filas.idade(fila.chave)
+        # Recarregada há pouco por outro caminho (consulta ou poller de push)
+        if idade is not None and idade < self.intervalo_segundos * (1 - self.jitter):
+            fila.puladas += 1
+            self._agendar(fila)
+            return
+        inicio = time.perf_counter()
+        try:
+            with prioridade_fluig(prioridade):
+                await cache_filas.atualizar(fila.chave, fila.carregador)
+            fila.atualizacoes += 1
+        except Exception as e:
+            fila.erros += 1
+            logger.error(f"[AtualizadorFilas] Erro ao atualizar a fila {fila.chave}: {str(e)}")
+        fila.ultima_duracao = round(time.perf_counter() - inicio, 3)
+        self._agendar(fila)
+
+    async def _manter(self, fila: _FilaMaterializada):
+        """Recarrega a fila na agenda dela até ser cancelada (usuário inativo ou parar())"""
+        while True:
+            espera = fila.proxima - time.monotonic()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            await self._atualizar(fila)
+
+    async def _expirar_periodicamente(self):
+        intervalo = min(self.intervalo_segundos, max(1.0, self.atividade_segundos / 10))
+        while True:
+            await asyncio.sleep(intervalo)
+            self._expirar_inativos()
+
+    def iniciar(self):
+        """Inicia as tarefas das filas no event loop atual (chamar no startup da aplicação)"""
+        if self._loop_evento is not None:
+            return
+        self._carregar_arquivo()
+        self._loop_evento = asyncio.get_running_loop()
+        self._limite = asyncio.Semaphore(self.concorrencia)
+        for fila in list(self._filas.values()):
+            self._iniciar_tarefa(fila)
+        self._tarefa_expiracao = self._loop_evento.create_task(self._expirar_periodicamente())
+        logger.info(
+            f"[AtualizadorFilas] Atualização das filas iniciada - {len(self._filas)} fila(s), "
+            f"intervalo: {self.intervalo_segundos}s ±{int(self.jitter * 100)}%"
+        )
+
+    def parar(self):
+        """Cancela as tarefas e salva os usuários ativos"""
+        for fila in self._filas.values():
+            self._cancelar_tarefa(fila)
+        if self._tarefa_expiracao is not None:
+            self._tarefa_expiracao.cancel()
+            self._tarefa_expiracao = None
+        self._loop_evento = None
+        self._salvar()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Filas mantidas, agenda e resultado das últimas recargas"""
+        agora = time.monotonic()
+        cache_filas = get_cache_filas_chamados()
+        return {
+            'ativo': self._loop_evento is not None,
+            'intervalo_segundos': self.intervalo_segundos,
+            'jitter': self.jitter,
+            'atividade_segundos': self.atividade_segundos,
+            'max_usuarios': self.max_usuarios,
+            'usuarios': len(self._usuarios),
+            'filas': [
+                {
+                    'fila': ':'.join(str(parte) for parte in fila.chave) if isinstance(fila.chave, tuple) else str(fila.chave),
+                    'fixa': fila.fixa,
+                    'idade_segundos': round(idade, 1) if (idade := cache_filas.idade(fila.chave)) is not None else None,
+                    'proxima_em_segundos': round(max(0.0, fila.proxima - agora), 1),
+                    'atualizacoes': fila.atualizacoes,
+                    'puladas': fila.puladas,
+                    'erros': fila.erros,
+                    'ultima_duracao_segundos': fila.ultima_duracao,
+                }
+                for fila in self._filas.values()
+            ],
+        }
+
+
+_atualizador_filas: Optional[AtualizadorFilas] = None
+
+
+def get_atualizador_filas() -> Optional[AtualizadorFilas]:
+    """
+    Retorna o atualizador global das filas materializadas
+
+    Returns:
+        AtualizadorFilas ou None se FILA_MATERIALIZADA_ENABLED estiver desabilitado
+    """
+    global _atualizador_filas
+    if str(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_ENABLED', 'true')).lower() != 'true':
+        return None
+    if _atualizador_filas is None:
+        _atualizador_filas = AtualizadorFilas(
+            intervalo_segundos=float(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_INTERVALO_SEGUNDOS', 120)),
+            jitter=float(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_JITTER', 0.2)),
+            atividade_segundos=float(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_ATIVIDADE_HORAS', 12)) * 3600,
+            max_usuarios=int(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_MAX_USUARIOS', 150)),
+            concorrencia=int(getattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_CONCORRENCIA', 4)),
+        )
+    return _atualizador_filas
+
+
+def iniciar_atualizacao_filas():
+    """Inicia a atualização das filas materializadas (startup da aplicação)"""
+    atualizador = get_atualizador_filas()
+    if atualizador is None:
+        logger.info("[filas_materializadas] Filas materializadas desabilitadas (FILA_MATERIALIZADA_ENABLED=false)")
+        return
+    atualizador.iniciar()
+
+
+def parar_atualizacao_filas():
+    """Para a atualização das filas materializadas (shutdown da aplicação)"""
+    if _atualizador_filas is not None:
+        _atualizador_filas.parar()
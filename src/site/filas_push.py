@@ -0,0 +1,240 @@
+"""
+Publicação das filas de chamados do webapp em tempo real (Server-Sent Events)
+
+Há um único poller por fila distinta (a fila de cada usuário e o pool do
+grupo). Ele é criado quando o primeiro navegador se inscreve. A cada
+FILA_PUSH_INTERVALO_SEGUNDOS o poller recarrega a fila e compara com a versão
+anterior. Os detalhes de chamados sem mudança vêm do cache de detalhes. Os
+inscritos recebem apenas os chamados adicionados, removidos e alterados, então
+a carga no Fluig cresce com o número de filas, não com o número de abas.
+
+As recargas rodam com PRIORIDADE_BACKGROUND no limitador do Fluig. Sem
+inscritos, o poller para de consultar o Fluig. Depois de
+FILA_PUSH_OCIOSIDADE_SEGUNDOS ele é encerrado; até lá, um recarregamento de
+página recebe a última versão na hora.
+
+Eventos entregues a cada inscrição (tipo, dados):
+- snapshot: {"versao", "chamados"} ao se inscrever (ou após a primeira carga)
+- diff: {"versao", "adicionados", "removidos", "alterados"}; removidos são processInstanceIds
+- erro: {"erro"} quando uma recarga falha (a última versão continua valendo)
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.fluig.fluig_limitador import PRIORIDADE_BACKGROUND, prioridade_fluig
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+
+# Eventos pendentes por inscrição; um navegador que não acompanha é desinscrito (reconecta e recebe snapshot)
+MAX_EVENTOS_PENDENTES = 100
+
+Evento = Tuple[str, str, Dict[str, Any]]
+
+
+def calcular_diff(anteriores: Dict[Any, Dict], chamados: List[Dict]) -> Dict[str, List]:
+    """
+    Compara duas versões de uma fila pelo processInstanceId
+
+    Args:
+        anteriores: Versão anterior {processInstanceId: chamado}
+        chamados: Versão nova (lista na ordem da listagem)
+
+    Returns:
+        {"adicionados": [chamado...], "removidos": [processInstanceId...], "alterados": [chamado...]}
+    """
+    atuais = {chamado.get('processInstanceId'): chamado for chamado in chamados}
+    return {
+        "adicionados": [c for pid, c in atuais.items() if pid not in anteriores],
+        "removidos": [pid for pid in anteriores if pid not in atuais],
+        "alterados": [c for pid, c in atuais.items() if pid in anteriores and anteriores[pid] != c],
+    }
+
+
+class _FilaPublicada:
+    """Estado de uma fila com poller: última versão, inscritos e a tarefa de recarga"""
+
+    def __init__(self, chave: Hashable, carregador: Callable[[], Awaitable[bytes]]):
+        self.chave = chave
+        self.carregador = carregador
+        # fila de eventos da inscrição -> rótulo da fila para aquele navegador (ex.: "minha", "grupo")
+        self.inscritos: Dict[asyncio.Queue, str] = {}
+        self.chamados: Optional[Dict[Any, Dict]] = None
+        self.versao = 0
+        self.vazia_desde = time.monotonic()
+        self.tarefa: Optional[asyncio.Task] = None
+        self.recargas = 0
+        self.erros = 0
+
+
+class PublicadorFilas:
+    """
+    Pollers compartilhados das filas do webapp e entrega dos eventos aos inscritos
+
+    Attributes:
+        intervalo_segundos: Intervalo entre recargas de cada fila
+        ociosidade_segundos: Tempo sem inscritos até o poller ser encerrado
+    """
+
+    def __init__(self, intervalo_segundos: float, ociosidade_segundos: float):
+        self.intervalo_segundos = max(1.0, float(intervalo_segundos))
+        self.ociosidade_segundos = max(0.0, float(ociosidade_segundos))
+        self._filas: Dict[Hashable, _FilaPublicada] = {}
+        self.desinscritos_por_atraso = 0
+
+    def _entregar(self, fila: _FilaPublicada, tipo: str, dados: Dict[str, Any], inscricao: Optional[asyncio.Queue] = None):
+        """Enfileira o evento para um inscrito (ou todos); quem está com a fila cheia é desinscrito"""
+        destinos = [inscricao] if inscricao is not None else list(fila.inscritos)
+        for destino in destinos:
+            rotulo = fila.inscritos.get(destino)
+            if rotulo is None:
+                continue
+            try:
+                destino.put_nowait((rotulo, tipo, dados))
+            except asyncio.QueueFull:
+                logger.warning(f"[PublicadorFilas] Inscrição atrasada na fila {fila.chave} - desinscrita")
+                self.desinscritos_por_atraso += 1
+                self.cancelar(destino)
+
+    def _snapshot(self, fila: _FilaPublicada) -> Dict[str, Any]:
+        return {"versao": fila.versao, "chamados": list(fila.chamados.values())}
+
+    def inscrever(
+        self,
+        inscricao: asyncio.Queue,
+        chave: Hashable,
+        rotulo: str,
+        carregador: Callable[[], Awaitable[bytes]]
+    ):
+        """
+        Inscreve uma conexão em uma fila, criando o poller se for o primeiro inscrito
+
+        Args:
+            inscricao: Fila de eventos da conexão (recebe tuplas (rotulo, tipo, dados))
+            chave: Identifica a fila (ex.: ('fila', email), ('grupo', 'ITSM_TODOS'))
+            rotulo: Nome da fila nos eventos dessa conexão
+            carregador: Corrotina que carrega a fila (resposta JSON serializada com "chamados")
+        """
+        fila = self._filas.get(chave)
+        if fila is None:
+            fila = _FilaPublicada(chave, carregador)
+            self._filas[chave] = fila
+        fila.inscritos[inscricao] = rotulo
+        if fila.tarefa is None or fila.tarefa.done():
+            fila.tarefa = asyncio.get_running_loop().create_task(self._loop(fila))
+        if fila.chamados is not None:
+            self._entregar(fila, "snapshot", self._snapshot(fila), inscricao)
+        logger.info(f"[PublicadorFilas] Inscrição na fila {chave} - {len(fila.inscritos)} inscrito(s)")
+
+    def cancelar(self, inscricao: asyncio.Queue):
+        """Remove a conexão de todas as filas em que estava inscrita"""
+        for fila in self._filas.values():
+            if fila.inscritos.pop(inscricao, None) is not None and not fila.inscritos:
+                fila.vazia_desde = time.monotonic()
+
+    def inscrita(self, inscricao: asyncio.Queue) -> bool:
+        """Indica se a conexão ainda recebe eventos de alguma fila"""
+        return any(inscricao in fila.inscritos for fila in self._filas.values())
+
+    async def _recarregar(self, fila: _FilaPublicada):
+        corpo = await fila.carregador()
+        chamados = json.loads(corpo).get("chamados") or []
+        fila.recargas += 1
+
+        if fila.chamados is None:
+            fila.chamados = {c.get('processInstanceId'): c for c in chamados}
+            fila.versao += 1
+            self._entregar(fila, "snapshot", self._snapshot(fila))
+            return
+
+        diff = calcular_diff(fila.chamados, chamados)
+        fila.chamados = {c.get('processInstanceId'): c for c in chamados}
+        if any(diff.values()):
+            fila.versao += 1
+            logger.info(
+                f"[PublicadorFilas] Fila {fila.chave} v{fila.versao}: +{len(diff['adicionados'])} "
+                f"-{len(diff['removidos'])} ~{len(diff['alterados'])} ({len(fila.inscritos)} inscrito(s))"
+            )
+            self._entregar(fila, "diff", {"versao": fila.versao, **diff})
+
+    async def _loop(self, fila: _FilaPublicada):
+        """Recarrega a fila enquanto houver inscritos; encerra após a ociosidade"""
+        try:
+            while True:
+                if not fila.inscritos:
+                    if time.monotonic() - fila.vazia_desde >= self.ociosidade_segundos:
+                        break
+                    await asyncio.sleep(min(self.intervalo_segundos, max(self.ociosidade_segundos, 1.0)))
+                    continue
+                try:
+                    # Recarga sem ninguém esperando: não disputa o limitador com as requisições dos usuários
+                    with prioridade_fluig(PRIORIDADE_BACKGROUND):
+                        await self._recarregar(fila)
+                except Exception as e:
+                    fila.erros += 1
+                    logger.error(f"[PublicadorFilas] Erro ao recarregar a fila {fila.chave}: {str(e)}")
+                    self._entregar(fila, "erro", {"erro": f"Erro ao atualizar chamados: {str(e)}"})
+                await asyncio.sleep(self.intervalo_segundos)
+        finally:
+            if not fila.inscritos and self._filas.get(fila.chave) is fila:
+                del self._filas[fila.chave]
+                logger.info(f"[PublicadorFilas] Poller da fila {fila.chave} encerrado (sem inscritos)")
+
+    def parar(self):
+        """Encerra todos os pollers (os inscritos deixam de receber eventos)"""
+        for fila in list(self._filas.values()):
+            fila.inscritos.clear()
+            if fila.tarefa is not None:
+                fila.tarefa.cancel()
+        self._filas.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Filas com poller, inscritos, versão e recargas"""
+        return {
+            'intervalo_segundos': self.intervalo_segundos,
+            'ociosidade_segundos': self.ociosidade_segundos,
+            'desinscritos_por_atraso': self.desinscritos_por_atraso,
+            'filas': [
+                {
+                    'fila': ':'.join(str(parte) for parte in fila.chave) if isinstance(fila.chave, tuple) else str(fila.chave),
+                    'inscritos': len(fila.inscritos),
+                    'chamados': len(fila.chamados) if fila.chamados is not None else None,
+                    'versao': fila.versao,
+                    'recargas': fila.recargas,
+                    'erros': fila.erros,
+                }
+                for fila in self._filas.values()
+            ],
+        }
+
+
+_publicador_filas: Optional[PublicadorFilas] = None
+
+
+def get_publicador_filas() -> Optional[PublicadorFilas]:
+    """
+    Retorna o publicador global das filas do webapp
+
+    Returns:
+        PublicadorFilas ou None se FILA_PUSH_ENABLED estiver desabilitado
+    """
+    global _publicador_filas
+    if str(getattr(ConfigEnvSetings, 'FILA_PUSH_ENABLED', 'true')).lower() != 'true':
+        return None
+    if _publicador_filas is None:
+        _publicador_filas = PublicadorFilas(
+            intervalo_segundos=float(getattr(ConfigEnvSetings, 'FILA_PUSH_INTERVALO_SEGUNDOS', 30)),
+            ociosidade_segundos=float(getattr(ConfigEnvSetings, 'FILA_PUSH_OCIOSIDADE_SEGUNDOS', 120)),
+        )
+        logger.info(
+            f"[filas_push] Publicador de filas criado - Intervalo: {_publicador_filas.intervalo_segundos}s, "
+            f"ociosidade: {_publicador_filas.ociosidade_segundos}s"
+        )
+    return _publicador_filas
+
+
+def parar_publicacao_filas():
+    """Encerra os pollers das filas (shutdown da aplicação)"""
+    if _publicador_filas is not None:
+        _publicador_filas.parar()
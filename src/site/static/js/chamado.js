@@ -182,6 +182,111 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // ==================== ATUALIZAÇÃO EM TEMPO REAL (SSE) ====================
+    // O servidor mantém um poller por fila e envia só o que mudou; sem EventSource, volta ao refresh em background
+    const pushDisponivel = typeof window.EventSource === 'function';
+    let eventosChamados = null;
+    
+    /**
+     * Aplica um evento de /api/chamados/eventos à lista da fila correspondente
+     */
+    function aplicarEventoFila(tipo, dados) {
+        const ehGrupo = dados.fila === 'grupo';
+        let lista = ehGrupo ? todosChamadosGrupo : todosChamados;
+        
+        if (tipo === 'snapshot') {
+            const novos = dados.chamados || [];
+            if (JSON.stringify(novos) === JSON.stringify(lista)) {
+                return;
+            }
+            lista = novos;
+        } else if (tipo === 'diff') {
+            const removidos = new Set((dados.removidos || []).map(String));
+            const alterados = new Map((dados.alterados || []).map(c => [String(c.processInstanceId), c]));
+            lista = lista
+                .filter(c => !removidos.has(String(c.processInstanceId)))
+                .map(c => alterados.get(String(c.processInstanceId)) || c)
+                .concat(dados.adicionados || []);
+        } else {
+            return;
+        }
+        console.log(`[Push] ${tipo} da fila ${dados.fila} (versão ${dados.versao}) - ${lista.length} chamados`);
+        
+        const paginas = Math.max(1, Math.ceil(lista.length / (ehGrupo ? itensPorPaginaGrupo : itensPorPagina)));
+        if (ehGrupo) {
+            todosChamadosGrupo = lista;
+            paginaAtualGrupo = Math.min(paginaAtualGrupo, paginas);
+            renderizarChamadosGrupo();
+            salvarCache(CACHE_KEY_GRUPO, { sucesso: true, chamados: lista, total: lista.length });
+        } else {
+            todosChamados = lista;
+            paginaAtual = Math.min(paginaAtual, paginas);
+            renderizarChamadosFila();
+            salvarCache(CACHE_KEY_FILA, { sucesso: true, chamados: lista, total: lista.length });
+        }
+    }
+    
+    /**
+     * Abre (uma única vez) a conexão SSE com as atualizações das filas
+     */
+    function iniciarEventosChamados() {
+        if (!pushDisponivel || eventosChamados) {
+            return;
+        }
+        eventosChamados = new EventSource('/api/chamados/eventos');
+        ['snapshot', 'diff'].forEach(tipo => {
+            eventosChamados.addEventListener(tipo, (evento) => {
+                try {
+                    aplicarEventoFila(tipo, JSON.parse(evento.data));
+                } catch (e) {
+                    console.error('[Push] Erro ao aplicar evento:', e);
+                }
+            });
+        });
+        eventosChamados.addEventListener('erro', (evento) => {
+            console.warn('[Push] Erro ao atualizar fila no servidor:', evento.data);
+        });
+        eventosChamados.onerror = () => {
+            // CLOSED: o servidor recusou (ex.: push desabilitado); o navegador não vai reconectar
+            if (eventosChamados.readyState === EventSource.CLOSED) {
+                console.warn('[Push] Conexão encerrada, usando atualização em background');
+                atualizarChamadosFilaEmBackground();
+                atualizarChamadosGrupoEmBackground();
+            }
+        };
+    }
+
+    /**
+     * Lê uma resposta NDJSON linha a linha, chamando aoReceberLinha com cada objeto assim que chega
+     */
+    async function lerLinhasNdjson(response, aoReceberLinha) {
+        const processar = (texto) => {
+            const linha = texto.trim();
+            if (linha) {
+                aoReceberLinha(JSON.parse(linha));
+            }
+        };
+        
+        // Navegadores sem ReadableStream: lê tudo e processa no final
+        if (!response.body || !response.body.getReader) {
+            (await response.text()).split('\n').forEach(processar);
+            return;
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let pendente = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            pendente += decoder.decode(value, { stream: true });
+            const linhas = pendente.split('\n');
+            pendente = linhas.pop();
+            linhas.forEach(processar);
+        }
+        processar(pendente + decoder.decode());
+    }
+
     const servicoInput = document.getElementById('servico');
     const servicoIdInput = document.getElementById('servico_id');
     const servicoDropdown = document.getElementById('servico-dropdown');
@@ -1071,8 +1176,10 @@ document.addEventListener('DOMContentLoaded', function() {
             paginaAtual = 1;
             renderizarChamadosFila();
             
-            // Atualizar em background (sem bloquear UI)
-            atualizarChamadosFilaEmBackground();
+            // Atualizar em background (sem bloquear UI); com push, o snapshot chega pelo EventSource
+            if (!pushDisponivel) {
+                atualizarChamadosFilaEmBackground();
+            }
             return;
         }
         
@@ -1323,8 +1430,10 @@ document.addEventListener('DOMContentLoaded', function() {
             paginaAtualGrupo = 1;
             renderizarChamadosGrupo();
             
-            // Atualizar em background (sem bloquear UI)
-            atualizarChamadosGrupoEmBackground();
+            // Atualizar em background (sem bloquear UI); com push, o snapshot chega pelo EventSource
+            if (!pushDisponivel) {
+                atualizarChamadosGrupoEmBackground();
+            }
             return;
         }
         
@@ -1334,8 +1443,9 @@ document.addEventListener('DOMContentLoaded', function() {
             chamadosGrupoList.innerHTML = '';
             if (chamadosGrupoPagination) chamadosGrupoPagination.style.display = 'none';
             
-            console.log('[carregarChamadosGrupo] Fazendo requisição para /api/chamados/grupo-itsm-todos...');
-            const response = await fetch('/api/chamados/grupo-itsm-todos');
+            // Streaming NDJSON: cada chamado é renderizado assim que seus detalhes chegam
+            console.log('[carregarChamadosGrupo] Fazendo requisição para /api/chamados/grupo-itsm-todos/stream...');
+            const response = await fetch('/api/chamados/grupo-itsm-todos/stream');
             
             console.log('[carregarChamadosGrupo] Status da resposta:', response.status);
             
@@ -1350,29 +1460,55 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
             
-            const data = await response.json();
-            console.log('[carregarChamadosGrupo] Dados recebidos:', data);
+            // Posições na ordem da listagem (os chamados chegam fora de ordem)
+            const chamadosPorPosicao = [];
+            let renderizacaoAgendada = null;
+            let erroStream = null;
+            let totalFinal = null;
+            todosChamadosGrupo = [];
+            paginaAtualGrupo = 1;
             
-            chamadosGrupoLoading.style.display = 'none';
+            const renderizarParcial = () => {
+                renderizacaoAgendada = null;
+                todosChamadosGrupo = chamadosPorPosicao.filter(Boolean);
+                chamadosGrupoLoading.style.display = 'none';
+                renderizarChamadosGrupo();
+            };
             
-            if (!data.sucesso) {
-                console.warn('[carregarChamadosGrupo] Requisição não foi bem-sucedida:', data.erro);
+            await lerLinhasNdjson(response, (linha) => {
+                if (linha.tipo === 'inicio') {
+                    console.log('[carregarChamadosGrupo] Total na listagem:', linha.total);
+                } else if (linha.tipo === 'chamado') {
+                    chamadosPorPosicao[linha.posicao] = linha.chamado;
+                    // Agrupa as renderizações (no máximo uma a cada 150ms)
+                    if (!renderizacaoAgendada) {
+                        renderizacaoAgendada = setTimeout(renderizarParcial, 150);
+                    }
+                } else if (linha.tipo === 'fim') {
+                    totalFinal = linha.total;
+                } else if (linha.tipo === 'erro') {
+                    erroStream = linha.erro;
+                }
+            });
+            
+            if (renderizacaoAgendada) {
+                clearTimeout(renderizacaoAgendada);
+            }
+            renderizarParcial();
+            
+            if (erroStream || totalFinal === null) {
+                console.warn('[carregarChamadosGrupo] Streaming interrompido:', erroStream);
                 if (chamadosGrupoError) {
-                    chamadosGrupoError.textContent = data.erro || 'Erro ao carregar chamados';
+                    chamadosGrupoError.textContent = erroStream || 'Carregamento dos chamados interrompido';
                     chamadosGrupoError.style.display = 'block';
                 }
                 return;
             }
             
-            todosChamadosGrupo = data.chamados || [];
-            paginaAtualGrupo = 1;
             console.log('[carregarChamadosGrupo] Total de chamados:', todosChamadosGrupo.length);
             
-            // Salvar no cache
-            salvarCache(CACHE_KEY_GRUPO, data);
-            
-            // Renderiza a primeira página
-            renderizarChamadosGrupo();
+            // Salvar no cache (mesmo formato de /api/chamados/grupo-itsm-todos)
+            salvarCache(CACHE_KEY_GRUPO, { sucesso: true, chamados: todosChamadosGrupo, total: todosChamadosGrupo.length });
             
             console.log('[carregarChamadosGrupo] Chamados renderizados com sucesso');
             
@@ -1386,6 +1522,11 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Recebe as atualizações das filas em tempo real
+    if ((chamadosList && chamadosLoading) || (chamadosGrupoList && chamadosGrupoLoading)) {
+        iniciarEventosChamados();
+    }
+    
     // Carrega chamados ao carregar a página
     if (chamadosList && chamadosLoading) {
         console.log('[chamado.js] Elementos da sidebar encontrados, iniciando carregamento de chamados...');
@@ -1477,9 +1618,29 @@ function carregarServicos() {
 
 
 
+// Busca no servidor (índice do catálogo: sem acento, por prefixo e tolerante a erros de digitação)
+let buscaServicosTimer = null;
+let buscaServicosSequencia = 0;
+
+// Filtro local (usado se a busca no servidor falhar)
+function filtrarServicosLocal(textoFiltro) {
+    return servicosDisponiveis.filter(servico => {
+        const servicoNome = (servico.servico || '').toLowerCase();
+        const grupoServico = (servico.grupo_servico || '').toLowerCase();
+        const itemServico = (servico.item_servico || '').toLowerCase();
+        const numeroDoc = (servico.numero_documento || '').toLowerCase();
+        const documentid = (servico.documentid || '').toLowerCase();
+        
+        return servicoNome.includes(textoFiltro) ||
+               grupoServico.includes(textoFiltro) ||
+               itemServico.includes(textoFiltro) ||
+               numeroDoc.includes(textoFiltro) ||
+               documentid.includes(textoFiltro);
+    });
+}
+
 // Função para mostrar dropdown de serviços
 function mostrarDropdown() {
-    const dropdown = document.getElementById('servico-dropdown');
     const servicoInput = document.getElementById('servico');
     
     if (servicosDisponiveis.length === 0) {
@@ -1488,30 +1649,41 @@ function mostrarDropdown() {
         return;
     }
     
-    // Filtra serviços baseado no texto digitado
-    const textoFiltro = servicoInput.value.trim().toLowerCase();
-    let servicosFiltrados;
+    const textoFiltro = servicoInput.value.trim();
+    clearTimeout(buscaServicosTimer);
     
     if (textoFiltro.length === 0) {
         // Se não há texto, mostrar todos os serviços
-        servicosFiltrados = servicosDisponiveis;
-    } else {
-        // Se há texto, filtrar os serviços
-        servicosFiltrados = servicosDisponiveis.filter(servico => {
-            const servicoNome = (servico.servico || '').toLowerCase();
-            const grupoServico = (servico.grupo_servico || '').toLowerCase();
-            const itemServico = (servico.item_servico || '').toLowerCase();
-            const numeroDoc = (servico.numero_documento || '').toLowerCase();
-            const documentid = (servico.documentid || '').toLowerCase();
-            
-            return servicoNome.includes(textoFiltro) ||
-                   grupoServico.includes(textoFiltro) ||
-                   itemServico.includes(textoFiltro) ||
-                   numeroDoc.includes(textoFiltro) ||
-                   documentid.includes(textoFiltro);
-        });
+        renderizarDropdownServicos(servicosDisponiveis);
+        return;
     }
     
+    // Aguarda uma pausa na digitação e descarta respostas de buscas anteriores
+    buscaServicosTimer = setTimeout(() => {
+        const sequencia = ++buscaServicosSequencia;
+        fetch(`/buscar_servicos?q=${encodeURIComponent(textoFiltro)}&limite=20`)
+            .then(response => response.json())
+            .then(data => {
+                if (sequencia !== buscaServicosSequencia) return;
+                if (data.sucesso) {
+                    renderizarDropdownServicos(data.servicos);
+                } else {
+                    renderizarDropdownServicos(filtrarServicosLocal(textoFiltro.toLowerCase()));
+                }
+            })
+            .catch(error => {
+                console.error('Erro ao buscar serviços:', error);
+                if (sequencia === buscaServicosSequencia) {
+                    renderizarDropdownServicos(filtrarServicosLocal(textoFiltro.toLowerCase()));
+                }
+            });
+    }, 120);
+}
+
+// Função para montar o dropdown com a lista de serviços
+function renderizarDropdownServicos(servicosFiltrados) {
+    const dropdown = document.getElementById('servico-dropdown');
+    
     if (servicosFiltrados.length > 0) {
         // Cria HTML do dropdown
         let dropdownHTML = '';
@@ -1566,6 +1738,10 @@ function selecionarServico(nomeServico, documentid) {
         servicoIdInput.value = documentid;
     }
     
+    // Cancela buscas pendentes para o dropdown não reabrir
+    clearTimeout(buscaServicosTimer);
+    buscaServicosSequencia++;
+    
     // Esconde o dropdown e limpa o conteúdo
     const dropdown = document.getElementById('servico-dropdown');
     dropdown.innerHTML = '';
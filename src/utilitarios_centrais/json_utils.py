@@ -1,9 +1,23 @@
 """Utilitários para operações com arquivos JSON"""
 import json
+import os
 from pathlib import Path
 from src.utilitarios_centrais.logger import logger
 
 
+def _gravar_json_atomico(arquivo: Path, dados: dict):
+    """
+    Grava o JSON em um arquivo temporário e o renomeia sobre o destino
+
+    Quem lê o arquivo (ex.: o catálogo de serviços, que recarrega quando o
+    mtime muda) vê o conteúdo antigo ou o novo, nunca um arquivo pela metade.
+    """
+    temporario = arquivo.with_name(f".{arquivo.name}.{os.getpid()}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, arquivo)
+
+
 def salvar_servicos_json(servicos: dict, ambiente: str = "PRD") -> str:
     """
     Salva a lista de serviços em arquivo JSON na pasta src/json/
@@ -21,8 +35,7 @@ def salvar_servicos_json(servicos: dict, ambiente: str = "PRD") -> str:
         json_dir = src_dir / "json"
         json_dir.mkdir(exist_ok=True)
         arquivo = json_dir / f"servicos_{ambiente.lower()}.json"
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(servicos, f, indent=2, ensure_ascii=False)
+        _gravar_json_atomico(arquivo, servicos)
         
         logger.info(f"[salvar_servicos_json] Serviços salvos em: {arquivo}")
         return str(arquivo)
@@ -30,33 +43,3 @@ def salvar_servicos_json(servicos: dict, ambiente: str = "PRD") -> str:
         logger.error(f"[salvar_servicos_json] Erro ao salvar serviços: {str(e)}")
         raise
 
-
-def salvar_detalhes_servico_json(detalhes: dict, id_servico: str, ambiente: str = "PRD") -> str:
-    """
-    Salva os detalhes de um serviço em arquivo JSON na pasta src/json/services/
-    
-    Args:
-        detalhes: Dicionário com os detalhes do serviço
-        id_servico: ID do serviço
-        ambiente: Ambiente ('PRD' ou 'QLD')
-    
-    Returns:
-        Caminho do arquivo salvo
-    """
-    try:
-        # src/utilitarios_centrais/json_utils.py -> src/utilitarios_centrais/ -> src/ -> src/json/services/
-        src_dir = Path(__file__).parent.parent
-        json_dir = src_dir / "json" / "services"
-        json_dir.mkdir(parents=True, exist_ok=True)
-
-        arquivo = json_dir / f"servico_detalhes_{id_servico}_{ambiente.lower()}.json"
-
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(detalhes, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"[salvar_detalhes_servico_json] Detalhes do serviço salvos em: {arquivo}")
-        return str(arquivo)
-    except Exception as e:
-        logger.error(f"[salvar_detalhes_servico_json] Erro ao salvar detalhes: {str(e)}")
-        raise
-
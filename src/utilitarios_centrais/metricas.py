@@ -0,0 +1,408 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus (texto 0.0.4)
+
+Contadores, medidores (gauges) e histogramas em memória, sem dependências
+externas, expostos em GET /metrics. Registrar uma amostra custa um lock e
+uma busca binária nos buckets, então a instrumentação pode ficar ligada em
+produção (METRICAS_ENABLED=true).
+
+Os rótulos têm cardinalidade limitada: família de endpoint do Fluig (não a
+URL), operação do Drive, método da API Google e o template da rota HTTP.
+
+As mesmas funções de instrumentação alimentam o rastro ativo
+(utilitarios_centrais.rastreamento), inclusive com METRICAS_ENABLED=false.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+from src.utilitarios_centrais.rastreamento import rastro_ativo, registrar_chamada_externa
+
+
+PREFIXO = "api_fluig_"
+
+# Latências de requisições externas e rotas (segundos)
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Duração de ciclos dos loops em background (segundos)
+BUCKETS_CICLO = (0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def metricas_habilitadas() -> bool:
+    """Indica se a coleta de métricas está habilitada (METRICAS_ENABLED)"""
+    return str(getattr(ConfigEnvSetings, 'METRICAS_ENABLED', 'true')).lower() in ('true', '1')
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra is not None:
+        pares.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_valor(valor: float) -> str:
+    if valor == float('inf'):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, rótulos e valores por combinação de rótulos"""
+
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = PREFIXO + nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._valores: Dict[tuple, object] = {}
+
+    def _chave(self, rotulos: Dict[str, object]) -> tuple:
+        return tuple(str(rotulos.get(nome, '')) for nome in self.rotulos)
+
+    def limpar(self):
+        """Remove todas as séries (usado por coletores que recalculam os valores)"""
+        with self._lock:
+            self._valores = {}
+
+    def _linhas(self) -> List[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        linhas.extend(self._linhas())
+        return linhas
+
+
+class Contador(_Metrica):
+    """Contador monotônico"""
+
+    tipo = "counter"
+
+    def inc(self, valor: float = 1.0, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def _linhas(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_valor(valor)}" for chave, valor in valores]
+
+
+class Medidor(Contador):
+    """Valor instantâneo (gauge)"""
+
+    tipo = "gauge"
+
+    def definir(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = float(valor)
+
+
+class Histograma(_Metrica):
+    """Histograma com buckets fixos (contagem, soma e distribuição)"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        # Bucket "le": primeiro limite >= valor (o último índice é o +Inf)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(chave)
+            if serie is None:
+                serie = self._valores[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def _linhas(self) -> List[str]:
+        with self._lock:
+            valores = sorted((chave, (list(serie[0]), serie[1], serie[2])) for chave, serie in self._valores.items())
+        linhas = []
+        for chave, (contagens, soma, total) in valores:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float('inf'),), contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, ('le', _formatar_valor(limite)))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_valor(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Conjunto de métricas expostas e coletores executados a cada leitura"""
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+        self._coletores: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            self._metricas.append(metrica)
+        return metrica
+
+    def registrar_coletor(self, coletor: Callable[[], None]):
+        """
+        Registra uma função que atualiza medidores antes de cada exportação
+
+        Usado para valores que já existem em outros módulos (tamanho de caches,
+        filas), evitando instrumentar o caminho quente.
+        """
+        with self._lock:
+            self._coletores.append(coletor)
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus"""
+        with self._lock:
+            coletores = list(self._coletores)
+            metricas = list(self._metricas)
+        for coletor in coletores:
+            try:
+                coletor()
+            except Exception as e:
+                logger.warning(f"[metricas] Erro no coletor {getattr(coletor, '__name__', coletor)}: {str(e)}")
+        linhas: List[str] = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+_registro = RegistroMetricas()
+
+
+def get_registro_metricas() -> RegistroMetricas:
+    """Retorna o registro global de métricas"""
+    return _registro
+
+
+# ==================== MÉTRICAS DA APLICAÇÃO ====================
+
+fluig_requisicoes = _registro.registrar(Contador(
+    "fluig_requisicoes_total", "Requisições enviadas ao Fluig", ("ambiente", "familia", "metodo", "status")))
+fluig_latencia = _registro.registrar(Histograma(
+    "fluig_requisicao_duracao_segundos", "Latência das requisições ao Fluig (por tentativa)",
+    ("ambiente", "familia", "metodo", "status")))
+
+drive_operacoes = _registro.registrar(Contador(
+    "drive_operacoes_total", "Chamadas à API do Google Drive", ("operacao", "resultado")))
+drive_latencia = _registro.registrar(Histograma(
+    "drive_operacao_duracao_segundos", "Latência das chamadas à API do Google Drive", ("operacao",)))
+
+google_api_chamadas = _registro.registrar(Contador(
+    "google_api_chamadas_total", "Chamadas às APIs Gmail e People", ("api", "metodo", "resultado")))
+google_api_latencia = _registro.registrar(Histograma(
+    "google_api_duracao_segundos", "Latência das chamadas às APIs Gmail e People", ("api", "metodo")))
+
+http_requisicoes = _registro.registrar(Contador(
+    "http_requisicoes_total", "Requisições recebidas pela API", ("rota", "metodo", "status")))
+http_latencia = _registro.registrar(Histograma(
+    "http_requisicao_duracao_segundos", "Tempo de resposta das rotas da API", ("rota", "metodo")))
+
+loop_ciclos = _registro.registrar(Contador(
+    "loop_ciclos_total", "Ciclos executados pelos loops em background", ("loop", "resultado")))
+loop_duracao = _registro.registrar(Histograma(
+    "loop_ciclo_duracao_segundos", "Duração dos ciclos dos loops em background", ("loop",), BUCKETS_CICLO))
+loop_ultimo_ciclo = _registro.registrar(Medidor(
+    "loop_ultimo_ciclo_duracao_segundos", "Duração do último ciclo de cada loop em background", ("loop",)))
+
+historico_monitorados = _registro.registrar(Medidor(
+    "historico_chamados_monitorados", "Chamados monitorados no último ciclo do monitor de histórico"))
+cache_entradas = _registro.registrar(Medidor(
+    "cache_entradas", "Entradas armazenadas por cache", ("cache",)))
+cache_bytes = _registro.registrar(Medidor(
+    "cache_bytes", "Bytes ocupados por cache (caches limitados por tamanho)", ("cache",)))
+cache_consultas = _registro.registrar(Contador(
+    "cache_consultas_total", "Consultas aos caches com revalidação em background", ("cache", "resultado")))
+cache_atualizacao_duracao = _registro.registrar(Histograma(
+    "cache_atualizacao_duracao_segundos", "Duração das cargas/atualizações dos caches com revalidação", ("cache", "resultado")))
+threadpool_fila = _registro.registrar(Medidor(
+    "threadpool_fila", "Tarefas aguardando thread livre por pool", ("pool",)))
+limitador_fila = _registro.registrar(Medidor(
+    "limitador_fila", "Requisições aguardando token no limitador do Fluig", ("ambiente", "prioridade")))
+fanout_em_uso = _registro.registrar(Medidor(
+    "fanout_em_uso", "Vagas ocupadas no limitador global de fan-out ao Fluig", ("limitador",)))
+fanout_fila = _registro.registrar(Medidor(
+    "fanout_fila", "Tarefas aguardando vaga no limitador global de fan-out ao Fluig", ("limitador",)))
+fanout_espera = _registro.registrar(Histograma(
+    "fanout_espera_segundos", "Tempo de espera por vaga no limitador global de fan-out ao Fluig", ("limitador",)))
+
+
+# ==================== INSTRUMENTAÇÃO ====================
+
+def registrar_requisicao_fluig(ambiente: str, familia: str, metodo: str, status: str, duracao: float):
+    """
+    Registra uma tentativa de requisição ao Fluig
+
+    Args:
+        ambiente: Ambiente ('PRD' ou 'QLD')
+        familia: Família de endpoint (ver fluig_resiliencia.familia_endpoint)
+        metodo: Método da requisição (GET, POST, POST_MULTIPART, ...)
+        status: Código HTTP ou tipo do erro (timeout, conexao)
+        duracao: Duração em segundos
+    """
+    registrar_chamada_externa("fluig", familia, duracao, status)
+    if not metricas_habilitadas():
+        return
+    fluig_requisicoes.inc(ambiente=ambiente, familia=familia, metodo=metodo, status=status)
+    fluig_latencia.observar(duracao, ambiente=ambiente, familia=familia, metodo=metodo, status=status)
+
+
+@contextmanager
+def medir_drive(operacao: str):
+    """
+    Mede uma chamada à API do Drive (listar, buscar, download, upload, metadados, criar_pasta)
+
+    Exceções são registradas com resultado "erro" e propagadas.
+    """
+    habilitadas = metricas_habilitadas()
+    if not habilitadas and not rastro_ativo():
+        yield
+        return
+    inicio = time.perf_counter()
+    resultado = "erro"
+    try:
+        yield
+        resultado = "ok"
+    finally:
+        duracao = time.perf_counter() - inicio
+        registrar_chamada_externa("drive", operacao, duracao, resultado)
+        if habilitadas:
+            drive_operacoes.inc(operacao=operacao, resultado=resultado)
+            drive_latencia.observar(duracao, operacao=operacao)
+
+
+def executar_google_api(requisicao, **kwargs):
+    """
+    Executa uma requisição do googleapiclient (Gmail/People) registrando latência
+
+    A API e o método vêm do methodId da requisição (ex.: gmail.users.threads.list).
+
+    Args:
+        requisicao: HttpRequest retornado pelo service (antes do .execute())
+        **kwargs: Repassados ao execute (ex.: num_retries)
+
+    Returns:
+        Resposta do execute()
+    """
+    habilitadas = metricas_habilitadas()
+    if not habilitadas and not rastro_ativo():
+        return requisicao.execute(**kwargs)
+    api, _, metodo = (getattr(requisicao, 'methodId', None) or 'desconhecida.desconhecido').partition('.')
+    if api == 'people':
+        metodo = metodo.removeprefix('people.')
+    else:
+        metodo = metodo.removeprefix('users.')
+    inicio = time.perf_counter()
+    resultado = "erro"
+    try:
+        resposta = requisicao.execute(**kwargs)
+        resultado = "ok"
+        return resposta
+    finally:
+        duracao = time.perf_counter() - inicio
+        registrar_chamada_externa(api, metodo, duracao, resultado)
+        if habilitadas:
+            google_api_chamadas.inc(api=api, metodo=metodo, resultado=resultado)
+            google_api_latencia.observar(duracao, api=api, metodo=metodo)
+
+
+def registrar_ciclo_loop(loop: str, duracao: float, sucesso: bool = True):
+    """
+    Registra um ciclo de loop em background (gmail, historico, diretorio)
+
+    Args:
+        loop: Nome do loop
+        duracao: Duração do ciclo em segundos
+        sucesso: False se o ciclo terminou com erro
+    """
+    if not metricas_habilitadas():
+        return
+    loop_ciclos.inc(loop=loop, resultado="ok" if sucesso else "erro")
+    loop_duracao.observar(duracao, loop=loop)
+    loop_ultimo_ciclo.definir(duracao, loop=loop)
+
+
+def registrar_consulta_cache(cache: str, resultado: str):
+    """
+    Registra uma consulta a um cache com revalidação
+
+    Args:
+        cache: Nome do cache
+        resultado: hit, obsoleto (servido enquanto atualiza), miss ou coalescido
+    """
+    if not metricas_habilitadas():
+        return
+    cache_consultas.inc(cache=cache, resultado=resultado)
+
+
+def registrar_atualizacao_cache(cache: str, duracao: float, sucesso: bool = True):
+    """Registra a duração de uma carga/atualização de entrada de cache"""
+    if not metricas_habilitadas():
+        return
+    cache_atualizacao_duracao.observar(duracao, cache=cache, resultado="ok" if sucesso else "erro")
+
+
+def registrar_espera_fanout(limitador: str, espera: float):
+    """Registra o tempo que uma tarefa esperou por vaga no limitador de fan-out"""
+    if not metricas_habilitadas():
+        return
+    fanout_espera.observar(espera, limitador=limitador)
+
+
+def registrar_requisicao_http(rota: str, metodo: str, status: int, duracao: float):
+    """Registra uma requisição recebida pela API (rota = template, ex.: /api/v1/fluig/{ambiente}/...)"""
+    if not metricas_habilitadas():
+        return
+    http_requisicoes.inc(rota=rota, metodo=metodo, status=status)
+    http_latencia.observar(duracao, rota=rota, metodo=metodo)
+
+
+class MiddlewareMetricasHTTP:
+    """
+    Middleware ASGI que mede as rotas da API
+
+    Usa o template da rota resolvida (não o caminho com IDs) para manter a
+    cardinalidade dos rótulos limitada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not metricas_habilitadas():
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = {'codigo': 500}
+
+        async def enviar(mensagem):
+            if mensagem['type'] == 'http.response.start':
+                status['codigo'] = mensagem['status']
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            rota = getattr(scope.get('route'), 'path', None)
+            if rota is None:
+                rota = "/static" if scope.get('path', '').startswith('/static') else "nao_roteada"
+            registrar_requisicao_http(rota, scope.get('method', ''), status['codigo'], time.perf_counter() - inicio)
@@ -0,0 +1,289 @@
+"""
+Rastreamento (tracing) em processo do fluxo email → chamado → histórico → notificação
+
+Cada email processado pelo monitor do Gmail pode gerar um rastro com os spans
+das etapas (abertura do chamado, chamadas ao FluigCore, leituras/gravações no
+Drive, envio de email) e as chamadas externas feitas dentro delas (Fluig,
+Drive, Gmail, People), com tempos e contagem por serviço.
+
+- Amostragem: `iniciar_rastro` sorteia com RASTREAMENTO_TAXA_AMOSTRAGEM; fora
+  da amostra (ou sem rastro ativo) spans e chamadas externas custam uma leitura
+  de contextvar.
+- Propagação: o rastro segue o contexto (contextvars), então vale para chamadas
+  encadeadas, asyncio.to_thread e tasks asyncio, mas não para threads próprias.
+- Exportação: os últimos RASTREAMENTO_MAX_RASTROS rastros ficam em memória
+  (`exportar_rastros`, rota /fluig/diagnostico/rastros) e, se
+  RASTREAMENTO_ARQUIVO estiver definido, cada rastro é gravado como uma linha
+  JSON nesse arquivo.
+"""
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.utilitarios_centrais.logger import logger
+
+
+# Limite de spans guardados por rastro (os excedentes só entram na contagem)
+_MAX_SPANS_POR_RASTRO = 1000
+
+
+class Rastro:
+    """
+    Rastro de uma unidade de trabalho (ex.: um email)
+
+    Attributes:
+        id_rastro: Identificador do rastro
+        nome: Nome da unidade de trabalho
+        atributos: Atributos anotados durante a execução
+    """
+
+    def __init__(self, nome: str, atributos: Dict[str, Any]):
+        self.id_rastro = uuid.uuid4().hex
+        self.nome = nome
+        self.atributos = dict(atributos)
+        self.inicio = time.perf_counter()
+        self.inicio_em = datetime.now().isoformat(timespec='milliseconds')
+        self.erro: Optional[str] = None
+        self._lock = threading.Lock()
+        self._spans: List[Dict[str, Any]] = []
+        self._spans_descartados = 0
+        self._proximo_id = 0
+        self._chamadas: Dict[str, Dict[str, Any]] = {}
+
+    def _novo_id(self) -> int:
+        with self._lock:
+            self._proximo_id += 1
+            return self._proximo_id
+
+    def _adicionar_span(self, span: Dict[str, Any]):
+        with self._lock:
+            if len(self._spans) < _MAX_SPANS_POR_RASTRO:
+                self._spans.append(span)
+            else:
+                self._spans_descartados += 1
+
+    def _contar_chamada(self, servico: str, operacao: str, duracao: float):
+        with self._lock:
+            chamadas = self._chamadas.setdefault(servico, {'total': 0, 'duracao_ms': 0.0, 'por_operacao': {}})
+            chamadas['total'] += 1
+            chamadas['duracao_ms'] += duracao * 1000
+            chamadas['por_operacao'][operacao] = chamadas['por_operacao'].get(operacao, 0) + 1
+
+    def para_dict(self, duracao: float) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s['inicio_ms'])
+            chamadas = {
+                servico: {**dados, 'duracao_ms': round(dados['duracao_ms'], 2), 'por_operacao': dict(dados['por_operacao'])}
+                for servico, dados in sorted(self._chamadas.items())
+            }
+            return {
+                'id_rastro': self.id_rastro,
+                'nome': self.nome,
+                'inicio': self.inicio_em,
+                'duracao_ms': round(duracao * 1000, 2),
+                'atributos': dict(self.atributos),
+                'erro': self.erro,
+                'chamadas_externas': chamadas,
+                'total_chamadas_externas': sum(dados['total'] for dados in chamadas.values()),
+                'spans': spans,
+                'spans_descartados': self._spans_descartados,
+            }
+
+
+_rastro_atual: contextvars.ContextVar[Optional[Rastro]] = contextvars.ContextVar('rastro_atual', default=None)
+_span_atual: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('span_atual', default=None)
+
+_rastros_lock = threading.Lock()
+_rastros: deque = deque(maxlen=max(1, int(getattr(ConfigEnvSetings, 'RASTREAMENTO_MAX_RASTROS', 200))))
+
+
+def rastreamento_habilitado() -> bool:
+    """Indica se o rastreamento está habilitado (RASTREAMENTO_ENABLED)"""
+    return str(getattr(ConfigEnvSetings, 'RASTREAMENTO_ENABLED', 'true')).lower() in ('true', '1')
+
+
+def rastro_ativo() -> bool:
+    """Indica se há um rastro (amostrado) no contexto atual"""
+    return _rastro_atual.get() is not None
+
+
+def iniciar_rastro(nome: str, **atributos) -> Optional[tuple]:
+    """
+    Inicia um rastro no contexto atual, se sorteado na amostragem
+
+    Usar em par com finalizar_rastro (ou o context manager `rastreamento`).
+
+    Args:
+        nome: Nome da unidade de trabalho (ex.: 'email')
+        **atributos: Atributos iniciais (ex.: thread_id)
+
+    Returns:
+        Token para finalizar_rastro, ou None se o rastro não foi amostrado
+    """
+    if not rastreamento_habilitado():
+        return None
+    taxa = float(getattr(ConfigEnvSetings, 'RASTREAMENTO_TAXA_AMOSTRAGEM', 1.0))
+    if taxa <= 0 or (taxa < 1 and random.random() >= taxa):
+        return None
+    rastro = Rastro(nome, atributos)
+    return rastro, _rastro_atual.set(rastro), _span_atual.set(None)
+
+
+def finalizar_rastro(token: Optional[tuple], erro: Optional[BaseException] = None):
+    """
+    Finaliza o rastro iniciado por iniciar_rastro e o exporta
+
+    Args:
+        token: Retorno de iniciar_rastro (None = nada a fazer)
+        erro: Exceção que encerrou a unidade de trabalho (opcional)
+    """
+    if token is None:
+        return
+    rastro, token_rastro, token_span = token
+    _span_atual.reset(token_span)
+    _rastro_atual.reset(token_rastro)
+    if erro is not None:
+        rastro.erro = f"{type(erro).__name__}: {erro}"
+    _exportar(rastro.para_dict(time.perf_counter() - rastro.inicio))
+
+
+@contextmanager
+def rastreamento(nome: str, **atributos):
+    """Context manager que inicia e finaliza um rastro (ver iniciar_rastro)"""
+    token = iniciar_rastro(nome, **atributos)
+    try:
+        yield
+    except BaseException as e:
+        finalizar_rastro(token, e)
+        token = None
+        raise
+    finally:
+        finalizar_rastro(token)
+
+
+def anotar_rastro(**atributos):
+    """Adiciona atributos ao rastro atual (ex.: remetente, process_instance_id)"""
+    rastro = _rastro_atual.get()
+    if rastro is not None:
+        with rastro._lock:
+            rastro.atributos.update(atributos)
+
+
+@contextmanager
+def span(nome: str, **atributos):
+    """
+    Mede uma etapa dentro do rastro atual (sem rastro ativo não faz nada)
+
+    Args:
+        nome: Nome da etapa (ex.: 'fluig.AberturaDeChamado')
+        **atributos: Atributos do span
+    """
+    rastro = _rastro_atual.get()
+    if rastro is None:
+        yield
+        return
+    id_span = rastro._novo_id()
+    pai = _span_atual.get()
+    token = _span_atual.set(id_span)
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        yield
+    except BaseException as e:
+        erro = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _span_atual.reset(token)
+        rastro._adicionar_span({
+            'id': id_span,
+            'pai': pai,
+            'nome': nome,
+            'inicio_ms': round((inicio - rastro.inicio) * 1000, 2),
+            'duracao_ms': round((time.perf_counter() - inicio) * 1000, 2),
+            'atributos': atributos,
+            'erro': erro,
+        })
+
+
+def com_span(nome: str):
+    """Decorator que executa a função (síncrona) dentro de um span"""
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if _rastro_atual.get() is None:
+                return funcao(*args, **kwargs)
+            with span(nome):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def registrar_chamada_externa(servico: str, operacao: str, duracao: float, status: str = "ok"):
+    """
+    Registra uma chamada a serviço externo no rastro atual (span folha + contagem)
+
+    Chamado pela instrumentação de métricas (Fluig, Drive, Gmail, People).
+
+    Args:
+        servico: fluig, drive, gmail ou people
+        operacao: Família de endpoint ou método da API
+        duracao: Duração em segundos
+        status: Código HTTP ou resultado
+    """
+    rastro = _rastro_atual.get()
+    if rastro is None:
+        return
+    agora = time.perf_counter()
+    rastro._contar_chamada(servico, operacao, duracao)
+    rastro._adicionar_span({
+        'id': rastro._novo_id(),
+        'pai': _span_atual.get(),
+        'nome': f"{servico}:{operacao}",
+        'inicio_ms': round((agora - duracao - rastro.inicio) * 1000, 2),
+        'duracao_ms': round(duracao * 1000, 2),
+        'atributos': {'status': status},
+        'erro': None,
+    })
+
+
+def _exportar(rastro: Dict[str, Any]):
+    with _rastros_lock:
+        _rastros.append(rastro)
+    arquivo = getattr(ConfigEnvSetings, 'RASTREAMENTO_ARQUIVO', '')
+    if not arquivo:
+        return
+    try:
+        caminho = Path(arquivo)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with _rastros_lock, open(caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(rastro, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"[rastreamento] Erro ao gravar rastro em {arquivo}: {str(e)}")
+
+
+def exportar_rastros(limite: int = 50, duracao_minima_ms: float = 0.0, nome: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Retorna os rastros mais recentes (mais novo primeiro)
+
+    Args:
+        limite: Quantidade máxima de rastros
+        duracao_minima_ms: Só rastros com duração maior ou igual (ex.: emails lentos)
+        nome: Filtra pelo nome do rastro (ex.: 'email')
+    """
+    with _rastros_lock:
+        rastros = list(_rastros)
+    selecionados = [
+        r for r in reversed(rastros)
+        if r['duracao_ms'] >= duracao_minima_ms and (nome is None or r['nome'] == nome)
+    ]
+    return selecionados[:max(0, limite)]
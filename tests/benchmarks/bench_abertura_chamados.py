@@ -0,0 +1,325 @@
+"""
+Benchmark de ponta a ponta da abertura de chamados (fluxo do /email/abrir)
+
+Roda a mesma cadeia da rota AberturaDeChamadosEmail contra o Fluig fake
+(tests/fake_fluig) e um Drive em memória (DriveFake), medindo cada etapa:
+
+- busca_colaborador: Dataset_config('colleague', email), como no PayloadChamadoNormal
+- montagem_payload:  montar_payload_abertura em thread (consulta o cache já aquecido)
+- abertura_post:     POST /processes/Abertura de Chamados/start
+- historico_inicial: obter_historico_chamado + HistoricoManager.salvar_historico (Drive)
+- anexos:            upload_arquivo_fluig + anexar_arquivo_chamado de cada anexo
+- total:             cadeia completa
+
+Para cada nível de concorrência (N "abridores" simultâneos) reporta p50/p95/p99
+por etapa, vazão (chamados/s) e chamadas aos serviços externos por chamado, e
+grava tudo em JSON (padrão: tests/benchmarks/resultados/abertura_chamados.json).
+
+O envio de email (Gmail) não faz parte da cadeia medida: a rota recebe o email
+já lido e não envia resposta.
+
+Uso:
+    python -m tests.benchmarks.bench_abertura_chamados --concorrencia 1,4,16 --chamados 60
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.configs import drive_config_manager
+from src.fluig import fluig_pool
+from src.fluig.fluig_comum import montar_payload_abertura, tratar_resposta_processo
+from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_core_async import AsyncFluigCore
+from src.historico_monitor.historico_manager import HistoricoManager
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.modelo_dados.modelos_fluig import AberturaChamado
+from src.rotas.rt_fluig_chamados import obter_colleague_id
+from src.utilitarios_centrais.logger import logger
+from tests.benchmarks.drive_fake import DriveFake
+from tests.fake_fluig import ConfiguracaoFake, ServidorFluigFake
+
+AMBIENTE = "QLD"
+ETAPAS = ("busca_colaborador", "montagem_payload", "abertura_post", "historico_inicial", "anexos", "total")
+ARQUIVO_RESULTADO_PADRAO = Path(__file__).parent / "resultados" / "abertura_chamados.json"
+URL_ABERTURA = "/process-management/api/v2/processes/Abertura%20de%20Chamados/start"
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil pelo método nearest-rank (0.0 se a lista estiver vazia)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def resumir_tempos(tempos: List[float]) -> Dict[str, Any]:
+    """Resumo de uma etapa em milissegundos"""
+    return {
+        'amostras': len(tempos),
+        'p50_ms': round(percentil(tempos, 50) * 1000, 2),
+        'p95_ms': round(percentil(tempos, 95) * 1000, 2),
+        'p99_ms': round(percentil(tempos, 99) * 1000, 2),
+        'media_ms': round(sum(tempos) / len(tempos) * 1000, 2) if tempos else 0.0,
+        'max_ms': round(max(tempos) * 1000, 2) if tempos else 0.0,
+    }
+
+
+async def abrir_chamado_medido(
+    fluig_core: AsyncFluigCore,
+    item: AberturaChamado,
+    anexos: List[Dict[str, Any]]
+) -> Dict[str, float]:
+    """
+    Executa a cadeia de abertura de um chamado medindo cada etapa
+
+    Returns:
+        {etapa: segundos} das etapas concluídas
+
+    Raises:
+        RuntimeError: Se o chamado não pôde ser aberto
+    """
+    tempos: Dict[str, float] = {}
+    inicio = marco = time.perf_counter()
+
+    def marcar(etapa: str):
+        nonlocal marco
+        agora = time.perf_counter()
+        tempos[etapa] = agora - marco
+        marco = agora
+
+    # Mesma busca síncrona feita pelo PayloadChamadoNormal (passa pelo cache de datasets)
+    await asyncio.to_thread(FluigCore(ambiente=AMBIENTE).Dataset_config, dataset_id="colleague", user=item.usuario)
+    marcar('busca_colaborador')
+
+    payload = await asyncio.to_thread(montar_payload_abertura, "normal", item, AMBIENTE)
+    marcar('montagem_payload')
+
+    resposta = await fluig_core.requests.RequestTipoPOST(fluig_core.url_base + URL_ABERTURA, payload)
+    resultado = tratar_resposta_processo(resposta, "AberturaDeChamado")
+    process_instance_id = (resultado.get('dados') or {}).get('processInstanceId')
+    if not resultado.get('sucesso') or not process_instance_id:
+        raise RuntimeError(f"Falha ao abrir chamado: {resultado.get('status_code')}")
+    marcar('abertura_post')
+
+    historico_manager = await asyncio.to_thread(HistoricoManager)
+    historico_inicial = await fluig_core.obter_historico_chamado(process_instance_id)
+    if historico_inicial:
+        await asyncio.to_thread(
+            historico_manager.salvar_historico,
+            process_instance_id=process_instance_id,
+            historico_data=historico_inicial,
+            ambiente=AMBIENTE,
+            email_remetente=item.usuario
+        )
+    marcar('historico_inicial')
+
+    if anexos:
+        colleague_id = obter_colleague_id(AMBIENTE)
+        for anexo in anexos:
+            # Nome único por chamado: a área de upload do Fluig é compartilhada pelo usuário de integração
+            nome_arquivo = f"{process_instance_id}_{anexo['nome']}"
+            if await fluig_core.upload_arquivo_fluig(anexo['bytes'], nome_arquivo, colleague_id):
+                await fluig_core.anexar_arquivo_chamado(process_instance_id, nome_arquivo)
+        marcar('anexos')
+
+    tempos['total'] = time.perf_counter() - inicio
+    return tempos
+
+
+async def executar_cenario(
+    servidor: ServidorFluigFake,
+    drive: DriveFake,
+    emails: List[str],
+    concorrencia: int,
+    anexos: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Abre len(emails) chamados com `concorrencia` abridores simultâneos
+
+    Returns:
+        Resumo do cenário (latência por etapa, vazão e chamadas por chamado)
+    """
+    fila: asyncio.Queue = asyncio.Queue()
+    for email in emails:
+        fila.put_nowait(email)
+
+    tempos_etapas: Dict[str, List[float]] = {etapa: [] for etapa in ETAPAS}
+    falhas: List[str] = []
+    fluig_core = AsyncFluigCore(ambiente=AMBIENTE)
+
+    async def abridor():
+        while True:
+            try:
+                email = fila.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            item = AberturaChamado(
+                titulo="Benchmark de abertura",
+                descricao="Chamado aberto pelo benchmark de abertura de chamados",
+                usuario=email,
+                telefone="65999999999"
+            )
+            try:
+                tempos = await abrir_chamado_medido(fluig_core, item, anexos)
+            except Exception as e:
+                falhas.append(str(e))
+                continue
+            for etapa, segundos in tempos.items():
+                tempos_etapas[etapa].append(segundos)
+
+    estatisticas_fluig = servidor.app.state.estatisticas
+    estatisticas_fluig.resetar()
+    drive.resetar_chamadas()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(abridor() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    chamadas_fluig = estatisticas_fluig.para_dict()
+    chamadas_drive = drive.chamadas()
+    total = len(emails)
+    return {
+        'concorrencia': concorrencia,
+        'chamados': total,
+        'sucesso': total - len(falhas),
+        'falhas': len(falhas),
+        'exemplos_falha': falhas[:3],
+        'duracao_segundos': round(duracao, 3),
+        'vazao_chamados_por_segundo': round((total - len(falhas)) / duracao, 2) if duracao > 0 else 0.0,
+        'etapas': {etapa: resumir_tempos(tempos_etapas[etapa]) for etapa in ETAPAS if tempos_etapas[etapa]},
+        'chamadas_por_chamado': {
+            'fluig': round(chamadas_fluig['total'] / total, 2),
+            'fluig_por_familia': {
+                familia: round(quantidade / total, 2)
+                for familia, quantidade in sorted(chamadas_fluig['por_familia'].items())
+            },
+            'drive': round(sum(chamadas_drive.values()) / total, 2),
+            'drive_por_operacao': {
+                operacao: round(quantidade / total, 2)
+                for operacao, quantidade in sorted(chamadas_drive.items())
+            },
+        },
+    }
+
+
+async def executar_benchmark(
+    servidor: ServidorFluigFake,
+    drive: DriveFake,
+    niveis_concorrencia: List[int],
+    chamados_por_nivel: int,
+    anexos: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Executa os cenários em sequência, cada um com solicitantes ainda não consultados (cache frio)"""
+    colaboradores = servidor.app.state.dados.colaboradores
+    cenarios = []
+    proximo = 0
+    try:
+        for concorrencia in niveis_concorrencia:
+            emails = [colaboradores[(proximo + i) % len(colaboradores)]['mail'] for i in range(chamados_por_nivel)]
+            proximo += chamados_por_nivel
+            cenario = await executar_cenario(servidor, drive, emails, concorrencia, anexos)
+            cenarios.append(cenario)
+            total = cenario['etapas'].get('total', {})
+            print(
+                f"N={concorrencia:<3} vazão={cenario['vazao_chamados_por_segundo']:>7} chamados/s  "
+                f"total p50={total.get('p50_ms', 0)}ms p95={total.get('p95_ms', 0)}ms p99={total.get('p99_ms', 0)}ms  "
+                f"fluig/chamado={cenario['chamadas_por_chamado']['fluig']} drive/chamado={cenario['chamadas_por_chamado']['drive']}  "
+                f"falhas={cenario['falhas']}"
+            )
+    finally:
+        await fluig_pool.fechar_clientes_fluig_async()
+    return cenarios
+
+
+def _lista_inteiros(valor: str) -> List[int]:
+    return [int(parte) for parte in valor.split(',') if parte.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta da abertura de chamados")
+    parser.add_argument("--concorrencia", type=_lista_inteiros, default=[1, 4, 16],
+                        help="Níveis de concorrência separados por vírgula (padrão: 1,4,16)")
+    parser.add_argument("--chamados", type=int, default=60, help="Chamados abertos por nível de concorrência")
+    parser.add_argument("--anexos", type=int, default=1, help="Anexos por chamado")
+    parser.add_argument("--tamanho-anexo-kb", type=int, default=64)
+    parser.add_argument("--latencia-fluig-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-fluig-ms", type=float, default=20.0)
+    parser.add_argument("--latencia-drive-ms", type=float, default=80.0)
+    parser.add_argument("--com-limitador", action="store_true",
+                        help="Mantém o limitador de taxa do Fluig (por padrão é desligado para medir só a cadeia)")
+    parser.add_argument("--saida", type=Path, default=ARQUIVO_RESULTADO_PADRAO, help="Arquivo JSON de resultado")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs INFO da aplicação")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+    if not args.com_limitador:
+        ConfigEnvSetings.FLUIG_LIMITADOR_ENABLED = "false"
+
+    # Drive em memória no lugar do DriveConfigManager
+    drive = DriveFake(latencia_ms=args.latencia_drive_ms)
+    ConfigEnvSetings.DRIVE_SYNC_ENABLED = "true"
+    drive_config_manager._drive_config_manager = drive
+
+    anexos = [
+        {'nome': f"anexo_{indice}.bin", 'bytes': b"x" * args.tamanho_anexo_kb * 1024}
+        for indice in range(args.anexos)
+    ]
+    configuracao = ConfiguracaoFake(
+        latencia_ms=args.latencia_fluig_ms,
+        jitter_ms=args.jitter_fluig_ms,
+        total_chamados=0,
+        total_colaboradores=max(2000, args.chamados * len(args.concorrencia)),
+    )
+
+    with ServidorFluigFake(configuracao) as servidor:
+        ConfigEnvSetings.URL_FLUIG_QLD = servidor.url
+        fluig_pool.fechar_clientes_fluig()
+        try:
+            cenarios = asyncio.run(executar_benchmark(servidor, drive, args.concorrencia, args.chamados, anexos))
+        finally:
+            fluig_pool.fechar_clientes_fluig()
+
+    resultado = {
+        'benchmark': 'abertura_chamados',
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente_execucao': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            # asyncio.to_thread usa o executor padrão: min(32, cpus + 4) threads
+            'cpus': os.cpu_count(),
+        },
+        'parametros': {
+            'chamados_por_nivel': args.chamados,
+            'anexos_por_chamado': args.anexos,
+            'tamanho_anexo_kb': args.tamanho_anexo_kb,
+            'latencia_fluig_ms': args.latencia_fluig_ms,
+            'jitter_fluig_ms': args.jitter_fluig_ms,
+            'latencia_drive_ms': args.latencia_drive_ms,
+            'limitador_fluig': args.com_limitador,
+            'cache_datasets': str(getattr(ConfigEnvSetings, 'DATASET_CACHE_ENABLED', 'true')).lower() == 'true',
+        },
+        'cenarios': cenarios,
+    }
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"Resultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Google Drive em memória para benchmarks (substitui o DriveConfigManager)
+
+Implementa os métodos usados pelo HistoricoManager (ler_config_do_drive,
+salvar_config_no_drive e listar_configs) com o mesmo número de chamadas à API
+do Drive que o DriveConfigManager faz com o cache de pastas aquecido:
+
+- ler:    busca do arquivo + download (só a busca se o arquivo não existe)
+- salvar: busca do arquivo + create, ou busca + get(parents) + update
+- listar: files().list
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class DriveFake:
+    """
+    Drive em memória com latência por chamada e contadores
+
+    Attributes:
+        latencia_ms: Latência simulada de cada chamada à API do Drive
+        arquivos: {(subpasta, nome_arquivo): conteudo}
+    """
+
+    def __init__(self, latencia_ms: float = 0.0):
+        self.latencia_ms = latencia_ms
+        self.arquivos: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._chamadas: Dict[str, int] = {}
+
+    # A interface do DriveConfigManager testa `service` antes de usar o gerenciador
+    service = True
+
+    def _chamada_api(self, operacao: str):
+        with self._lock:
+            self._chamadas[operacao] = self._chamadas.get(operacao, 0) + 1
+        if self.latencia_ms > 0:
+            time.sleep(self.latencia_ms / 1000)
+
+    def chamadas(self) -> Dict[str, int]:
+        """Chamadas à API do Drive por operação (files.list, files.get_media, ...)"""
+        with self._lock:
+            return dict(self._chamadas)
+
+    def resetar_chamadas(self):
+        with self._lock:
+            self._chamadas = {}
+
+    def ler_config_do_drive(self, nome_arquivo: str, subpasta: Optional[str] = None) -> Optional[str]:
+        self._chamada_api('files.list')
+        with self._lock:
+            conteudo = self.arquivos.get((subpasta, nome_arquivo))
+        if conteudo is None:
+            return None
+        self._chamada_api('files.get_media')
+        return conteudo
+
+    def salvar_config_no_drive(self, conteudo: str, nome_arquivo: str, subpasta: Optional[str] = None) -> bool:
+        self._chamada_api('files.list')
+        with self._lock:
+            existe = (subpasta, nome_arquivo) in self.arquivos
+        if existe:
+            self._chamada_api('files.get')
+            self._chamada_api('files.update')
+        else:
+            self._chamada_api('files.create')
+        with self._lock:
+            self.arquivos[(subpasta, nome_arquivo)] = conteudo
+        return True
+
+    def listar_configs(self, subpasta: Optional[str] = None) -> List[Dict[str, str]]:
+        self._chamada_api('files.list')
+        with self._lock:
+            nomes = [nome for (pasta, nome) in self.arquivos if pasta == subpasta]
+        return [{'id': nome, 'nome': nome, 'modificado': '', 'tamanho': '0'} for nome in nomes]
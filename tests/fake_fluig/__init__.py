@@ -0,0 +1,8 @@
+"""
+Fluig fake para testes e benchmarks offline (ver README.md)
+"""
+from .app import ConfiguracaoFake, criar_app_fluig_fake
+from .dados import EstadoFluigFake
+from .servidor import ServidorFluigFake
+
+__all__ = ['ConfiguracaoFake', 'criar_app_fluig_fake', 'EstadoFluigFake', 'ServidorFluigFake']
@@ -0,0 +1,320 @@
+"""
+Aplicação ASGI (FastAPI) que simula os endpoints do Fluig usados pelo projeto
+
+Endpoints simulados:
+- GET  /api/public/ecm/dataset/search              (filterFields, resultFields, limit/offset)
+- POST /api/public/ecm/dataset/datasets/           (constraints MUST/SHOULD/MUST_NOT, ex.: ITSM_Catalogo_Servico)
+- POST /process-management/api/v2/processes/{id}/start
+- GET  /process-management/api/v2/tasks           (page/pageSize)
+- GET  /process-management/api/v2/requests/{id}
+- GET  /process-management/api/v2/activities
+- GET  /process-management/api/v2/requests/{id}/histories
+- GET  /process-management/api/v2/requests/{id}/attachments/download
+- POST /ecm/upload
+- POST /ecm/api/rest/ecm/workflowView/saveAttachments
+
+Controle do fake (não simulam o Fluig):
+- GET/PUT /_fake/config       Latência e injeção de erros em tempo de execução
+- GET     /_fake/estatisticas Chamadas recebidas por família de endpoint e rota
+- POST    /_fake/reset        Zera as estatísticas
+- POST    /_fake/chamados/{id}/historico  Adiciona item ao histórico (simula atualização)
+
+A autenticação OAuth 1.0 é ignorada.
+"""
+import asyncio
+import random
+import threading
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from src.fluig.fluig_resiliencia import familia_endpoint
+from .dados import EstadoFluigFake
+
+
+class ConfiguracaoFake(BaseModel):
+    """
+    Comportamento do Fluig fake
+
+    Attributes:
+        latencia_ms: Latência base de cada resposta
+        jitter_ms: Variação aleatória somada à latência (0 a jitter_ms)
+        latencia_por_familia_ms: Latência específica por família (tasks, historico, dataset, processo, upload, outros)
+        taxa_erro: Probabilidade (0-1) de responder status_erro
+        taxa_erro_por_familia: Probabilidade de erro específica por família
+        status_erro: Status HTTP devolvido nos erros injetados
+        semente: Semente dos dados gerados e da injeção de erros
+        total_colaboradores: Registros nos datasets colleague/ds_funcionarios
+        total_chamados: Chamados pré-existentes na fila
+        itens_historico: Itens de histórico por chamado pré-existente
+    """
+    latencia_ms: float = 0.0
+    jitter_ms: float = 0.0
+    latencia_por_familia_ms: Dict[str, float] = {}
+    taxa_erro: float = 0.0
+    taxa_erro_por_familia: Dict[str, float] = {}
+    status_erro: int = 503
+    semente: int = 42
+    total_colaboradores: int = 2000
+    total_chamados: int = 300
+    itens_historico: int = 20
+
+
+class _Estatisticas:
+    """Contadores de chamadas recebidas pelo fake"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.resetar()
+
+    def resetar(self):
+        with self._lock:
+            self.total = 0
+            self.erros_injetados = 0
+            self.por_familia: Dict[str, int] = {}
+            self.por_rota: Dict[str, int] = {}
+
+    def registrar(self, familia: str, rota: str, erro_injetado: bool):
+        with self._lock:
+            self.total += 1
+            self.erros_injetados += int(erro_injetado)
+            self.por_familia[familia] = self.por_familia.get(familia, 0) + 1
+            self.por_rota[rota] = self.por_rota.get(rota, 0) + 1
+
+    def para_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'total': self.total,
+                'erros_injetados': self.erros_injetados,
+                'por_familia': dict(self.por_familia),
+                'por_rota': dict(self.por_rota),
+            }
+
+
+def _paginar(itens: List[Any], page: int, page_size: int) -> Dict[str, Any]:
+    """Página no formato da API v2 ({items, hasNext})"""
+    page = max(1, page)
+    page_size = max(1, page_size)
+    inicio = (page - 1) * page_size
+    return {'items': itens[inicio:inicio + page_size], 'hasNext': inicio + page_size < len(itens)}
+
+
+def _filtrar_dataset(registros: List[Dict[str, Any]], filter_fields: Optional[str]) -> List[Dict[str, Any]]:
+    """Aplica filterFields ("campo,valor[,campo,valor...]") com comparação sem diferenciar maiúsculas"""
+    if not filter_fields:
+        return registros
+    partes = filter_fields.split(',')
+    filtros = [(partes[i], partes[i + 1].strip().lower()) for i in range(0, len(partes) - 1, 2)]
+    return [
+        registro for registro in registros
+        if all(str(registro.get(campo, '')).lower() == valor for campo, valor in filtros)
+    ]
+
+
+def criar_app_fluig_fake(configuracao: Optional[ConfiguracaoFake] = None) -> FastAPI:
+    """
+    Cria a aplicação do Fluig fake
+
+    Args:
+        configuracao: Comportamento do fake (padrão: sem latência e sem erros)
+
+    Returns:
+        Aplicação FastAPI (ASGI)
+    """
+    app = FastAPI(title="Fluig fake")
+    app.state.configuracao = configuracao or ConfiguracaoFake()
+    app.state.dados = EstadoFluigFake(
+        semente=app.state.configuracao.semente,
+        total_colaboradores=app.state.configuracao.total_colaboradores,
+        total_chamados=app.state.configuracao.total_chamados,
+        itens_historico=app.state.configuracao.itens_historico,
+    )
+    app.state.estatisticas = _Estatisticas()
+    rng = random.Random(app.state.configuracao.semente)
+
+    @app.middleware("http")
+    async def simular_rede(request: Request, call_next):
+        caminho = request.url.path
+        if caminho.startswith("/_fake"):
+            return await call_next(request)
+
+        config: ConfiguracaoFake = app.state.configuracao
+        familia = familia_endpoint(caminho)
+        latencia = config.latencia_por_familia_ms.get(familia, config.latencia_ms)
+        if config.jitter_ms:
+            latencia += rng.uniform(0, config.jitter_ms)
+        if latencia > 0:
+            await asyncio.sleep(latencia / 1000)
+
+        taxa_erro = config.taxa_erro_por_familia.get(familia, config.taxa_erro)
+        erro_injetado = taxa_erro > 0 and rng.random() < taxa_erro
+        app.state.estatisticas.registrar(familia, f"{request.method} {caminho}", erro_injetado)
+        if erro_injetado:
+            return JSONResponse({'message': 'Erro injetado pelo Fluig fake'}, status_code=config.status_erro)
+        return await call_next(request)
+
+    # ------------------------------------------------------------------ controle
+
+    @app.get("/_fake/config")
+    async def obter_config():
+        return app.state.configuracao
+
+    @app.put("/_fake/config")
+    async def alterar_config(configuracao: ConfiguracaoFake):
+        # Dados gerados não mudam: apenas latência e erros valem em tempo de execução
+        app.state.configuracao = configuracao
+        return configuracao
+
+    @app.get("/_fake/estatisticas")
+    async def obter_estatisticas():
+        return app.state.estatisticas.para_dict()
+
+    @app.post("/_fake/reset")
+    async def resetar_estatisticas():
+        app.state.estatisticas.resetar()
+        return {'sucesso': True}
+
+    @app.post("/_fake/chamados/{process_instance_id}/historico")
+    async def adicionar_historico(process_instance_id: int, tipo: str = 'OBSERVATION', descricao: Optional[str] = None):
+        item = app.state.dados.adicionar_item_historico(process_instance_id, tipo, descricao)
+        if item is None:
+            return JSONResponse({'message': 'Chamado não encontrado'}, status_code=404)
+        return item
+
+    # ------------------------------------------------------------------ datasets
+
+    @app.get("/api/public/ecm/dataset/search")
+    async def buscar_dataset(
+        datasetId: str,
+        filterFields: Optional[str] = None,
+        resultFields: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ):
+        registros = _filtrar_dataset(app.state.dados.dataset(datasetId), filterFields)
+        if limit is not None:
+            registros = registros[offset:offset + limit]
+        if resultFields:
+            campos = [c.strip() for c in resultFields.split(',') if c.strip()]
+            registros = [{c: r.get(c) for c in campos} for r in registros]
+        return {'content': registros}
+
+    @app.post("/api/public/ecm/dataset/datasets/")
+    async def consultar_dataset(request: Request):
+        corpo = await request.json()
+        registros = app.state.dados.dataset(corpo.get('name', ''))
+        # _type: 1 = MUST, 2 = SHOULD (basta um), 3 = MUST_NOT
+        deve, pode, nao_deve = [], [], []
+        for constraint in corpo.get('constraints') or []:
+            filtro = (constraint.get('_field'), str(constraint.get('_initialValue', '')).lower())
+            {2: pode, 3: nao_deve}.get(constraint.get('_type', 1), deve).append(filtro)
+
+        def atende(registro, campo, valor):
+            return str(registro.get(campo, '')).lower() == valor
+
+        registros = [
+            r for r in registros
+            if all(atende(r, c, v) for c, v in deve)
+            and not any(atende(r, c, v) for c, v in nao_deve)
+            and (not pode or any(atende(r, c, v) for c, v in pode))
+        ]
+        colunas = list(registros[0].keys()) if registros else []
+        return {'content': {'columns': colunas, 'values': registros}, 'message': None}
+
+    # ------------------------------------------------------------------ processos
+
+    @app.post("/process-management/api/v2/processes/{process_id}/start")
+    async def iniciar_processo(process_id: str, request: Request):
+        corpo = await request.json()
+        chamado = app.state.dados.criar_chamado(process_id, corpo.get('formFields') or {}, corpo.get('targetAssignee'))
+        return {
+            'processInstanceId': chamado['processInstanceId'],
+            'processId': process_id,
+            'state': chamado['state'],
+            'startDate': chamado['startDate'],
+        }
+
+    @app.get("/process-management/api/v2/tasks")
+    async def listar_tasks(
+        assignee: Optional[str] = None,
+        status: Optional[str] = None,
+        slaStatus: Optional[str] = None,
+        page: int = 1,
+        pageSize: int = 1000,
+        order: str = "processInstanceId"
+    ):
+        tasks = app.state.dados.tasks(status, slaStatus)
+        tasks.sort(key=lambda task: str(task.get(order.lstrip('-'), '')), reverse=order.startswith('-'))
+        return _paginar(tasks, page, pageSize)
+
+    def _chamado_ou_404(process_instance_id: int):
+        return app.state.dados.chamados.get(process_instance_id)
+
+    @app.get("/process-management/api/v2/requests/{process_instance_id}")
+    async def detalhes_chamado(process_instance_id: int):
+        chamado = _chamado_ou_404(process_instance_id)
+        if chamado is None:
+            return JSONResponse({'message': 'Solicitação não encontrada'}, status_code=404)
+        return {chave: valor for chave, valor in chamado.items() if not chave.startswith('_') and chave not in ('historico', 'anexos')}
+
+    @app.get("/process-management/api/v2/activities")
+    async def listar_atividades(processInstanceId: int, page: int = 1, pageSize: int = 1000):
+        chamado = _chamado_ou_404(processInstanceId)
+        if chamado is None:
+            return JSONResponse({'message': 'Solicitação não encontrada'}, status_code=404)
+        atividades = [
+            {
+                'processInstanceId': processInstanceId,
+                'movementSequence': item['movementSequence'],
+                'state': chamado['state'],
+                'assignee': chamado['assignee'],
+                'startDate': item['date'],
+            }
+            for item in chamado['historico'] if item['type'] == 'MOVEMENT'
+        ]
+        return _paginar(atividades, page, pageSize)
+
+    @app.get("/process-management/api/v2/requests/{process_instance_id}/histories")
+    async def historico_chamado(process_instance_id: int, page: int = 1, pageSize: int = 1000):
+        chamado = _chamado_ou_404(process_instance_id)
+        if chamado is None:
+            return JSONResponse({'message': 'Solicitação não encontrada'}, status_code=404)
+        return _paginar(chamado['historico'], page, pageSize)
+
+    @app.get("/process-management/api/v2/requests/{process_instance_id}/attachments/download")
+    async def baixar_anexo(process_instance_id: int, documentName: str):
+        chamado = _chamado_ou_404(process_instance_id)
+        conteudo = chamado['anexos'].get(documentName) if chamado else None
+        if conteudo is None:
+            return JSONResponse({'message': 'Anexo não encontrado'}, status_code=404)
+        return Response(content=conteudo, media_type='application/octet-stream')
+
+    # ------------------------------------------------------------------ ECM
+
+    @app.post("/ecm/upload")
+    async def upload(files: UploadFile = File(...), userId: str = Form('')):
+        conteudo = await files.read()
+        app.state.dados.arquivos_enviados[files.filename] = conteudo
+        return {'files': [{'name': files.filename, 'size': len(conteudo)}]}
+
+    @app.post("/ecm/api/rest/ecm/workflowView/saveAttachments")
+    async def salvar_anexos(request: Request):
+        corpo = await request.json()
+        chamado = _chamado_ou_404(int(corpo.get('processInstanceId') or 0))
+        if chamado is None:
+            return {'content': 'ERROR', 'message': {'message': 'Solicitação não encontrada'}}
+        for anexo in corpo.get('attachments') or []:
+            nome = anexo.get('name')
+            conteudo = app.state.dados.arquivos_enviados.pop(nome, None)
+            if conteudo is None:
+                return {'content': 'ERROR', 'message': {'message': f'Arquivo {nome} não enviado via upload'}}
+            chamado['anexos'][nome] = conteudo
+            app.state.dados.adicionar_item_historico(chamado['processInstanceId'], 'ATTACHMENT', f"Anexo {nome}", nome)
+        return {'content': {'hasNewAttachment': True}, 'message': None}
+
+    return app
+
+
+app = criar_app_fluig_fake()
@@ -0,0 +1,235 @@
+"""
+Dados em memória do Fluig fake (colaboradores, catálogo de serviços e chamados)
+
+Gerados de forma determinística a partir de uma semente, com formulários no
+mesmo formato (e tamanho) do `classificação.json` da raiz do projeto.
+"""
+import json
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ARQUIVO_FORMULARIO_MODELO = Path(__file__).parent.parent.parent / "classificação.json"
+
+_NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+    "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sabrina", "Thiago", "Vanessa", "William",
+]
+_SOBRENOMES = [
+    "Almeida", "Barbosa", "Cardoso", "Dias", "Esteves", "Ferreira", "Gomes", "Lima", "Martins", "Nunes",
+    "Oliveira", "Pereira", "Queiroz", "Rocha", "Santos", "Teixeira", "Vieira", "Xavier", "Azevedo", "Moraes",
+]
+_FUNCOES = ["Analista de TI", "Operador Industrial", "Assistente Administrativo", "Técnico de Manutenção", "Coordenador"]
+_SECOES = ["Tecnologia da Informação", "Produção", "Financeiro", "Manutenção", "Logística"]
+_EMPRESAS = ["UISA S.A.", "UISA Bioenergia"]
+_SERVICOS = [
+    ("Acessos", "Active Directory", "Desbloqueio de Usuário AD"),
+    ("Acessos", "Active Directory", "Reset de Senha"),
+    ("Infraestrutura", "Rede", "Liberação de Ponto de Rede"),
+    ("Infraestrutura", "Estação de Trabalho", "Instalação de Software"),
+    ("Sistemas", "SAP", "Criação de Usuário SAP"),
+    ("Sistemas", "Fluig", "Erro em Processo"),
+]
+_TEXTOS_HISTORICO = [
+    "Chamado recebido pela equipe de atendimento.",
+    "Solicitado mais detalhes ao usuário sobre o problema relatado.",
+    "Usuário retornou com as informações solicitadas.",
+    "Encaminhado para a equipe responsável pelo serviço.",
+    "Atividade realizada conforme procedimento padrão, aguardando validação do solicitante.",
+]
+
+
+def _carregar_formulario_modelo() -> List[Dict[str, str]]:
+    """Campos do formulário de exemplo (formData do classificação.json)"""
+    try:
+        with open(ARQUIVO_FORMULARIO_MODELO, 'r', encoding='utf-8') as f:
+            return json.load(f).get('formData', [])
+    except (OSError, ValueError):
+        return []
+
+
+class EstadoFluigFake:
+    """
+    Estado mutável do Fluig fake
+
+    Attributes:
+        colaboradores: Registros do dataset colleague
+        funcionarios: Registros do dataset ds_funcionarios
+        servicos: Registros do dataset ITSM_Catalogo_Servico
+        chamados: {processInstanceId: chamado}
+        arquivos_enviados: {nome_arquivo: bytes} recebidos em /ecm/upload
+    """
+
+    def __init__(self, semente: int = 42, total_colaboradores: int = 2000, total_chamados: int = 300, itens_historico: int = 20):
+        self._lock = threading.Lock()
+        self._rng = random.Random(semente)
+        self._formulario_modelo = _carregar_formulario_modelo()
+        self.colaboradores: List[Dict[str, Any]] = []
+        self.funcionarios: List[Dict[str, Any]] = []
+        self.servicos: List[Dict[str, Any]] = []
+        self.chamados: Dict[int, Dict[str, Any]] = {}
+        self.arquivos_enviados: Dict[str, bytes] = {}
+        self._proximo_id = 700000
+        self._gerar_colaboradores(total_colaboradores)
+        self._gerar_servicos()
+        self._gerar_chamados(total_chamados, itens_historico)
+
+    # ------------------------------------------------------------------ geração
+
+    def _gerar_colaboradores(self, total: int):
+        for indice in range(total):
+            nome = f"{self._rng.choice(_NOMES)} {self._rng.choice(_SOBRENOMES)} {self._rng.choice(_SOBRENOMES)}"
+            primeiro, *_, ultimo = nome.lower().split()
+            email = f"{primeiro}.{ultimo}{indice}@uisa.com.br"
+            chapa = str(100000 + indice)
+            colleague_id = uuid.UUID(int=self._rng.getrandbits(128)).hex
+            self.colaboradores.append({
+                'colleagueId': colleague_id,
+                'colleagueName': nome,
+                'mail': email,
+                'login': f"ad{chapa}",
+                'currentProject': chapa,
+                'active': 'true',
+            })
+            self.funcionarios.append({
+                'Chapa': chapa,
+                'Nome': nome,
+                'Email': email,
+                'Função': self._rng.choice(_FUNCOES),
+                'Seção': self._rng.choice(_SECOES),
+                'Centro de Custo': str(self._rng.randint(1000, 9999)),
+                'Empresa': self._rng.choice(_EMPRESAS),
+            })
+
+    def _gerar_servicos(self):
+        for indice, (grupo, item, servico) in enumerate(_SERVICOS):
+            self.servicos.append({
+                'documentid': str(5000 + indice),
+                'grupo_servico': grupo,
+                'item_servico': item,
+                'servico': servico,
+                'urgencia_alta': '4',
+                'urgencia_media': '8',
+                'urgencia_baixa': '24',
+                'ds_responsavel': 'Equipe ITSM',
+                'equipe_executante': 'ITSM_TODOS',
+                'matric_keyuser': '100000',
+            })
+
+    def _gerar_chamados(self, total: int, itens_historico: int):
+        for _ in range(total):
+            solicitante = self._rng.choice(self.colaboradores)
+            servico = self._rng.choice(self.servicos)
+            campos = {
+                'ds_titulo': servico['servico'],
+                'ds_chamado': f"Solicitação de {servico['servico'].lower()} para o usuário {solicitante['login']}",
+                'nm_emitente': solicitante['colleagueName'],
+                'h_solicitante': solicitante['colleagueId'],
+                'email_solicitante': solicitante['mail'],
+                'ds_servico': servico['servico'],
+            }
+            chamado = self.criar_chamado("Abertura de Chamados", campos, solicitante['colleagueId'])
+            for _ in range(max(0, itens_historico - 1)):
+                self.adicionar_item_historico(chamado['processInstanceId'], self._rng.choice(['MOVEMENT', 'OBSERVATION']))
+
+    # ------------------------------------------------------------------ datasets
+
+    def dataset(self, dataset_id: str) -> List[Dict[str, Any]]:
+        """Registros de um dataset (lista vazia se desconhecido)"""
+        return {
+            'colleague': self.colaboradores,
+            'ds_funcionarios': self.funcionarios,
+            'ds_aprovadores': self.funcionarios,
+            'ITSM_Catalogo_Servico': self.servicos,
+        }.get(dataset_id, [])
+
+    def colaborador(self, colleague_id: str) -> Optional[Dict[str, Any]]:
+        return next((c for c in self.colaboradores if c['colleagueId'] == colleague_id), None)
+
+    # ------------------------------------------------------------------ chamados
+
+    def _formulario(self, campos: Dict[str, Any]) -> List[Dict[str, str]]:
+        """formFields no formato da API v2 ({field, value}), com o volume do formulário real"""
+        formulario = {item['name']: item.get('value', '') for item in self._formulario_modelo}
+        formulario.update({nome: str(valor) for nome, valor in campos.items()})
+        return [{'field': nome, 'value': valor} for nome, valor in formulario.items()]
+
+    def criar_chamado(self, process_id: str, campos: Dict[str, Any], assignee: Optional[str]) -> Dict[str, Any]:
+        """Cria um chamado (start de processo) com o primeiro item de histórico"""
+        with self._lock:
+            process_instance_id = self._proximo_id
+            self._proximo_id += 1
+        solicitante = self.colaborador(campos.get('h_solicitante', '')) or {}
+        agora = datetime.now()
+        chamado = {
+            'processInstanceId': process_instance_id,
+            'processId': process_id,
+            'processDescription': process_id,
+            'status': 'OPEN',
+            'slaStatus': 'ON_TIME',
+            'startDate': agora.isoformat(),
+            'assignStartDate': agora.isoformat(),
+            'requester': {'code': solicitante.get('colleagueId', ''), 'name': solicitante.get('colleagueName', '')},
+            'assignee': {'code': assignee or '', 'name': ''},
+            'state': {'sequence': 5, 'stateName': 'Aguardando Classificação'},
+            'formFields': self._formulario(campos),
+            'historico': [],
+            'anexos': {},
+            '_movimento': 0,
+            '_observacao': 0,
+            '_anexo': 0,
+        }
+        self.chamados[process_instance_id] = chamado
+        self.adicionar_item_historico(process_instance_id, 'MOVEMENT', "Início da solicitação")
+        return chamado
+
+    def adicionar_item_historico(
+        self,
+        process_instance_id: int,
+        tipo: str = 'OBSERVATION',
+        descricao: Optional[str] = None,
+        nome_anexo: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Adiciona um item (MOVEMENT, OBSERVATION ou ATTACHMENT) no topo do histórico"""
+        chamado = self.chamados.get(process_instance_id)
+        if chamado is None:
+            return None
+        with self._lock:
+            if tipo == 'MOVEMENT':
+                chamado['_movimento'] += 1
+            elif tipo == 'ATTACHMENT':
+                chamado['_anexo'] += 1
+            else:
+                chamado['_observacao'] += 1
+            data = datetime.now() - timedelta(seconds=self._rng.randint(0, 3600))
+            item = {
+                'type': tipo,
+                'movementSequence': chamado['_movimento'],
+                'date': data.isoformat(),
+                'user': chamado['requester'],
+                'description': descricao or self._rng.choice(_TEXTOS_HISTORICO),
+            }
+            if tipo == 'OBSERVATION':
+                item['observationId'] = chamado['_observacao']
+            if tipo == 'ATTACHMENT':
+                item['attachmentId'] = chamado['_anexo']
+                item['documentName'] = nome_anexo
+            # A API devolve o histórico do mais novo para o mais antigo
+            chamado['historico'].insert(0, item)
+        return item
+
+    def tasks(self, status: Optional[str], sla_status: Optional[str]) -> List[Dict[str, Any]]:
+        """Chamados no formato da listagem /api/v2/tasks (todos atribuídos à fila consultada)"""
+        campos_task = ('processInstanceId', 'processId', 'processDescription', 'status', 'slaStatus',
+                       'startDate', 'assignStartDate', 'requester', 'assignee', 'state')
+        tasks = []
+        for chamado in self.chamados.values():
+            if sla_status and chamado['slaStatus'] != sla_status:
+                continue
+            if status == 'NOT_COMPLETED' and chamado['status'] != 'OPEN':
+                continue
+            tasks.append({**{campo: chamado[campo] for campo in campos_task}, 'movementSequence': chamado['_movimento']})
+        return tasks
@@ -0,0 +1,88 @@
+"""
+Execução do Fluig fake com uvicorn (linha de comando ou thread em background)
+"""
+import argparse
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+
+from .app import ConfiguracaoFake, criar_app_fluig_fake
+
+
+class ServidorFluigFake:
+    """
+    Sobe o Fluig fake em uma thread (para testes e benchmarks no mesmo processo)
+
+    Uso:
+        with ServidorFluigFake(ConfiguracaoFake(latencia_ms=50)) as servidor:
+            os.environ['URL_FLUIG_PRD'] = servidor.url
+    """
+
+    def __init__(self, configuracao: Optional[ConfiguracaoFake] = None, host: str = "127.0.0.1", porta: int = 0):
+        self.app = criar_app_fluig_fake(configuracao)
+        self.host = host
+        self.porta = porta or self._porta_livre(host)
+        self._servidor = uvicorn.Server(uvicorn.Config(self.app, host=self.host, port=self.porta, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _porta_livre(host: str) -> int:
+        with socket.socket() as s:
+            s.bind((host, 0))
+            return s.getsockname()[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    def iniciar(self, timeout: float = 10.0) -> "ServidorFluigFake":
+        self._thread = threading.Thread(target=self._servidor.run, daemon=True, name="fluig-fake")
+        self._thread.start()
+        limite = time.monotonic() + timeout
+        while not self._servidor.started:
+            if time.monotonic() > limite:
+                raise RuntimeError("Fluig fake não iniciou no tempo esperado")
+            time.sleep(0.05)
+        return self
+
+    def parar(self):
+        self._servidor.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "ServidorFluigFake":
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fluig fake para testes e benchmarks offline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8990)
+    parser.add_argument("--latencia-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Probabilidade (0-1) de responder com erro")
+    parser.add_argument("--status-erro", type=int, default=503)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--colaboradores", type=int, default=2000)
+    parser.add_argument("--chamados", type=int, default=300)
+    parser.add_argument("--itens-historico", type=int, default=20)
+    args = parser.parse_args()
+
+    configuracao = ConfiguracaoFake(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        taxa_erro=args.taxa_erro,
+        status_erro=args.status_erro,
+        semente=args.semente,
+        total_colaboradores=args.colaboradores,
+        total_chamados=args.chamados,
+        itens_historico=args.itens_historico,
+    )
+    print(f"Fluig fake em http://{args.host}:{args.porta} (use como URL_FLUIG_PRD/URL_FLUIG_QLD)")
+    uvicorn.run(criar_app_fluig_fake(configuracao), host=args.host, port=args.porta, log_level="warning")
@@ -0,0 +1,600 @@
+"""
+Testes offline do FluigCore contra o Fluig fake
+
+Sobe o Fluig fake em uma thread e aponta o ambiente QLD para ele.
+
+Uso:
+    python -m pytest tests/fake_fluig -q
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.fluig import fluig_pool
+from src.fluig.fluig_cache import (
+    CacheDetalhesChamados, CacheTTL, ExecucoesEmVoo, FilaSerializada, get_cache_detalhes_chamados, get_cache_filas_chamados, versao_task
+)
+from src.fluig.fluig_catalogo import CatalogoServicos, IndiceCatalogo, SincronizadorCatalogo
+from src.fluig.fluig_comum import iterar_paginas, marcador_historico
+from src.fluig.fluig_core import FluigCore
+from src.fluig.fluig_core_async import AsyncFluigCore
+from src.fluig.fluig_limitador import (
+    PRIORIDADE_BACKGROUND, LimitadorConcorrencia, LimitadorTaxa, get_limitador_fluig, obter_prioridade_atual,
+    prioridade_fluig
+)
+from src.fluig import fluig_requests
+from src.fluig.fluig_comum import URL_SAVE_ATTACHMENTS
+from src.fluig.fluig_resiliencia import (
+    ESTADO_FECHADO, ESTADO_MEIO_ABERTO, PrazoExcedidoError, familia_endpoint, get_disjuntor, prazo_fluig, tempo_restante
+)
+from src.modelo_dados.modelo_settings import ConfigEnvSetings
+from src.modelo_dados.modelos_fluig import AberturaChamado
+from src.site.filas_materializadas import AtualizadorFilas
+from src.site.filas_push import PublicadorFilas
+from tests.fake_fluig import ConfiguracaoFake, ServidorFluigFake
+
+
+@pytest.fixture(scope="module")
+def servidor():
+    configuracao = ConfiguracaoFake(total_colaboradores=50, total_chamados=30, itens_historico=12)
+    with ServidorFluigFake(configuracao) as servidor:
+        url_original = ConfigEnvSetings.URL_FLUIG_QLD
+        ConfigEnvSetings.URL_FLUIG_QLD = servidor.url
+        fluig_pool.fechar_clientes_fluig()
+        try:
+            yield servidor
+        finally:
+            ConfigEnvSetings.URL_FLUIG_QLD = url_original
+            fluig_pool.fechar_clientes_fluig()
+
+
+@pytest.fixture
+def fluig_core(servidor):
+    return FluigCore(ambiente="QLD")
+
+
+@pytest.fixture
+def webapp(servidor, monkeypatch):
+    """Rotas do webapp (ambiente PRD) apontadas para o Fluig fake, com o cache das filas vazio"""
+    from src.rotas.webapp import rt_chamado
+
+    monkeypatch.setattr(ConfigEnvSetings, 'URL_FLUIG_PRD', servidor.url)
+    # O atualizador global gravaria src/json/filas_ativas.json
+    monkeypatch.setattr(ConfigEnvSetings, 'FILA_MATERIALIZADA_ENABLED', 'false')
+    fluig_pool.fechar_clientes_fluig()
+    get_cache_filas_chamados().invalidar()
+    servidor.app.state.estatisticas.resetar()
+    try:
+        yield rt_chamado
+    finally:
+        get_cache_filas_chamados().invalidar()
+        fluig_pool.fechar_clientes_fluig()
+
+
+def _email_de_um_responsavel(servidor) -> str:
+    chamado = next(iter(servidor.app.state.dados.chamados.values()))
+    return servidor.app.state.dados.colaborador(chamado['assignee']['code'])['mail']
+
+
+def _requisicao_webapp(email: str):
+    return SimpleNamespace(session={'user': {'email': email}})
+
+
+def test_dataset_colleague_por_email(servidor, fluig_core):
+    colaborador = servidor.app.state.dados.colaboradores[0]
+    dados = fluig_core.Dataset_config(dataset_id="colleague", user=colaborador['mail'])
+    assert dados['content'][0]['colleagueId'] == colaborador['colleagueId']
+
+
+def test_abertura_e_historico(servidor, fluig_core):
+    colaborador = servidor.app.state.dados.colaboradores[1]
+    item = AberturaChamado(titulo="Teste offline", descricao="Chamado aberto no Fluig fake", usuario=colaborador['mail'])
+    resultado = fluig_core.AberturaDeChamado("normal", item)
+    assert resultado['sucesso']
+    process_instance_id = resultado['dados']['processInstanceId']
+
+    detalhes = fluig_core.obter_detalhes_chamado(process_instance_id=process_instance_id)
+    assert detalhes['formFields']['ds_titulo'] == "Teste offline"
+
+    historico = fluig_core.obter_historico_chamado(process_instance_id)
+    assert len(historico['items']) == 1
+
+
+def test_listagem_paginada(servidor, fluig_core):
+    items = list(fluig_core.iterar_chamados_tasks(page_size=7))
+    assert len(items) == len(servidor.app.state.dados.chamados)
+
+
+def test_prefetch_de_paginas_mantem_contexto_do_chamador():
+    contextos = {}
+
+    def buscar_pagina(page):
+        contextos[page] = (obter_prioridade_atual(), tempo_restante())
+        return {'items': [page], 'hasNext': page < 3}
+
+    with prioridade_fluig(PRIORIDADE_BACKGROUND), prazo_fluig(30):
+        assert list(iterar_paginas(buscar_pagina, "teste", prefetch=True))[-1]['items'] == [3]
+
+    # Páginas 2 e 3 vêm da thread de prefetch, com a prioridade e o prazo de quem iterou
+    assert all(prioridade == PRIORIDADE_BACKGROUND and restante is not None for prioridade, restante in contextos.values())
+
+
+def test_historico_incremental(servidor, fluig_core):
+    process_instance_id = next(iter(servidor.app.state.dados.chamados))
+    antigo = fluig_core.obter_historico_chamado(process_instance_id)
+
+    servidor.app.state.dados.adicionar_item_historico(process_instance_id, 'OBSERVATION', "Novo comentário")
+    novo = fluig_core.obter_historico_chamado(process_instance_id, **marcador_historico(antigo['items']))
+    assert [item['description'] for item in novo['items']] == ["Novo comentário"]
+
+
+def test_upload_anexo_e_download(servidor, fluig_core):
+    process_instance_id = next(iter(servidor.app.state.dados.chamados))
+    upload = fluig_core.upload_arquivo_fluig(b"conteudo do anexo", "anexo.txt", colleague_id="admin")
+    assert upload['sucesso']
+
+    # O saveAttachments passa pelo limitador de taxa como as demais requisições
+    requisicoes = get_limitador_fluig("QLD").estatisticas()['prioridades']['interativa']['requisicoes']
+    assert fluig_core.anexar_arquivo_chamado(process_instance_id, "anexo.txt")
+    assert get_limitador_fluig("QLD").estatisticas()['prioridades']['interativa']['requisicoes'] == requisicoes + 1
+    assert fluig_core.baixar_anexo_chamado(process_instance_id, "anexo.txt") == b"conteudo do anexo"
+
+
+def test_sincronizacao_catalogo_em_lotes(servidor, tmp_path):
+    catalogo = CatalogoServicos("QLD", arquivo=tmp_path / "servicos_qld.json", arquivo_snapshot=tmp_path / "catalogo_servicos_qld.json")
+    sincronizador = SincronizadorCatalogo(catalogo, tamanho_pagina=2, tamanho_lote=4)
+    servicos = servidor.app.state.dados.servicos
+    antes = servidor.app.state.estatisticas.para_dict()['por_rota'].get("POST /api/public/ecm/dataset/datasets/", 0)
+
+    resumo = sincronizador.sincronizar()
+    lotes = servidor.app.state.estatisticas.para_dict()['por_rota']["POST /api/public/ecm/dataset/datasets/"] - antes
+    assert resumo['total'] == resumo['incluidos'] == len(servicos)
+    assert lotes == -(-len(servicos) // 4)
+    # O índice da nova revisão já foi montado pela sincronização: as rotas só leem a referência
+    recargas = catalogo.recargas
+    indice = asyncio.run(catalogo.indice_async())
+    assert catalogo.recargas == recargas
+    assert indice.completo and indice.revisao == 1
+    assert indice.buscar_por_documentid(servicos[0]['documentid'])['servico'] == servicos[0]['servico']
+
+    # Sem mudanças no Fluig não gera nova revisão
+    assert sincronizador.sincronizar()['revisao'] == 1
+
+
+def test_catalogo_recarrega_fora_do_event_loop(servidor, tmp_path):
+    arquivo = tmp_path / "servicos_qld.json"
+    arquivo.write_text(json.dumps({'content': servidor.app.state.dados.servicos}), encoding='utf-8')
+    catalogo = CatalogoServicos("QLD", arquivo=arquivo, arquivo_snapshot=tmp_path / "catalogo_servicos_qld.json")
+    threads = []
+    carregar = catalogo._carregar
+
+    def carregar_registrando(assinatura):
+        threads.append(threading.current_thread())
+        return carregar(assinatura)
+
+    catalogo._carregar = carregar_registrando
+
+    async def consultar():
+        return threading.current_thread(), await catalogo.indice_async(), await catalogo.indice_async()
+
+    thread_do_loop, indice, de_novo = asyncio.run(consultar())
+    assert len(indice.servicos) == len(servidor.app.state.dados.servicos) and de_novo is indice
+    assert len(threads) == 1 and threads[0] is not thread_do_loop
+
+
+def test_busca_catalogo_tolerante(servidor):
+    servicos = servidor.app.state.dados.servicos
+    indice = IndiceCatalogo(tuple(servicos), ("servicos_qld.json", 0, 0))
+    alvo = next(s for s in servicos if s['servico'] == "Instalação de Software")
+
+    assert indice.buscar("instalacao soft")[0]['documentid'] == alvo['documentid']
+    assert indice.buscar("instalaçao sofware")[0]['documentid'] == alvo['documentid']
+
+    # Remontagem reaproveita a análise dos serviços inalterados
+    recarregado = IndiceCatalogo(tuple(servicos), ("servicos_qld.json", 1, 0), anterior=indice)
+    assert recarregado.busca.reaproveitados == len(servicos)
+
+
+def test_injecao_de_erro(servidor, fluig_core):
+    configuracao = servidor.app.state.configuracao
+    servidor.app.state.configuracao = configuracao.model_copy(update={'taxa_erro_por_familia': {'outros': 1.0}})
+    try:
+        assert fluig_core.obter_detalhes_chamado(process_instance_id=next(iter(servidor.app.state.dados.chamados))) is None
+    finally:
+        servidor.app.state.configuracao = configuracao
+
+
+def test_cache_detalhes_por_versao_da_task(servidor):
+    cache = CacheDetalhesChamados("detalhes_teste", max_entradas=100, ttl_segundos=600)
+
+    async def carregar_fila() -> int:
+        """Carrega os detalhes da fila e retorna quantos foram buscados no Fluig"""
+        fluig_core = AsyncFluigCore(ambiente="QLD")
+        items = [item async for item in fluig_core.iterar_chamados_tasks()]
+        cargas = cache.estatisticas()['cargas']
+        for item in items:
+            pid = item['processInstanceId']
+            detalhes, _ = await cache.obter_ou_carregar_async(
+                "QLD", pid, versao_task(item),
+                lambda pid=pid: fluig_core.obter_detalhes_chamado(process_instance_id=pid)
+            )
+            assert detalhes['processInstanceId'] == pid
+        return cache.estatisticas()['cargas'] - cargas
+
+    total = len(servidor.app.state.dados.chamados)
+    assert asyncio.run(carregar_fila()) == total
+    assert asyncio.run(carregar_fila()) == 0
+
+    # Só o chamado movimentado é buscado de novo
+    process_instance_id = next(iter(servidor.app.state.dados.chamados))
+    servidor.app.state.dados.adicionar_item_historico(process_instance_id, 'MOVEMENT', "Encaminhado")
+    assert asyncio.run(carregar_fila()) == 1
+    assert cache.estatisticas()['alterados'] == 1
+
+
+def test_coalescencia_lider_cancelado_nao_derruba_quem_aguarda():
+    execucoes = ExecucoesEmVoo("teste")
+    cache = CacheDetalhesChamados("detalhes_cancelamento", max_entradas=10, ttl_segundos=600)
+    cargas = []
+
+    async def carregar():
+        cargas.append(1)
+        await asyncio.sleep(0.2)
+        return {"processInstanceId": 1, "carga": len(cargas)}
+
+    async def executar():
+        lider = asyncio.create_task(execucoes.executar_async("chave", carregar))
+        await asyncio.sleep(0.05)
+        seguidor = asyncio.create_task(execucoes.executar_async("chave", carregar))
+        await asyncio.sleep(0.05)
+        lider.cancel()
+        # Quem aguardava assume a execução em vez de receber o CancelledError do líder
+        assert (await seguidor)["carga"] == 2
+        assert lider.cancelled()
+
+        # Mesmo comportamento no cache de detalhes (mesma coalescência)
+        lider = asyncio.create_task(cache.obter_ou_carregar_async("QLD", 1, (1,), carregar))
+        await asyncio.sleep(0.05)
+        seguidor = asyncio.create_task(cache.obter_ou_carregar_async("QLD", 1, (1,), carregar))
+        await asyncio.sleep(0.05)
+        lider.cancel()
+        detalhes, _ = await seguidor
+        assert detalhes["carga"] == 4
+
+    asyncio.run(executar())
+    assert execucoes.estatisticas()['lideres_cancelados'] == 1
+    assert execucoes.estatisticas()['em_voo'] == 0
+
+
+def test_cache_ttl_lider_cancelado_nao_derruba_quem_aguarda():
+    cache = CacheTTL("datasets_cancelamento", max_entradas=10, ttl_segundos=600, ttl_negativo_segundos=60)
+    cargas = []
+
+    async def carregar():
+        cargas.append(1)
+        await asyncio.sleep(0.2)
+        return {"content": [], "carga": len(cargas)}
+
+    async def executar():
+        lider = asyncio.create_task(cache.obter_ou_carregar_async("chave", carregar))
+        await asyncio.sleep(0.05)
+        seguidores = [asyncio.create_task(cache.obter_ou_carregar_async("chave", carregar)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        lider.cancel()
+        # Um dos que aguardavam carrega de novo; o outro aguarda essa nova carga
+        assert [seguidor["carga"] for seguidor in await asyncio.gather(*seguidores)] == [2, 2]
+        assert lider.cancelled()
+        assert await cache.obter_ou_carregar_async("chave", carregar) == {"content": [], "carga": 2}
+
+    asyncio.run(executar())
+    estatisticas = cache.estatisticas()
+    assert estatisticas['lideres_cancelados'] == 1 and estatisticas['em_voo'] == 0 and len(cargas) == 2
+
+
+def test_limitador_desiste_sem_token_quando_prazo_nao_comporta():
+    limitador = LimitadorTaxa("TESTE", taxa=5, rajada=1)
+    limitador.adquirir()
+
+    # O próximo token leva 0.2s: com 0.05s de prazo a requisição sai da fila na hora
+    inicio = time.monotonic()
+    with pytest.raises(PrazoExcedidoError):
+        limitador.adquirir(prazo_segundos=0.05)
+    assert time.monotonic() - inicio < 0.05
+    with pytest.raises(PrazoExcedidoError):
+        asyncio.run(limitador.adquirir_async(prazo_segundos=0.05))
+
+    # Nenhum token foi gasto pelas desistências
+    assert limitador.adquirir(prazo_segundos=1) < 0.3
+    estatisticas = limitador.estatisticas()['prioridades']['interativa']
+    assert estatisticas['desistiram'] == 2 and estatisticas['em_espera'] == 0
+
+
+def test_fila_prazo_por_chamado_e_fila_incompleta_fora_do_cache(servidor, webapp, monkeypatch):
+    monkeypatch.setattr(ConfigEnvSetings, 'FLUIG_LIMITADOR_ENABLED', 'false')
+    monkeypatch.setattr(ConfigEnvSetings, 'FLUIG_DISJUNTOR_ENABLED', 'false')
+    monkeypatch.setattr(ConfigEnvSetings, 'FLUIG_RETRY_MAX_TENTATIVAS', 1)
+    monkeypatch.setattr(ConfigEnvSetings, 'FLUIG_PRAZO_DETALHES_CHAMADOS_SEGUNDOS', 0.4)
+    email = _email_de_um_responsavel(servidor)
+    configuracao = servidor.app.state.configuracao
+    cache_detalhes = get_cache_detalhes_chamados()
+
+    async def carregar_fila():
+        if cache_detalhes is not None:
+            cache_detalhes.invalidar()
+        inicio = time.monotonic()
+        resposta = await webapp.obter_chamados_fila(_requisicao_webapp(email))
+        return resposta, time.monotonic() - inicio
+
+    try:
+        # Detalhes (família "outros") lentos: a busca toda passa do prazo, cada chamado cabe nele
+        servidor.app.state.configuracao = configuracao.model_copy(update={'latencia_por_familia_ms': {'outros': 150}})
+        resposta, duracao = asyncio.run(carregar_fila())
+        chamados = json.loads(resposta.body)['chamados']
+        assert duracao > 0.4
+        assert chamados and all(c['detalhes'] is not None for c in chamados)
+        get_cache_filas_chamados().invalidar()
+
+        # Sem os detalhes, a fila é respondida mas não fica no cache
+        servidor.app.state.configuracao = configuracao.model_copy(update={'taxa_erro_por_familia': {'outros': 1.0}})
+        recusados = get_cache_filas_chamados().estatisticas()['recusados']
+        for _ in range(2):
+            resposta, _ = asyncio.run(carregar_fila())
+            assert resposta.headers['X-Cache'] == 'miss'
+            assert all(c['detalhes'] is None for c in json.loads(resposta.body)['chamados'])
+        assert get_cache_filas_chamados().estatisticas()['recusados'] == recusados + 2
+    finally:
+        servidor.app.state.configuracao = configuracao
+        if cache_detalhes is not None:
+            cache_detalhes.invalidar()
+
+
+def test_cache_filas_guarda_conforme_flag_de_fila_completa():
+    cache_filas = get_cache_filas_chamados()
+    # Campo de formulário vazio também serializa como "detalhes":null: só o flag decide
+    corpo = json.dumps({"chamados": [{"detalhes": {"campos": {"detalhes": None}}}]}, separators=(",", ":")).encode()
+    try:
+        cache_filas.salvar(('teste', 'completa'), FilaSerializada(corpo, True))
+        cache_filas.salvar(('teste', 'incompleta'), FilaSerializada(corpo, False))
+        assert cache_filas.contem(('teste', 'completa'))
+        assert not cache_filas.contem(('teste', 'incompleta'))
+    finally:
+        cache_filas.invalidar(('teste', 'completa'))
+
+
+def test_fila_fria_concorrente_faz_uma_listagem(servidor, webapp):
+    requisicao = _requisicao_webapp(_email_de_um_responsavel(servidor))
+    configuracao = servidor.app.state.configuracao
+    estatisticas = servidor.app.state.estatisticas
+
+    def listagens_de(consultas: int):
+        get_cache_filas_chamados().invalidar()
+        antes = estatisticas.para_dict()['por_familia'].get('tasks', 0)
+
+        async def consultar():
+            return await asyncio.gather(*(webapp.obter_chamados_fila(requisicao) for _ in range(consultas)))
+
+        respostas = asyncio.run(consultar())
+        return respostas, estatisticas.para_dict()['por_familia'].get('tasks', 0) - antes
+
+    try:
+        servidor.app.state.configuracao = configuracao.model_copy(update={'latencia_por_familia_ms': {'tasks': 100}})
+        respostas, listagens = listagens_de(8)
+        _, listagens_de_uma_consulta = listagens_de(1)
+
+        # Uma consulta dispara a carga e as outras 7 aguardam a mesma listagem
+        assert sorted(resposta.headers['X-Cache'] for resposta in respostas) == ['coalescido'] * 7 + ['miss']
+        assert listagens == listagens_de_uma_consulta > 0
+        assert len({resposta.body for resposta in respostas}) == 1
+    finally:
+        servidor.app.state.configuracao = configuracao
+
+
+def test_fila_vencida_responde_na_hora_e_revalida_em_background(servidor, webapp):
+    requisicao = _requisicao_webapp(_email_de_um_responsavel(servidor))
+    configuracao = servidor.app.state.configuracao
+    cache_filas = get_cache_filas_chamados()
+    ttl = cache_filas.ttl_segundos
+
+    async def consultar_vencida():
+        carregada = await webapp.obter_chamados_fila(requisicao)
+        cache_filas.ttl_segundos = 0.0
+        servidor.app.state.configuracao = configuracao.model_copy(update={'latencia_por_familia_ms': {'tasks': 500}})
+        atualizacoes = cache_filas.estatisticas()['atualizacoes']
+
+        inicio = time.monotonic()
+        vencida = await webapp.obter_chamados_fila(requisicao)
+        duracao = time.monotonic() - inicio
+        em_voo = cache_filas.estatisticas()['em_voo']
+
+        # A revalidação roda depois da resposta e renova a entrada
+        while cache_filas.estatisticas()['em_voo']:
+            await asyncio.sleep(0.05)
+        return carregada, vencida, duracao, em_voo, cache_filas.estatisticas()['atualizacoes'] - atualizacoes
+
+    try:
+        carregada, vencida, duracao, em_voo, atualizacoes = asyncio.run(consultar_vencida())
+        assert vencida.headers['X-Cache'] == 'obsoleto' and vencida.body == carregada.body
+        assert duracao < 0.2 and em_voo == 1
+        assert atualizacoes == 1 and cache_filas.idade(('fila', requisicao.session['user']['email'])) < 1
+    finally:
+        cache_filas.ttl_segundos = ttl
+        servidor.app.state.configuracao = configuracao
+
+
+async def _linhas_stream(resposta) -> list:
+    return [json.loads(linha) async for linha in resposta.body_iterator]
+
+
+def test_stream_grupo_compartilha_carga_do_cache(servidor, webapp):
+    requisicao = _requisicao_webapp(_email_de_um_responsavel(servidor))
+    configuracao = servidor.app.state.configuracao
+    cache_filas = get_cache_filas_chamados()
+
+    async def stream_e_json_concorrentes():
+        stream = await webapp.obter_chamados_grupo_itsm_todos_stream(requisicao)
+        linhas, resposta = await asyncio.gather(
+            _linhas_stream(stream), webapp.obter_chamados_grupo_itsm_todos(requisicao)
+        )
+        return stream, linhas, resposta
+
+    try:
+        servidor.app.state.configuracao = configuracao.model_copy(update={'latencia_por_familia_ms': {'tasks': 100}})
+        antes = cache_filas.estatisticas()
+        stream, linhas, resposta = asyncio.run(stream_e_json_concorrentes())
+
+        # O stream dispara a carga do cache e transmite; a rota JSON aguarda a mesma carga
+        assert stream.headers['X-Cache'] == 'miss' and resposta.headers['X-Cache'] == 'coalescido'
+        assert linhas[0]['tipo'] == 'inicio' and linhas[-1] == {'tipo': 'fim', 'sucesso': True, 'total': linhas[0]['total']}
+        chamados = json.loads(resposta.body)['chamados']
+        assert sorted(linha['posicao'] for linha in linhas[1:-1]) == list(range(len(chamados)))
+        estatisticas = cache_filas.estatisticas()
+        assert estatisticas['atualizacoes'] - antes['atualizacoes'] == 1
+        assert estatisticas['coalescidos'] - antes['coalescidos'] == 1
+
+        # Fila no cache: hit e, vencida, obsoleto (servida na hora, atualizada em background)
+        stream = asyncio.run(webapp.obter_chamados_grupo_itsm_todos_stream(requisicao))
+        assert stream.headers['X-Cache'] == 'hit'
+        assert len(asyncio.run(_linhas_stream(stream))) == len(chamados) + 2
+        cache_filas.ttl_segundos, ttl = 0.0, cache_filas.ttl_segundos
+        try:
+            stream = asyncio.run(webapp.obter_chamados_grupo_itsm_todos_stream(requisicao))
+            assert stream.headers['X-Cache'] == 'obsoleto'
+        finally:
+            cache_filas.ttl_segundos = ttl
+    finally:
+        servidor.app.state.configuracao = configuracao
+
+
+def test_disjuntor_meio_aberto_devolve_teste_quando_prazo_esgota_na_fila(servidor, fluig_core, monkeypatch):
+    monkeypatch.setattr(ConfigEnvSetings, 'FLUIG_DISJUNTOR_ENABLED', 'true')
+    url = fluig_core.url_base + URL_SAVE_ATTACHMENTS
+    disjuntor = get_disjuntor("QLD", familia_endpoint(url))
+    tempo_aberto = disjuntor.tempo_aberto
+    limitador = LimitadorTaxa("TESTE", taxa=1, rajada=1)
+    limitador.adquirir()
+    monkeypatch.setattr(fluig_requests, 'get_limitador_fluig', lambda ambiente: limitador)
+
+    try:
+        disjuntor.tempo_aberto = 0.05
+        for _ in range(disjuntor.limite_falhas):
+            disjuntor.registrar_falha("teste")
+        time.sleep(0.1)
+        assert disjuntor.estado == ESTADO_MEIO_ABERTO
+
+        # A requisição de teste desiste na fila do limitador, sem resposta do Fluig
+        with prazo_fluig(0.1), pytest.raises(PrazoExcedidoError):
+            fluig_core.requests.RequestTipoPOST(url, {})
+
+        # A vaga de teste volta: a próxima requisição testa o Fluig e fecha o circuito
+        monkeypatch.setattr(fluig_requests, 'get_limitador_fluig', lambda ambiente: None)
+        fluig_core.requests.RequestTipoPOST(url, {}, logar_conteudo=False)
+        assert disjuntor.estado == ESTADO_FECHADO
+    finally:
+        disjuntor.tempo_aberto = tempo_aberto
+        disjuntor.registrar_sucesso()
+
+
+def test_limitador_fanout_rodizio_entre_chamadores():
+    limitador = LimitadorConcorrencia("teste", max_concorrencia=2, max_por_chamador=2)
+    ordem = []
+
+    async def tarefa(chamador: str):
+        async with limitador.vaga(chamador):
+            ordem.append(chamador)
+            await asyncio.sleep(0.01)
+
+    async def executar():
+        grande = [asyncio.create_task(tarefa("grande")) for _ in range(6)]
+        await asyncio.sleep(0)
+        pequena = [asyncio.create_task(tarefa("pequena")) for _ in range(2)]
+        await asyncio.gather(*grande, *pequena)
+
+    asyncio.run(executar())
+    # A fila pequena não espera a grande terminar: as vagas liberadas alternam entre as duas
+    assert ordem.index("pequena") <= 3 and ordem[-1] == "grande"
+    assert limitador.estatisticas()['em_uso'] == 0 and limitador.estatisticas()['em_espera'] == 0
+
+
+def test_publicador_filas_envia_snapshot_e_diff():
+    versoes = [
+        [{"processInstanceId": 1, "status": "A"}, {"processInstanceId": 2, "status": "A"}],
+        [{"processInstanceId": 2, "status": "B"}, {"processInstanceId": 3, "status": "A"}],
+    ]
+    cargas = []
+
+    async def carregar() -> bytes:
+        cargas.append(obter_prioridade_atual())
+        return json.dumps({"chamados": versoes[min(len(cargas), len(versoes)) - 1]}).encode()
+
+    async def executar():
+        publicador = PublicadorFilas(intervalo_segundos=1, ociosidade_segundos=0)
+        # Duas abas na mesma fila compartilham o poller
+        abas = [asyncio.Queue(), asyncio.Queue()]
+        for aba in abas:
+            publicador.inscrever(aba, ('grupo', 'teste'), "grupo", carregar)
+        eventos = [[await asyncio.wait_for(aba.get(), 5) for _ in range(2)] for aba in abas]
+        publicador.parar()
+        return eventos
+
+    for (snapshot, diff) in asyncio.run(executar()):
+        assert snapshot[:2] == ("grupo", "snapshot") and len(snapshot[2]["chamados"]) == 2
+        assert diff[1] == "diff"
+        assert [c["processInstanceId"] for c in diff[2]["adicionados"]] == [3]
+        assert diff[2]["removidos"] == [1]
+        assert diff[2]["alterados"] == [{"processInstanceId": 2, "status": "B"}]
+    # Polling sem usuário esperando não disputa o limitador como interativo
+    assert cargas == [PRIORIDADE_BACKGROUND, PRIORIDADE_BACKGROUND]
+
+
+def test_fila_materializada_carrega_na_hora_e_expira(servidor, webapp, tmp_path):
+    email = _email_de_um_responsavel(servidor)
+    chave = ('fila', email)
+    atualizador = AtualizadorFilas(
+        intervalo_segundos=5, jitter=0, atividade_segundos=1.5, max_usuarios=10, concorrencia=1,
+        arquivo=tmp_path / "filas_ativas.json"
+    )
+
+    async def fila_lenta() -> FilaSerializada:
+        await asyncio.sleep(3)
+        return FilaSerializada(json.dumps({"sucesso": True, "chamados": []}).encode(), True)
+
+    # A única vaga de recarga fica ocupada por uma fila fixa lenta
+    atualizador.configurar(webapp._fila_materializada_usuario, {('grupo', 'lento'): fila_lenta})
+
+    async def executar():
+        atualizador.iniciar()
+        try:
+            await asyncio.sleep(0.1)
+            atualizador.registrar_acesso(email)
+            inicio = time.monotonic()
+            while get_cache_filas_chamados().idade(chave) is None and time.monotonic() - inicio < 5:
+                await asyncio.sleep(0.02)
+            # Materializada sem esperar a recarga lenta terminar
+            assert time.monotonic() - inicio < 2
+
+            tasks_antes = servidor.app.state.estatisticas.para_dict()['por_familia'].get('tasks', 0)
+            resposta = await webapp.obter_chamados_fila(_requisicao_webapp(email))
+            assert resposta.headers['X-Cache'] == 'hit'
+            assert json.loads(resposta.body)['chamados']
+            assert servidor.app.state.estatisticas.para_dict()['por_familia'].get('tasks', 0) == tasks_antes
+
+            # Sem novo acesso, a fila do usuário deixa de ser mantida
+            await asyncio.sleep(3)
+            estatisticas = atualizador.estatisticas()
+            assert estatisticas['usuarios'] == 0
+            assert [f['fila'] for f in estatisticas['filas']] == ['grupo:lento']
+        finally:
+            atualizador.parar()
+
+    asyncio.run(executar())
+    assert json.loads((tmp_path / "filas_ativas.json").read_text())['usuarios'] == {}